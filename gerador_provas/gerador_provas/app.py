@@ -13,27 +13,41 @@ Fluxo de Negócio (Versão Piloto):
 6. Sistema gera N provas únicas com embaralhamento
 """
 
+from __future__ import annotations
+
 import os
 import json
-from flask import Flask, render_template, request, jsonify, send_from_directory, send_file, redirect, url_for
+from flask import Flask, render_template, request, jsonify, send_from_directory, send_file, redirect, url_for, Response, stream_with_context
+from werkzeug.utils import safe_join
 from config import settings
-from backend.main_crewai import (
-    gerar_questao_simples,
-    gerar_prova_completa,
-    gerar_multiplas_questoes,
-    gerar_questao_com_diagrama
-)
-from backend.services.prova_service import ProvaService, ConfiguracaoProva
-from backend.services.revisao_service import RevisaoService, RevisaoQuestao, FonteBibliografica
-from backend.services.prova_individual_service import ProvaIndividualService, ConfiguracaoProvaIndividual
+
+# O pool de compilação de PDFs (spawn) reimporta este arquivo como
+# __mp_main__ em cada processo filho: agentes, serviços, fila de lotes e
+# consultas ao banco ficam só no processo do servidor
+PROCESSO_SERVIDOR = __name__ != "__mp_main__"
+
+if PROCESSO_SERVIDOR:
+    from backend.main_crewai import (
+        gerar_questao_simples,
+        gerar_prova_completa,
+        gerar_multiplas_questoes,
+        gerar_questao_com_diagrama
+    )
+    from backend.services.prova_service import ProvaService, ConfiguracaoProva
+    from backend.services.revisao_service import RevisaoService, RevisaoQuestao, FonteBibliografica
+    from backend.services.prova_individual_service import ProvaIndividualService, ConfiguracaoProvaIndividual
+    from backend.services.fila_lotes_service import FilaLotesService
+    from backend.utils.empacotador_zip import gerar_zip_stream, listar_arquivos
+    from backend.repositories.paginacao import CursorInvalido
 
 # Tenta importar o gerador de IA (pode falhar se LLM não configurado)
-try:
-    from backend.gerador_ia import gerar_questao_ia, gerar_multiplas_ia
-    IA_DISPONIVEL = True
-except Exception as e:
-    print(f"[INFO] Gerador de IA não disponível: {e}")
-    IA_DISPONIVEL = False
+IA_DISPONIVEL = False
+if PROCESSO_SERVIDOR:
+    try:
+        from backend.gerador_ia import gerar_questao_ia, gerar_multiplas_ia, gerar_questao_stream
+        IA_DISPONIVEL = True
+    except Exception as e:
+        print(f"[INFO] Gerador de IA não disponível: {e}")
 
 # Verifica se deve usar IA
 USE_AI = os.getenv("USE_AI_GENERATION", "false").lower() == "true" and IA_DISPONIVEL
@@ -42,17 +56,26 @@ USE_AI = os.getenv("USE_AI_GENERATION", "false").lower() == "true" and IA_DISPON
 app = Flask(__name__, static_folder='static')
 app.config['SECRET_KEY'] = settings.SECRET_KEY
 
-# Criar diretórios necessários
 DIAGRAMAS_DIR = os.path.join(app.static_folder, settings.DIAGRAMAS_DIR.replace('static/', ''))
-os.makedirs(DIAGRAMAS_DIR, exist_ok=True)
-os.makedirs(settings.LOG_DIR, exist_ok=True)
-os.makedirs(settings.OUTPUT_DIR, exist_ok=True)
-os.makedirs(settings.PDF_OUTPUT_DIR, exist_ok=True)
 
-# Serviços
-prova_service = ProvaService()
-revisao_service = RevisaoService()
-prova_individual_service = ProvaIndividualService()
+# Questões por página em /banco-questoes
+BANCO_QUESTOES_POR_PAGINA = 30
+
+if PROCESSO_SERVIDOR:
+    # Criar diretórios necessários
+    os.makedirs(DIAGRAMAS_DIR, exist_ok=True)
+    os.makedirs(settings.LOG_DIR, exist_ok=True)
+    os.makedirs(settings.OUTPUT_DIR, exist_ok=True)
+    os.makedirs(settings.PDF_OUTPUT_DIR, exist_ok=True)
+    
+    # Serviços
+    prova_service = ProvaService()
+    revisao_service = RevisaoService()
+    prova_individual_service = ProvaIndividualService()
+    fila_lotes_service = FilaLotesService(prova_individual_service)
+    
+    # Mapas código -> ID de matérias/tópicos (sem banco, carregados sob demanda)
+    prova_service.questao_repository.precarregar_dominio()
 
 
 # Filtro Jinja2 customizado para obter basename de path
@@ -87,8 +110,16 @@ def index():
             # Geração de MÚLTIPLAS questões
             if multiplas:
                 if modo == "ia" and IA_DISPONIVEL:
-                    # Múltiplas com IA
-                    questoes = gerar_multiplas_ia(materia, quantidade, topico, dificuldade)
+                    # Múltiplas com IA (chamadas paralelas, 1 por questão)
+                    questoes = gerar_multiplas_ia(
+                        materia, quantidade, topico, dificuldade, paralelo=True
+                    )
+                    falhas = [q for q in questoes if q.get("erro")]
+                    questoes = [q for q in questoes if not q.get("erro")]
+                    if falhas:
+                        print(f"[AVISO] {len(falhas)} de {quantidade} questões falharam: {falhas[0]['erro']}")
+                    if not questoes:
+                        raise RuntimeError(falhas[0]["erro"])
                 else:
                     # Múltiplas com templates
                     questoes = gerar_multiplas_questoes(
@@ -222,27 +253,51 @@ def sobre():
 
 @app.route("/banco-questoes")
 def banco_questoes():
-    """Página do banco de questões do professor."""
+    """
+    Página do banco de questões do professor (paginação por cursor).
+    
+    Query params:
+        tab: todas | pendentes | aprovadas
+        materia, status, dificuldade: Filtros
+        q: Busca no enunciado
+        cursor: Valor de "proximo_cursor" da página anterior
+    """
     tab = request.args.get("tab", "todas")
-    materia = request.args.get("materia")
+    if tab not in RevisaoService.ABAS_LISTAGEM:
+        tab = "todas"
     
-    # Obter questões conforme a tab
-    if tab == "pendentes":
-        questoes = revisao_service.obter_questoes_pendentes(materia=materia)
-    elif tab == "aprovadas":
-        questoes = revisao_service.obter_questoes_aprovadas(materia=materia)
-    else:
-        # Todas as questões
-        pendentes = revisao_service.obter_questoes_pendentes(materia=materia)
-        aprovadas = revisao_service.obter_questoes_aprovadas(materia=materia)
-        questoes = pendentes + aprovadas
+    filtros = {
+        "materia": request.args.get("materia") or None,
+        "status": request.args.get("status") or None,
+        "dificuldade": request.args.get("dificuldade") or None,
+        "q": request.args.get("q", "").strip() or None
+    }
+    if filtros["status"] not in RevisaoService.STATUS_REVISAO:
+        filtros["status"] = None
+    
+    try:
+        pagina = revisao_service.listar_questoes_pagina(
+            aba=tab,
+            materia=filtros["materia"],
+            status=filtros["status"],
+            dificuldade=filtros["dificuldade"],
+            texto=filtros["q"],
+            limite=BANCO_QUESTOES_POR_PAGINA,
+            cursor=request.args.get("cursor") or None
+        )
+    except CursorInvalido:
+        # Cursor antigo ou adulterado: volta para a primeira página
+        return redirect(url_for('banco_questoes', tab=tab, **{k: v for k, v in filtros.items() if v}))
     
     # Estatísticas
     estatisticas = revisao_service.obter_estatisticas()
     
     return render_template(
         "banco_questoes.html",
-        questoes=questoes,
+        questoes=pagina["questoes"],
+        proximo_cursor=pagina["proximo_cursor"],
+        pagina_inicial=not request.args.get("cursor"),
+        filtros={k: v for k, v in filtros.items() if v},
         estatisticas=estatisticas,
         tab=tab
     )
@@ -358,12 +413,8 @@ def montar_prova():
     questoes_ids = request.args.get("questoes", "").split(",")
     questoes_ids = [q.strip() for q in questoes_ids if q.strip()]
     
-    # Buscar as questões
-    questoes = []
-    for questao_id in questoes_ids:
-        questao = revisao_service.obter_questao(questao_id)
-        if questao:
-            questoes.append(questao)
+    # Buscar as questões (em lote, na ordem da seleção)
+    questoes = revisao_service.obter_questoes(questoes_ids)
     
     return render_template("montar_prova.html", questoes=questoes)
 
@@ -407,17 +458,9 @@ def gerar_provas_individuais():
             gerar_zip=True
         )
         
-        # Gerar provas
-        resultado = prova_individual_service.gerar_provas_individuais(config)
-        
-        if resultado.status == "erro":
-            return render_template(
-                "montar_prova.html",
-                questoes=[],
-                erro=resultado.erro
-            )
-        
-        return render_template("provas_individuais.html", resultado=resultado)
+        # Gerar provas em segundo plano e acompanhar o progresso
+        lote_id = fila_lotes_service.submeter(config)
+        return redirect(url_for("acompanhar_lote", lote_id=lote_id))
         
     except Exception as e:
         return render_template(
@@ -427,19 +470,61 @@ def gerar_provas_individuais():
         )
 
 
+@app.route("/lotes-provas/<lote_id>")
+def acompanhar_lote(lote_id):
+    """Página de progresso do lote; mostra o resultado quando concluído."""
+    progresso = fila_lotes_service.obter_progresso(lote_id)
+    
+    if progresso is None:
+        return render_template(
+            "montar_prova.html",
+            questoes=[],
+            erro="Lote não encontrado"
+        ), 404
+    
+    if progresso["status"] == "erro":
+        return render_template(
+            "montar_prova.html",
+            questoes=[],
+            erro=progresso["erro"]
+        )
+    
+    resultado = fila_lotes_service.obter_resultado(lote_id)
+    if resultado is not None:
+        return render_template("provas_individuais.html", resultado=resultado)
+    
+    return render_template("lote_progresso.html", progresso=progresso)
+
+
 @app.route("/download/zip/<path:filename>")
 def download_zip(filename):
-    """Rota para download de arquivos ZIP."""
-    try:
-        directory = os.path.join(settings.OUTPUT_DIR, "provas_individuais")
+    """
+    Rota para download de arquivos ZIP.
+    
+    Se o ZIP não foi gravado (ou com ?stream=1), o ZIP é montado em
+    streaming a partir do diretório do lote, sem passar pelo disco.
+    """
+    directory = os.path.join(settings.OUTPUT_DIR, "provas_individuais")
+    caminho_zip = safe_join(directory, filename)
+    forcar_stream = request.args.get("stream") == "1"
+    
+    if caminho_zip and os.path.isfile(caminho_zip) and not forcar_stream:
         return send_from_directory(
             directory,
             filename,
             as_attachment=True,
             download_name=filename
         )
-    except Exception as e:
-        return jsonify({"erro": str(e)}), 404
+    
+    lote_dir = safe_join(directory, os.path.splitext(filename)[0])
+    if not lote_dir or not os.path.isdir(lote_dir):
+        return jsonify({"erro": f"Arquivo não encontrado: {filename}"}), 404
+    
+    return Response(
+        stream_with_context(gerar_zip_stream(listar_arquivos(lote_dir))),
+        mimetype="application/zip",
+        headers={"Content-Disposition": f'attachment; filename="{os.path.basename(filename)}"'}
+    )
 
 
 # =============================================================================
@@ -508,6 +593,57 @@ def api_gerar_questao():
         return jsonify({"erro": str(e)}), 500
 
 
+@app.route("/api/questao/stream", methods=["GET", "POST"])
+def api_gerar_questao_stream():
+    """
+    API para geração de questão com IA via Server-Sent Events.
+    
+    Parâmetros (JSON no POST ou query string no GET, para EventSource):
+        materia, topico, dificuldade, observacoes, usar_cache
+    
+    Eventos:
+        inicio  - enviado imediatamente ao conectar
+        token   - {"texto": "..."} parte da resposta do LLM
+        questao - {"questao": {...}} assim que o JSON da questão fecha
+        erro    - {"erro": "..."}
+        fim     - fim do stream
+    """
+    if not IA_DISPONIVEL:
+        return jsonify({"erro": "IA não disponível. Configure a API key no arquivo .env"}), 503
+    
+    dados = request.get_json(silent=True) or request.args
+    
+    materia = dados.get("materia", "farmacologia")
+    topico = dados.get("topico", "") or "geral"
+    dificuldade = dados.get("dificuldade", "medio")
+    observacoes = (dados.get("observacoes", "") or "").strip()
+    usar_cache = str(dados.get("usar_cache", "true")).lower() != "false"
+    
+    def _evento(nome: str, dados_evento: dict) -> str:
+        return f"event: {nome}\ndata: {json.dumps(dados_evento, ensure_ascii=False, default=str)}\n\n"
+    
+    def gerar_eventos():
+        yield _evento("inicio", {"materia": materia, "topico": topico})
+        try:
+            for evento in gerar_questao_stream(
+                materia, topico, dificuldade, observacoes, usar_cache=usar_cache
+            ):
+                nome = evento.pop("evento")
+                yield _evento(nome, evento)
+        except Exception as e:
+            yield _evento("erro", {"erro": str(e)})
+        yield _evento("fim", {})
+    
+    return Response(
+        stream_with_context(gerar_eventos()),
+        mimetype="text/event-stream",
+        headers={
+            "Cache-Control": "no-cache",
+            "X-Accel-Buffering": "no",  # Desativa buffer do nginx
+        }
+    )
+
+
 @app.route("/api/prova", methods=["POST"])
 def api_gerar_prova():
     """
@@ -680,34 +816,161 @@ def health_check():
 # NOVAS APIs - FLUXO DE REVISÃO E PROVAS INDIVIDUAIS
 # =============================================================================
 
-@app.route("/api/questoes/pendentes", methods=["GET"])
-def api_questoes_pendentes():
-    """API para listar questões pendentes de revisão."""
-    materia = request.args.get("materia")
-    limite = int(request.args.get("limite", 50))
+def _inteiro_da_query(nome: str, padrao: int, minimo: int = 0, maximo: int = None) -> int:
+    """
+    Lê um inteiro da query string, limitado ao intervalo [minimo, maximo].
     
-    questoes = revisao_service.obter_questoes_pendentes(materia=materia, limite=limite)
+    Raises:
+        ValueError: Valor não numérico (as rotas respondem 400)
+    """
+    valor = request.args.get(nome, "").strip()
+    if not valor:
+        return padrao
+    try:
+        numero = max(int(valor), minimo)
+    except ValueError:
+        raise ValueError(f"Parâmetro '{nome}' deve ser um número inteiro") from None
+    return min(numero, maximo) if maximo is not None else numero
+
+
+@app.route("/api/questoes", methods=["GET"])
+def api_listar_questoes():
+    """
+    API para listar o banco de questões (paginação por cursor).
+    
+    Query params:
+        materia: Filtrar por matéria
+        dificuldade: Filtrar por dificuldade
+        status: Filtrar por status
+        q: Busca no enunciado
+        limite: Questões por página (padrão 50, máximo 200)
+        cursor: Valor de "proximo_cursor" da página anterior
+    
+    Response:
+        {"questoes": [...], "total": 50, "proximo_cursor": "..." | null}
+    """
+    try:
+        limite = _inteiro_da_query("limite", 50, minimo=1, maximo=200)
+    except ValueError as e:
+        return jsonify({"erro": str(e)}), 400
+    
+    try:
+        pagina = prova_service.questao_service.buscar_questoes_pagina(
+            materia=request.args.get("materia"),
+            dificuldade=request.args.get("dificuldade"),
+            status=request.args.get("status"),
+            limite=limite,
+            cursor=request.args.get("cursor") or None,
+            texto=request.args.get("q", "").strip() or None
+        )
+    except CursorInvalido as e:
+        return jsonify({"erro": str(e)}), 400
+    except Exception as e:
+        return jsonify({"erro": str(e)}), 503
     
     return jsonify({
-        "questoes": questoes,
-        "total": len(questoes)
+        "questoes": pagina["questoes"],
+        "total": len(pagina["questoes"]),
+        "proximo_cursor": pagina["proximo_cursor"]
     })
 
 
-@app.route("/api/questoes/aprovadas", methods=["GET"])
-def api_questoes_aprovadas():
-    """API para listar questões aprovadas."""
-    materia = request.args.get("materia")
-    limite = int(request.args.get("limite", 100))
+@app.route("/api/questoes/busca", methods=["GET"])
+def api_buscar_questoes():
+    """
+    API de busca textual no banco de questões.
     
-    questoes = revisao_service.obter_questoes_aprovadas(materia=materia, limite=limite)
+    Query params:
+        q: Texto da busca ("frase exata", -excluir, termo1 or termo2)
+        palavras_chave: Lista separada por vírgulas (todas obrigatórias)
+        materia, dificuldade, status: Filtros
+        limite: Resultados por página (padrão 20, máximo 100)
+        offset: Posição inicial
+    
+    Response:
+        {"questoes": [...], "total": 20, "consulta": "..."}
+    """
+    texto = request.args.get("q", "").strip()
+    palavras_chave = [p for p in request.args.get("palavras_chave", "").split(",") if p.strip()]
+    
+    if not texto and not palavras_chave:
+        return jsonify({"erro": "Informe o texto (q) ou palavras_chave"}), 400
+    
+    try:
+        limite = _inteiro_da_query("limite", 20, minimo=1, maximo=100)
+        offset = _inteiro_da_query("offset", 0)
+    except ValueError as e:
+        return jsonify({"erro": str(e)}), 400
+    
+    try:
+        questoes = prova_service.questao_service.buscar_texto(
+            texto=texto or None,
+            palavras_chave=palavras_chave or None,
+            materia=request.args.get("materia"),
+            dificuldade=request.args.get("dificuldade"),
+            status=request.args.get("status"),
+            limite=limite,
+            offset=offset
+        )
+    except Exception as e:
+        return jsonify({"erro": str(e)}), 503
     
     return jsonify({
         "questoes": questoes,
-        "total": len(questoes)
+        "total": len(questoes),
+        "consulta": texto
+    })
+
+
+def _pagina_revisao(aba: str, limite_padrao: int):
+    """
+    Página de questões do fluxo de revisão para as APIs de listagem.
+    
+    Query params:
+        materia, dificuldade: Filtros
+        q: Busca no enunciado
+        limite: Questões por página (máximo 200)
+        cursor: Valor de "proximo_cursor" da página anterior
+    
+    Response:
+        {"questoes": [...], "total": N, "proximo_cursor": "..." | null}
+    """
+    try:
+        limite = _inteiro_da_query("limite", limite_padrao, minimo=1, maximo=200)
+    except ValueError as e:
+        return jsonify({"erro": str(e)}), 400
+    
+    try:
+        pagina = revisao_service.listar_questoes_pagina(
+            aba=aba,
+            materia=request.args.get("materia") or None,
+            dificuldade=request.args.get("dificuldade") or None,
+            texto=request.args.get("q") or None,
+            limite=limite,
+            cursor=request.args.get("cursor") or None
+        )
+    except CursorInvalido as e:
+        return jsonify({"erro": str(e)}), 400
+    
+    return jsonify({
+        "questoes": pagina["questoes"],
+        "total": len(pagina["questoes"]),
+        "proximo_cursor": pagina["proximo_cursor"]
     })
 
 
+@app.route("/api/questoes/pendentes", methods=["GET"])
+def api_questoes_pendentes():
+    """API para listar questões pendentes de revisão (ver _pagina_revisao)."""
+    return _pagina_revisao("pendentes", limite_padrao=50)
+
+
+@app.route("/api/questoes/aprovadas", methods=["GET"])
+def api_questoes_aprovadas():
+    """API para listar questões aprovadas (ver _pagina_revisao)."""
+    return _pagina_revisao("aprovadas", limite_padrao=100)
+
+
 @app.route("/api/questao/<questao_id>", methods=["GET"])
 def api_obter_questao(questao_id):
     """API para obter uma questão específica."""
@@ -722,9 +985,7 @@ def api_obter_questao(questao_id):
 @app.route("/api/questao/<questao_id>", methods=["DELETE"])
 def api_excluir_questao(questao_id):
     """API para excluir uma questão."""
-    # Por enquanto apenas remove do cache
-    if questao_id in revisao_service._questoes_cache:
-        del revisao_service._questoes_cache[questao_id]
+    if revisao_service.excluir_questao(questao_id):
         return jsonify({"sucesso": True})
     
     return jsonify({"erro": "Questão não encontrada"}), 404
@@ -796,48 +1057,159 @@ def api_gerar_provas_individuais():
         return jsonify({"erro": "Nenhuma questão selecionada"}), 400
     
     try:
-        config = ConfiguracaoProvaIndividual(
-            titulo=dados.get("titulo", "Prova"),
-            questoes_ids=dados["questoes_ids"],
-            quantidade_alunos=dados.get("quantidade_alunos", 30),
-            embaralhar_questoes=dados.get("embaralhar_questoes", True),
-            embaralhar_alternativas=dados.get("embaralhar_alternativas", True),
-            instituicao=dados.get("instituicao"),
-            instrucoes=dados.get("instrucoes"),
-            tempo_limite_min=dados.get("tempo_limite_min"),
-            gerar_pdf=dados.get("gerar_pdf", True),
-            gerar_zip=dados.get("gerar_zip", True)
-        )
+        config = _config_prova_individual_de_json(dados)
+        
+        # Geração em segundo plano (recomendado para turmas grandes)
+        if dados.get("assincrono"):
+            return _submeter_lote(config)
         
         resultado = prova_individual_service.gerar_provas_individuais(config)
         
-        return jsonify({
-            "lote_id": resultado.lote_id,
-            "titulo": resultado.titulo,
-            "provas_geradas": resultado.provas_geradas,
-            "tempo_geracao_seg": resultado.tempo_geracao_seg,
-            "caminho_zip": resultado.caminho_zip,
-            "gabarito_consolidado": resultado.gabarito_consolidado,
-            "status": resultado.status,
-            "erro": resultado.erro
-        })
+        return jsonify(_resultado_lote_para_json(resultado))
         
     except Exception as e:
         return jsonify({"erro": str(e)}), 500
 
 
+def _config_prova_individual_de_json(dados: dict) -> ConfiguracaoProvaIndividual:
+    """Monta a configuração do lote a partir do JSON da requisição."""
+    return ConfiguracaoProvaIndividual(
+        titulo=dados.get("titulo", "Prova"),
+        questoes_ids=dados["questoes_ids"],
+        quantidade_alunos=dados.get("quantidade_alunos", 30),
+        embaralhar_questoes=dados.get("embaralhar_questoes", True),
+        embaralhar_alternativas=dados.get("embaralhar_alternativas", True),
+        instituicao=dados.get("instituicao"),
+        instrucoes=dados.get("instrucoes"),
+        tempo_limite_min=dados.get("tempo_limite_min"),
+        gerar_pdf=dados.get("gerar_pdf", True),
+        gerar_zip=dados.get("gerar_zip", True)
+    )
+
+
+def _resultado_lote_para_json(resultado) -> dict:
+    """Converte ResultadoLoteProvas para a resposta da API."""
+    return {
+        "lote_id": resultado.lote_id,
+        "titulo": resultado.titulo,
+        "provas_geradas": resultado.provas_geradas,
+        "tempo_geracao_seg": resultado.tempo_geracao_seg,
+        "caminho_zip": resultado.caminho_zip,
+        "gabarito_consolidado": resultado.gabarito_consolidado,
+        "status": resultado.status,
+        "erro": resultado.erro
+    }
+
+
+def _submeter_lote(config: ConfiguracaoProvaIndividual):
+    """Coloca o lote na fila e responde 202 com as URLs de acompanhamento."""
+    lote_id = fila_lotes_service.submeter(config)
+    return jsonify({
+        "lote_id": lote_id,
+        "status": "na_fila",
+        "progresso_url": url_for("api_progresso_lote", lote_id=lote_id),
+        "resultado_url": url_for("api_resultado_lote", lote_id=lote_id)
+    }), 202
+
+
 @app.route("/api/lotes-provas", methods=["GET"])
 def api_listar_lotes():
-    """API para listar lotes de provas gerados."""
-    limite = int(request.args.get("limite", 20))
-    lotes = prova_individual_service.listar_lotes(limite=limite)
+    """
+    API para listar lotes de provas gerados (mais recentes primeiro).
+    
+    Query params:
+        limite: Lotes por página (padrão 20)
+        antes_de: Valor de "proximo" da página anterior
+    """
+    try:
+        limite = _inteiro_da_query("limite", 20, minimo=1, maximo=200)
+        lotes = prova_individual_service.listar_lotes(
+            limite=limite, antes_de=request.args.get("antes_de") or None
+        )
+    except ValueError as e:
+        return jsonify({"erro": str(e)}), 400
+    
+    proximo = None
+    if len(lotes) == limite and lotes[-1].get("lote_id"):
+        proximo = lotes[-1]["lote_id"]
     
     return jsonify({
         "lotes": lotes,
-        "total": len(lotes)
+        "total": len(lotes),
+        "proximo": proximo,
+        "em_processamento": fila_lotes_service.listar_tarefas()
     })
 
 
+@app.route("/api/lotes-provas", methods=["POST"])
+def api_submeter_lote():
+    """
+    API para gerar um lote de provas individuais em segundo plano.
+    
+    Request Body: igual a /api/provas-individuais
+    
+    Response (202):
+        {
+            "lote_id": "...",
+            "status": "na_fila",
+            "progresso_url": "/api/lotes-provas/<lote_id>",
+            "resultado_url": "/api/lotes-provas/<lote_id>/resultado"
+        }
+    """
+    dados = request.get_json(silent=True)
+    
+    if not dados:
+        return jsonify({"erro": "Dados não fornecidos"}), 400
+    
+    if not dados.get("questoes_ids"):
+        return jsonify({"erro": "Nenhuma questão selecionada"}), 400
+    
+    try:
+        return _submeter_lote(_config_prova_individual_de_json(dados))
+    except Exception as e:
+        return jsonify({"erro": str(e)}), 500
+
+
+@app.route("/api/lotes-provas/<lote_id>", methods=["GET"])
+def api_progresso_lote(lote_id):
+    """
+    API de progresso de um lote.
+    
+    Response:
+        {
+            "lote_id": "...",
+            "status": "na_fila" | "gerando" | "concluido" | "erro",
+            "provas_concluidas": 12,
+            "total_provas": 30,
+            "percentual": 40.0,
+            "eta_seg": 35.2
+        }
+    """
+    progresso = fila_lotes_service.obter_progresso(lote_id)
+    
+    if progresso is None:
+        return jsonify({"erro": "Lote não encontrado"}), 404
+    
+    return jsonify(progresso)
+
+
+@app.route("/api/lotes-provas/<lote_id>/resultado", methods=["GET"])
+def api_resultado_lote(lote_id):
+    """API com o resultado final do lote (202 enquanto não terminar)."""
+    progresso = fila_lotes_service.obter_progresso(lote_id)
+    
+    if progresso is None:
+        return jsonify({"erro": "Lote não encontrado"}), 404
+    
+    resultado = fila_lotes_service.obter_resultado(lote_id)
+    if resultado is None:
+        # Lotes de execuções anteriores só têm o resumo gravado no banco
+        finalizado = progresso["status"] in ("concluido", "erro")
+        return jsonify(progresso), 200 if finalizado else 202
+    
+    return jsonify(_resultado_lote_para_json(resultado))
+
+
 @app.route("/api/estatisticas/revisao", methods=["GET"])
 def api_estatisticas_revisao():
     """API para obter estatísticas do fluxo de revisão."""
@@ -8,17 +8,25 @@ Módulos:
 - repositories: Acesso ao banco de dados
 """
 
-from backend.main_crewai import (
-    gerar_questao_simples,
-    gerar_prova_completa,
-    gerar_multiplas_questoes,
-    gerar_questao_com_diagrama
-)
+import importlib
 
-__all__ = [
-    'gerar_questao_simples',
-    'gerar_prova_completa', 
-    'gerar_multiplas_questoes',
-    'gerar_questao_com_diagrama'
-]
+# Nome exportado -> módulo. Importados sob demanda: os subpacotes (repositórios,
+# PDFs, migrações, processos do pool de compilação) não carregam o CrewAI
+_EXPORTACOES = {
+    'gerar_questao_simples': 'backend.main_crewai',
+    'gerar_prova_completa': 'backend.main_crewai',
+    'gerar_multiplas_questoes': 'backend.main_crewai',
+    'gerar_questao_com_diagrama': 'backend.main_crewai',
+}
+
+__all__ = list(_EXPORTACOES)
+
+
+def __getattr__(nome):
+    modulo = _EXPORTACOES.get(nome)
+    if modulo is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {nome!r}")
+    valor = getattr(importlib.import_module(modulo), nome)
+    globals()[nome] = valor
+    return valor
 
@@ -242,53 +242,35 @@ def verificar_questao_bibliograficamente(questao: dict) -> dict:
     return get_verificador().verificar_questao(questao)
 
 
-def verificar_questao_com_ia(questao: dict) -> dict:
+def verificar_questao_com_ia(questao: dict, usar_cache: bool = True) -> dict:
     """
     Verifica uma questão usando IA (1 chamada adicional à API).
     
     Faz uma chamada à API para verificar a precisão científica
     da questão consultando o conhecimento do modelo sobre
-    fontes acadêmicas.
+    fontes acadêmicas. Reverificar uma questão inalterada usa
+    a resposta do cache local.
     
     Args:
         questao: Dicionário com a questão
+        usar_cache: Se False, sempre chama a API
     
     Returns:
         Questão original + campo 'verificacao' com o resultado
     """
-    import litellm
-    from backend.llm_config import detectar_provider_automatico
+    from backend.llm_config import get_cliente_llm
     
     verificador = get_verificador()
     prompt = verificador.get_prompt_verificacao(questao)
     
-    provider, model = detectar_provider_automatico()
-    
-    # Configura o modelo
-    if provider == "gemini":
-        model_name = f"gemini/{model}"
-        api_key = os.getenv("GOOGLE_API_KEY")
-    elif provider == "openai":
-        model_name = model
-        api_key = os.getenv("OPENAI_API_KEY")
-    elif provider == "anthropic":
-        model_name = f"anthropic/{model}"
-        api_key = os.getenv("ANTHROPIC_API_KEY")
-    else:
-        model_name = f"ollama/{model}"
-        api_key = None
-    
     try:
         # 1 chamada à API para verificação
-        response = litellm.completion(
-            model=model_name,
-            messages=[{"role": "user", "content": prompt}],
-            api_key=api_key,
-            temperature=0.3,  # Mais determinístico para verificação
+        response_text = get_cliente_llm().completar(
+            prompt,
+            temperatura=0.3,  # Mais determinístico para verificação
+            usar_cache=usar_cache
         )
         
-        response_text = response.choices[0].message.content
-        
         # Tenta extrair JSON da resposta
         verificacao = _parse_verificacao(response_text)
         
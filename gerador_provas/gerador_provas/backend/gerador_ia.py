@@ -8,6 +8,7 @@ questões verdadeiramente originais e contextualizadas.
 
 import json
 import re
+from contextlib import closing
 from typing import Optional
 from crewai import Agent, Task, Crew, Process
 
@@ -282,55 +283,46 @@ def gerar_questao_direta(
     disciplina: str,
     topico: str = "geral",
     dificuldade: str = "medio",
-    observacoes: str = ""
+    observacoes: str = "",
+    usar_cache: bool = True
 ) -> dict:
     """
     Gera uma questão com 1 ÚNICA chamada à API (mais eficiente).
     
     Esta função NÃO usa CrewAI, faz uma chamada direta ao LLM.
-    Ideal para APIs com limite de quota.
+    Ideal para APIs com limite de quota. Respostas para o mesmo
+    prompt/modelo/temperatura são reaproveitadas do cache local.
     
     Args:
         disciplina: Nome da disciplina
         topico: Tópico específico
         dificuldade: Nível (facil, medio, dificil)
         observacoes: Instruções específicas do professor
+        usar_cache: Se False, sempre chama a API (gera uma questão nova)
     
     Returns:
         Dicionário com a questão gerada
     """
-    import litellm
-    from backend.llm_config import detectar_provider_automatico
-    import os
+    from backend.llm_config import get_cliente_llm
     
-    provider, model = detectar_provider_automatico()
     prompt = get_prompt(disciplina, topico, dificuldade, observacoes)
     
-    # Configura o modelo no formato do LiteLLM
-    if provider == "gemini":
-        model_name = f"gemini/{model}"
-        api_key = os.getenv("GOOGLE_API_KEY")
-    elif provider == "openai":
-        model_name = model
-        api_key = os.getenv("OPENAI_API_KEY")
-    elif provider == "anthropic":
-        model_name = f"anthropic/{model}"
-        api_key = os.getenv("ANTHROPIC_API_KEY")
-    else:
-        model_name = f"ollama/{model}"
-        api_key = None
-    
-    # 1 única chamada à API
-    response = litellm.completion(
-        model=model_name,
-        messages=[{"role": "user", "content": prompt}],
-        api_key=api_key,
-        temperature=0.7,
+    # 1 única chamada à API (ou resposta do cache)
+    response_text = get_cliente_llm().completar(
+        prompt, temperatura=0.7, usar_cache=usar_cache
     )
     
-    # Extrai a resposta
-    response_text = response.choices[0].message.content
-    
+    return _montar_questao_direta(response_text, disciplina, topico, dificuldade, observacoes)
+
+
+def _montar_questao_direta(
+    response_text: str,
+    disciplina: str,
+    topico: str,
+    dificuldade: str,
+    observacoes: str
+) -> dict:
+    """Faz o parse da resposta do LLM e adiciona os metadados da questão."""
     # Parse do JSON
     gerador = GeradorQuestoesIA.__new__(GeradorQuestoesIA)
     questao = gerador._parse_json_response(response_text)
@@ -349,6 +341,125 @@ def gerar_questao_direta(
     return questao
 
 
+class DetectorJSONIncremental:
+    """
+    Detecta o fechamento do primeiro objeto JSON em um texto recebido em partes.
+    
+    Conta chaves fora de strings (respeitando escapes), de forma que o
+    objeto pode ser processado assim que o LLM fecha a última chave,
+    sem esperar o fim da resposta.
+    """
+    
+    def __init__(self):
+        self.texto = ""
+        self.concluido = False
+        self._posicao = 0
+        self._inicio = None
+        self._profundidade = 0
+        self._em_string = False
+        self._escape = False
+    
+    def alimentar(self, parte: str) -> Optional[str]:
+        """
+        Adiciona uma parte do texto.
+        
+        Returns:
+            O texto do objeto JSON completo na primeira vez que ele fecha,
+            ou None
+        """
+        self.texto += parte
+        if self.concluido:
+            return None
+        
+        for i in range(self._posicao, len(self.texto)):
+            c = self.texto[i]
+            
+            if self._inicio is None:
+                if c == '{':
+                    self._inicio = i
+                    self._profundidade = 1
+                continue
+            
+            if self._em_string:
+                if self._escape:
+                    self._escape = False
+                elif c == '\\':
+                    self._escape = True
+                elif c == '"':
+                    self._em_string = False
+                continue
+            
+            if c == '"':
+                self._em_string = True
+            elif c == '{':
+                self._profundidade += 1
+            elif c == '}':
+                self._profundidade -= 1
+                if self._profundidade == 0:
+                    self.concluido = True
+                    self._posicao = i + 1
+                    return self.texto[self._inicio:i + 1]
+        
+        self._posicao = len(self.texto)
+        return None
+
+
+def gerar_questao_stream(
+    disciplina: str,
+    topico: str = "geral",
+    dificuldade: str = "medio",
+    observacoes: str = "",
+    usar_cache: bool = True
+):
+    """
+    Gera uma questão repassando o texto do LLM à medida que chega.
+    
+    Produz eventos (dicts com a chave 'evento'):
+        {"evento": "token", "texto": "..."}   - parte da resposta
+        {"evento": "questao", "questao": {...}} - questão pronta, assim que o JSON fecha
+    
+    Args:
+        disciplina: Nome da disciplina
+        topico: Tópico específico
+        dificuldade: Nível (facil, medio, dificil)
+        observacoes: Instruções específicas do professor
+        usar_cache: Se False, sempre chama a API
+    """
+    from backend.llm_config import get_cliente_llm
+    
+    prompt = get_prompt(disciplina, topico, dificuldade, observacoes)
+    detector = DetectorJSONIncremental()
+    
+    # closing(): se o cliente desconectar, fechar este gerador fecha o
+    # stream, que cancela a chamada ao LLM (nada de drenar sem leitor)
+    with closing(get_cliente_llm().stream(prompt, temperatura=0.7, usar_cache=usar_cache)) as partes:
+        for parte in partes:
+            if detector.concluido:
+                # Texto após o JSON não interessa ao cliente; o stream segue só
+                # para que a resposta completa vá para o cache
+                continue
+            
+            yield {"evento": "token", "texto": parte}
+            
+            json_texto = detector.alimentar(parte)
+            if json_texto is not None:
+                yield {
+                    "evento": "questao",
+                    "questao": _montar_questao_direta(
+                        json_texto, disciplina, topico, dificuldade, observacoes
+                    )
+                }
+    
+    # Resposta sem objeto JSON: usa o fallback do parser
+    if not detector.concluido:
+        yield {
+            "evento": "questao",
+            "questao": _montar_questao_direta(
+                detector.texto, disciplina, topico, dificuldade, observacoes
+            )
+        }
+
+
 # =============================================================================
 # Funções de conveniência
 # =============================================================================
@@ -368,7 +479,8 @@ def gerar_questao_ia(
     topico: str = "geral",
     dificuldade: str = "medio",
     observacoes: str = "",
-    verificar_bibliografia: bool = False
+    verificar_bibliografia: bool = False,
+    usar_cache: bool = True
 ) -> dict:
     """
     Gera uma questão com IA.
@@ -379,6 +491,7 @@ def gerar_questao_ia(
         dificuldade: Nível (facil, medio, dificil)
         observacoes: Instruções do professor
         verificar_bibliografia: Se True, verifica em fontes acadêmicas (+1 chamada API)
+        usar_cache: Se False, ignora o cache de respostas do LLM
     
     Chamadas à API:
         - Sem verificação: 1 chamada
@@ -389,22 +502,108 @@ def gerar_questao_ia(
         questao = gerar_questao_ia("farmacologia", "antibioticos", "dificil", verificar_bibliografia=True)
     """
     # Gera a questão (1 chamada)
-    questao = gerar_questao_direta(disciplina, topico, dificuldade, observacoes)
+    questao = gerar_questao_direta(
+        disciplina, topico, dificuldade, observacoes, usar_cache=usar_cache
+    )
     
     # Verifica bibliografia se solicitado (+1 chamada)
     if verificar_bibliografia:
         from backend.agents.verificador_bibliografico import verificar_questao_com_ia
-        questao = verificar_questao_com_ia(questao)
+        questao = verificar_questao_com_ia(questao, usar_cache=usar_cache)
     
     return questao
 
 
+def gerar_multiplas_paralelo(
+    disciplina: str,
+    quantidade: int = 5,
+    topico: str = "geral",
+    dificuldade: str = "medio",
+    observacoes: str = "",
+    max_concorrencia: int = None,
+    usar_cache: bool = True
+) -> list:
+    """
+    Gera várias questões com chamadas independentes e simultâneas.
+    
+    Cada questão é uma chamada a gerar_questao_direta, executadas em um
+    pool de threads limitado por max_concorrencia e pelo limite de
+    requisições do provider. Uma resposta lenta ou inválida não
+    compromete as demais.
+    
+    Args:
+        disciplina: Nome da disciplina
+        quantidade: Número de questões
+        topico: Tópico específico
+        dificuldade: Nível (facil, medio, dificil)
+        observacoes: Instruções do professor
+        max_concorrencia: Chamadas simultâneas (padrão: LLM_MAX_CONCORRENCIA)
+        usar_cache: Se False, ignora o cache de respostas do LLM
+    
+    Returns:
+        Lista na mesma ordem solicitada. Posições que falharam contêm
+        {"erro": mensagem, "indice": i} no lugar da questão.
+    """
+    from concurrent.futures import ThreadPoolExecutor
+    from backend.llm_config import get_max_concorrencia
+    
+    if quantidade <= 0:
+        return []
+    
+    max_concorrencia = max_concorrencia or get_max_concorrencia()
+    
+    def _gerar(indice: int) -> dict:
+        # Cada posição recebe um prompt próprio para obter questões distintas
+        # (e chaves de cache distintas)
+        obs = observacoes
+        if quantidade > 1:
+            variacao = f"Questão {indice + 1} de {quantidade}: aborde um aspecto diferente do tema."
+            obs = f"{observacoes}\n{variacao}" if observacoes else variacao
+        
+        try:
+            questao = gerar_questao_direta(
+                disciplina, topico, dificuldade, obs, usar_cache=usar_cache
+            )
+            if observacoes:
+                questao["observacoes_professor"] = observacoes
+            else:
+                questao.pop("observacoes_professor", None)
+            return questao
+        except Exception as e:
+            return {
+                "erro": str(e),
+                "indice": indice,
+                "materia": disciplina,
+                "topico": topico,
+                "dificuldade": dificuldade,
+            }
+    
+    with ThreadPoolExecutor(max_workers=min(max_concorrencia, quantidade)) as executor:
+        # map preserva a ordem de submissão
+        return list(executor.map(_gerar, range(quantidade)))
+
+
 def gerar_multiplas_ia(
     disciplina: str,
     quantidade: int = 5,
     topico: str = "geral",
-    dificuldade: str = "medio"
+    dificuldade: str = "medio",
+    paralelo: bool = False,
+    max_concorrencia: int = None
 ) -> list:
-    """Função de conveniência para gerar múltiplas questões."""
+    """
+    Função de conveniência para gerar múltiplas questões.
+    
+    Args:
+        paralelo: Se True, usa gerar_multiplas_paralelo (1 chamada por questão,
+                  falhas parciais retornadas com campo 'erro');
+                  se False, gera todas em um único prompt via CrewAI
+        max_concorrencia: Chamadas simultâneas no modo paralelo
+    """
+    if paralelo:
+        return gerar_multiplas_paralelo(
+            disciplina, quantidade, topico, dificuldade,
+            max_concorrencia=max_concorrencia
+        )
     return get_gerador_ia().gerar_multiplas_questoes(disciplina, quantidade, topico, dificuldade)
 
@@ -15,7 +15,11 @@ DETECÇÃO AUTOMÁTICA:
 """
 
 import os
-from typing import Optional
+import time
+import queue
+import asyncio
+import threading
+from typing import Optional, Iterator, AsyncIterator
 from crewai import LLM
 
 
@@ -191,3 +195,369 @@ def listar_modelos_disponiveis() -> dict:
     """Retorna lista de modelos recomendados por provider."""
     return MODELOS_RECOMENDADOS
 
+
+
+# =============================================================================
+# Concorrência e limite de requisições
+# =============================================================================
+
+# Requisições por minuto aceitas por provider (0 = sem limite).
+# Pode ser sobrescrito com LLM_RATE_LIMIT_RPM no .env
+LIMITES_RPM_PADRAO = {
+    "gemini": 15,     # Free tier do Gemini Flash
+    "google": 15,
+    "openai": 60,
+    "anthropic": 50,
+    "ollama": 0,      # Local, sem limite
+}
+
+
+class LimitadorTaxa:
+    """
+    Limitador de requisições por minuto (thread-safe).
+    
+    Espaça o início das chamadas em intervalos de 60/rpm segundos,
+    de forma que várias threads compartilhando o mesmo limitador
+    nunca ultrapassem a taxa configurada.
+    """
+    
+    def __init__(self, requisicoes_por_minuto: int = 0):
+        self.requisicoes_por_minuto = requisicoes_por_minuto
+        self._intervalo = 60.0 / requisicoes_por_minuto if requisicoes_por_minuto > 0 else 0.0
+        self._proximo_horario = 0.0
+        self._lock = threading.Lock()
+    
+    def aguardar(self) -> float:
+        """
+        Bloqueia até que uma nova requisição possa ser feita.
+        
+        Returns:
+            Tempo esperado em segundos
+        """
+        if not self._intervalo:
+            return 0.0
+        
+        espera = self.reservar()
+        if espera > 0:
+            time.sleep(espera)
+        return espera
+    
+    def reservar(self) -> float:
+        """
+        Reserva o próximo horário livre sem bloquear.
+        
+        Returns:
+            Tempo em segundos que o chamador deve esperar antes da requisição
+        """
+        if not self._intervalo:
+            return 0.0
+        
+        with self._lock:
+            agora = time.monotonic()
+            inicio = max(agora, self._proximo_horario)
+            self._proximo_horario = inicio + self._intervalo
+        
+        return inicio - agora
+
+
+_limitadores: dict = {}
+_limitadores_lock = threading.Lock()
+
+
+def get_limitador_taxa(provider: str) -> LimitadorTaxa:
+    """Retorna o limitador compartilhado do provider (um por processo)."""
+    provider = (provider or "ollama").lower()
+    with _limitadores_lock:
+        if provider not in _limitadores:
+            rpm_env = os.getenv("LLM_RATE_LIMIT_RPM", "")
+            rpm = int(rpm_env) if rpm_env.strip() else LIMITES_RPM_PADRAO.get(provider, 0)
+            _limitadores[provider] = LimitadorTaxa(rpm)
+        return _limitadores[provider]
+
+
+def get_max_concorrencia() -> int:
+    """Número máximo de chamadas simultâneas ao LLM (LLM_MAX_CONCORRENCIA)."""
+    return max(1, int(os.getenv("LLM_MAX_CONCORRENCIA", 4)))
+
+
+# =============================================================================
+# Cliente compartilhado (chamadas diretas via LiteLLM)
+# =============================================================================
+
+def resolver_modelo_litellm(provider: str = None, model: str = None) -> tuple[str, str, Optional[str]]:
+    """
+    Resolve provider, nome do modelo no formato do LiteLLM e API key.
+    
+    Args:
+        provider: Provider do LLM (None para detecção automática)
+        model: Nome do modelo (None para o padrão do provider)
+    
+    Returns:
+        Tupla (provider, model_name, api_key)
+    """
+    if provider is None:
+        provider, detected_model = detectar_provider_automatico()
+        model = model or detected_model
+    else:
+        model = model or os.getenv("LLM_MODEL") or get_default_model(provider)
+    
+    provider = provider.lower()
+    
+    if provider in ["gemini", "google"]:
+        return provider, f"gemini/{model}", os.getenv("GOOGLE_API_KEY")
+    if provider == "openai":
+        return provider, model, os.getenv("OPENAI_API_KEY")
+    if provider == "anthropic":
+        return provider, f"anthropic/{model}", os.getenv("ANTHROPIC_API_KEY")
+    return provider, f"ollama/{model}", None
+
+
+class TempoEsgotadoLLM(TimeoutError):
+    """O LLM não respondeu dentro do tempo limite."""
+
+
+class ClienteLLM:
+    """
+    Cliente de chamadas diretas ao LLM (sem CrewAI).
+    
+    Resolve o provider uma única vez e executa as chamadas com
+    litellm.acompletion em um event loop próprio, de vida longa,
+    para que as conexões HTTP sejam reaproveitadas entre chamadas.
+    Aplica timeout, limite de requisições do provider e o cache
+    persistente de respostas.
+    
+    Uso assíncrono:
+        texto = await cliente.acompletar(prompt, temperatura=0.7)
+    
+    Uso síncrono (rotas Flask, threads):
+        texto = cliente.completar(prompt, temperatura=0.7)
+    """
+    
+    def __init__(self, provider: str = None, model: str = None, timeout: float = None):
+        self.provider, self.model_name, self.api_key = resolver_modelo_litellm(provider, model)
+        self.timeout = timeout or float(os.getenv("LLM_TIMEOUT_SEG", 120))
+        self.max_tentativas = int(os.getenv("LLM_MAX_TENTATIVAS", 2))
+        self.base_url = os.getenv("OLLAMA_BASE_URL") if self.provider == "ollama" else None
+        self._loop = None
+        self._loop_lock = threading.Lock()
+    
+    def _montar_parametros(self, prompt: str, temperatura: float, **kwargs) -> dict:
+        """Monta os parâmetros da chamada ao LiteLLM."""
+        parametros = {
+            "model": self.model_name,
+            "messages": [{"role": "user", "content": prompt}],
+            "temperature": temperatura,
+            "timeout": self.timeout,
+            "num_retries": self.max_tentativas,
+        }
+        if self.api_key:
+            parametros["api_key"] = self.api_key
+        if self.base_url:
+            parametros["api_base"] = self.base_url
+        parametros.update(kwargs)
+        return parametros
+    
+    async def acompletar(
+        self,
+        prompt: str,
+        temperatura: float = 0.7,
+        usar_cache: bool = True
+    ) -> str:
+        """
+        Envia um prompt ao LLM e retorna o texto da resposta.
+        
+        Args:
+            prompt: Prompt já renderizado
+            temperatura: Temperatura da geração
+            usar_cache: Se False, ignora o cache de respostas
+        
+        Returns:
+            Texto da resposta
+        """
+        import litellm
+        from backend.utils.llm_cache import get_llm_cache
+        
+        # O cache é SQLite (bloqueante): fora do event loop compartilhado
+        cache = get_llm_cache()
+        chave = None
+        if usar_cache:
+            chave, resposta = await asyncio.to_thread(
+                cache.consultar, self.model_name, prompt, temperatura
+            )
+            if resposta is not None:
+                return resposta
+        
+        espera = get_limitador_taxa(self.provider).reservar()
+        if espera > 0:
+            await asyncio.sleep(espera)
+        
+        response = await litellm.acompletion(**self._montar_parametros(prompt, temperatura))
+        resposta = response.choices[0].message.content
+        
+        if chave is not None:
+            await asyncio.to_thread(cache.salvar, chave, resposta, self.model_name)
+        
+        return resposta
+    
+    def _obter_loop(self) -> asyncio.AbstractEventLoop:
+        """Retorna o event loop de fundo (criado na primeira chamada)."""
+        if self._loop is None:
+            with self._loop_lock:
+                if self._loop is None:
+                    loop = asyncio.new_event_loop()
+                    thread = threading.Thread(
+                        target=loop.run_forever,
+                        name="cliente-llm",
+                        daemon=True
+                    )
+                    thread.start()
+                    self._loop = loop
+        return self._loop
+    
+    def completar(
+        self,
+        prompt: str,
+        temperatura: float = 0.7,
+        usar_cache: bool = True
+    ) -> str:
+        """
+        Versão síncrona de acompletar.
+        
+        Pode ser chamada de várias threads ao mesmo tempo: todas as
+        chamadas compartilham o mesmo event loop e suas conexões.
+        """
+        futuro = asyncio.run_coroutine_threadsafe(
+            self.acompletar(prompt, temperatura, usar_cache),
+            self._obter_loop()
+        )
+        # Margem para esperas do limitador de requisições
+        return futuro.result(timeout=self.timeout * (self.max_tentativas + 1) + 60)
+
+    async def astream(
+        self,
+        prompt: str,
+        temperatura: float = 0.7,
+        usar_cache: bool = True
+    ) -> AsyncIterator[str]:
+        """
+        Envia um prompt ao LLM e produz o texto da resposta em partes.
+        
+        Respostas em cache são produzidas de uma vez. A resposta completa
+        é gravada no cache ao final do stream.
+        """
+        import litellm
+        from backend.utils.llm_cache import get_llm_cache
+        
+        cache = get_llm_cache()
+        chave = None
+        if usar_cache:
+            chave, resposta = await asyncio.to_thread(
+                cache.consultar, self.model_name, prompt, temperatura
+            )
+            if resposta is not None:
+                yield resposta
+                return
+        
+        espera = get_limitador_taxa(self.provider).reservar()
+        if espera > 0:
+            await asyncio.sleep(espera)
+        
+        response = await litellm.acompletion(
+            **self._montar_parametros(prompt, temperatura, stream=True)
+        )
+        
+        partes = []
+        async for chunk in response:
+            texto = chunk.choices[0].delta.content if chunk.choices else None
+            if texto:
+                partes.append(texto)
+                yield texto
+        
+        if chave is not None:
+            await asyncio.to_thread(cache.salvar, chave, "".join(partes), self.model_name)
+    
+    def stream(
+        self,
+        prompt: str,
+        temperatura: float = 0.7,
+        usar_cache: bool = True
+    ) -> Iterator[str]:
+        """
+        Versão síncrona de astream (gerador de partes do texto).
+        
+        O stream roda no event loop de fundo e as partes são repassadas
+        por uma fila limitada, então pode ser consumido de uma rota Flask.
+        Se o consumidor parar (cliente desconectado, gerador fechado), a
+        chamada ao LLM é cancelada.
+        
+        Raises:
+            TempoEsgotadoLLM: Nenhuma parte chegou dentro do timeout
+        """
+        fila: queue.Queue = queue.Queue(maxsize=TAMANHO_FILA_STREAM)
+        
+        async def _repassar(item):
+            # put() bloquearia o event loop compartilhado: espera cooperativa
+            while True:
+                try:
+                    fila.put_nowait(item)
+                    return
+                except queue.Full:
+                    await asyncio.sleep(0.01)
+        
+        async def _produzir():
+            partes = self.astream(prompt, temperatura, usar_cache)
+            try:
+                async for parte in partes:
+                    await _repassar(parte)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                await _repassar(e)
+            else:
+                await _repassar(_FIM_STREAM)
+            finally:
+                # Cancelado durante _repassar: fecha a chamada ao LLM já
+                await partes.aclose()
+        
+        futuro = asyncio.run_coroutine_threadsafe(_produzir(), self._obter_loop())
+        
+        try:
+            while True:
+                try:
+                    item = fila.get(timeout=self.timeout + 60)
+                except queue.Empty:
+                    raise TempoEsgotadoLLM(
+                        f"Sem resposta do LLM ({self.model_name}) em {self.timeout + 60:.0f}s"
+                    ) from None
+                if item is _FIM_STREAM:
+                    return
+                if isinstance(item, Exception):
+                    raise item
+                yield item
+        finally:
+            futuro.cancel()
+
+
+# Marca o fim de um stream na fila entre o event loop e o consumidor
+_FIM_STREAM = object()
+
+# Partes em trânsito por stream (o produtor espera se o consumidor atrasar)
+TAMANHO_FILA_STREAM = 256
+
+_clientes: dict = {}
+_clientes_lock = threading.Lock()
+
+
+def get_cliente_llm(provider: str = None, model: str = None) -> ClienteLLM:
+    """
+    Retorna o cliente compartilhado para o provider/modelo.
+    
+    Sem argumentos, usa o provider detectado automaticamente.
+    """
+    if provider is None:
+        provider, model = detectar_provider_automatico()
+    chave = (provider.lower(), model or "")
+    with _clientes_lock:
+        if chave not in _clientes:
+            _clientes[chave] = ClienteLLM(provider, model)
+        return _clientes[chave]
@@ -4,14 +4,28 @@ Repositórios para acesso ao banco de dados.
 Implementa o padrão Repository para abstrair o acesso aos dados.
 """
 
-from backend.repositories.base import BaseRepository, get_db_engine
-from backend.repositories.questao_repository import QuestaoRepository
+from backend.repositories.base import (
+    BaseRepository,
+    get_db_engine,
+    get_session,
+    descartar_engine,
+    unidade_de_trabalho
+)
+from backend.repositories.questao_repository import QuestaoRepository, invalidar_cache_dominio
 from backend.repositories.prova_repository import ProvaRepository
+from backend.repositories.lote_repository import LoteProvaRepository
+from backend.repositories.revisao_repository import RevisaoRepository
 
 __all__ = [
     'BaseRepository',
     'get_db_engine',
+    'get_session',
+    'descartar_engine',
+    'unidade_de_trabalho',
     'QuestaoRepository',
-    'ProvaRepository'
+    'invalidar_cache_dominio',
+    'ProvaRepository',
+    'LoteProvaRepository',
+    'RevisaoRepository'
 ]
 
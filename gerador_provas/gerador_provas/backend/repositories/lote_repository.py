@@ -0,0 +1,257 @@
+"""
+Repositório para lotes de provas individuais (provas.lotes_prova).
+"""
+
+import json
+from typing import Optional, Dict, List
+
+from backend.repositories.base import BaseRepository, listar_colunas
+
+# Colunas de provas.lotes_prova (SELECTs preparados não usam l.*)
+COLUNAS_LOTE = (
+    "id", "prova_base_id", "professor_id", "quantidade_alunos",
+    "embaralhar_questoes", "embaralhar_alternativas", "status", "erro_mensagem",
+    "caminho_zip", "provas_geradas", "tempo_geracao_seg", "created_at",
+    "concluido_em", "nome", "diretorio",
+)
+
+
+class LoteProvaRepository(BaseRepository):
+    """
+    Repositório para o estado dos lotes de provas individuais.
+    """
+
+    COLUNAS = {"colunas_lote": listar_colunas("l", COLUNAS_LOTE)}
+
+    INSTRUCOES = {
+        "lote_por_id": """
+            SELECT {colunas_lote}, p.titulo
+            FROM {schema}.lotes_prova l
+            JOIN {schema}.provas p ON p.id = l.prova_base_id
+            WHERE l.id = :id
+        """,
+        # Chamada a cada prova gerada do lote
+        "atualizar_progresso": """
+            UPDATE {schema}.lotes_prova
+            SET provas_geradas = :provas_geradas, status = :status
+            WHERE id = :id
+        """,
+    }
+
+    INSTRUCOES_PREPARADAS = frozenset(INSTRUCOES)
+
+    def __init__(self):
+        super().__init__(schema="provas")
+
+    def criar_lote(
+        self,
+        lote_id: str,
+        prova_base_id: str,
+        quantidade_alunos: int,
+        embaralhar_questoes: bool = True,
+        embaralhar_alternativas: bool = True,
+        status: str = "na_fila",
+        professor_id: str = None
+    ) -> str:
+        """
+        Registra um novo lote.
+
+        Returns:
+            ID do lote
+        """
+        query = f"""
+            INSERT INTO {self.schema}.lotes_prova (
+                id, prova_base_id, professor_id, quantidade_alunos,
+                embaralhar_questoes, embaralhar_alternativas, status, provas_geradas
+            ) VALUES (
+                :id, :prova_base_id, :professor_id, :quantidade_alunos,
+                :embaralhar_questoes, :embaralhar_alternativas, :status, 0
+            )
+        """
+
+        params = {
+            "id": lote_id,
+            "prova_base_id": prova_base_id,
+            "professor_id": professor_id,
+            "quantidade_alunos": quantidade_alunos,
+            "embaralhar_questoes": embaralhar_questoes,
+            "embaralhar_alternativas": embaralhar_alternativas,
+            "status": status
+        }
+
+        return self.execute_insert(query, params)
+
+    def atualizar_progresso(
+        self,
+        lote_id: str,
+        provas_geradas: int,
+        status: str = "gerando"
+    ) -> bool:
+        """Atualiza o número de provas geradas e o status do lote."""
+        return self.executar("atualizar_progresso", {
+            "id": lote_id,
+            "provas_geradas": provas_geradas,
+            "status": status
+        }) > 0
+
+    def finalizar_lote(
+        self,
+        lote_id: str,
+        status: str,
+        provas_geradas: int,
+        tempo_geracao_seg: float,
+        caminho_zip: str = None,
+        erro_mensagem: str = None
+    ) -> bool:
+        """Registra o resultado final do lote (concluido ou erro)."""
+        query = f"""
+            UPDATE {self.schema}.lotes_prova
+            SET status = :status,
+                provas_geradas = :provas_geradas,
+                tempo_geracao_seg = :tempo_geracao_seg,
+                caminho_zip = :caminho_zip,
+                erro_mensagem = :erro_mensagem,
+                concluido_em = CURRENT_TIMESTAMP
+            WHERE id = :id
+        """
+
+        return self.execute_update(query, {
+            "id": lote_id,
+            "status": status,
+            "provas_geradas": provas_geradas,
+            "tempo_geracao_seg": int(round(tempo_geracao_seg)),
+            "caminho_zip": caminho_zip,
+            "erro_mensagem": erro_mensagem
+        }) > 0
+
+    def buscar_lote_por_id(self, lote_id: str) -> Optional[Dict]:
+        """Busca um lote pelo ID."""
+        results = self.consultar("lote_por_id", {"id": lote_id})
+        return results[0] if results else None
+
+    def buscar_lote_por_nome(self, nome: str) -> Optional[Dict]:
+        """Busca um lote pelo nome do diretório."""
+        query = f"""
+            SELECT l.*, p.titulo
+            FROM {self.schema}.lotes_prova l
+            JOIN {self.schema}.provas p ON p.id = l.prova_base_id
+            WHERE l.nome = :nome
+        """
+
+        results = self.execute_query(query, {"nome": nome})
+        return results[0] if results else None
+
+    def listar_lotes(self, limite: int = 20, antes_de: str = None) -> List[Dict]:
+        """
+        Lista lotes do mais recente para o mais antigo.
+
+        A paginação é por chave (created_at, id) e usa o índice
+        idx_lotes_created: o custo depende só do tamanho da página.
+
+        Args:
+            limite: Lotes por página
+            antes_de: ID do último lote da página anterior
+
+        Returns:
+            Lista de lotes (com o título da prova base)
+        """
+        filtro = ""
+        params = {"limite": limite}
+
+        if antes_de:
+            filtro = f"""
+                WHERE (l.created_at, l.id) < (
+                    SELECT created_at, id FROM {self.schema}.lotes_prova WHERE id = :antes_de
+                )
+            """
+            params["antes_de"] = antes_de
+
+        query = f"""
+            SELECT l.id, l.nome, l.diretorio, l.status, l.quantidade_alunos,
+                   l.provas_geradas, l.caminho_zip, l.created_at, l.concluido_em,
+                   p.titulo
+            FROM {self.schema}.lotes_prova l
+            JOIN {self.schema}.provas p ON p.id = l.prova_base_id
+            {filtro}
+            ORDER BY l.created_at DESC, l.id DESC
+            LIMIT :limite
+        """
+
+        return self.execute_query(query, params)
+
+    def registrar_provas_alunos(
+        self,
+        lote_id: str,
+        prova_base_id: str,
+        provas: List[Dict],
+        nome: str = None,
+        diretorio: str = None
+    ) -> int:
+        """
+        Grava os mapeamentos de cada aluno em provas.provas_alunos.
+
+        Todas as provas vão em um único executemany, na mesma transação
+        que registra o nome e o diretório do lote.
+
+        Args:
+            lote_id: ID do lote
+            prova_base_id: Prova base do lote
+            provas: Dicionários com numero_aluno, codigo_prova, ordem_questoes,
+                ordem_alternativas, gabarito, caminho_pdf, caminho_gabarito
+                e hash_verificacao
+            nome: Nome do diretório do lote
+            diretorio: Caminho do diretório do lote
+
+        Returns:
+            Número de provas enviadas ao banco
+        """
+        insert = f"""
+            INSERT INTO {self.schema}.provas_alunos (
+                prova_base_id, numero_aluno, codigo_prova, ordem_questoes,
+                ordem_alternativas, gabarito, caminho_pdf, caminho_gabarito,
+                hash_verificacao
+            ) VALUES (
+                :prova_base_id, :numero_aluno, :codigo_prova, :ordem_questoes,
+                :ordem_alternativas, :gabarito, :caminho_pdf, :caminho_gabarito,
+                :hash_verificacao
+            )
+            ON CONFLICT (prova_base_id, numero_aluno) DO NOTHING
+        """
+
+        linhas = [
+            {
+                "prova_base_id": prova_base_id,
+                "numero_aluno": prova["numero_aluno"],
+                "codigo_prova": prova.get("codigo_prova"),
+                "ordem_questoes": json.dumps(prova.get("ordem_questoes", []), ensure_ascii=False),
+                "ordem_alternativas": json.dumps(prova.get("ordem_alternativas", {}), ensure_ascii=False),
+                "gabarito": json.dumps(prova.get("gabarito", {}), ensure_ascii=False),
+                "caminho_pdf": prova.get("caminho_pdf"),
+                "caminho_gabarito": prova.get("caminho_gabarito"),
+                "hash_verificacao": prova.get("hash_verificacao")
+            }
+            for prova in provas
+        ]
+
+        self.execute_batch([
+            (insert, linhas),
+            (f"""
+                UPDATE {self.schema}.lotes_prova
+                SET nome = :nome, diretorio = :diretorio
+                WHERE id = :id
+            """, {"id": lote_id, "nome": nome, "diretorio": diretorio})
+        ])
+
+        return len(linhas)
+
+    def buscar_provas_alunos(self, prova_base_id: str) -> List[Dict]:
+        """Lista as provas dos alunos de uma prova base, por número do aluno."""
+        query = f"""
+            SELECT numero_aluno, codigo_prova, gabarito, caminho_pdf,
+                   caminho_gabarito, hash_verificacao
+            FROM {self.schema}.provas_alunos
+            WHERE prova_base_id = :prova_base_id
+            ORDER BY numero_aluno
+        """
+
+        return self.execute_query(query, {"prova_base_id": prova_base_id})
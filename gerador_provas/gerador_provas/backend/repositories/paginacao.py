@@ -0,0 +1,69 @@
+"""
+Paginação por chave (keyset) com cursores opacos.
+
+Em vez de LIMIT/OFFSET (que lê e descarta todas as linhas anteriores),
+cada página começa logo depois da última linha da página anterior:
+
+    WHERE (created_at, id) < (:cursor_created_at, :cursor_id)
+    ORDER BY created_at DESC, id DESC
+    LIMIT :limite
+
+Com um índice em (created_at DESC, id DESC) o custo de qualquer página é
+o mesmo, por mais funda que seja. O cursor enviado ao cliente é a chave
+da última linha codificada em base64 (o cliente não deve interpretá-lo).
+"""
+
+import json
+import base64
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+
+
+class CursorInvalido(ValueError):
+    """Cursor de paginação malformado ou adulterado."""
+
+
+def codificar_cursor(created_at: Optional[datetime], item_id: Any) -> str:
+    """Codifica a chave (created_at, id) de uma linha como cursor opaco."""
+    if isinstance(created_at, datetime):
+        created_at = created_at.isoformat()
+    chave = [created_at, str(item_id)]
+    dados = json.dumps(chave, separators=(',', ':')).encode('utf-8')
+    return base64.urlsafe_b64encode(dados).decode('ascii').rstrip('=')
+
+
+def decodificar_cursor(cursor: str) -> Tuple[Optional[datetime], str]:
+    """
+    Decodifica um cursor gerado por codificar_cursor().
+
+    Raises:
+        CursorInvalido: Se o cursor não puder ser lido
+    """
+    try:
+        preenchimento = '=' * (-len(cursor) % 4)
+        created_at, item_id = json.loads(base64.urlsafe_b64decode(cursor + preenchimento))
+        return (datetime.fromisoformat(created_at) if created_at else None), str(item_id)
+    except (ValueError, TypeError) as e:
+        raise CursorInvalido(f"Cursor inválido: {cursor!r}") from e
+
+
+def montar_pagina(
+    linhas: List[Dict],
+    limite: int,
+    chave: str = "itens"
+) -> Dict[str, Any]:
+    """
+    Monta a resposta de uma página a partir de limite + 1 linhas lidas.
+
+    A linha excedente só indica que existe próxima página; o cursor é a
+    chave da última linha devolvida.
+
+    Returns:
+        {chave: [...], "proximo_cursor": str | None}
+    """
+    itens = linhas[:limite]
+    proximo = None
+    if len(linhas) > limite and itens:
+        ultima = itens[-1]
+        proximo = codificar_cursor(ultima.get("created_at"), ultima["id"])
+    return {chave: itens, "proximo_cursor": proximo}
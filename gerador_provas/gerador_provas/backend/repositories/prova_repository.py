@@ -6,7 +6,18 @@ import uuid
 from typing import Optional, List, Dict, Any
 from datetime import datetime
 
-from backend.repositories.base import BaseRepository
+from backend.repositories.base import BaseRepository, listar_colunas
+from backend.repositories.questao_repository import COLUNAS_QUESTAO
+
+# Colunas de provas.provas (SELECTs preparados não usam p.*)
+COLUNAS_PROVA = (
+    "id", "codigo", "titulo", "descricao", "materia_id", "nivel_escolar", "serie",
+    "status", "tempo_limite_min", "pontuacao_total", "nota_minima", "instrucoes",
+    "observacoes", "data_aplicacao", "hora_inicio", "hora_fim",
+    "embaralhar_questoes", "embaralhar_alternativas", "mostrar_gabarito",
+    "permitir_revisao", "criado_por", "created_at", "updated_at", "deleted_at",
+    "permite_individualizacao", "quantidade_versoes_geradas",
+)
 
 
 class ProvaRepository(BaseRepository):
@@ -14,6 +25,29 @@ class ProvaRepository(BaseRepository):
     Repositório para CRUD de provas.
     """
     
+    COLUNAS = {
+        "colunas_prova": listar_colunas("p", COLUNAS_PROVA),
+        "colunas_questao": listar_colunas("q", COLUNAS_QUESTAO),
+    }
+    
+    INSTRUCOES = {
+        "prova_por_id": """
+            SELECT {colunas_prova}, m.nome as materia_nome
+            FROM {schema}.provas p
+            LEFT JOIN {schema}.materias m ON p.materia_id = m.id
+            WHERE p.id = :id AND p.deleted_at IS NULL
+        """,
+        "questoes_da_prova": """
+            SELECT pq.numero, pq.pontuacao, {colunas_questao}
+            FROM {schema}.prova_questoes pq
+            JOIN {schema}.questoes q ON pq.questao_id = q.id
+            WHERE pq.prova_id = :prova_id
+            ORDER BY pq.numero
+        """,
+    }
+    
+    INSTRUCOES_PREPARADAS = frozenset(INSTRUCOES)
+    
     def __init__(self):
         super().__init__(schema="provas")
     
@@ -99,33 +133,43 @@ class ProvaRepository(BaseRepository):
         self.execute_insert(query, params)
         return relacao_id
     
+    def adicionar_questoes_prova(self, prova_id: str, questoes: List[Dict]) -> List[str]:
+        """
+        Adiciona várias questões a uma prova com um INSERT multi-linha.
+        
+        Args:
+            prova_id: ID da prova
+            questoes: Questões com "id" e, opcionalmente, "numero" e "pontuacao"
+        
+        Returns:
+            IDs dos relacionamentos criados
+        """
+        linhas = [
+            {
+                "id": str(uuid.uuid4()),
+                "prova_id": prova_id,
+                "questao_id": questao["id"],
+                "numero": questao.get("numero", 0),
+                "pontuacao": questao.get("pontuacao", 1.0)
+            }
+            for questao in questoes
+        ]
+        
+        self.bulk_insert("prova_questoes", linhas)
+        return [linha["id"] for linha in linhas]
+    
     def buscar_prova_por_id(self, prova_id: str) -> Optional[Dict]:
         """
         Busca uma prova pelo ID com suas questões.
         """
-        query = f"""
-            SELECT p.*, m.nome as materia_nome
-            FROM {self.schema}.provas p
-            LEFT JOIN {self.schema}.materias m ON p.materia_id = m.id
-            WHERE p.id = :id AND p.deleted_at IS NULL
-        """
-        
-        resultados = self.execute_query(query, {"id": prova_id})
+        resultados = self.consultar("prova_por_id", {"id": prova_id})
         if not resultados:
             return None
         
         prova = resultados[0]
         
         # Buscar questões da prova
-        query_questoes = f"""
-            SELECT pq.numero, pq.pontuacao, q.*
-            FROM {self.schema}.prova_questoes pq
-            JOIN {self.schema}.questoes q ON pq.questao_id = q.id
-            WHERE pq.prova_id = :prova_id
-            ORDER BY pq.numero
-        """
-        
-        prova["questoes"] = self.execute_query(query_questoes, {"prova_id": prova_id})
+        prova["questoes"] = self.consultar("questoes_da_prova", {"prova_id": prova_id})
         
         return prova
     
@@ -2,11 +2,146 @@
 Repositório para operações com questões no banco de dados.
 """
 
+import os
+import time
 import uuid
-from typing import Optional, List, Dict, Any
+import threading
+from typing import Optional, List, Dict, Any, Tuple
 from datetime import datetime
 
-from backend.repositories.base import BaseRepository
+from backend.repositories.base import BaseRepository, listar_colunas, unidade_de_trabalho
+from backend.repositories.paginacao import decodificar_cursor, montar_pagina
+from backend.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+try:
+    from config import settings
+    DOMINIO_CACHE_TTL_SEG = settings.DOMINIO_CACHE_TTL_SEG
+except (ImportError, AttributeError):
+    DOMINIO_CACHE_TTL_SEG = int(os.getenv('DOMINIO_CACHE_TTL_SEG', 3600))
+
+# Colunas de provas.questoes (SELECTs preparados não usam q.*)
+COLUNAS_QUESTAO = (
+    "id", "materia_id", "topico_id", "tipo", "dificuldade", "status", "codigo",
+    "enunciado", "enunciado_complementar", "pontuacao", "tempo_estimado_min",
+    "fonte", "ano_referencia", "palavras_chave", "vezes_usada", "taxa_acerto",
+    "criado_por", "revisado_por", "aprovado_por", "created_at", "updated_at",
+    "deleted_at", "professor_id", "aprovada_em", "fontes_bibliograficas",
+    "versao_atual", "observacoes_professor", "alternativas_comentadas",
+    "explicacao_geral", "resolucao_passo_a_passo", "erros_comuns",
+    "dicas_correcao", "criterios_correcao", "pontos_chave", "nivel_cognitivo",
+)
+
+COLUNAS_ALTERNATIVA = (
+    "id", "questao_id", "letra", "texto", "correta", "justificativa", "ordem",
+    "created_at",
+)
+
+COLUNAS_RESOLUCAO = (
+    "id", "questao_id", "resposta_curta", "resposta_completa", "passos", "dicas",
+    "erros_comuns", "metodo_resolucao", "nivel_detalhamento", "created_at",
+    "updated_at",
+)
+
+COLUNAS_DIAGRAMA = (
+    "id", "questao_id", "resolucao_id", "nome_arquivo", "caminho", "tipo_arquivo",
+    "tamanho_bytes", "tipo_diagrama", "titulo", "descricao", "alt_text",
+    "parametros_geracao", "posicao", "ordem", "created_at",
+)
+
+# Códigos das matérias no banco (provas.materias.codigo)
+CODIGOS_MATERIAS = {
+    "fisica": "FIS",
+    "quimica": "QUI",
+    "matematica": "MAT",
+    "biologia": "BIO",
+    "geografia": "GEO",
+    "historia": "HIS",
+    "portugues": "POR"
+}
+
+
+def codigo_materia(materia: str) -> str:
+    """Código da matéria no banco (ex: "fisica" -> "FIS")."""
+    return CODIGOS_MATERIAS.get(materia, materia.upper()[:3])
+
+
+def normalizar_palavras_chave(palavras_chave: Optional[List[str]]) -> Optional[List[str]]:
+    """
+    Palavras-chave sem espaços nas pontas e em minúsculas.
+    
+    Aplicada na gravação e na busca: a contenção de arrays (@>) do índice
+    GIN compara os textos exatamente.
+    """
+    if palavras_chave is None:
+        return None
+    return [p.strip().lower() for p in palavras_chave if p and p.strip()]
+
+
+class CacheDominio:
+    """
+    Mapas código -> ID de provas.materias e provas.topicos em memória.
+
+    As tabelas de domínio quase nunca mudam: os mapas são carregados de
+    uma vez (duas consultas) e recarregados quando o TTL vence ou após
+    invalidar(). Compartilhado por todas as instâncias do repositório.
+    """
+
+    def __init__(self, ttl_seg: int = None):
+        """
+        Args:
+            ttl_seg: Validade dos mapas em segundos (0 = até invalidar)
+        """
+        self.ttl_seg = DOMINIO_CACHE_TTL_SEG if ttl_seg is None else ttl_seg
+        self.materias: Dict[str, Any] = {}
+        self.topicos: Dict[Tuple[str, str], Any] = {}
+        self._carregado_em: Optional[float] = None
+        self._lock = threading.Lock()
+
+    def expirado(self) -> bool:
+        if self._carregado_em is None:
+            return True
+        return bool(self.ttl_seg) and time.monotonic() - self._carregado_em > self.ttl_seg
+
+    def carregar(self, repositorio: BaseRepository):
+        """Recarrega os dois mapas a partir do banco."""
+        materias = repositorio.execute_query(f"""
+            SELECT id, codigo FROM {repositorio.schema}.materias
+            WHERE deleted_at IS NULL
+        """)
+        topicos = repositorio.execute_query(f"""
+            SELECT id, materia_id, codigo FROM {repositorio.schema}.topicos
+            WHERE deleted_at IS NULL
+        """)
+
+        with self._lock:
+            self.materias = {m["codigo"].upper(): m["id"] for m in materias}
+            self.topicos = {
+                (str(t["materia_id"]), t["codigo"].upper()): t["id"] for t in topicos
+            }
+            self._carregado_em = time.monotonic()
+
+        logger.info(f"Cache de domínio carregado: {len(self.materias)} matérias, {len(self.topicos)} tópicos")
+
+    def garantir(self, repositorio: BaseRepository):
+        """Carrega os mapas se ainda não foram carregados ou se o TTL venceu."""
+        if self.expirado():
+            self.carregar(repositorio)
+
+    def invalidar(self):
+        """Força a recarga na próxima consulta."""
+        with self._lock:
+            self._carregado_em = None
+
+
+# Instância global (compartilhada entre os repositórios)
+cache_dominio = CacheDominio()
+
+
+def invalidar_cache_dominio():
+    """Descarta os mapas de matérias/tópicos (ex.: após cadastrar uma matéria)."""
+    cache_dominio.invalidar()
 
 
 class QuestaoRepository(BaseRepository):
@@ -14,6 +149,72 @@ class QuestaoRepository(BaseRepository):
     Repositório para CRUD de questões.
     """
     
+    COLUNAS = {
+        "colunas_questao": listar_colunas("q", COLUNAS_QUESTAO),
+        "colunas_alternativa": listar_colunas("a", COLUNAS_ALTERNATIVA),
+        "colunas_resolucao": listar_colunas("r", COLUNAS_RESOLUCAO),
+        "colunas_diagrama": listar_colunas("d", COLUNAS_DIAGRAMA),
+    }
+    
+    INSTRUCOES = {
+        "questao_por_id": """
+            SELECT {colunas_questao}, m.nome as materia_nome, m.codigo as materia_codigo,
+                   t.nome as topico_nome, t.codigo as topico_codigo
+            FROM {schema}.questoes q
+            LEFT JOIN {schema}.materias m ON q.materia_id = m.id
+            LEFT JOIN {schema}.topicos t ON q.topico_id = t.id
+            WHERE q.id = :id AND q.deleted_at IS NULL
+        """,
+        "materia_id_por_codigo": """
+            SELECT id FROM {schema}.materias 
+            WHERE codigo = :codigo AND deleted_at IS NULL
+        """,
+        "topico_id_por_codigo": """
+            SELECT id FROM {schema}.topicos 
+            WHERE materia_id = :materia_id AND codigo = :codigo AND deleted_at IS NULL
+        """,
+        # Montagem de provas: questões e relacionados em lote (uma consulta por tabela)
+        "questoes_por_ids": """
+            SELECT {colunas_questao}, m.nome as materia_nome, m.codigo as materia_codigo,
+                   t.nome as topico_nome, t.codigo as topico_codigo
+            FROM {schema}.questoes q
+            LEFT JOIN {schema}.materias m ON q.materia_id = m.id
+            LEFT JOIN {schema}.topicos t ON q.topico_id = t.id
+            WHERE q.id = ANY(CAST(:ids AS UUID[])) AND q.deleted_at IS NULL
+        """,
+        "alternativas_por_questoes": """
+            SELECT {colunas_alternativa} FROM {schema}.alternativas a
+            WHERE a.questao_id = ANY(CAST(:ids AS UUID[]))
+            ORDER BY a.questao_id, a.ordem, a.letra
+        """,
+        "resolucoes_por_questoes": """
+            SELECT {colunas_resolucao} FROM {schema}.resolucoes r
+            WHERE r.questao_id = ANY(CAST(:ids AS UUID[]))
+        """,
+        "diagramas_por_questoes": """
+            SELECT {colunas_diagrama} FROM {schema}.diagramas d
+            WHERE d.questao_id = ANY(CAST(:ids AS UUID[]))
+            ORDER BY d.questao_id, d.ordem
+        """,
+        "incrementar_uso": """
+            UPDATE {schema}.questoes 
+            SET vezes_usada = COALESCE(vezes_usada, 0) + 1
+            WHERE id = :id
+        """,
+    }
+    
+    INSTRUCOES_PREPARADAS = frozenset(INSTRUCOES)
+    
+    # Filtros opcionais de buscar_questoes (cada combinação é uma variante registrada)
+    FILTROS_BUSCA = (
+        ("cursor", "(q.created_at, q.id) < (:cursor_created_at, :cursor_id)"),
+        ("materia_id", "q.materia_id = :materia_id"),
+        ("topico_id", "q.topico_id = :topico_id"),
+        ("dificuldade", "q.dificuldade = :dificuldade"),
+        ("status", "q.status = :status"),
+        ("texto", "to_tsvector('portuguese', q.enunciado) @@ websearch_to_tsquery('portuguese', :texto)"),
+    )
+    
     def __init__(self):
         super().__init__(schema="provas")
     
@@ -35,6 +236,34 @@ class QuestaoRepository(BaseRepository):
         Returns:
             ID da questão criada
         """
+        query, params = self._montar_questao(
+            materia_id=materia_id,
+            enunciado=enunciado,
+            tipo=tipo,
+            dificuldade=dificuldade,
+            topico_id=topico_id,
+            codigo=codigo,
+            status=status,
+            criado_por=criado_por,
+            **kwargs
+        )
+        
+        self.execute_insert(query, params)
+        return params["id"]
+    
+    def _montar_questao(
+        self,
+        materia_id: str,
+        enunciado: str,
+        tipo: str = "dissertativa",
+        dificuldade: str = "medio",
+        topico_id: str = None,
+        codigo: str = None,
+        status: str = "rascunho",
+        criado_por: str = None,
+        **kwargs
+    ) -> Tuple[str, Dict]:
+        """Monta o INSERT da questão (o ID vai em params["id"])."""
         questao_id = str(uuid.uuid4())
         
         if codigo is None:
@@ -69,11 +298,10 @@ class QuestaoRepository(BaseRepository):
             "pontuacao": kwargs.get("pontuacao", 1.0),
             "tempo_estimado_min": kwargs.get("tempo_estimado_min"),
             "fonte": kwargs.get("fonte", "Gerador Automático"),
-            "palavras_chave": kwargs.get("palavras_chave")
+            "palavras_chave": normalizar_palavras_chave(kwargs.get("palavras_chave"))
         }
         
-        self.execute_insert(query, params)
-        return questao_id
+        return query, params
     
     def criar_resolucao(
         self,
@@ -90,6 +318,28 @@ class QuestaoRepository(BaseRepository):
         Returns:
             ID da resolução criada
         """
+        query, params = self._montar_resolucao(
+            questao_id=questao_id,
+            resposta_curta=resposta_curta,
+            resposta_completa=resposta_completa,
+            passos=passos,
+            formulas=formulas,
+            **kwargs
+        )
+        
+        self.execute_insert(query, params)
+        return params["id"]
+    
+    def _montar_resolucao(
+        self,
+        questao_id: str,
+        resposta_curta: str,
+        resposta_completa: str = None,
+        passos: List[Dict] = None,
+        formulas: List[str] = None,
+        **kwargs
+    ) -> Tuple[str, Dict]:
+        """Monta o INSERT da resolução (o ID vai em params["id"])."""
         import json
         
         resolucao_id = str(uuid.uuid4())
@@ -116,8 +366,7 @@ class QuestaoRepository(BaseRepository):
             "metodo_resolucao": kwargs.get("metodo_resolucao")
         }
         
-        self.execute_insert(query, params)
-        return resolucao_id
+        return query, params
     
     def criar_diagrama(
         self,
@@ -133,6 +382,26 @@ class QuestaoRepository(BaseRepository):
         Returns:
             ID do diagrama criado
         """
+        query, params = self._montar_diagrama(
+            questao_id=questao_id,
+            nome_arquivo=nome_arquivo,
+            caminho=caminho,
+            tipo_diagrama=tipo_diagrama,
+            **kwargs
+        )
+        
+        self.execute_insert(query, params)
+        return params["id"]
+    
+    def _montar_diagrama(
+        self,
+        questao_id: str,
+        nome_arquivo: str,
+        caminho: str,
+        tipo_diagrama: str = None,
+        **kwargs
+    ) -> Tuple[str, Dict]:
+        """Monta o INSERT do diagrama (o ID vai em params["id"])."""
         import json
         import os
         
@@ -170,48 +439,230 @@ class QuestaoRepository(BaseRepository):
             "posicao": kwargs.get("posicao", "apos_enunciado")
         }
         
-        self.execute_insert(query, params)
-        return diagrama_id
+        return query, params
+    
+    def criar_questao_completa(
+        self,
+        questao: Dict[str, Any],
+        resolucao: Dict[str, Any],
+        diagrama: Optional[Dict[str, Any]] = None
+    ) -> str:
+        """
+        Cria questão, resolução e diagrama em uma única transação.
+        
+        Args:
+            questao: Argumentos de criar_questao
+            resolucao: Argumentos de criar_resolucao (sem questao_id)
+            diagrama: Argumentos de criar_diagrama (sem questao_id), opcional
+        
+        Returns:
+            ID da questão criada
+        """
+        query, params = self._montar_questao(**questao)
+        questao_id = params["id"]
+        instrucoes = [
+            (query, params),
+            self._montar_resolucao(questao_id=questao_id, **resolucao)
+        ]
+        
+        if diagrama:
+            instrucoes.append(self._montar_diagrama(questao_id=questao_id, **diagrama))
+        
+        self.execute_batch(instrucoes)
+        return questao_id
     
     def buscar_questao_por_id(self, questao_id: str) -> Optional[Dict]:
         """
         Busca uma questão pelo ID.
         """
-        query = f"""
-            SELECT q.*, m.nome as materia_nome, m.codigo as materia_codigo,
-                   t.nome as topico_nome, t.codigo as topico_codigo
+        resultados = self.consultar("questao_por_id", {"id": questao_id})
+        return resultados[0] if resultados else None
+    
+    def buscar_questoes_por_ids(self, questoes_ids: List[str]) -> List[Dict]:
+        """
+        Busca várias questões de uma vez, com alternativas, resolução e diagramas.
+        
+        Faz uma consulta por tabela (4 no total, qualquer que seja o número
+        de questões), na mesma conexão, em vez de uma ida ao banco por ID.
+        
+        Args:
+            questoes_ids: IDs das questões (IDs que não são UUID são ignorados)
+        
+        Returns:
+            Questões encontradas, na ordem pedida, com as chaves
+            "alternativas", "resolucao" e "diagramas"
+        """
+        ids = []
+        for questao_id in dict.fromkeys(str(i) for i in questoes_ids):
+            try:
+                uuid.UUID(questao_id)
+            except ValueError:
+                continue
+            ids.append(questao_id)
+        
+        if not ids:
+            return []
+        
+        params = {"ids": ids}
+        with unidade_de_trabalho(self.engine):
+            questoes = {str(q["id"]): q for q in self.consultar("questoes_por_ids", params)}
+            if not questoes:
+                return []
+            
+            for questao in questoes.values():
+                questao["alternativas"] = []
+                questao["resolucao"] = None
+                questao["diagramas"] = []
+            
+            for alternativa in self.consultar("alternativas_por_questoes", params):
+                questoes[str(alternativa["questao_id"])]["alternativas"].append(alternativa)
+            
+            for resolucao in self.consultar("resolucoes_por_questoes", params):
+                questao = questoes[str(resolucao["questao_id"])]
+                if questao["resolucao"] is None:
+                    questao["resolucao"] = resolucao
+            
+            for diagrama in self.consultar("diagramas_por_questoes", params):
+                questoes[str(diagrama["questao_id"])]["diagramas"].append(diagrama)
+        
+        return [questoes[i] for i in ids if i in questoes]
+    
+    def buscar_questoes(
+        self,
+        materia_id: str = None,
+        topico_id: str = None,
+        dificuldade: str = None,
+        status: str = None,
+        limite: int = 50,
+        offset: int = 0,
+        cursor: str = None,
+        texto: str = None
+    ) -> List[Dict]:
+        """
+        Busca questões com filtros, das mais recentes para as mais antigas.
+        
+        Args:
+            texto: Busca textual no enunciado (mesma sintaxe de buscar_texto)
+            cursor: Cursor opaco da página anterior (ver paginacao.py). Com
+                cursor a busca começa depois dessa linha e o offset é
+                ignorado; o custo não cresce com a profundidade da página.
+        
+        Raises:
+            CursorInvalido: Se o cursor não puder ser lido
+        """
+        params = {
+            "limite": limite,
+            "offset": offset,
+            "materia_id": materia_id,
+            "topico_id": topico_id,
+            "dificuldade": dificuldade,
+            "status": status,
+            "texto": texto
+        }
+        
+        if cursor:
+            cursor_created_at, cursor_id = decodificar_cursor(cursor)
+            params["cursor"] = cursor
+            params["cursor_created_at"] = cursor_created_at
+            params["cursor_id"] = cursor_id
+            params["offset"] = 0
+        
+        filtros = tuple(nome for nome, _ in self.FILTROS_BUSCA if params.get(nome))
+        query = self.instrucao(
+            "buscar_questoes:" + ",".join(filtros),
+            lambda: self._sql_buscar_questoes(filtros)
+        )
+        
+        return self.execute_query(query, params)
+    
+    def _sql_buscar_questoes(self, filtros: Tuple[str, ...]) -> str:
+        """SQL de buscar_questoes com as condições dos filtros informados."""
+        conditions = ["q.deleted_at IS NULL"]
+        conditions.extend(condicao for nome, condicao in self.FILTROS_BUSCA if nome in filtros)
+        
+        return f"""
+            SELECT q.*, m.nome as materia_nome, t.nome as topico_nome
             FROM {self.schema}.questoes q
             LEFT JOIN {self.schema}.materias m ON q.materia_id = m.id
             LEFT JOIN {self.schema}.topicos t ON q.topico_id = t.id
-            WHERE q.id = :id AND q.deleted_at IS NULL
+            WHERE {" AND ".join(conditions)}
+            ORDER BY q.created_at DESC, q.id DESC
+            LIMIT :limite OFFSET :offset
         """
-        
-        resultados = self.execute_query(query, {"id": questao_id})
-        return resultados[0] if resultados else None
     
-    def buscar_questoes(
+    def buscar_questoes_pagina(
         self,
         materia_id: str = None,
         topico_id: str = None,
         dificuldade: str = None,
         status: str = None,
         limite: int = 50,
+        cursor: str = None,
+        texto: str = None
+    ) -> Dict[str, Any]:
+        """
+        Página de questões com cursor para a próxima.
+        
+        Returns:
+            {"questoes": [...], "proximo_cursor": str | None}
+        """
+        linhas = self.buscar_questoes(
+            materia_id=materia_id,
+            topico_id=topico_id,
+            dificuldade=dificuldade,
+            status=status,
+            limite=limite + 1,
+            cursor=cursor,
+            texto=texto
+        )
+        return montar_pagina(linhas, limite, chave="questoes")
+    
+    def buscar_texto(
+        self,
+        texto: str = None,
+        palavras_chave: List[str] = None,
+        materia_id: str = None,
+        dificuldade: str = None,
+        status: str = None,
+        limite: int = 20,
         offset: int = 0
     ) -> List[Dict]:
         """
-        Busca questões com filtros.
+        Busca textual no enunciado, ordenada por relevância.
+        
+        O texto aceita a sintaxe de buscadores (websearch_to_tsquery):
+        "frase exata", -excluir, termo1 or termo2. A expressão
+        to_tsvector('portuguese', enunciado) é a mesma do índice GIN
+        idx_questoes_enunciado_gin, e o filtro de palavras-chave (todas
+        precisam estar presentes) usa o GIN de palavras_chave.
+        
+        Args:
+            texto: Consulta em linguagem natural (opcional se houver palavras-chave)
+            palavras_chave: Palavras-chave obrigatórias
+        
+        Returns:
+            Questões com o campo "relevancia"
         """
         conditions = ["q.deleted_at IS NULL"]
         params = {"limite": limite, "offset": offset}
         
+        if texto:
+            relevancia = "ts_rank(to_tsvector('portuguese', q.enunciado), consulta)"
+            origem = "CROSS JOIN websearch_to_tsquery('portuguese', :texto) AS consulta"
+            conditions.append("to_tsvector('portuguese', q.enunciado) @@ consulta")
+            params["texto"] = texto
+        else:
+            relevancia = "0"
+            origem = ""
+        
+        if palavras_chave:
+            conditions.append("q.palavras_chave @> CAST(:palavras_chave AS TEXT[])")
+            params["palavras_chave"] = normalizar_palavras_chave(palavras_chave)
+        
         if materia_id:
             conditions.append("q.materia_id = :materia_id")
             params["materia_id"] = materia_id
         
-        if topico_id:
-            conditions.append("q.topico_id = :topico_id")
-            params["topico_id"] = topico_id
-        
         if dificuldade:
             conditions.append("q.dificuldade = :dificuldade")
             params["dificuldade"] = dificuldade
@@ -220,44 +671,73 @@ class QuestaoRepository(BaseRepository):
             conditions.append("q.status = :status")
             params["status"] = status
         
-        where_clause = " AND ".join(conditions)
-        
         query = f"""
-            SELECT q.*, m.nome as materia_nome, t.nome as topico_nome
+            SELECT q.*, m.nome as materia_nome, t.nome as topico_nome,
+                   {relevancia} AS relevancia
             FROM {self.schema}.questoes q
+            {origem}
             LEFT JOIN {self.schema}.materias m ON q.materia_id = m.id
             LEFT JOIN {self.schema}.topicos t ON q.topico_id = t.id
-            WHERE {where_clause}
-            ORDER BY q.created_at DESC
+            WHERE {" AND ".join(conditions)}
+            ORDER BY relevancia DESC, q.created_at DESC, q.id DESC
             LIMIT :limite OFFSET :offset
         """
         
         return self.execute_query(query, params)
     
+    def precarregar_dominio(self) -> bool:
+        """
+        Carrega os mapas de matérias/tópicos (chamado na inicialização).
+        
+        Returns:
+            True se o banco respondeu
+        """
+        try:
+            cache_dominio.carregar(self)
+            return True
+        except Exception as e:
+            logger.warning(f"Cache de domínio não carregado: {e}")
+            return False
+    
     def obter_materia_id_por_codigo(self, codigo: str) -> Optional[str]:
         """
         Obtém o ID da matéria pelo código (ex: 'FIS', 'MAT', 'QUI').
+        
+        Consulta o cache de domínio; códigos ausentes (ex.: matéria criada
+        depois da carga) são buscados no banco e acrescentados ao cache.
         """
-        query = f"""
-            SELECT id FROM {self.schema}.materias 
-            WHERE codigo = :codigo AND deleted_at IS NULL
-        """
+        codigo = codigo.upper()
+        cache_dominio.garantir(self)
         
-        resultados = self.execute_query(query, {"codigo": codigo.upper()})
+        materia_id = cache_dominio.materias.get(codigo)
+        if materia_id is None:
+            materia_id = self._buscar_materia_id(codigo)
+            if materia_id is not None:
+                cache_dominio.materias[codigo] = materia_id
+        return materia_id
+    
+    def _buscar_materia_id(self, codigo: str) -> Optional[str]:
+        resultados = self.consultar("materia_id_por_codigo", {"codigo": codigo})
         return resultados[0]["id"] if resultados else None
     
     def obter_topico_id_por_codigo(self, materia_id: str, codigo: str) -> Optional[str]:
         """
-        Obtém o ID do tópico pelo código e matéria.
-        """
-        query = f"""
-            SELECT id FROM {self.schema}.topicos 
-            WHERE materia_id = :materia_id AND codigo = :codigo AND deleted_at IS NULL
+        Obtém o ID do tópico pelo código e matéria (via cache de domínio).
         """
+        chave = (str(materia_id), codigo.upper())
+        cache_dominio.garantir(self)
         
-        resultados = self.execute_query(query, {
+        topico_id = cache_dominio.topicos.get(chave)
+        if topico_id is None:
+            topico_id = self._buscar_topico_id(materia_id, chave[1])
+            if topico_id is not None:
+                cache_dominio.topicos[chave] = topico_id
+        return topico_id
+    
+    def _buscar_topico_id(self, materia_id: str, codigo: str) -> Optional[str]:
+        resultados = self.consultar("topico_id_por_codigo", {
             "materia_id": materia_id,
-            "codigo": codigo.upper()
+            "codigo": codigo
         })
         return resultados[0]["id"] if resultados else None
     
@@ -265,12 +745,7 @@ class QuestaoRepository(BaseRepository):
         """
         Incrementa o contador de uso da questão.
         """
-        query = f"""
-            UPDATE {self.schema}.questoes 
-            SET vezes_usada = COALESCE(vezes_usada, 0) + 1
-            WHERE id = :id
-        """
-        self.execute_update(query, {"id": questao_id})
+        self.executar("incrementar_uso", {"id": questao_id})
     
     def contar_questoes(self, materia_id: str = None) -> int:
         """
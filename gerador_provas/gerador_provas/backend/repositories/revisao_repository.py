@@ -0,0 +1,427 @@
+"""
+Repositório do fluxo de revisão (provas.questoes + provas.questao_revisoes).
+"""
+
+import json
+import uuid
+from typing import Optional, Dict, List
+
+from backend.repositories.base import BaseRepository, listar_colunas
+from backend.repositories.paginacao import decodificar_cursor
+
+
+# Colunas de provas.questao_revisoes (SELECTs preparados não usam *)
+COLUNAS_REVISAO = (
+    "id", "questao_id", "professor_id", "status", "comentarios",
+    "sugestoes_melhoria", "correcoes_texto", "fontes_bibliograficas",
+    "precisao_cientifica", "clareza_enunciado", "adequacao_nivel", "versao",
+    "created_at", "updated_at", "aprovada_em",
+)
+
+
+def _uuid_ou_none(valor) -> Optional[str]:
+    """Retorna o valor como UUID em texto, ou None se não for um UUID."""
+    try:
+        return str(uuid.UUID(str(valor)))
+    except (TypeError, ValueError):
+        return None
+
+
+class RevisaoRepository(BaseRepository):
+    """
+    Repositório das questões em revisão e do histórico de revisões.
+
+    O status de revisão de uma questão é o da sua revisão mais recente
+    (ou "pendente", se ainda não houver nenhuma); provas.questoes.status
+    guarda a versão resumida dele (ver STATUS_QUESTAO).
+    """
+
+    # Status de revisão -> status da questão (provas.status_questao)
+    STATUS_QUESTAO = {
+        'pendente': 'revisao',
+        'em_revisao': 'revisao',
+        'correcao_pendente': 'revisao',
+        'aprovada': 'aprovada',
+        'rejeitada': 'arquivada',
+    }
+
+    # Status de revisão da questão q: o da revisão mais recente r ou, se
+    # ainda não houver revisão, o equivalente ao status da questão
+    STATUS_REVISAO_SQL = """COALESCE(r.status::text,
+                            CASE q.status WHEN 'aprovada' THEN 'aprovada'
+                                          WHEN 'arquivada' THEN 'rejeitada'
+                                          ELSE 'pendente' END)"""
+
+    # Ordenações aceitas em listar_questoes()
+    ORDENACOES = {
+        'recentes': "q.created_at DESC, q.id DESC",
+        'aprovacao': "q.aprovada_em DESC NULLS LAST, q.id DESC",
+    }
+
+    COLUNAS = {"colunas_revisao": listar_colunas("r", COLUNAS_REVISAO)}
+
+    INSTRUCOES = {
+        "revisoes_da_questao": """
+            SELECT {colunas_revisao} FROM {schema}.questao_revisoes r
+            WHERE r.questao_id = :questao_id
+            ORDER BY r.versao
+        """,
+        "status_revisao": """
+            SELECT DISTINCT ON (questao_id) questao_id, status
+            FROM {schema}.questao_revisoes
+            WHERE questao_id = ANY(CAST(:ids AS UUID[]))
+            ORDER BY questao_id, versao DESC
+        """,
+    }
+
+    INSTRUCOES_PREPARADAS = frozenset(INSTRUCOES)
+
+    def __init__(self):
+        super().__init__(schema="provas")
+
+    # ========================================================================
+    # ESCRITA
+    # ========================================================================
+
+    def inserir_questao(self, questao: Dict, materia_id: str, topico_id: str = None) -> None:
+        """
+        Grava uma questão enviada para revisão, com alternativas, resposta
+        e diagrama, em uma transação.
+
+        Args:
+            questao: Questão no formato do RevisaoService (com "id")
+        """
+        questao_id = questao['id']
+        alternativas = questao.get('alternativas') or []
+
+        instrucoes = [(f"""
+            INSERT INTO {self.schema}.questoes (
+                id, materia_id, topico_id, tipo, dificuldade, codigo,
+                enunciado, status, fonte, professor_id,
+                observacoes_professor, versao_atual
+            ) VALUES (
+                :id, :materia_id, :topico_id, :tipo, :dificuldade, :codigo,
+                :enunciado, :status, :fonte, :professor_id,
+                :observacoes_professor, :versao_atual
+            )
+        """, {
+            "id": questao_id,
+            "materia_id": materia_id,
+            "topico_id": topico_id,
+            "tipo": questao.get('tipo_questao') or ('multipla_escolha' if alternativas else 'dissertativa'),
+            "dificuldade": questao.get('dificuldade') or 'medio',
+            "codigo": f"REV-{questao_id[:8].upper()}",
+            "enunciado": questao.get('enunciado', ''),
+            "status": self.STATUS_QUESTAO.get(questao.get('status'), 'revisao'),
+            "fonte": "Gerador Automático",
+            "professor_id": _uuid_ou_none(questao.get('professor_id')),
+            "observacoes_professor": questao.get('observacoes_professor') or None,
+            "versao_atual": questao.get('versao', 1)
+        })]
+
+        instrucoes.append(self._montar_alternativas(questao_id, alternativas))
+
+        if questao.get('resposta') or questao.get('explicacao'):
+            instrucoes.append((f"""
+                INSERT INTO {self.schema}.resolucoes (id, questao_id, resposta_curta, resposta_completa)
+                VALUES (:id, :questao_id, :resposta_curta, :resposta_completa)
+            """, {
+                "id": str(uuid.uuid4()),
+                "questao_id": questao_id,
+                "resposta_curta": str(questao.get('resposta') or ''),
+                "resposta_completa": questao.get('explicacao')
+            }))
+
+        if questao.get('diagrama'):
+            caminho = str(questao['diagrama'])
+            instrucoes.append((f"""
+                INSERT INTO {self.schema}.diagramas (id, questao_id, nome_arquivo, caminho)
+                VALUES (:id, :questao_id, :nome_arquivo, :caminho)
+            """, {
+                "id": str(uuid.uuid4()),
+                "questao_id": questao_id,
+                "nome_arquivo": caminho.replace('\\', '/').rsplit('/', 1)[-1],
+                "caminho": caminho
+            }))
+
+        self.execute_batch(instrucoes)
+
+    def _montar_alternativas(self, questao_id: str, alternativas: List[Dict]):
+        """Monta o INSERT (executemany) das alternativas da questão."""
+        linhas = [
+            {
+                "id": str(uuid.uuid4()),
+                "questao_id": questao_id,
+                "letra": str(alternativa.get('letra') or chr(ord('A') + ordem))[:1],
+                "texto": str(alternativa.get('texto', '')),
+                "correta": bool(alternativa.get('correta', False)),
+                "ordem": ordem
+            }
+            for ordem, alternativa in enumerate(alternativas)
+        ]
+        return (f"""
+            INSERT INTO {self.schema}.alternativas (id, questao_id, letra, texto, correta, ordem)
+            VALUES (:id, :questao_id, :letra, :texto, :correta, :ordem)
+        """, linhas)
+
+    def registrar_revisao(self, revisao: Dict, aprovada_em: str = None) -> bool:
+        """
+        Grava uma revisão e atualiza o status da questão, em uma transação.
+
+        A versão da revisão é a próxima da questão (a revisão em memória
+        pode repetir a versão da questão).
+
+        Args:
+            revisao: Revisão no formato do RevisaoService
+            aprovada_em: Data da aprovação (apenas quando aprovada)
+        """
+        fontes = revisao.get('fontes_bibliograficas')
+        fontes_json = json.dumps(fontes) if fontes and aprovada_em else None
+
+        self.execute_batch([
+            (f"""
+                INSERT INTO {self.schema}.questao_revisoes (
+                    id, questao_id, professor_id, status, comentarios,
+                    sugestoes_melhoria, correcoes_texto, fontes_bibliograficas,
+                    nota_qualidade, precisao_cientifica, clareza_enunciado,
+                    adequacao_nivel, versao, aprovada_em
+                )
+                SELECT
+                    :id, :questao_id, :professor_id, :status, :comentarios,
+                    :sugestoes_melhoria, :correcoes_texto, :fontes_bibliograficas,
+                    :nota_qualidade, :precisao_cientifica, :clareza_enunciado,
+                    :adequacao_nivel, COALESCE(MAX(versao), 0) + 1, :aprovada_em
+                FROM {self.schema}.questao_revisoes
+                WHERE questao_id = :questao_id
+            """, {
+                "id": revisao['id'],
+                "questao_id": revisao['questao_id'],
+                "professor_id": _uuid_ou_none(revisao.get('professor_id')),
+                "status": revisao['status'],
+                "comentarios": revisao.get('comentarios'),
+                "sugestoes_melhoria": revisao.get('sugestoes_melhoria'),
+                "correcoes_texto": revisao.get('correcoes_texto'),
+                "fontes_bibliograficas": json.dumps(fontes) if fontes else None,
+                "nota_qualidade": revisao.get('nota_qualidade'),
+                "precisao_cientifica": revisao.get('precisao_cientifica'),
+                "clareza_enunciado": revisao.get('clareza_enunciado'),
+                "adequacao_nivel": revisao.get('adequacao_nivel'),
+                "aprovada_em": aprovada_em
+            }),
+            (f"""
+                UPDATE {self.schema}.questoes
+                SET status = :status,
+                    aprovada_em = COALESCE(:aprovada_em, aprovada_em),
+                    fontes_bibliograficas = COALESCE(:fontes, fontes_bibliograficas)
+                WHERE id = :questao_id
+            """, {
+                "questao_id": revisao['questao_id'],
+                "status": self.STATUS_QUESTAO.get(revisao['status'], 'revisao'),
+                "aprovada_em": aprovada_em,
+                "fontes": fontes_json
+            }),
+        ])
+        return True
+
+    def atualizar_conteudo(
+        self,
+        questao_id: str,
+        versao: int,
+        enunciado: str = None,
+        alternativas: List[Dict] = None,
+        resposta: str = None
+    ) -> bool:
+        """
+        Aplica correções à questão e a devolve para revisão.
+
+        Registra uma revisão "pendente" para a nova versão, para que o
+        status de revisão (o da revisão mais recente) volte a pendente.
+        """
+        instrucoes = [(f"""
+            UPDATE {self.schema}.questoes
+            SET enunciado = COALESCE(:enunciado, enunciado),
+                versao_atual = :versao, status = 'revisao', aprovada_em = NULL
+            WHERE id = :questao_id
+        """, {"questao_id": questao_id, "enunciado": enunciado, "versao": versao})]
+
+        if alternativas:
+            instrucoes.append((
+                f"DELETE FROM {self.schema}.alternativas WHERE questao_id = :questao_id",
+                {"questao_id": questao_id}
+            ))
+            instrucoes.append(self._montar_alternativas(questao_id, alternativas))
+
+        if resposta:
+            instrucoes.append((f"""
+                UPDATE {self.schema}.resolucoes SET resposta_curta = :resposta
+                WHERE questao_id = :questao_id
+            """, {"questao_id": questao_id, "resposta": resposta}))
+
+        instrucoes.append((f"""
+            INSERT INTO {self.schema}.questao_revisoes (id, questao_id, status, comentarios, versao)
+            SELECT :id, :questao_id, 'pendente', :comentarios, COALESCE(MAX(versao), 0) + 1
+            FROM {self.schema}.questao_revisoes
+            WHERE questao_id = :questao_id
+        """, {
+            "id": str(uuid.uuid4()),
+            "questao_id": questao_id,
+            "comentarios": f"Correções aplicadas (versão {versao})"
+        }))
+
+        self.execute_batch(instrucoes)
+        return True
+
+    def atualizar_fontes(self, questao_id: str, fontes: List[Dict]) -> bool:
+        """Substitui as fontes bibliográficas da questão."""
+        return self.execute_update(f"""
+            UPDATE {self.schema}.questoes SET fontes_bibliograficas = :fontes
+            WHERE id = :questao_id
+        """, {"questao_id": questao_id, "fontes": json.dumps(fontes)}) > 0
+
+    def excluir_questao(self, questao_id: str) -> bool:
+        """Exclui (soft delete) uma questão."""
+        questao_id = _uuid_ou_none(questao_id)
+        if questao_id is None:
+            return False
+
+        return self.execute_update(f"""
+            UPDATE {self.schema}.questoes SET deleted_at = CURRENT_TIMESTAMP
+            WHERE id = :questao_id AND deleted_at IS NULL
+        """, {"questao_id": questao_id}) > 0
+
+    # ========================================================================
+    # LEITURA
+    # ========================================================================
+
+    def listar_questoes(
+        self,
+        status_questao: List[str],
+        status_revisao: List[str] = None,
+        materia_id: str = None,
+        professor_id: str = None,
+        limite: int = 50,
+        ordem: str = 'recentes',
+        dificuldade: str = None,
+        texto: str = None,
+        cursor: str = None
+    ) -> List[Dict]:
+        """
+        Lista questões do fluxo de revisão pelo status (consulta indexada).
+
+        Args:
+            status_questao: Valores de provas.questoes.status
+            status_revisao: Filtra também pelo status da revisão mais recente
+            ordem: Chave de ORDENACOES
+            dificuldade: Filtra pela dificuldade
+            texto: Busca textual no enunciado (índice GIN do enunciado)
+            cursor: Cursor da página anterior (ver paginacao.py); só com
+                a ordem 'recentes'
+
+        Returns:
+            Linhas com id, status_revisao, ultima_revisao e total_revisoes
+
+        Raises:
+            CursorInvalido: Se o cursor não puder ser lido
+        """
+        conditions = [
+            "q.deleted_at IS NULL",
+            "q.status = ANY(CAST(:status_questao AS provas.status_questao[]))"
+        ]
+        params = {"status_questao": list(status_questao), "limite": limite}
+
+        if status_revisao:
+            conditions.append(f"{self.STATUS_REVISAO_SQL} = ANY(:status_revisao)")
+            params["status_revisao"] = list(status_revisao)
+
+        if dificuldade:
+            conditions.append("q.dificuldade = :dificuldade")
+            params["dificuldade"] = dificuldade
+
+        if texto:
+            conditions.append(
+                "to_tsvector('portuguese', q.enunciado) @@ websearch_to_tsquery('portuguese', :texto)"
+            )
+            params["texto"] = texto
+
+        if cursor:
+            if ordem != 'recentes':
+                raise ValueError("Paginação por cursor exige a ordem 'recentes'")
+            params["cursor_created_at"], params["cursor_id"] = decodificar_cursor(cursor)
+            conditions.append("(q.created_at, q.id) < (:cursor_created_at, :cursor_id)")
+
+        if materia_id:
+            conditions.append("q.materia_id = :materia_id")
+            params["materia_id"] = materia_id
+
+        if professor_id:
+            conditions.append("q.professor_id = :professor_id")
+            params["professor_id"] = professor_id
+
+        query = f"""
+            SELECT q.id,
+                   {self.STATUS_REVISAO_SQL} AS status_revisao,
+                   CASE WHEN r.id IS NULL THEN NULL ELSE to_jsonb(r) END AS ultima_revisao,
+                   (SELECT COUNT(*) FROM {self.schema}.questao_revisoes c
+                    WHERE c.questao_id = q.id) AS total_revisoes
+            FROM {self.schema}.questoes q
+            LEFT JOIN LATERAL (
+                SELECT * FROM {self.schema}.questao_revisoes
+                WHERE questao_id = q.id
+                ORDER BY versao DESC
+                LIMIT 1
+            ) r ON true
+            WHERE {" AND ".join(conditions)}
+            ORDER BY {self.ORDENACOES[ordem]}
+            LIMIT :limite
+        """
+
+        return self.execute_query(query, params)
+
+    def status_revisao(self, questoes_ids: List[str]) -> Dict[str, str]:
+        """Status da revisão mais recente de cada questão (as sem revisão ficam de fora)."""
+        ids = [i for i in map(_uuid_ou_none, questoes_ids) if i]
+        if not ids:
+            return {}
+
+        linhas = self.consultar("status_revisao", {"ids": ids})
+        return {str(linha['questao_id']): str(linha['status']) for linha in linhas}
+
+    def buscar_revisoes(self, questao_id: str) -> List[Dict]:
+        """Histórico de revisões de uma questão (da mais antiga para a mais recente)."""
+        questao_id = _uuid_ou_none(questao_id)
+        if questao_id is None:
+            return []
+
+        return self.consultar("revisoes_da_questao", {"questao_id": questao_id})
+
+    def contar_por_status(self, professor_id: str = None) -> List[Dict]:
+        """
+        Conta as questões por status de revisão e matéria.
+
+        Returns:
+            Linhas com status_revisao, materia_codigo e total
+        """
+        conditions = ["q.deleted_at IS NULL"]
+        params = {}
+
+        if professor_id:
+            conditions.append("q.professor_id = :professor_id")
+            params["professor_id"] = professor_id
+
+        query = f"""
+            SELECT {self.STATUS_REVISAO_SQL} AS status_revisao,
+                   m.codigo AS materia_codigo,
+                   COUNT(*) AS total
+            FROM {self.schema}.questoes q
+            LEFT JOIN {self.schema}.materias m ON q.materia_id = m.id
+            LEFT JOIN LATERAL (
+                SELECT status FROM {self.schema}.questao_revisoes
+                WHERE questao_id = q.id
+                ORDER BY versao DESC
+                LIMIT 1
+            ) r ON true
+            WHERE {" AND ".join(conditions)}
+            GROUP BY 1, 2
+        """
+
+        return self.execute_query(query, params)
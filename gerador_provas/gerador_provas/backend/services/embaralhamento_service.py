@@ -19,12 +19,13 @@ Tipos de questão suportados:
 import random
 import hashlib
 import json
-from typing import Dict, List, Tuple, Any, Optional, Union
-from dataclasses import dataclass, field
+from array import array
+from typing import Dict, List, Tuple, Any, Optional, Union, Sequence
+from dataclasses import dataclass, replace
 from datetime import datetime
-from copy import deepcopy
 from enum import Enum
 
+from backend.services.questao_snapshot import QuestaoSnapshot
 from backend.utils.logger import get_logger
 
 logger = get_logger(__name__)
@@ -59,16 +60,286 @@ class MapeamentoAlternativas:
     tipo_questao: str = "multipla_escolha"
 
 
+# Letras possíveis para alternativas (máximo 10)
+LETRAS_ALTERNATIVAS = ['A', 'B', 'C', 'D', 'E', 'F', 'G', 'H', 'I', 'J']
+
+
+def _letras(quantidade: int) -> List[str]:
+    """Letras das alternativas de uma questão, na ordem da prova."""
+    return [
+        LETRAS_ALTERNATIVAS[i] if i < len(LETRAS_ALTERNATIVAS) else f'X{i}'
+        for i in range(quantidade)
+    ]
+
+
+def _mapear_alternativas(
+    alternativas: Sequence,
+    ordem: Sequence[int],
+    questao_id: str,
+    numero_questao: int,
+    tipo_questao: TipoQuestao = None
+) -> MapeamentoAlternativas:
+    """Mapeamento de letras e gabarito de uma permutação das alternativas."""
+    # Encontrar alternativas corretas (pode ser mais de uma)
+    corretas_originais = [alt.get('letra', 'A') for alt in alternativas if alt.get('correta', False)]
+    if not corretas_originais:
+        corretas_originais = ['A']  # Default
+    
+    letras = _letras(len(alternativas))
+    mapeamento = {}
+    corretas_novas = []
+    
+    for i, indice in enumerate(ordem):
+        alt = alternativas[indice]
+        mapeamento[alt.get('letra', letras[i])] = letras[i]
+        if alt.get('correta', False):
+            corretas_novas.append(letras[i])
+    
+    # Para múltipla resposta, manter lista; para única, pegar primeira
+    if tipo_questao == TipoQuestao.MULTIPLA_RESPOSTA:
+        correta_original = corretas_originais
+        correta_nova = corretas_novas
+    else:
+        correta_original = corretas_originais[0]
+        correta_nova = corretas_novas[0] if corretas_novas else mapeamento.get(correta_original, 'A')
+    
+    return MapeamentoAlternativas(
+        questao_id=questao_id,
+        numero_questao=numero_questao,
+        mapeamento=mapeamento,
+        correta_original=correta_original,
+        correta_nova=correta_nova,
+        tipo_questao=tipo_questao.value if tipo_questao else "multipla_escolha"
+    )
+
+
+def _aplicar_permutacao(alternativas: Sequence, ordem: Sequence[int]) -> List[Dict]:
+    """Alternativas na ordem sorteada, com as novas letras (textos compartilhados)."""
+    return [
+        {**alternativas[indice], 'letra': letra}
+        for indice, letra in zip(ordem, _letras(len(ordem)))
+    ]
+
+
+def _padronizar_verdadeiro_falso(
+    alternativas: Sequence,
+    questao_id: str,
+    numero_questao: int
+) -> Tuple[List[Dict], MapeamentoAlternativas]:
+    """Alternativas V/F no formato padrão (sem embaralhar) e seu mapeamento."""
+    # Encontrar qual é a correta
+    correta = 'V'  # Default
+    for alt in alternativas:
+        if alt.get('correta', False):
+            texto = str(alt.get('texto', '')).strip().upper()
+            correta = 'V' if texto in ['V', 'VERDADEIRO', 'TRUE', 'SIM'] else 'F'
+            break
+    
+    padronizadas = [
+        {"letra": "V", "texto": "Verdadeiro", "correta": correta == 'V'},
+        {"letra": "F", "texto": "Falso", "correta": correta == 'F'}
+    ]
+    
+    mapeamento_obj = MapeamentoAlternativas(
+        questao_id=questao_id,
+        numero_questao=numero_questao,
+        mapeamento={"V": "V", "F": "F"},
+        correta_original=correta,
+        correta_nova=correta,
+        tipo_questao="verdadeiro_falso"
+    )
+    
+    return padronizadas, mapeamento_obj
+
+
+def _aplicar_associacao(questao: Dict, indices_b: Sequence[int]) -> Dict:
+    """Questão de associação com a coluna B na ordem sorteada e o gabarito remapeado."""
+    coluna_b = questao.get('coluna_b', [])
+    
+    # Atualizar números/letras (original -> novo)
+    mapeamento_b = {original_idx + 1: novo_idx + 1 for novo_idx, original_idx in enumerate(indices_b)}
+    
+    novo_gabarito = {
+        item_a: mapeamento_b.get(item_b, item_b) if isinstance(item_b, int) else item_b
+        for item_a, item_b in questao.get('gabarito_associacao', {}).items()
+    }
+    
+    # Cópia rasa: colunas e gabarito são substituídos, não alterados
+    return {
+        **questao,
+        'coluna_b': [coluna_b[i] for i in indices_b],
+        'gabarito_associacao': novo_gabarito,
+        'mapeamento_coluna_b': mapeamento_b,
+    }
+
+
+@dataclass(frozen=True)
+class QuestoesLote:
+    """Questões de um lote, congeladas uma vez e compartilhadas por todas as provas."""
+    snapshots: Tuple[QuestaoSnapshot, ...]
+    tipos: Tuple[TipoQuestao, ...]
+    
+    def __len__(self) -> int:
+        return len(self.snapshots)
+
+
 @dataclass
 class ProvaEmbaralhada:
-    """Representa uma prova com questões e alternativas embaralhadas."""
+    """
+    Prova de um aluno em forma compacta.
+    
+    Guarda só a ordem das questões (índices originais, array de inteiros
+    de 16 bits) e, por posição, a permutação das alternativas (ou da
+    coluna B, nas de associação) em bytes; None quando a questão fica
+    como está. As questões ficam em `lote`, compartilhado pelo lote
+    inteiro.
+    
+    questoes, gabarito, ordem_questoes e ordem_alternativas são derivados
+    sob demanda a cada acesso (não ficam guardados na prova).
+    """
     numero_aluno: int
     codigo_prova: str
-    questoes: List[Dict]
-    ordem_questoes: List[MapeamentoQuestao]
-    ordem_alternativas: Dict[str, MapeamentoAlternativas]
-    gabarito: Dict[str, Union[str, List[str]]]  # {"1": "C", "2": ["A", "C"], "3": "V", ...}
-    hash_verificacao: str
+    lote: QuestoesLote
+    ordem: array
+    permutacoes: Tuple[Optional[bytes], ...]
+    hash_verificacao: str = ""
+    numerar: bool = True  # numero/numero_original nas questões (questões embaralhadas)
+    
+    def _variante(self, posicao: int, com_questao: bool = True):
+        """
+        Deriva uma posição da prova.
+        
+        Returns:
+            Tupla (questao ou None, mapeamento das alternativas ou None, gabarito)
+        """
+        indice_original = self.ordem[posicao]
+        snapshot = self.lote.snapshots[indice_original]
+        tipo = self.lote.tipos[indice_original]
+        permutacao = self.permutacoes[posicao]
+        numero_questao = posicao + 1
+        
+        campos = {'tipo_identificado': tipo.value}
+        if self.numerar:
+            campos['numero'] = numero_questao
+            campos['numero_original'] = indice_original + 1
+        
+        alternativas = snapshot.get('alternativas', ())
+        questao = None
+        mapeamento = None
+        
+        if tipo == TipoQuestao.DISSERTATIVA:
+            # Dissertativa: gabarito é a resposta textual
+            resposta = snapshot.get('resposta', '')
+            resposta = resposta[:200] if resposta else 'Resposta aberta'
+        
+        elif tipo == TipoQuestao.NUMERICA:
+            # Numérica: gabarito é o número
+            resposta = snapshot.get('resposta', '0')
+            tolerancia = snapshot.get('tolerancia', 0)
+            resposta = f"{resposta} (±{tolerancia})" if tolerancia else str(resposta)
+        
+        elif tipo == TipoQuestao.ASSOCIACAO:
+            # Associação: coluna B na ordem sorteada
+            questao = snapshot.visao(**campos)
+            if permutacao is not None:
+                questao = _aplicar_associacao(questao, permutacao)
+            resposta = questao.get('gabarito_associacao', {})
+        
+        elif tipo == TipoQuestao.VERDADEIRO_FALSO:
+            # V/F: não embaralha, apenas padroniza
+            alt_processadas, mapeamento = _padronizar_verdadeiro_falso(
+                alternativas, snapshot.id, numero_questao
+            )
+            if com_questao:
+                questao = snapshot.visao(alternativas=alt_processadas, **campos)
+            resposta = mapeamento.correta_nova
+        
+        elif permutacao is not None:
+            # Múltipla escolha ou múltipla resposta embaralhada
+            mapeamento = _mapear_alternativas(
+                alternativas, permutacao, snapshot.id, numero_questao, tipo
+            )
+            if com_questao:
+                questao = snapshot.visao(alternativas=_aplicar_permutacao(alternativas, permutacao), **campos)
+            resposta = mapeamento.correta_nova
+        
+        elif alternativas:
+            # Sem embaralhamento: letras originais
+            if tipo == TipoQuestao.MULTIPLA_RESPOSTA:
+                corretas = [a.get('letra', 'A') for a in alternativas if a.get('correta')]
+                resposta = corretas if corretas else ['A']
+            else:
+                resposta = next(
+                    (a.get('letra', 'A') for a in alternativas if a.get('correta', False)), None
+                )
+        else:
+            resposta = snapshot.get('resposta', '')
+            resposta = resposta[:100] if resposta else ''
+        
+        if com_questao and questao is None:
+            questao = snapshot.visao(**campos)
+        return questao, mapeamento, resposta
+    
+    @property
+    def questoes(self) -> List[Dict]:
+        """Questões da prova, na ordem do aluno (visões montadas a cada acesso)."""
+        return [self._variante(posicao)[0] for posicao in range(len(self.ordem))]
+    
+    @property
+    def gabarito(self) -> Dict[str, Union[str, List[str]]]:
+        """Gabarito da prova: {"1": "C", "2": ["A", "C"], "3": "V", ...}."""
+        gabarito = {}
+        for posicao in range(len(self.ordem)):
+            _, _, resposta = self._variante(posicao, com_questao=False)
+            if resposta is not None:
+                gabarito[str(posicao + 1)] = resposta
+        return gabarito
+    
+    @property
+    def ordem_questoes(self) -> List[MapeamentoQuestao]:
+        """Mapeamento posição original -> nova de cada questão."""
+        return [
+            MapeamentoQuestao(
+                questao_id=self.lote.snapshots[indice_original].id,
+                posicao_original=indice_original + 1,
+                nova_posicao=posicao + 1
+            )
+            for posicao, indice_original in enumerate(self.ordem)
+        ]
+    
+    @property
+    def ordem_alternativas(self) -> Dict[str, MapeamentoAlternativas]:
+        """Mapeamentos das alternativas, por número da questão na prova."""
+        mapeamentos = {}
+        for posicao in range(len(self.ordem)):
+            _, mapeamento, _ = self._variante(posicao, com_questao=False)
+            if mapeamento:
+                mapeamentos[str(posicao + 1)] = mapeamento
+        return mapeamentos
+    
+    def para_compacto(self) -> Dict[str, Any]:
+        """Forma serializável mínima (as questões vão uma vez, à parte)."""
+        return {
+            'numero_aluno': self.numero_aluno,
+            'codigo_prova': self.codigo_prova,
+            'ordem': list(self.ordem),
+            'permutacoes': [None if p is None else list(p) for p in self.permutacoes],
+            'numerar': self.numerar,
+            'hash_verificacao': self.hash_verificacao
+        }
+    
+    @classmethod
+    def de_compacto(cls, dados: Dict[str, Any], lote: QuestoesLote) -> 'ProvaEmbaralhada':
+        """Reconstrói a prova a partir de para_compacto() e das questões do lote."""
+        return cls(
+            numero_aluno=dados['numero_aluno'],
+            codigo_prova=dados['codigo_prova'],
+            lote=lote,
+            ordem=array('H', dados['ordem']),
+            permutacoes=tuple(None if p is None else bytes(p) for p in dados['permutacoes']),
+            hash_verificacao=dados.get('hash_verificacao', ''),
+            numerar=dados.get('numerar', True)
+        )
 
 
 class EmbaralhamentoService:
@@ -90,7 +361,7 @@ class EmbaralhamentoService:
     """
     
     # Letras possíveis para alternativas (máximo 10)
-    LETRAS_ALTERNATIVAS = ['A', 'B', 'C', 'D', 'E', 'F', 'G', 'H', 'I', 'J']
+    LETRAS_ALTERNATIVAS = LETRAS_ALTERNATIVAS
     
     # Opções para V/F
     OPCOES_VF = ['V', 'F']
@@ -193,6 +464,14 @@ class EmbaralhamentoService:
         
         return lista_embaralhada, indices
     
+    def _sortear_ordem(self, tamanho: int, seed: Optional[int] = None) -> List[int]:
+        """Permutação de range(tamanho) (com seed fixa, quando configurada)."""
+        if self.seed and seed is not None:
+            random.seed(seed)
+        indices = list(range(tamanho))
+        random.shuffle(indices)
+        return indices
+    
     def embaralhar_alternativas(
         self,
         alternativas: List[Dict],
@@ -227,57 +506,31 @@ class EmbaralhamentoService:
         if tipo_questao == TipoQuestao.VERDADEIRO_FALSO:
             return self._processar_verdadeiro_falso(alternativas, questao_id, numero_questao)
         
-        # Encontrar alternativas corretas (pode ser mais de uma)
-        corretas_originais = []
-        for alt in alternativas:
-            if alt.get('correta', False):
-                corretas_originais.append(alt.get('letra', 'A'))
-        
-        if not corretas_originais:
-            corretas_originais = ['A']  # Default
-        
-        # Determinar letras baseado no número de alternativas
-        num_alternativas = len(alternativas)
-        letras_disponiveis = self.LETRAS_ALTERNATIVAS[:num_alternativas]
-        
-        # Embaralhar
-        alternativas_copy = deepcopy(alternativas)
-        if self.seed:
-            random.seed(self.seed + seed_adicional + hash(questao_id) % 1000)
-        random.shuffle(alternativas_copy)
-        
-        # Criar mapeamento e atualizar letras
-        mapeamento = {}
-        corretas_novas = []
-        
-        for i, alt in enumerate(alternativas_copy):
-            letra_original = alt.get('letra', letras_disponiveis[i] if i < len(letras_disponiveis) else f'X{i}')
-            letra_nova = letras_disponiveis[i] if i < len(letras_disponiveis) else f'X{i}'
-            
-            mapeamento[letra_original] = letra_nova
-            alt['letra'] = letra_nova
-            
-            if alt.get('correta', False):
-                corretas_novas.append(letra_nova)
-        
-        # Para múltipla resposta, manter lista; para única, pegar primeira
-        if tipo_questao == TipoQuestao.MULTIPLA_RESPOSTA:
-            correta_original = corretas_originais
-            correta_nova = corretas_novas
-        else:
-            correta_original = corretas_originais[0] if corretas_originais else 'A'
-            correta_nova = corretas_novas[0] if corretas_novas else mapeamento.get(correta_original, 'A')
-        
-        mapeamento_obj = MapeamentoAlternativas(
-            questao_id=questao_id,
-            numero_questao=numero_questao,
-            mapeamento=mapeamento,
-            correta_original=correta_original,
-            correta_nova=correta_nova,
-            tipo_questao=tipo_questao.value if tipo_questao else "multipla_escolha"
+        ordem, mapeamento_obj = self._permutar_alternativas(
+            alternativas, questao_id, numero_questao, seed_adicional, tipo_questao
         )
+        return _aplicar_permutacao(alternativas, ordem), mapeamento_obj
+    
+    def _permutar_alternativas(
+        self,
+        alternativas,
+        questao_id: str,
+        numero_questao: int,
+        seed_adicional: int = 0,
+        tipo_questao: TipoQuestao = None
+    ) -> Tuple[List[int], MapeamentoAlternativas]:
+        """
+        Sorteia a ordem das alternativas sem copiá-las.
         
-        return alternativas_copy, mapeamento_obj
+        Returns:
+            Tupla (ordem, mapeamento): a alternativa na posição i da
+            variante é alternativas[ordem[i]]
+        """
+        ordem = self._sortear_ordem(
+            len(alternativas), (self.seed or 0) + seed_adicional + hash(questao_id) % 1000
+        )
+        mapeamento = _mapear_alternativas(alternativas, ordem, questao_id, numero_questao, tipo_questao)
+        return ordem, mapeamento
     
     def _processar_verdadeiro_falso(
         self,
@@ -296,35 +549,7 @@ class EmbaralhamentoService:
         Returns:
             Tupla (alternativas_padronizadas, mapeamento)
         """
-        alternativas_copy = deepcopy(alternativas)
-        
-        # Encontrar qual é a correta
-        correta = 'V'  # Default
-        for alt in alternativas_copy:
-            if alt.get('correta', False):
-                texto = str(alt.get('texto', '')).strip().upper()
-                if texto in ['V', 'VERDADEIRO', 'TRUE', 'SIM']:
-                    correta = 'V'
-                else:
-                    correta = 'F'
-                break
-        
-        # Padronizar formato
-        padronizadas = [
-            {"letra": "V", "texto": "Verdadeiro", "correta": correta == 'V'},
-            {"letra": "F", "texto": "Falso", "correta": correta == 'F'}
-        ]
-        
-        mapeamento_obj = MapeamentoAlternativas(
-            questao_id=questao_id,
-            numero_questao=numero_questao,
-            mapeamento={"V": "V", "F": "F"},
-            correta_original=correta,
-            correta_nova=correta,
-            tipo_questao="verdadeiro_falso"
-        )
-        
-        return padronizadas, mapeamento_obj
+        return _padronizar_verdadeiro_falso(alternativas, questao_id, numero_questao)
     
     def embaralhar_associacao(
         self,
@@ -341,43 +566,17 @@ class EmbaralhamentoService:
         Returns:
             Questão com colunas embaralhadas e gabarito atualizado
         """
-        questao_copy = deepcopy(questao)
-        
-        coluna_a = questao_copy.get('coluna_a', [])
-        coluna_b = questao_copy.get('coluna_b', [])
-        gabarito_original = questao_copy.get('gabarito_associacao', {})
-        
+        indices_b = self._sortear_coluna_b(questao, seed_adicional)
+        if indices_b is None:
+            return dict(questao)
+        return _aplicar_associacao(questao, indices_b)
+    
+    def _sortear_coluna_b(self, questao, seed_adicional: int = 0) -> Optional[List[int]]:
+        """Ordem sorteada da coluna B (None se a questão não tiver coluna B)."""
+        coluna_b = questao.get('coluna_b', [])
         if not coluna_b:
-            return questao_copy
-        
-        # Embaralhar apenas coluna B
-        if self.seed:
-            random.seed(self.seed + seed_adicional)
-        
-        indices_b = list(range(len(coluna_b)))
-        random.shuffle(indices_b)
-        
-        # Nova coluna B
-        nova_coluna_b = [coluna_b[i] for i in indices_b]
-        
-        # Atualizar números/letras
-        mapeamento_b = {}  # original -> novo
-        for novo_idx, original_idx in enumerate(indices_b):
-            mapeamento_b[original_idx + 1] = novo_idx + 1
-        
-        # Atualizar gabarito
-        novo_gabarito = {}
-        for item_a, item_b in gabarito_original.items():
-            if isinstance(item_b, int):
-                novo_gabarito[item_a] = mapeamento_b.get(item_b, item_b)
-            else:
-                novo_gabarito[item_a] = item_b
-        
-        questao_copy['coluna_b'] = nova_coluna_b
-        questao_copy['gabarito_associacao'] = novo_gabarito
-        questao_copy['mapeamento_coluna_b'] = mapeamento_b
-        
-        return questao_copy
+            return None
+        return self._sortear_ordem(len(coluna_b), (self.seed or 0) + seed_adicional)
     
     def embaralhar_questoes(
         self,
@@ -388,42 +587,40 @@ class EmbaralhamentoService:
         Embaralha a ordem das questões.
         
         Args:
-            questoes: Lista de questões
+            questoes: Lista de questões (dicts ou QuestaoSnapshot)
             seed_adicional: Seed para variar embaralhamento
         
         Returns:
             Tupla (questoes_embaralhadas, mapeamento)
         """
-        questoes_copy = deepcopy(questoes)
-        
-        if self.seed:
-            random.seed(self.seed + seed_adicional)
+        snapshots = QuestaoSnapshot.de_questoes(questoes)
+        indices, mapeamento = self._ordenar_questoes(snapshots, seed_adicional)
         
-        # Criar lista de índices e embaralhar
-        indices = list(range(len(questoes_copy)))
-        random.shuffle(indices)
+        questoes_embaralhadas = [
+            snapshots[indice_original].visao(numero=nova_pos + 1, numero_original=indice_original + 1)
+            for nova_pos, indice_original in enumerate(indices)
+        ]
         
-        # Reorganizar questões e criar mapeamento
-        questoes_embaralhadas = []
-        mapeamento = []
+        return questoes_embaralhadas, mapeamento
+    
+    def _ordenar_questoes(
+        self,
+        snapshots: List[QuestaoSnapshot],
+        seed_adicional: int = 0
+    ) -> Tuple[List[int], List[MapeamentoQuestao]]:
+        """Sorteia a ordem das questões (índices originais na nova ordem)."""
+        indices = self._sortear_ordem(len(snapshots), (self.seed or 0) + seed_adicional)
         
-        for nova_pos, indice_original in enumerate(indices):
-            questao = questoes_copy[indice_original]
-            questao_id = questao.get('id', str(indice_original))
-            
-            # Atualizar número da questão
-            questao['numero'] = nova_pos + 1
-            questao['numero_original'] = indice_original + 1
-            
-            questoes_embaralhadas.append(questao)
-            
-            mapeamento.append(MapeamentoQuestao(
-                questao_id=questao_id,
+        mapeamento = [
+            MapeamentoQuestao(
+                questao_id=snapshots[indice_original].id,
                 posicao_original=indice_original + 1,
                 nova_posicao=nova_pos + 1
-            ))
+            )
+            for nova_pos, indice_original in enumerate(indices)
+        ]
         
-        return questoes_embaralhadas, mapeamento
+        return indices, mapeamento
     
     def gerar_prova_embaralhada(
         self,
@@ -444,7 +641,7 @@ class EmbaralhamentoService:
         - associacao: Embaralha coluna B
         
         Args:
-            questoes: Lista de questões originais
+            questoes: Lista de questões originais (dicts ou QuestaoSnapshot)
             numero_aluno: Número do aluno (1, 2, 3...)
             embaralhar_questoes: Se deve embaralhar ordem das questões
             embaralhar_alternativas: Se deve embaralhar alternativas
@@ -455,120 +652,65 @@ class EmbaralhamentoService:
         # Usar número do aluno como seed adicional para garantir unicidade
         seed_aluno = numero_aluno * 1000
         
+        # Questões congeladas uma vez; a prova só guarda ordem e permutações
+        lote = self.preparar_lote(questoes)
+        
         # Embaralhar questões (se configurado)
         if embaralhar_questoes:
-            questoes_processadas, mapeamento_questoes = self.embaralhar_questoes(
-                questoes, seed_aluno
-            )
+            indices, _ = self._ordenar_questoes(list(lote.snapshots), seed_aluno)
         else:
-            questoes_processadas = deepcopy(questoes)
-            mapeamento_questoes = [
-                MapeamentoQuestao(
-                    questao_id=q.get('id', str(i)),
-                    posicao_original=i + 1,
-                    nova_posicao=i + 1
-                )
-                for i, q in enumerate(questoes)
-            ]
-        
-        # Processar cada questão conforme seu tipo
-        mapeamento_alternativas = {}
-        gabarito = {}
-        
-        for i, questao in enumerate(questoes_processadas):
-            questao_id = questao.get('id', str(i))
-            numero_questao = i + 1
-            numero_str = str(numero_questao)
-            
-            # Identificar tipo da questão
-            tipo_questao = self.identificar_tipo_questao(questao)
-            questao['tipo_identificado'] = tipo_questao.value
-            
-            alternativas = questao.get('alternativas', [])
-            
-            # Processar conforme o tipo
-            if tipo_questao == TipoQuestao.DISSERTATIVA:
-                # Dissertativa: gabarito é a resposta textual
-                resposta = questao.get('resposta', '')
-                gabarito[numero_str] = resposta[:200] if resposta else 'Resposta aberta'
-            
-            elif tipo_questao == TipoQuestao.NUMERICA:
-                # Numérica: gabarito é o número
-                resposta = questao.get('resposta', '0')
-                tolerancia = questao.get('tolerancia', 0)
-                if tolerancia:
-                    gabarito[numero_str] = f"{resposta} (±{tolerancia})"
-                else:
-                    gabarito[numero_str] = str(resposta)
+            indices = list(range(len(lote)))
+        
+        # Permutação de cada posição conforme o tipo da questão
+        permutacoes = []
+        for i, indice_original in enumerate(indices):
+            snapshot = lote.snapshots[indice_original]
+            tipo_questao = lote.tipos[indice_original]
+            alternativas = snapshot.get('alternativas', ())
+            permutacao = None
             
+            if not embaralhar_alternativas:
+                pass
             elif tipo_questao == TipoQuestao.ASSOCIACAO:
                 # Associação: embaralhar coluna B
-                if embaralhar_alternativas:
-                    questao_emb = self.embaralhar_associacao(questao, seed_aluno + i)
-                    questao.update(questao_emb)
-                gabarito[numero_str] = questao.get('gabarito_associacao', {})
-            
-            elif tipo_questao == TipoQuestao.VERDADEIRO_FALSO:
-                # V/F: não embaralha, apenas padroniza
-                alt_processadas, mapeamento_alt = self._processar_verdadeiro_falso(
-                    alternativas, questao_id, numero_questao
-                )
-                questao['alternativas'] = alt_processadas
-                if mapeamento_alt:
-                    mapeamento_alternativas[numero_str] = mapeamento_alt
-                    gabarito[numero_str] = mapeamento_alt.correta_nova
-            
-            elif alternativas and embaralhar_alternativas:
+                permutacao = self._sortear_coluna_b(snapshot, seed_aluno + i)
+            elif tipo_questao in (TipoQuestao.DISSERTATIVA, TipoQuestao.NUMERICA,
+                                  TipoQuestao.VERDADEIRO_FALSO):
+                # Sem alternativas para embaralhar (V/F só é padronizada)
+                pass
+            elif alternativas:
                 # Múltipla escolha ou múltipla resposta: embaralhar
-                alt_embaralhadas, mapeamento_alt = self.embaralhar_alternativas(
-                    alternativas,
-                    questao_id,
-                    numero_questao,
-                    seed_aluno + i,
-                    tipo_questao
+                permutacao = self._sortear_ordem(
+                    len(alternativas),
+                    (self.seed or 0) + seed_aluno + i + hash(snapshot.id) % 1000
                 )
-                
-                questao['alternativas'] = alt_embaralhadas
-                
-                if mapeamento_alt:
-                    mapeamento_alternativas[numero_str] = mapeamento_alt
-                    gabarito[numero_str] = mapeamento_alt.correta_nova
             
-            else:
-                # Sem embaralhamento: manter original
-                if alternativas:
-                    if tipo_questao == TipoQuestao.MULTIPLA_RESPOSTA:
-                        # Múltiplas corretas
-                        corretas = [a.get('letra', 'A') for a in alternativas if a.get('correta')]
-                        gabarito[numero_str] = corretas if corretas else ['A']
-                    else:
-                        # Uma correta
-                        for alt in alternativas:
-                            if alt.get('correta', False):
-                                gabarito[numero_str] = alt.get('letra', 'A')
-                                break
-                else:
-                    resposta = questao.get('resposta', '')
-                    gabarito[numero_str] = resposta[:100] if resposta else ''
-        
-        # Gerar código único da prova
-        codigo_prova = self._gerar_codigo_prova(numero_aluno)
-        
-        # Gerar hash de verificação
-        hash_verificacao = self._gerar_hash_verificacao(
-            questoes_processadas,
-            mapeamento_alternativas,
-            gabarito
-        )
+            permutacoes.append(None if permutacao is None else bytes(permutacao))
         
-        return ProvaEmbaralhada(
+        prova = ProvaEmbaralhada(
             numero_aluno=numero_aluno,
-            codigo_prova=codigo_prova,
-            questoes=questoes_processadas,
-            ordem_questoes=mapeamento_questoes,
-            ordem_alternativas=mapeamento_alternativas,
-            gabarito=gabarito,
-            hash_verificacao=hash_verificacao
+            codigo_prova=self._gerar_codigo_prova(numero_aluno),
+            lote=lote,
+            ordem=array('H', indices),
+            permutacoes=tuple(permutacoes),
+            numerar=embaralhar_questoes
+        )
+        prova.hash_verificacao = self._hash_da_prova(prova)
+        return prova
+    
+    def preparar_lote(self, questoes) -> QuestoesLote:
+        """
+        Congela as questões do lote e identifica o tipo de cada uma.
+        
+        Args:
+            questoes: Dicts, QuestaoSnapshot ou um QuestoesLote já preparado
+        """
+        if isinstance(questoes, QuestoesLote):
+            return questoes
+        snapshots = tuple(QuestaoSnapshot.de_questoes(questoes))
+        return QuestoesLote(
+            snapshots=snapshots,
+            tipos=tuple(self.identificar_tipo_questao(snapshot) for snapshot in snapshots)
         )
     
     def gerar_multiplas_provas(
@@ -592,6 +734,9 @@ class EmbaralhamentoService:
         """
         logger.info(f"Gerando {quantidade_alunos} provas embaralhadas")
         
+        # Uma cópia congelada por questão para o lote inteiro
+        questoes = self.preparar_lote(questoes)
+        
         provas = []
         codigos_usados = set()
         
@@ -605,14 +750,8 @@ class EmbaralhamentoService:
             
             # Garantir código único
             while prova.codigo_prova in codigos_usados:
-                prova = ProvaEmbaralhada(
-                    numero_aluno=prova.numero_aluno,
-                    codigo_prova=self._gerar_codigo_prova(i, extra=random.randint(1, 999)),
-                    questoes=prova.questoes,
-                    ordem_questoes=prova.ordem_questoes,
-                    ordem_alternativas=prova.ordem_alternativas,
-                    gabarito=prova.gabarito,
-                    hash_verificacao=prova.hash_verificacao
+                prova = replace(
+                    prova, codigo_prova=self._gerar_codigo_prova(i, extra=random.randint(1, 999))
                 )
             
             codigos_usados.add(prova.codigo_prova)
@@ -648,18 +787,21 @@ class EmbaralhamentoService:
         dados_str = json.dumps(dados, sort_keys=True)
         return hashlib.sha256(dados_str.encode()).hexdigest()[:16]
     
+    def _hash_da_prova(self, prova: ProvaEmbaralhada) -> str:
+        """Hash de verificação calculado a partir da forma compacta da prova."""
+        return self._gerar_hash_verificacao(
+            [prova.lote.snapshots[i] for i in prova.ordem],
+            prova.ordem_alternativas,
+            prova.gabarito
+        )
+    
     def verificar_integridade(
         self,
         prova: ProvaEmbaralhada,
         hash_original: str
     ) -> bool:
         """Verifica se uma prova não foi alterada."""
-        hash_atual = self._gerar_hash_verificacao(
-            prova.questoes,
-            prova.ordem_alternativas,
-            prova.gabarito
-        )
-        return hash_atual == hash_original
+        return self._hash_da_prova(prova) == hash_original
     
     def converter_para_dict(self, prova: ProvaEmbaralhada) -> Dict:
         """Converte ProvaEmbaralhada para dicionário serializável."""
@@ -689,6 +831,23 @@ class EmbaralhamentoService:
             'hash_verificacao': prova.hash_verificacao
         }
     
+    def exportar_variantes(self, provas: List[ProvaEmbaralhada]) -> Dict[str, Any]:
+        """
+        Forma compacta de todas as provas de um lote, para persistir em JSON.
+        
+        As questões entram uma vez, só como (id, versao); cada prova traz
+        apenas a ordem e as permutações (ver ProvaEmbaralhada.para_compacto).
+        """
+        if not provas:
+            return {'questoes': [], 'provas': []}
+        return {
+            'questoes': [
+                {'id': snapshot.id, 'versao': snapshot.versao}
+                for snapshot in provas[0].lote.snapshots
+            ],
+            'provas': [prova.para_compacto() for prova in provas]
+        }
+    
     def gerar_gabarito_consolidado(
         self,
         provas: List[ProvaEmbaralhada]
@@ -0,0 +1,330 @@
+"""
+Fila de Lotes - Executa a geração de provas individuais em segundo plano.
+
+A geração de um lote (PDFs de N alunos + gabaritos + ZIP) leva minutos
+para turmas grandes. Em vez de prender a requisição HTTP, o lote é
+enviado para um pool de workers no próprio processo:
+
+1. submeter() retorna o lote_id imediatamente (sem acessar o banco)
+2. obter_progresso() informa provas concluídas / total e ETA
+3. obter_resultado() devolve o ResultadoLoteProvas ao final
+
+O estado é gravado em provas.lotes_prova pelo worker quando o banco está
+disponível. Lotes finalizados ficam em memória por LOTES_RETENCAO_SEG;
+depois disso, o progresso vem só do banco.
+"""
+
+import time
+import uuid
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Dict, List, Optional
+
+from backend.services.prova_individual_service import (
+    ProvaIndividualService,
+    ConfiguracaoProvaIndividual,
+    ResultadoLoteProvas
+)
+from backend.repositories.base import unidade_de_trabalho
+from backend.utils.logger import get_logger
+from config import settings
+
+logger = get_logger(__name__)
+
+# Intervalo mínimo entre gravações de progresso no banco (segundos)
+INTERVALO_PERSISTENCIA_SEG = 2.0
+
+
+@dataclass
+class TarefaLote:
+    """Estado de um lote submetido à fila."""
+    lote_id: str
+    titulo: str
+    total: int
+    status: str = "na_fila"  # na_fila, gerando, concluido, erro
+    concluidas: int = 0
+    criado_em: datetime = field(default_factory=datetime.now)
+    iniciado_em: Optional[datetime] = None
+    concluido_em: Optional[datetime] = None
+    resultado: Optional[ResultadoLoteProvas] = None
+    erro: Optional[str] = None
+    persistido: bool = False
+    ultima_persistencia: float = 0.0
+    finalizado_monotonic: Optional[float] = None  # Base da retenção em memória
+
+    @property
+    def finalizado(self) -> bool:
+        return self.status in ("concluido", "erro")
+
+    def calcular_eta_seg(self) -> Optional[float]:
+        """Estima o tempo restante com base na média por prova concluída."""
+        if self.finalizado:
+            return 0.0
+        if not self.iniciado_em or self.concluidas == 0:
+            return None
+        decorrido = (datetime.now() - self.iniciado_em).total_seconds()
+        por_prova = decorrido / self.concluidas
+        return round(por_prova * (self.total - self.concluidas), 1)
+
+    def to_dict(self) -> Dict:
+        """Converte o progresso para dicionário (resposta da API)."""
+        percentual = round(100 * self.concluidas / self.total, 1) if self.total else 0.0
+        return {
+            "lote_id": self.lote_id,
+            "titulo": self.titulo,
+            "status": self.status,
+            "provas_concluidas": self.concluidas,
+            "total_provas": self.total,
+            "percentual": 100.0 if self.status == "concluido" else percentual,
+            "eta_seg": self.calcular_eta_seg(),
+            "criado_em": self.criado_em.isoformat(),
+            "iniciado_em": self.iniciado_em.isoformat() if self.iniciado_em else None,
+            "concluido_em": self.concluido_em.isoformat() if self.concluido_em else None,
+            "erro": self.erro
+        }
+
+
+class FilaLotesService:
+    """
+    Executor em segundo plano para lotes de provas individuais.
+    """
+
+    def __init__(
+        self,
+        prova_individual_service: ProvaIndividualService = None,
+        max_workers: int = None,
+        persistir: bool = True,
+        retencao_seg: float = None
+    ):
+        """
+        Args:
+            prova_individual_service: Serviço que gera os lotes
+            max_workers: Lotes processados ao mesmo tempo (padrão: LOTES_MAX_WORKERS)
+            persistir: Se True, grava o estado em provas.lotes_prova
+            retencao_seg: Tempo que um lote finalizado fica em memória
+                (padrão: LOTES_RETENCAO_SEG)
+        """
+        self.prova_individual_service = prova_individual_service or ProvaIndividualService()
+        self.max_workers = max_workers or settings.LOTES_MAX_WORKERS
+        self.persistir = persistir
+        self.retencao_seg = settings.LOTES_RETENCAO_SEG if retencao_seg is None else retencao_seg
+        self._executor = ThreadPoolExecutor(
+            max_workers=self.max_workers,
+            thread_name_prefix="lote-provas"
+        )
+        self._tarefas: Dict[str, TarefaLote] = {}
+        self._lock = threading.Lock()
+        self._lote_repository = None
+        self._prova_repository = None
+
+    # =========================================================================
+    # Persistência (best-effort: a fila funciona sem banco)
+    # =========================================================================
+
+    def _repositorios(self):
+        if self._lote_repository is None:
+            from backend.repositories.lote_repository import LoteProvaRepository
+            from backend.repositories.prova_repository import ProvaRepository
+            self._lote_repository = LoteProvaRepository()
+            self._prova_repository = ProvaRepository()
+        return self._lote_repository, self._prova_repository
+
+    def _persistir_criacao(self, tarefa: TarefaLote, config: ConfiguracaoProvaIndividual):
+        if not self.persistir:
+            return
+        try:
+            lote_repository, prova_repository = self._repositorios()
+            with unidade_de_trabalho(lote_repository.engine):
+                prova_base_id = prova_repository.criar_prova(
+                    titulo=config.titulo,
+                    tempo_limite_min=config.tempo_limite_min,
+                    instrucoes="\n".join(config.instrucoes) if config.instrucoes else None,
+                    embaralhar_questoes=config.embaralhar_questoes,
+                    embaralhar_alternativas=config.embaralhar_alternativas
+                )
+                lote_repository.criar_lote(
+                    lote_id=tarefa.lote_id,
+                    prova_base_id=prova_base_id,
+                    quantidade_alunos=config.quantidade_alunos,
+                    embaralhar_questoes=config.embaralhar_questoes,
+                    embaralhar_alternativas=config.embaralhar_alternativas,
+                    status=tarefa.status
+                )
+            tarefa.persistido = True
+        except Exception as e:
+            logger.warning(f"Lote {tarefa.lote_id} não foi registrado no banco: {e}")
+
+    def _persistir_progresso(self, tarefa: TarefaLote, forcar: bool = False):
+        if not tarefa.persistido:
+            return
+        agora = datetime.now().timestamp()
+        if not forcar and agora - tarefa.ultima_persistencia < INTERVALO_PERSISTENCIA_SEG:
+            return
+        tarefa.ultima_persistencia = agora
+        try:
+            lote_repository, _ = self._repositorios()
+            lote_repository.atualizar_progresso(tarefa.lote_id, tarefa.concluidas, tarefa.status)
+        except Exception as e:
+            logger.warning(f"Falha ao atualizar progresso do lote {tarefa.lote_id}: {e}")
+
+    def _persistir_fim(self, tarefa: TarefaLote):
+        if not tarefa.persistido:
+            return
+        resultado = tarefa.resultado
+        try:
+            lote_repository, _ = self._repositorios()
+            lote_repository.finalizar_lote(
+                lote_id=tarefa.lote_id,
+                status=tarefa.status,
+                provas_geradas=resultado.provas_geradas if resultado else tarefa.concluidas,
+                tempo_geracao_seg=resultado.tempo_geracao_seg if resultado else 0,
+                caminho_zip=resultado.caminho_zip if resultado else None,
+                erro_mensagem=tarefa.erro
+            )
+        except Exception as e:
+            logger.warning(f"Falha ao finalizar lote {tarefa.lote_id} no banco: {e}")
+
+    # =========================================================================
+    # Execução
+    # =========================================================================
+
+    def submeter(self, config: ConfiguracaoProvaIndividual) -> str:
+        """
+        Coloca um lote na fila e retorna imediatamente.
+
+        Returns:
+            lote_id para consultar progresso e resultado
+        """
+        tarefa = TarefaLote(
+            lote_id=str(uuid.uuid4()),
+            titulo=config.titulo,
+            total=config.quantidade_alunos
+        )
+
+        with self._lock:
+            self._descartar_finalizadas()
+            self._tarefas[tarefa.lote_id] = tarefa
+
+        self._executor.submit(self._executar, tarefa, config)
+
+        logger.info(f"Lote {tarefa.lote_id} na fila ({config.quantidade_alunos} alunos)")
+        return tarefa.lote_id
+
+    def _executar(self, tarefa: TarefaLote, config: ConfiguracaoProvaIndividual):
+        """Registra e gera o lote no worker, atualizando o progresso."""
+        self._persistir_criacao(tarefa, config)
+
+        tarefa.status = "gerando"
+        tarefa.iniciado_em = datetime.now()
+        self._persistir_progresso(tarefa, forcar=True)
+
+        def _progresso(concluidas: int, total: int):
+            tarefa.concluidas = concluidas
+            tarefa.total = total
+            self._persistir_progresso(tarefa)
+
+        try:
+            resultado = self.prova_individual_service.gerar_provas_individuais(
+                config,
+                lote_id=tarefa.lote_id,
+                progresso=_progresso
+            )
+            tarefa.resultado = resultado
+            tarefa.erro = resultado.erro
+            tarefa.status = resultado.status
+        except Exception as e:
+            logger.error(f"Erro no lote {tarefa.lote_id}: {e}")
+            tarefa.erro = str(e)
+            tarefa.status = "erro"
+        finally:
+            tarefa.concluido_em = datetime.now()
+            tarefa.finalizado_monotonic = time.monotonic()
+            self._persistir_fim(tarefa)
+
+    def _descartar_finalizadas(self):
+        """Remove da memória os lotes finalizados há mais de retencao_seg (sob self._lock)."""
+        limite = time.monotonic() - self.retencao_seg
+        expiradas = [
+            lote_id for lote_id, tarefa in self._tarefas.items()
+            if tarefa.finalizado_monotonic is not None and tarefa.finalizado_monotonic <= limite
+        ]
+        for lote_id in expiradas:
+            del self._tarefas[lote_id]
+
+    # =========================================================================
+    # Consultas
+    # =========================================================================
+
+    def obter_tarefa(self, lote_id: str) -> Optional[TarefaLote]:
+        """Retorna a tarefa em memória (None se desconhecida ou já descartada)."""
+        with self._lock:
+            self._descartar_finalizadas()
+            return self._tarefas.get(lote_id)
+
+    def obter_progresso(self, lote_id: str) -> Optional[Dict]:
+        """
+        Retorna o progresso do lote.
+
+        Lotes de execuções anteriores do processo são lidos do banco.
+        """
+        tarefa = self.obter_tarefa(lote_id)
+        if tarefa:
+            return tarefa.to_dict()
+
+        if not self.persistir:
+            return None
+
+        try:
+            lote_repository, _ = self._repositorios()
+            lote = lote_repository.buscar_lote_por_id(lote_id)
+        except Exception as e:
+            logger.warning(f"Falha ao buscar lote {lote_id} no banco: {e}")
+            return None
+
+        if not lote:
+            return None
+
+        total = lote.get("quantidade_alunos") or 0
+        concluidas = lote.get("provas_geradas") or 0
+        return {
+            "lote_id": lote_id,
+            "titulo": lote.get("titulo"),
+            "status": lote.get("status"),
+            "provas_concluidas": concluidas,
+            "total_provas": total,
+            "percentual": round(100 * min(concluidas, total) / total, 1) if total else 0.0,
+            "eta_seg": None,
+            "criado_em": str(lote.get("created_at")) if lote.get("created_at") else None,
+            "iniciado_em": None,
+            "concluido_em": str(lote.get("concluido_em")) if lote.get("concluido_em") else None,
+            "erro": lote.get("erro_mensagem"),
+            "caminho_zip": lote.get("caminho_zip")
+        }
+
+    def obter_resultado(self, lote_id: str) -> Optional[ResultadoLoteProvas]:
+        """Retorna o resultado do lote, ou None se ainda não terminou."""
+        tarefa = self.obter_tarefa(lote_id)
+        if tarefa and tarefa.finalizado:
+            return tarefa.resultado
+        return None
+
+    def listar_tarefas(self) -> List[Dict]:
+        """Lista o progresso das tarefas conhecidas (mais recentes primeiro)."""
+        with self._lock:
+            self._descartar_finalizadas()
+            tarefas = list(self._tarefas.values())
+        tarefas.sort(key=lambda t: t.criado_em, reverse=True)
+        return [t.to_dict() for t in tarefas]
+
+    def aguardar(self, lote_id: str, timeout: float = None) -> Optional[ResultadoLoteProvas]:
+        """Bloqueia até o lote terminar (útil em scripts e testes)."""
+        limite = time.monotonic() + timeout if timeout else None
+        while True:
+            tarefa = self.obter_tarefa(lote_id)
+            if tarefa is None or tarefa.finalizado:
+                return tarefa.resultado if tarefa else None
+            if limite and time.monotonic() > limite:
+                return None
+            time.sleep(0.05)
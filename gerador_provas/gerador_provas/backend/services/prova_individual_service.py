@@ -11,16 +11,20 @@ Este serviço integra:
 
 import os
 import json
-import zipfile
-from typing import Dict, List, Optional, Any
+from typing import Dict, List, Optional, Any, Callable
 from datetime import datetime
-from dataclasses import dataclass, field
-from copy import deepcopy
+from dataclasses import dataclass, field, asdict
 import uuid
 
+from sqlalchemy.exc import InterfaceError, OperationalError
+
 from backend.services.embaralhamento_service import EmbaralhamentoService, ProvaEmbaralhada
+from backend.services.questao_snapshot import QuestaoSnapshot
 from backend.services.revisao_service import RevisaoService
+from backend.repositories.base import unidade_de_trabalho
 from backend.utils.prova_pdf_generator import ProvaPDFGenerator
+from backend.utils.compilador_pdf import compilar_provas_alunos
+from backend.utils.empacotador_zip import EmpacotadorZip
 from backend.utils.logger import get_logger
 from config import settings
 
@@ -91,12 +95,22 @@ class ProvaIndividualService:
     2. Para cada aluno, gera uma versão com embaralhamento único
     3. Gera PDF individual + gabarito individual
     4. Empacota tudo em um ZIP
+    5. Registra o lote e os mapeamentos dos alunos no banco
     """
     
-    def __init__(self):
+    def __init__(self, pdf_workers: Optional[int] = None, persistir: bool = True):
+        """
+        Args:
+            pdf_workers: Processos de compilação de PDF (padrão: PDF_WORKERS)
+            persistir: Se True, grava os lotes em provas.lotes_prova / provas_alunos
+        """
         self.embaralhamento = EmbaralhamentoService()
         self.revisao_service = RevisaoService()
         self.pdf_generator = ProvaPDFGenerator()
+        self.pdf_workers = pdf_workers
+        self.persistir = persistir
+        self._lote_repository = None
+        self._prova_repository = None
         
         # Diretório para provas geradas
         self.output_dir = os.path.join(settings.OUTPUT_DIR, "provas_individuais")
@@ -112,20 +126,20 @@ class ProvaIndividualService:
         Returns:
             Lista de questões
         """
-        questoes = []
+        questoes = self.revisao_service.obter_questoes(questoes_ids)
         
+        encontradas = {str(q.get('id')) for q in questoes}
         for questao_id in questoes_ids:
-            questao = self.revisao_service.obter_questao(questao_id)
-            if questao:
-                questoes.append(questao)
-            else:
+            if questao_id not in encontradas:
                 logger.warning(f"Questão {questao_id} não encontrada")
         
         return questoes
     
     def gerar_provas_individuais(
         self,
-        config: ConfiguracaoProvaIndividual
+        config: ConfiguracaoProvaIndividual,
+        lote_id: Optional[str] = None,
+        progresso: Optional[Callable[[int, int], None]] = None
     ) -> ResultadoLoteProvas:
         """
         Gera um lote de provas individuais para todos os alunos + prova do professor.
@@ -136,16 +150,19 @@ class ProvaIndividualService:
         
         Args:
             config: Configuração do lote de provas
+            lote_id: ID do lote (gerado se não informado)
+            progresso: Callback chamado com (provas_concluidas, total) a cada aluno
         
         Returns:
             ResultadoLoteProvas com todas as provas geradas
         """
         inicio = datetime.now()
-        lote_id = str(uuid.uuid4())[:8]
+        lote_id = lote_id or str(uuid.uuid4())
         
         total_provas = config.quantidade_alunos + (1 if config.gerar_prova_professor else 0)
         logger.info(f"Iniciando geração de {total_provas} provas ({config.quantidade_alunos} alunos + professor) - Lote {lote_id}")
         
+        empacotador = None
         try:
             # 1. Obter questões selecionadas
             questoes = self.obter_questoes_por_ids(config.questoes_ids)
@@ -165,6 +182,9 @@ class ProvaIndividualService:
             
             logger.info(f"Encontradas {len(questoes)} questões")
             
+            # Snapshots compartilhados pela prova do professor e pelas variantes
+            questoes = QuestaoSnapshot.de_questoes(questoes)
+            
             # 2. Criar diretório do lote
             data_hora = datetime.now().strftime("%Y%m%d_%H%M%S")
             nome_lote = f"{config.titulo.replace(' ', '_').lower()}_{data_hora}"
@@ -178,6 +198,10 @@ class ProvaIndividualService:
             os.makedirs(gabaritos_dir, exist_ok=True)
             os.makedirs(professor_dir, exist_ok=True)
             
+            # ZIP montado à medida que os arquivos ficam prontos
+            if config.gerar_zip:
+                empacotador = EmpacotadorZip(os.path.join(self.output_dir, f"{nome_lote}.zip"))
+            
             # 3. Gerar PROVA DO PROFESSOR (mestre, comentada)
             prova_professor_dict = None
             if config.gerar_prova_professor:
@@ -187,6 +211,8 @@ class ProvaIndividualService:
                     output_dir=professor_dir
                 )
                 logger.info("Prova do professor gerada")
+                if empacotador:
+                    empacotador.adicionar_diretorio(professor_dir, lote_dir)
             
             # 4. Gerar provas embaralhadas para os alunos
             provas_embaralhadas = self.embaralhamento.gerar_multiplas_provas(
@@ -196,40 +222,45 @@ class ProvaIndividualService:
                 embaralhar_alternativas=config.embaralhar_alternativas
             )
             
-            # 5. Gerar PDFs dos alunos
-            provas_alunos = []
+            # 5. Gerar PDFs dos alunos (prova + gabarito, em paralelo)
+            provas_alunos = [
+                self._preparar_prova_para_pdf(prova, config)
+                for prova in provas_embaralhadas
+            ]
+            total_alunos = len(provas_alunos)
             
-            for prova in provas_embaralhadas:
-                prova_dict = self._preparar_prova_para_pdf(prova, config)
+            if config.gerar_pdf:
+                tarefas = [
+                    {
+                        "prova": prova_dict,
+                        "nome_prova": f"prova_{prova_dict['codigo_prova']}",
+                        "nome_gabarito": f"gabarito_{prova_dict['codigo_prova']}",
+                        "provas_dir": provas_dir,
+                        "gabaritos_dir": gabaritos_dir,
+                        "instituicao": config.instituicao,
+                        "instrucoes": config.instrucoes,
+                    }
+                    for prova_dict in provas_alunos
+                ]
                 
-                if config.gerar_pdf:
-                    try:
-                        # Gerar PDF da prova do aluno
-                        nome_prova = f"prova_{prova.codigo_prova}"
-                        caminho_prova = self.pdf_generator.gerar_prova_pdf(
-                            prova_dict,
-                            nome_arquivo=nome_prova,
-                            output_dir=provas_dir,
-                            instituicao=config.instituicao,
-                            instrucoes=config.instrucoes
-                        )
-                        
-                        # Gerar PDF do gabarito individual
-                        nome_gabarito = f"gabarito_{prova.codigo_prova}"
-                        caminho_gabarito = self.pdf_generator.gerar_gabarito_pdf(
-                            prova_dict,
-                            nome_arquivo=nome_gabarito,
-                            output_dir=gabaritos_dir
-                        )
-                        
-                        prova_dict['caminho_pdf'] = caminho_prova
-                        prova_dict['caminho_gabarito'] = caminho_gabarito
-                        
-                    except Exception as e:
-                        logger.error(f"Erro ao gerar PDF da prova {prova.codigo_prova}: {e}")
-                        prova_dict['erro_pdf'] = str(e)
-                
-                provas_alunos.append(prova_dict)
+                resultados_pdf = compilar_provas_alunos(tarefas, max_workers=self.pdf_workers)
+                for concluidas, (prova_dict, resultado_pdf) in enumerate(
+                    zip(provas_alunos, resultados_pdf), 1
+                ):
+                    if resultado_pdf["erro"]:
+                        logger.error(f"Erro ao gerar PDF da prova {prova_dict['codigo_prova']}: {resultado_pdf['erro']}")
+                        prova_dict['erro_pdf'] = resultado_pdf["erro"]
+                    else:
+                        prova_dict['caminho_pdf'] = resultado_pdf["caminho_pdf"]
+                        prova_dict['caminho_gabarito'] = resultado_pdf["caminho_gabarito"]
+                        if empacotador:
+                            for caminho in (resultado_pdf["caminho_pdf"], resultado_pdf["caminho_gabarito"]):
+                                empacotador.adicionar_arquivo(caminho, os.path.relpath(caminho, lote_dir))
+                    
+                    if progresso:
+                        progresso(concluidas, total_alunos)
+            elif progresso:
+                progresso(total_alunos, total_alunos)
             
             # 6. Gerar gabarito consolidado
             gabarito_consolidado = self.embaralhamento.gerar_gabarito_consolidado(provas_embaralhadas)
@@ -247,11 +278,18 @@ class ProvaIndividualService:
             gabarito_path = os.path.join(lote_dir, "gabarito_consolidado.json")
             with open(gabarito_path, 'w', encoding='utf-8') as f:
                 json.dump(gabarito_consolidado, f, ensure_ascii=False, indent=2)
-            
-            # 7. Criar ZIP
+
+            # Variantes em forma compacta (ordem e permutações de cada aluno)
+            variantes_path = os.path.join(lote_dir, "variantes.json")
+            with open(variantes_path, 'w', encoding='utf-8') as f:
+                json.dump(self.embaralhamento.exportar_variantes(provas_embaralhadas), f, separators=(',', ':'))
+
+            # 7. Finalizar ZIP (arquivos que ainda não entraram, como os JSONs)
             caminho_zip = None
-            if config.gerar_zip:
-                caminho_zip = self._criar_zip_lote(lote_dir, nome_lote)
+            if empacotador:
+                empacotador.adicionar_diretorio(lote_dir, lote_dir)
+                caminho_zip = empacotador.fechar()
+                empacotador = None
             
             # Calcular tempo
             fim = datetime.now()
@@ -260,7 +298,7 @@ class ProvaIndividualService:
             total_geradas = len(provas_alunos) + (1 if prova_professor_dict else 0)
             logger.info(f"Lote {lote_id} concluído: {total_geradas} provas em {tempo_geracao:.2f}s")
             
-            return ResultadoLoteProvas(
+            resultado = ResultadoLoteProvas(
                 lote_id=lote_id,
                 titulo=config.titulo,
                 quantidade_alunos=config.quantidade_alunos,
@@ -273,8 +311,15 @@ class ProvaIndividualService:
                 status="concluido"
             )
             
+            # 8. Registrar lote e mapeamentos no banco
+            self._persistir_lote(resultado, config, provas_embaralhadas, nome_lote, lote_dir)
+            
+            return resultado
+            
         except Exception as e:
             logger.error(f"Erro ao gerar lote de provas: {e}")
+            if empacotador:
+                empacotador.descartar()
             return ResultadoLoteProvas(
                 lote_id=lote_id,
                 titulo=config.titulo,
@@ -321,13 +366,12 @@ class ProvaIndividualService:
         fontes_todas = []
         resumo_por_tipo = {}
         
-        for i, questao in enumerate(questoes):
+        for i, snapshot in enumerate(QuestaoSnapshot.de_questoes(questoes)):
             numero = i + 1
             numero_str = str(numero)
             
-            # Copiar questão
-            q_comentada = deepcopy(questao)
-            q_comentada['numero'] = numero
+            # Visão própria (alternativas recebem destaque/explicação; textos compartilhados)
+            q_comentada = snapshot.visao(numero=numero)
             
             # Identificar tipo
             tipo = q_comentada.get('tipo_questao', q_comentada.get('tipo_identificado', 'multipla_escolha'))
@@ -515,7 +559,7 @@ class ProvaIndividualService:
             'titulo': config.titulo,
             'codigo_prova': prova.codigo_prova,
             'numero_aluno': prova.numero_aluno,
-            'questoes': prova.questoes,
+            'questoes': prova.questoes,  # Derivadas da forma compacta só aqui
             'gabarito': prova.gabarito,
             'hash_verificacao': prova.hash_verificacao,
             'tempo_limite_min': config.tempo_limite_min,
@@ -524,24 +568,10 @@ class ProvaIndividualService:
             'data': datetime.now().strftime("%d/%m/%Y"),
             'incluir_campo_nome': config.incluir_campo_nome,
             'incluir_campo_matricula': config.incluir_campo_matricula,
-            'num_questoes': len(prova.questoes),
-            'pontuacao_total': len(prova.questoes)
+            'num_questoes': len(prova.ordem),
+            'pontuacao_total': len(prova.ordem)
         }
     
-    def _criar_zip_lote(self, lote_dir: str, nome_lote: str) -> str:
-        """Cria arquivo ZIP com todas as provas e gabaritos."""
-        zip_path = os.path.join(self.output_dir, f"{nome_lote}.zip")
-        
-        with zipfile.ZipFile(zip_path, 'w', zipfile.ZIP_DEFLATED) as zipf:
-            for root, dirs, files in os.walk(lote_dir):
-                for file in files:
-                    file_path = os.path.join(root, file)
-                    arcname = os.path.relpath(file_path, lote_dir)
-                    zipf.write(file_path, arcname)
-        
-        logger.info(f"ZIP criado: {zip_path}")
-        return zip_path
-    
     def gerar_prova_rapida(
         self,
         titulo: str,
@@ -574,8 +604,151 @@ class ProvaIndividualService:
         
         return self.gerar_provas_individuais(config)
     
-    def listar_lotes(self, limite: int = 20) -> List[Dict]:
-        """Lista os lotes de provas gerados."""
+    # =========================================================================
+    # Persistência (best-effort: sem banco, os lotes continuam no disco)
+    # =========================================================================
+    
+    def _repositorios(self):
+        if self._lote_repository is None:
+            from backend.repositories.lote_repository import LoteProvaRepository
+            from backend.repositories.prova_repository import ProvaRepository
+            self._lote_repository = LoteProvaRepository()
+            self._prova_repository = ProvaRepository()
+        return self._lote_repository, self._prova_repository
+    
+    def _persistir_lote(
+        self,
+        resultado: ResultadoLoteProvas,
+        config: ConfiguracaoProvaIndividual,
+        provas_embaralhadas: List[ProvaEmbaralhada],
+        nome_lote: str,
+        lote_dir: str
+    ):
+        """
+        Grava o lote em provas.lotes_prova e os mapeamentos de cada aluno
+        em provas.provas_alunos (inserção em lote, uma única transação).
+        
+        Lotes submetidos pela fila já têm o registro criado; nos demais a
+        prova base e o lote são criados aqui.
+        """
+        if not self.persistir:
+            return
+        
+        try:
+            lote_repository, prova_repository = self._repositorios()
+            
+            with unidade_de_trabalho(lote_repository.engine):
+                lote = lote_repository.buscar_lote_por_id(resultado.lote_id)
+                if lote:
+                    prova_base_id = str(lote["prova_base_id"])
+                else:
+                    prova_base_id = prova_repository.criar_prova(
+                        titulo=config.titulo,
+                        tempo_limite_min=config.tempo_limite_min,
+                        instrucoes="\n".join(config.instrucoes) if config.instrucoes else None,
+                        embaralhar_questoes=config.embaralhar_questoes,
+                        embaralhar_alternativas=config.embaralhar_alternativas
+                    )
+                    lote_repository.criar_lote(
+                        lote_id=resultado.lote_id,
+                        prova_base_id=prova_base_id,
+                        quantidade_alunos=config.quantidade_alunos,
+                        embaralhar_questoes=config.embaralhar_questoes,
+                        embaralhar_alternativas=config.embaralhar_alternativas,
+                        status="gerando"
+                    )
+                
+                provas = [
+                    {
+                        'numero_aluno': prova.numero_aluno,
+                        'codigo_prova': prova.codigo_prova,
+                        'ordem_questoes': [asdict(m) for m in prova.ordem_questoes],
+                        'ordem_alternativas': {
+                            chave: asdict(m) for chave, m in prova.ordem_alternativas.items()
+                        },
+                        'gabarito': prova.gabarito,
+                        'caminho_pdf': prova_dict.get('caminho_pdf'),
+                        'caminho_gabarito': prova_dict.get('caminho_gabarito'),
+                        'hash_verificacao': prova.hash_verificacao
+                    }
+                    for prova, prova_dict in zip(provas_embaralhadas, resultado.provas_alunos)
+                ]
+                lote_repository.registrar_provas_alunos(
+                    lote_id=resultado.lote_id,
+                    prova_base_id=prova_base_id,
+                    provas=provas,
+                    nome=nome_lote,
+                    diretorio=lote_dir
+                )
+                
+                if not lote:
+                    lote_repository.finalizar_lote(
+                        lote_id=resultado.lote_id,
+                        status=resultado.status,
+                        provas_geradas=resultado.provas_geradas,
+                        tempo_geracao_seg=resultado.tempo_geracao_seg,
+                        caminho_zip=resultado.caminho_zip
+                    )
+        except Exception as e:
+            logger.warning(f"Lote {resultado.lote_id} não foi registrado no banco: {e}")
+    
+    # =========================================================================
+    # Consultas
+    # =========================================================================
+    
+    def listar_lotes(self, limite: int = 20, antes_de: Optional[str] = None) -> List[Dict]:
+        """
+        Lista os lotes de provas gerados (mais recentes primeiro).
+        
+        Consulta provas.lotes_prova com paginação por chave; sem banco,
+        varre o diretório de saída.
+        
+        Args:
+            limite: Lotes por página
+            antes_de: lote_id do último lote da página anterior
+        
+        Raises:
+            ValueError: Se antes_de não for um lote_id (UUID)
+        """
+        if antes_de is not None:
+            try:
+                antes_de = str(uuid.UUID(str(antes_de)))
+            except ValueError:
+                raise ValueError("Parâmetro 'antes_de' deve ser o lote_id de um lote") from None
+        
+        if self.persistir:
+            try:
+                lote_repository, _ = self._repositorios()
+                return [
+                    self._lote_para_dict(lote)
+                    for lote in lote_repository.listar_lotes(limite=limite, antes_de=antes_de)
+                ]
+            except (OperationalError, InterfaceError) as e:
+                logger.warning(f"Banco indisponível, listando lotes do diretório de saída: {e}")
+        
+        # A listagem do diretório não tem cursor: a página depois de um lote
+        # do banco não existe nela (voltar à primeira faria o cliente repetir)
+        if antes_de:
+            return []
+        return self._listar_lotes_diretorio(limite)
+    
+    @staticmethod
+    def _lote_para_dict(lote: Dict) -> Dict:
+        """Converte uma linha de provas.lotes_prova para o formato da listagem."""
+        criado_em = lote.get('created_at')
+        return {
+            'lote_id': str(lote['id']),
+            'nome': lote.get('nome'),
+            'titulo': lote.get('titulo'),
+            'status': lote.get('status'),
+            'quantidade_provas': lote.get('provas_geradas') or 0,
+            'diretorio': lote.get('diretorio'),
+            'caminho_zip': lote.get('caminho_zip'),
+            'data_criacao': criado_em.strftime("%d/%m/%Y %H:%M") if criado_em else None
+        }
+    
+    def _listar_lotes_diretorio(self, limite: int = 20) -> List[Dict]:
+        """Lista os lotes varrendo o diretório de saída (modo sem banco)."""
         lotes = []
         
         if not os.path.exists(self.output_dir):
@@ -608,6 +781,14 @@ class ProvaIndividualService:
     
     def obter_estatisticas_lote(self, lote_nome: str) -> Dict:
         """Obtém estatísticas de um lote específico."""
+        if self.persistir:
+            try:
+                estatisticas = self._estatisticas_lote_banco(lote_nome)
+                if estatisticas:
+                    return estatisticas
+            except Exception as e:
+                logger.warning(f"Falha ao buscar lote {lote_nome} no banco: {e}")
+        
         lote_dir = os.path.join(self.output_dir, lote_nome)
         
         if not os.path.exists(lote_dir):
@@ -635,6 +816,33 @@ class ProvaIndividualService:
             'gabaritos_pdf': num_gabaritos_pdf,
             'gabarito_consolidado': gabarito
         }
+    
+    def _estatisticas_lote_banco(self, lote_nome: str) -> Optional[Dict]:
+        """Estatísticas a partir de provas.provas_alunos (None se o lote não estiver no banco)."""
+        lote_repository, _ = self._repositorios()
+        
+        lote = lote_repository.buscar_lote_por_nome(lote_nome)
+        if not lote:
+            return None
+        
+        provas = lote_repository.buscar_provas_alunos(str(lote['prova_base_id']))
+        gabarito = {
+            prova['codigo_prova']: {
+                'numero_aluno': prova['numero_aluno'],
+                'gabarito': prova['gabarito'],
+                'hash': prova['hash_verificacao']
+            }
+            for prova in provas
+        }
+        
+        return {
+            'nome': lote_nome,
+            'lote_id': str(lote['id']),
+            'quantidade_versoes': len(gabarito),
+            'provas_pdf': sum(1 for prova in provas if prova['caminho_pdf']),
+            'gabaritos_pdf': sum(1 for prova in provas if prova['caminho_gabarito']),
+            'gabarito_consolidado': gabarito
+        }
 
 
 # Instância global do serviço
@@ -15,6 +15,7 @@ from dataclasses import dataclass, field
 
 from backend.repositories.prova_repository import ProvaRepository
 from backend.repositories.questao_repository import QuestaoRepository
+from backend.repositories.base import unidade_de_trabalho
 from backend.services.questao_service import QuestaoService
 from backend.services.alternativas_generator import AlternativasGenerator
 from backend.utils.prova_pdf_generator import ProvaPDFGenerator
@@ -301,34 +302,31 @@ class ProvaService:
         return questao
     
     def _salvar_prova(self, prova: Dict, config: ConfiguracaoProva) -> str:
-        """Salva a prova no banco de dados."""
-        # Obter materia_id
-        codigo_materia = QuestaoService.MATERIA_CODIGOS.get(
-            config.materia, 
-            config.materia.upper()[:3]
-        )
-        materia_id = self.questao_repository.obter_materia_id_por_codigo(codigo_materia)
-        
-        # Criar prova
-        prova_id = self.prova_repository.criar_prova(
-            titulo=config.titulo,
-            materia_id=materia_id,
-            descricao=f"Prova de {config.materia} - Tópicos: {', '.join(config.topicos)}",
-            tempo_limite_min=config.tempo_limite_min,
-            instrucoes="\n".join(config.instrucoes) if config.instrucoes else None
-        )
-        
-        # Adicionar questões à prova
-        for questao in prova["questoes"]:
-            if questao.get("id"):
-                self.prova_repository.adicionar_questao_prova(
-                    prova_id=prova_id,
-                    questao_id=questao["id"],
-                    numero=questao.get("numero", 0),
-                    pontuacao=questao.get("pontuacao", 1.0)
-                )
-        
-        return prova_id
+        """Salva a prova e suas questões no banco de dados (uma transação)."""
+        with unidade_de_trabalho(self.prova_repository.engine):
+            # Obter materia_id
+            codigo_materia = QuestaoService.MATERIA_CODIGOS.get(
+                config.materia, 
+                config.materia.upper()[:3]
+            )
+            materia_id = self.questao_repository.obter_materia_id_por_codigo(codigo_materia)
+            
+            # Criar prova
+            prova_id = self.prova_repository.criar_prova(
+                titulo=config.titulo,
+                materia_id=materia_id,
+                descricao=f"Prova de {config.materia} - Tópicos: {', '.join(config.topicos)}",
+                tempo_limite_min=config.tempo_limite_min,
+                instrucoes="\n".join(config.instrucoes) if config.instrucoes else None
+            )
+            
+            # Adicionar questões à prova (um único INSERT multi-linha)
+            self.prova_repository.adicionar_questoes_prova(
+                prova_id=prova_id,
+                questoes=[q for q in prova["questoes"] if q.get("id")]
+            )
+            
+            return prova_id
     
     def criar_prova_rapida(
         self,
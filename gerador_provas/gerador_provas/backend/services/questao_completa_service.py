@@ -16,7 +16,6 @@ import json
 from typing import Dict, List, Optional, Any
 from dataclasses import dataclass, field
 from datetime import datetime
-from copy import deepcopy
 import uuid
 
 from backend.utils.logger import get_logger
@@ -19,7 +19,8 @@ from backend.agents.matematica import AgenteMatematica
 from backend.agents.revisor import AgenteRevisor
 from backend.agents.classificador import AgenteClassificador
 from backend.agents.imagens import AgenteImagens
-from backend.repositories.questao_repository import QuestaoRepository
+from backend.repositories.questao_repository import QuestaoRepository, CODIGOS_MATERIAS
+from backend.repositories.base import unidade_de_trabalho
 from backend.utils.logger import log_questao_gerada, get_logger
 
 logger = get_logger(__name__)
@@ -38,15 +39,7 @@ class QuestaoService:
     """
     
     # Mapeamento de matérias para códigos
-    MATERIA_CODIGOS = {
-        "fisica": "FIS",
-        "quimica": "QUI",
-        "matematica": "MAT",
-        "biologia": "BIO",
-        "geografia": "GEO",
-        "historia": "HIS",
-        "portugues": "POR"
-    }
+    MATERIA_CODIGOS = CODIGOS_MATERIAS
     
     def __init__(self, persistir: bool = True):
         """
@@ -175,58 +168,60 @@ class QuestaoService:
         topico: str,
         dificuldade: str
     ) -> str:
-        """Salva a questão no banco de dados."""
-        # Obter IDs de matéria e tópico
-        codigo_materia = self.MATERIA_CODIGOS.get(materia, materia.upper()[:3])
-        materia_id = self.repository.obter_materia_id_por_codigo(codigo_materia)
-        
-        if not materia_id:
-            logger.warning(f"Matéria {codigo_materia} não encontrada no banco")
-            # Usar ID genérico ou criar
-            materia_id = None
-        
-        topico_id = None
-        if topico and materia_id:
-            topico_id = self.repository.obter_topico_id_por_codigo(
-                materia_id, 
-                topico.upper().replace(" ", "_")
-            )
-        
-        # Criar questão
-        questao_id = self.repository.criar_questao(
-            materia_id=materia_id,
-            topico_id=topico_id,
-            enunciado=questao.get("enunciado", ""),
-            tipo=questao.get("tipo_questao", "dissertativa"),
-            dificuldade=dificuldade,
-            status="aprovada" if questao.get("revisao_aprovada") else "rascunho",
-            fonte="Gerador Automático CrewAI",
-            palavras_chave=questao.get("tags", {}).get("topico")
-        )
-        
-        # Criar resolução
-        self.repository.criar_resolucao(
-            questao_id=questao_id,
-            resposta_curta=questao.get("resposta", ""),
-            resposta_completa=questao.get("explicacao"),
-            formulas=questao.get("formulas"),
-            metodo_resolucao=questao.get("metodo")
-        )
+        """
+        Salva a questão no banco de dados.
         
-        # Registrar diagrama se existir
-        if questao.get("diagrama"):
-            caminho = questao["diagrama"]
-            nome_arquivo = os.path.basename(caminho)
+        Consultas e inserções usam a mesma conexão e um único commit.
+        """
+        with unidade_de_trabalho(self.repository.engine):
+            # Obter IDs de matéria e tópico
+            codigo_materia = self.MATERIA_CODIGOS.get(materia, materia.upper()[:3])
+            materia_id = self.repository.obter_materia_id_por_codigo(codigo_materia)
+            
+            if not materia_id:
+                logger.warning(f"Matéria {codigo_materia} não encontrada no banco")
+                # Usar ID genérico ou criar
+                materia_id = None
+            
+            topico_id = None
+            if topico and materia_id:
+                topico_id = self.repository.obter_topico_id_por_codigo(
+                    materia_id, 
+                    topico.upper().replace(" ", "_")
+                )
+            
+            # Questão, resolução e diagrama
+            diagrama = None
+            if questao.get("diagrama"):
+                caminho = questao["diagrama"]
+                diagrama = {
+                    "nome_arquivo": os.path.basename(caminho),
+                    "caminho": caminho,
+                    "tipo_diagrama": questao.get("tipo"),
+                    "parametros": questao.get("dados")
+                }
             
-            self.repository.criar_diagrama(
-                questao_id=questao_id,
-                nome_arquivo=nome_arquivo,
-                caminho=caminho,
-                tipo_diagrama=questao.get("tipo"),
-                parametros=questao.get("dados")
+            questao_id = self.repository.criar_questao_completa(
+                questao={
+                    "materia_id": materia_id,
+                    "topico_id": topico_id,
+                    "enunciado": questao.get("enunciado", ""),
+                    "tipo": questao.get("tipo_questao", "dissertativa"),
+                    "dificuldade": dificuldade,
+                    "status": "aprovada" if questao.get("revisao_aprovada") else "rascunho",
+                    "fonte": "Gerador Automático CrewAI",
+                    "palavras_chave": questao.get("tags", {}).get("topico")
+                },
+                resolucao={
+                    "resposta_curta": questao.get("resposta", ""),
+                    "resposta_completa": questao.get("explicacao"),
+                    "formulas": questao.get("formulas"),
+                    "metodo_resolucao": questao.get("metodo")
+                },
+                diagrama=diagrama
             )
-        
-        return questao_id
+            
+            return questao_id
     
     def gerar_multiplas(
         self,
@@ -290,6 +285,79 @@ class QuestaoService:
             limite=limite
         )
     
+    def buscar_texto(
+        self,
+        texto: str = None,
+        palavras_chave: List[str] = None,
+        materia: str = None,
+        dificuldade: str = None,
+        status: str = None,
+        limite: int = 20,
+        offset: int = 0
+    ) -> List[Dict]:
+        """
+        Busca questões pelo texto do enunciado e/ou palavras-chave.
+        
+        Returns:
+            Questões da mais relevante para a menos relevante
+        """
+        if not self.repository:
+            return []
+        
+        materia_id = None
+        if materia:
+            codigo = self.MATERIA_CODIGOS.get(materia, materia.upper()[:3])
+            materia_id = self.repository.obter_materia_id_por_codigo(codigo)
+            if materia_id is None:
+                return []
+        
+        return self.repository.buscar_texto(
+            texto=texto,
+            palavras_chave=palavras_chave,
+            materia_id=materia_id,
+            dificuldade=dificuldade,
+            status=status,
+            limite=limite,
+            offset=offset
+        )
+    
+    def buscar_questoes_pagina(
+        self,
+        materia: str = None,
+        dificuldade: str = None,
+        status: str = None,
+        limite: int = 50,
+        cursor: str = None,
+        texto: str = None
+    ) -> Dict[str, Any]:
+        """
+        Busca uma página de questões no banco (paginação por cursor).
+        
+        Args:
+            texto: Busca textual no enunciado (opcional)
+        
+        Returns:
+            {"questoes": [...], "proximo_cursor": str | None}
+        """
+        if not self.repository:
+            return {"questoes": [], "proximo_cursor": None}
+        
+        materia_id = None
+        if materia:
+            codigo = self.MATERIA_CODIGOS.get(materia, materia.upper()[:3])
+            materia_id = self.repository.obter_materia_id_por_codigo(codigo)
+            if materia_id is None:
+                return {"questoes": [], "proximo_cursor": None}
+        
+        return self.repository.buscar_questoes_pagina(
+            materia_id=materia_id,
+            dificuldade=dificuldade,
+            status=status,
+            limite=limite,
+            cursor=cursor,
+            texto=texto or None
+        )
+    
     def obter_estatisticas(self) -> Dict:
         """
         Retorna estatísticas das questões.
@@ -0,0 +1,96 @@
+"""
+Snapshots imutáveis de questões para a geração de lotes de provas.
+
+Cada questão é congelada uma única vez por lote (QuestaoSnapshot) e todas
+as variantes (provas dos alunos e prova do professor) partem dela. O que
+muda de um aluno para outro é só a ordem das alternativas e as letras:
+as visões montadas para o PDF são cópias rasas que compartilham os textos
+(enunciado, alternativas, fontes) com o snapshot, em vez de deepcopy da
+questão inteira por aluno.
+
+As visões são dicts comuns (serializáveis e enviados aos processos de
+compilação); os valores internos são compartilhados e não devem ser
+alterados in place.
+"""
+
+from types import MappingProxyType
+from typing import Any, Dict, Iterable, List, Mapping, Optional, Tuple, Union
+
+
+class QuestaoSnapshot:
+    """
+    Versão imutável de uma questão, identificada por (id, versao).
+
+    Expõe get() como um dict para que identificar o tipo e calcular o
+    gabarito funcionem direto sobre o snapshot.
+    """
+
+    __slots__ = ('id', 'versao', 'dados', 'alternativas')
+
+    def __init__(self, questao: Mapping, indice: int = 0):
+        """
+        Args:
+            questao: Questão no formato dict (como vem do banco/serviços)
+            indice: Posição na prova, usada como ID quando a questão não tem
+        """
+        alternativas = questao.get('alternativas')
+        dados = {chave: valor for chave, valor in questao.items() if chave != 'alternativas'}
+
+        definir = object.__setattr__
+        definir(self, 'id', str(questao.get('id', indice)))
+        definir(self, 'versao', questao.get('versao', 1))
+        definir(self, 'dados', MappingProxyType(dados))
+        definir(self, 'alternativas', None if alternativas is None else tuple(
+            MappingProxyType(dict(alternativa)) for alternativa in alternativas
+        ))
+
+    def __setattr__(self, nome, valor):
+        raise AttributeError("QuestaoSnapshot é imutável")
+
+    def __delattr__(self, nome):
+        raise AttributeError("QuestaoSnapshot é imutável")
+
+    def __repr__(self) -> str:
+        return f"QuestaoSnapshot(id={self.id!r}, versao={self.versao!r})"
+
+    @property
+    def chave(self) -> Tuple[str, Any]:
+        """Identidade do snapshot: (id, versao)."""
+        return self.id, self.versao
+
+    def get(self, chave: str, padrao: Any = None) -> Any:
+        """Lê um campo como em dict.get() (alternativas como tupla somente leitura)."""
+        if chave == 'alternativas':
+            return padrao if self.alternativas is None else self.alternativas
+        return self.dados.get(chave, padrao)
+
+    def visao(self, alternativas: Optional[List[Dict]] = None, **campos) -> Dict:
+        """
+        Monta o dict da questão para uma variante (cópia na escrita).
+
+        Só o dict de topo e os dicts das alternativas são novos; os
+        valores (textos, listas de fontes...) são os do snapshot.
+
+        Args:
+            alternativas: Alternativas já permutadas da variante (padrão:
+                as do snapshot, na ordem original)
+            campos: Campos próprios da variante (numero, tipo_identificado...)
+        """
+        questao = dict(self.dados)
+        if alternativas is not None:
+            questao['alternativas'] = alternativas
+        elif self.alternativas is not None:
+            questao['alternativas'] = [dict(alternativa) for alternativa in self.alternativas]
+        questao.update(campos)
+        return questao
+
+    @classmethod
+    def de_questoes(
+        cls,
+        questoes: Iterable[Union[Mapping, 'QuestaoSnapshot']]
+    ) -> List['QuestaoSnapshot']:
+        """Congela uma lista de questões (snapshots já prontos são reaproveitados)."""
+        return [
+            questao if isinstance(questao, cls) else cls(questao, indice)
+            for indice, questao in enumerate(questoes)
+        ]
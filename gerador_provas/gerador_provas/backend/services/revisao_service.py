@@ -8,16 +8,299 @@ Este serviço coordena:
 - Gestão de fontes bibliográficas
 """
 
-from typing import Dict, List, Optional, Any
+import os
+import time
+import uuid
+import heapq
+import threading
+from bisect import bisect_left, insort
+from itertools import islice
+from collections import OrderedDict, defaultdict, deque
+from collections.abc import MutableMapping
+from typing import Dict, List, Optional, Any, Callable, Iterator
 from datetime import datetime
 from dataclasses import dataclass, field
-import uuid
 
-from backend.repositories.questao_repository import QuestaoRepository
+from sqlalchemy.exc import InterfaceError, OperationalError, SQLAlchemyError
+
+from backend.repositories.base import unidade_de_trabalho
+from backend.repositories.paginacao import decodificar_cursor, montar_pagina
+from backend.repositories.questao_repository import QuestaoRepository, CODIGOS_MATERIAS, codigo_materia
+from backend.repositories.revisao_repository import RevisaoRepository
 from backend.utils.logger import get_logger
 
 logger = get_logger(__name__)
 
+try:
+    from config import settings
+    REVISAO_CACHE_MAX = settings.REVISAO_CACHE_MAX
+    REVISAO_CACHE_TTL_SEG = settings.REVISAO_CACHE_TTL_SEG
+    REVISAO_BANCO_RETENTATIVA_SEG = settings.REVISAO_BANCO_RETENTATIVA_SEG
+except (ImportError, AttributeError):
+    REVISAO_CACHE_MAX = int(os.getenv('REVISAO_CACHE_MAX', 2000))
+    REVISAO_CACHE_TTL_SEG = int(os.getenv('REVISAO_CACHE_TTL_SEG', 60))
+    REVISAO_BANCO_RETENTATIVA_SEG = int(os.getenv('REVISAO_BANCO_RETENTATIVA_SEG', 30))
+
+# Código da matéria no banco -> nome usado nas questões ("FIS" -> "fisica")
+MATERIAS_POR_CODIGO = {codigo: materia for materia, codigo in CODIGOS_MATERIAS.items()}
+
+
+def _chave_cronologica(created_at: Any, questao_id: str) -> tuple:
+    """Chave (created_at, id) da paginação, comparável entre datas com e sem fuso."""
+    if isinstance(created_at, str):
+        try:
+            created_at = datetime.fromisoformat(created_at)
+        except ValueError:
+            created_at = None
+    if not isinstance(created_at, datetime):
+        created_at = datetime.min
+    return created_at.replace(tzinfo=None), str(questao_id)
+
+
+class CacheLRU(MutableMapping):
+    """
+    Dicionário limitado, com descarte do item menos usado e validade.
+    
+    Ao passar de `maximo` itens, descarta os menos usados; itens mais
+    velhos que `ttl_seg` são tratados como ausentes (e relidos do banco),
+    o que limita o tempo em que um worker enxerga dados desatualizados
+    por outro. Itens fixados (ainda não gravados no banco) nunca são
+    descartados nem expiram; ao_descartar(chave) é chamado a cada descarte
+    automático, inclusive por validade (ver descartar_expirados).
+    """
+    
+    def __init__(self, maximo: int, ttl_seg: int = 0, ao_descartar: Callable[[Any], None] = None):
+        self.maximo = maximo
+        self.ttl_seg = ttl_seg
+        self.ao_descartar = ao_descartar
+        self._itens: "OrderedDict[str, tuple]" = OrderedDict()
+        # Itens não fixados em ordem de gravação (os mais antigos vencem primeiro)
+        self._gravacoes: "OrderedDict[str, float]" = OrderedDict()
+        self._fixados = set()
+        self._lock = threading.RLock()
+    
+    def __getitem__(self, chave):
+        with self._lock:
+            valor, gravado_em = self._itens[chave]
+            if chave in self._gravacoes and self._expirado(gravado_em):
+                self._descartar(chave)
+                raise KeyError(chave)
+            self._itens.move_to_end(chave)
+            return valor
+    
+    def __setitem__(self, chave, valor):
+        with self._lock:
+            agora = time.monotonic()
+            self._itens[chave] = (valor, agora)
+            self._itens.move_to_end(chave)
+            if chave not in self._fixados:
+                self._gravacoes[chave] = agora
+                self._gravacoes.move_to_end(chave)
+            self._descartar_excedentes(preservar=chave)
+            self.descartar_expirados()
+    
+    def __delitem__(self, chave):
+        with self._lock:
+            del self._itens[chave]
+            self._gravacoes.pop(chave, None)
+            self._fixados.discard(chave)
+    
+    def __iter__(self) -> Iterator:
+        with self._lock:
+            return iter(list(self._itens))
+    
+    def __len__(self) -> int:
+        return len(self._itens)
+    
+    def items(self) -> List[tuple]:
+        """Cópia dos itens válidos (segura contra alterações concorrentes)."""
+        with self._lock:
+            itens = []
+            for chave in list(self._itens):
+                try:
+                    itens.append((chave, self[chave]))
+                except KeyError:
+                    pass
+            return itens
+    
+    def values(self) -> List:
+        return [valor for _, valor in self.items()]
+    
+    def fixar(self, chave):
+        """Impede o descarte do item (ex.: questão que só existe em memória)."""
+        with self._lock:
+            self._fixados.add(chave)
+            self._gravacoes.pop(chave, None)
+    
+    def desafixar(self, chave):
+        """Volta a sujeitar o item ao descarte e à validade (já gravado no banco)."""
+        with self._lock:
+            self._fixados.discard(chave)
+            if chave in self._itens:
+                self._gravacoes[chave] = time.monotonic()
+    
+    def descartar_expirados(self):
+        """Descarta agora os itens vencidos (custo proporcional aos vencidos)."""
+        if not self.ttl_seg:
+            return
+        with self._lock:
+            while self._gravacoes:
+                chave, gravado_em = next(iter(self._gravacoes.items()))
+                if not self._expirado(gravado_em):
+                    break
+                self._descartar(chave)
+    
+    def _expirado(self, gravado_em: float) -> bool:
+        return bool(self.ttl_seg) and time.monotonic() - gravado_em > self.ttl_seg
+    
+    def _descartar(self, chave):
+        del self._itens[chave]
+        self._gravacoes.pop(chave, None)
+        if self.ao_descartar:
+            self.ao_descartar(chave)
+    
+    def _descartar_excedentes(self, preservar=None):
+        excesso = len(self._itens) - self.maximo
+        if excesso <= 0:
+            return
+        for chave in list(self._itens):
+            if chave not in self._fixados and chave != preservar:
+                self._descartar(chave)
+                excesso -= 1
+                if excesso == 0:
+                    break
+
+
+class IndiceQuestoes:
+    """
+    Índices secundários das questões em memória.
+    
+    Para cada (status, matéria) guarda as chaves (created_at, id) das
+    questões em uma lista ordenada, atualizada a cada gravação; a contagem
+    do grupo é o tamanho da lista. As aprovadas também ficam ordenadas por
+    (aprovada_em, id), por matéria. Listagens juntam as listas já ordenadas
+    a partir do cursor (bisect) e param no limite, e estatísticas custam
+    O(grupos), sem varrer as questões.
+    """
+    
+    # Chaves copiadas por vez ao percorrer um grupo do fim para o início
+    LOTE_PERCURSO = 64
+    
+    def __init__(self):
+        # (status, matéria) -> [(created_at, ID)] ordenada
+        self._grupos: Dict[tuple, List[tuple]] = defaultdict(list)
+        self._chaves: Dict[str, tuple] = {}
+        self._ordem: Dict[str, tuple] = {}
+        # matéria -> [(aprovada_em, ID)] ordenada, só das aprovadas
+        self._aprovacoes: Dict[str, List[tuple]] = defaultdict(list)
+        self._aprovacao: Dict[str, tuple] = {}
+        self._lock = threading.RLock()
+    
+    def atualizar(
+        self, questao_id: str, status: str, materia: str, ordem: tuple, aprovacao: Optional[tuple] = None
+    ):
+        """
+        Indexa a questão (ou move para o novo status/matéria/ordem).
+        
+        Args:
+            ordem: Chave (created_at, id) da questão
+            aprovacao: Chave (aprovada_em, id), se aprovada
+        """
+        with self._lock:
+            chave = (status, materia)
+            if self._chaves.get(questao_id) != chave or self._ordem.get(questao_id) != ordem:
+                self._retirar(questao_id)
+                insort(self._grupos[chave], ordem)
+                self._chaves[questao_id] = chave
+                self._ordem[questao_id] = ordem
+            
+            aprovacao = (materia, aprovacao) if aprovacao else None
+            if self._aprovacao.get(questao_id) != aprovacao:
+                self._retirar_aprovacao(questao_id)
+                if aprovacao:
+                    insort(self._aprovacoes[materia], aprovacao[1])
+                    self._aprovacao[questao_id] = aprovacao
+    
+    def remover(self, questao_id: str):
+        """Retira a questão dos índices."""
+        with self._lock:
+            self._retirar(questao_id)
+            self._retirar_aprovacao(questao_id)
+    
+    def _retirar(self, questao_id: str):
+        chave = self._chaves.pop(questao_id, None)
+        if chave is None:
+            return
+        self._tirar_da_lista(self._grupos, chave, self._ordem.pop(questao_id))
+    
+    def _retirar_aprovacao(self, questao_id: str):
+        aprovacao = self._aprovacao.pop(questao_id, None)
+        if aprovacao is not None:
+            self._tirar_da_lista(self._aprovacoes, *aprovacao)
+    
+    @staticmethod
+    def _tirar_da_lista(listas: Dict, chave: Any, item: tuple):
+        lista = listas[chave]
+        del lista[bisect_left(lista, item)]
+        if not lista:
+            del listas[chave]
+    
+    def ids(self, status: List[str], materia: Optional[str] = None, limite: Optional[int] = None) -> List[str]:
+        """IDs com um dos status (e da matéria), das mais antigas às mais recentes."""
+        with self._lock:
+            grupos = [
+                grupo for (s, m), grupo in self._grupos.items()
+                if s in status and (materia is None or m == materia)
+            ]
+            return [ordem[-1] for ordem in islice(heapq.merge(*grupos), limite)]
+    
+    def recentes(
+        self, status: List[str], materia: Optional[str] = None, antes_de: Optional[tuple] = None
+    ) -> Iterator[str]:
+        """
+        IDs com um dos status (e da matéria), das mais recentes às mais
+        antigas, começando antes da chave (created_at, id) do cursor.
+        
+        O percurso é preguiçoso: cada grupo é lido aos poucos a partir do
+        cursor, então consumir k IDs custa O(grupos · log n + k).
+        """
+        with self._lock:
+            chaves = [
+                (s, m) for (s, m) in self._grupos
+                if s in status and (materia is None or m == materia)
+            ]
+        percursos = [self._descendo(self._grupos, chave, antes_de) for chave in chaves]
+        return (ordem[-1] for ordem in heapq.merge(*percursos, reverse=True))
+    
+    def aprovadas_recentes(self, materia: Optional[str] = None) -> Iterator[str]:
+        """IDs das aprovadas (da matéria), das aprovadas por último às primeiras."""
+        with self._lock:
+            chaves = [m for m in self._aprovacoes if materia is None or m == materia]
+        percursos = [self._descendo(self._aprovacoes, chave, None) for chave in chaves]
+        return (aprovacao[-1] for aprovacao in heapq.merge(*percursos, reverse=True))
+    
+    def _descendo(self, listas: Dict, chave: Any, antes_de: Optional[tuple]) -> Iterator[tuple]:
+        """
+        Itens de uma lista do fim para o início, abaixo de antes_de.
+        
+        Copia LOTE_PERCURSO itens por vez sob o lock e retoma pelo último
+        item lido (bisect), então a lista pode mudar durante o percurso.
+        """
+        while True:
+            with self._lock:
+                lista = listas.get(chave, [])
+                fim = len(lista) if antes_de is None else bisect_left(lista, antes_de)
+                lote = lista[max(0, fim - self.LOTE_PERCURSO):fim]
+            if not lote:
+                return
+            yield from reversed(lote)
+            antes_de = lote[0]
+    
+    def contar(self) -> List[tuple]:
+        """Contagens como (status, matéria, total)."""
+        with self._lock:
+            return [(status, materia, len(grupo)) for (status, materia), grupo in self._grupos.items()]
+
 
 @dataclass
 class FonteBibliografica:
@@ -72,11 +355,286 @@ class RevisaoService:
         'correcao_pendente': 'Correções solicitadas'
     }
     
-    def __init__(self):
+    # Abas do banco de questões -> status de revisão listados
+    ABAS_LISTAGEM = {
+        'todas': ['pendente', 'aprovada'],
+        'pendentes': ['pendente'],
+        'aprovadas': ['aprovada'],
+    }
+    
+    # Status em memória equivalentes a um status de revisão
+    STATUS_EM_MEMORIA = {'pendente': ['rascunho', 'revisao', 'pendente']}
+    
+    def __init__(self, persistir: bool = True, cache_max: int = None):
+        """
+        Args:
+            persistir: Se True, lê e grava em provas.questoes / provas.questao_revisoes
+            cache_max: Questões mantidas em memória (padrão: REVISAO_CACHE_MAX)
+        """
         self.questao_repository = QuestaoRepository()
-        # Cache de revisões em memória (para versão piloto sem banco)
-        self._revisoes_cache: Dict[str, List[Dict]] = {}
-        self._questoes_cache: Dict[str, Dict] = {}
+        self.revisao_repository = RevisaoRepository()
+        self.persistir = persistir
+        self._banco_indisponivel_ate = 0.0
+        
+        # Gravações feitas com o banco indisponível: (questão, operação), em
+        # ordem; repetidas antes da próxima operação no banco
+        self._gravacoes_pendentes: deque = deque()
+        self._sincronizacao_lock = threading.Lock()
+        
+        # Cache de leitura (write-through). Sem banco, guarda as questões
+        # da sessão, fixadas para não serem descartadas
+        self._cache_max = cache_max or REVISAO_CACHE_MAX
+        self.limpar_cache()
+    
+    def limpar_cache(self):
+        """Esvazia as questões e revisões em memória (e os índices e as gravações pendentes)."""
+        self._gravacoes_pendentes.clear()
+        self._indice = IndiceQuestoes()
+        self._questoes_cache = CacheLRU(
+            self._cache_max, REVISAO_CACHE_TTL_SEG, ao_descartar=self._indice.remover
+        )
+        self._revisoes_cache = CacheLRU(self._cache_max, REVISAO_CACHE_TTL_SEG)
+    
+    def _ids_indexados(self, status: List[str], materia: Optional[str], limite: Optional[int] = None) -> List[str]:
+        """IDs em memória pelos índices, sem as questões já vencidas no cache."""
+        self._questoes_cache.descartar_expirados()
+        return self._indice.ids(status, materia or None, limite)
+    
+    def _indexar(self, questao_id: str, questao: Dict):
+        status = questao.get('status', 'pendente')
+        self._indice.atualizar(
+            questao_id, status, questao.get('materia', 'outros'),
+            _chave_cronologica(questao.get('created_at'), questao_id),
+            _chave_cronologica(questao.get('aprovada_em'), questao_id) if status == 'aprovada' else None
+        )
+    
+    def _guardar(self, questao_id: str, questao: Dict):
+        """Grava a questão no cache e atualiza os índices."""
+        self._questoes_cache[questao_id] = questao
+        self._indexar(questao_id, questao)
+    
+    # ========================================================================
+    # BANCO DE DADOS
+    # ========================================================================
+    
+    def _no_banco(self, operacao: Callable[[], Any]) -> Any:
+        """
+        Executa uma operação no banco.
+        
+        Antes, repete as gravações pendentes (feitas enquanto o banco
+        estava fora), para que a operação já as enxergue.
+        
+        Returns:
+            O resultado da operação, ou None se o banco estiver indisponível.
+            Após uma falha de conexão, o banco só é tentado de novo depois
+            de REVISAO_BANCO_RETENTATIVA_SEG. Outros erros (SQL inválido,
+            tipos, violações de integridade) são propagados.
+        """
+        if not self._banco_disponivel():
+            return None
+        
+        try:
+            self._sincronizar_pendentes()
+            if not self._banco_disponivel():
+                return None
+            return operacao()
+        except (OperationalError, InterfaceError) as e:
+            self._marcar_banco_indisponivel(e)
+        return None
+    
+    def _banco_disponivel(self) -> bool:
+        return self.persistir and time.monotonic() >= self._banco_indisponivel_ate
+    
+    def _marcar_banco_indisponivel(self, erro: Exception):
+        logger.error(f"Banco indisponível para o fluxo de revisão: {erro}")
+        self._banco_indisponivel_ate = time.monotonic() + REVISAO_BANCO_RETENTATIVA_SEG
+    
+    def _gravar_no_banco(self, questao_id: str, operacao: Callable[[], Any], fixar: bool = True) -> Any:
+        """
+        Grava no banco. Se o banco estiver indisponível, a gravação fica
+        pendente (repetida quando ele voltar) e a questão fica fixada em
+        memória até lá; sem persistência, só é fixada.
+        
+        Args:
+            fixar: False para gravações que não mantêm a questão (exclusão)
+        
+        Returns:
+            O resultado da operação (falso se não foi gravada agora)
+        """
+        resultado = self._no_banco(operacao)
+        if not resultado:
+            if fixar:
+                self._manter_em_memoria(questao_id)
+            if self.persistir and not self._banco_disponivel():
+                self._gravacoes_pendentes.append((questao_id, operacao))
+        return resultado
+    
+    def _sincronizar_pendentes(self):
+        """
+        Repete, em ordem, as gravações feitas com o banco indisponível.
+        
+        Para na primeira falha de conexão (o restante espera a próxima
+        tentativa). Uma gravação recusada pelo banco é descartada (a
+        questão continua só em memória). Questões sem gravações pendentes
+        voltam a expirar do cache normalmente.
+        """
+        if not self._gravacoes_pendentes or not self._sincronizacao_lock.acquire(blocking=False):
+            return
+        try:
+            while self._gravacoes_pendentes:
+                questao_id, operacao = self._gravacoes_pendentes[0]
+                try:
+                    gravou = operacao()
+                except (OperationalError, InterfaceError) as e:
+                    self._marcar_banco_indisponivel(e)
+                    return
+                except SQLAlchemyError as e:
+                    logger.error(f"Gravação pendente da questão {questao_id} recusada pelo banco: {e}")
+                    gravou = False
+                self._gravacoes_pendentes.popleft()
+                
+                if not gravou:
+                    continue
+                if all(pendente != questao_id for pendente, _ in list(self._gravacoes_pendentes)):
+                    self._questoes_cache.desafixar(questao_id)
+                    self._revisoes_cache.pop(questao_id, None)
+                    self._revisoes_cache.desafixar(questao_id)
+                    logger.info(f"Questão {questao_id} gravada no banco após a reconexão")
+        finally:
+            self._sincronizacao_lock.release()
+    
+    def _manter_em_memoria(self, questao_id: str):
+        """Fixa a questão no cache (não foi gravada no banco)."""
+        self._questoes_cache.fixar(questao_id)
+        self._revisoes_cache.fixar(questao_id)
+    
+    def _inserir_no_banco(self, questao: Dict) -> Optional[bool]:
+        """Grava uma questão nova; None se a matéria não existir no banco."""
+        with unidade_de_trabalho(self.revisao_repository.engine):
+            materia_id = self.questao_repository.obter_materia_id_por_codigo(
+                codigo_materia(questao.get('materia') or 'outros')
+            )
+            if materia_id is None:
+                logger.warning(f"Matéria {questao.get('materia')} não encontrada no banco")
+                return None
+            
+            topico_id = None
+            if questao.get('topico'):
+                topico_id = self.questao_repository.obter_topico_id_por_codigo(
+                    materia_id, questao['topico'].upper().replace(" ", "_")
+                )
+            
+            self.revisao_repository.inserir_questao(questao, materia_id, topico_id)
+        return True
+    
+    def _buscar_no_banco(self, questoes_ids: List[str]) -> Dict[str, Dict]:
+        """Lê questões do banco (em lote) e as coloca no cache."""
+        linhas = self.questao_repository.buscar_questoes_por_ids(questoes_ids)
+        if not linhas:
+            return {}
+        
+        status = self.revisao_repository.status_revisao([linha['id'] for linha in linhas])
+        questoes = {}
+        for linha in linhas:
+            questao = self._questao_do_banco(linha, status.get(str(linha['id'])))
+            self._guardar(questao['id'], questao)
+            questoes[questao['id']] = questao
+        return questoes
+    
+    def _listar_do_banco(
+        self,
+        status_questao: List[str],
+        status_revisao: Optional[List[str]],
+        materia: Optional[str],
+        professor_id: Optional[str],
+        limite: int,
+        ordem: str,
+        **filtros
+    ) -> Optional[List[Dict]]:
+        """
+        Listagem indexada no banco; None se o banco estiver indisponível.
+        
+        Args:
+            filtros: dificuldade, texto e cursor de RevisaoRepository.listar_questoes()
+        """
+        def listar():
+            materia_id = None
+            if materia:
+                materia_id = self.questao_repository.obter_materia_id_por_codigo(codigo_materia(materia))
+                if materia_id is None:
+                    return []
+            
+            linhas = self.revisao_repository.listar_questoes(
+                status_questao=status_questao,
+                status_revisao=status_revisao,
+                materia_id=materia_id,
+                professor_id=professor_id,
+                limite=limite,
+                ordem=ordem,
+                **filtros
+            )
+            if not linhas:
+                return []
+            
+            completas = {
+                str(q['id']): q
+                for q in self.questao_repository.buscar_questoes_por_ids([l['id'] for l in linhas])
+            }
+            questoes = []
+            for linha in linhas:
+                completa = completas.get(str(linha['id']))
+                if completa is None:
+                    continue
+                questao = self._questao_do_banco(completa, linha['status_revisao'])
+                self._guardar(questao['id'], questao)
+                questoes.append({
+                    **questao,
+                    'ultima_revisao': linha.get('ultima_revisao'),
+                    'total_revisoes': linha.get('total_revisoes', 0)
+                })
+            return questoes
+        
+        return self._no_banco(listar)
+    
+    @staticmethod
+    def _questao_do_banco(linha: Dict, status_revisao: Optional[str] = None) -> Dict:
+        """Converte uma linha de buscar_questoes_por_ids() no formato do serviço."""
+        resolucao = linha.get('resolucao') or {}
+        diagramas = linha.get('diagramas') or []
+        
+        if status_revisao is None:
+            status_revisao = {'aprovada': 'aprovada', 'arquivada': 'rejeitada'}.get(
+                linha.get('status'), 'pendente'
+            )
+        
+        def _data(valor):
+            return valor.isoformat() if isinstance(valor, datetime) else valor
+        
+        questao = {chave: valor for chave, valor in linha.items() if chave not in ('resolucao', 'diagramas')}
+        questao.update({
+            'id': str(linha['id']),
+            'materia': MATERIAS_POR_CODIGO.get(
+                linha.get('materia_codigo'), (linha.get('materia_nome') or '').lower()
+            ),
+            'topico': linha.get('topico_nome') or '',
+            'status': status_revisao,
+            'resposta': resolucao.get('resposta_curta', ''),
+            'explicacao': resolucao.get('resposta_completa'),
+            'alternativas': [
+                {'letra': a.get('letra'), 'texto': a.get('texto'), 'correta': bool(a.get('correta'))}
+                for a in linha.get('alternativas') or []
+            ],
+            'diagrama': diagramas[0].get('caminho') if diagramas else None,
+            'versao': linha.get('versao_atual') or 1,
+            'fontes_bibliograficas': linha.get('fontes_bibliograficas') or [],
+            'created_at': _data(linha.get('created_at')),
+            'aprovada_em': _data(linha.get('aprovada_em')),
+        })
+        return questao
+    
+    # ========================================================================
+    # LISTAGENS
+    # ========================================================================
     
     def obter_questoes_pendentes(
         self,
@@ -95,28 +653,44 @@ class RevisaoService:
         Returns:
             Lista de questões pendentes
         """
+        questoes = self._listar_do_banco(
+            status_questao=['rascunho', 'revisao'],
+            status_revisao=['pendente'],
+            materia=materia,
+            professor_id=professor_id,
+            limite=limite,
+            ordem='recentes'
+        )
+        if questoes is not None:
+            return questoes
+        
+        # Sem banco: questões em memória (pelos índices de status/matéria)
         questoes = []
         
-        for questao_id, questao in self._questoes_cache.items():
-            if questao.get('status') in ['rascunho', 'revisao', 'pendente']:
-                if materia and questao.get('materia') != materia:
-                    continue
-                if professor_id and questao.get('professor_id') != professor_id:
-                    continue
-                    
-                # Adicionar info de revisão
-                revisoes = self._revisoes_cache.get(questao_id, [])
-                ultima_revisao = revisoes[-1] if revisoes else None
-                
-                questao_info = {
-                    **questao,
-                    'id': questao_id,
-                    'ultima_revisao': ultima_revisao,
-                    'total_revisoes': len(revisoes)
-                }
-                questoes.append(questao_info)
+        for questao_id in self._ids_indexados(
+            ['rascunho', 'revisao', 'pendente'], materia, None if professor_id else limite
+        ):
+            questao = self._questoes_cache.get(questao_id)
+            if questao is None:
+                continue
+            if professor_id and questao.get('professor_id') != professor_id:
+                continue
+            
+            # Adicionar info de revisão
+            revisoes = self._revisoes_cache.get(questao_id, [])
+            ultima_revisao = revisoes[-1] if revisoes else None
+            
+            questao_info = {
+                **questao,
+                'id': questao_id,
+                'ultima_revisao': ultima_revisao,
+                'total_revisoes': len(revisoes)
+            }
+            questoes.append(questao_info)
+            if len(questoes) >= limite:
+                break
         
-        return questoes[:limite]
+        return questoes
     
     def obter_questoes_aprovadas(
         self,
@@ -135,25 +709,143 @@ class RevisaoService:
         Returns:
             Lista de questões aprovadas
         """
+        questoes = self._listar_do_banco(
+            status_questao=['aprovada'],
+            status_revisao=None,
+            materia=materia,
+            professor_id=professor_id,
+            limite=limite,
+            ordem='aprovacao'
+        )
+        if questoes is not None:
+            return questoes
+        
+        # Sem banco: aprovadas em memória, mais recentes primeiro (pelo índice de aprovação)
         questoes = []
         
-        for questao_id, questao in self._questoes_cache.items():
-            if questao.get('status') == 'aprovada':
-                if materia and questao.get('materia') != materia:
-                    continue
-                if professor_id and questao.get('professor_id') != professor_id:
-                    continue
-                
-                questao_info = {
-                    **questao,
-                    'id': questao_id
-                }
-                questoes.append(questao_info)
+        self._questoes_cache.descartar_expirados()
+        for questao_id in self._indice.aprovadas_recentes(materia or None):
+            questao = self._questoes_cache.get(questao_id)
+            if questao is None:
+                continue
+            if professor_id and questao.get('professor_id') != professor_id:
+                continue
+            
+            questoes.append({
+                **questao,
+                'id': questao_id
+            })
+            if len(questoes) >= limite:
+                break
+        
+        return questoes
+    
+    def listar_questoes_pagina(
+        self,
+        aba: str = 'todas',
+        materia: Optional[str] = None,
+        status: Optional[str] = None,
+        dificuldade: Optional[str] = None,
+        texto: Optional[str] = None,
+        professor_id: Optional[str] = None,
+        limite: int = 50,
+        cursor: Optional[str] = None
+    ) -> Dict[str, Any]:
+        """
+        Página do banco de questões, das mais recentes para as mais antigas.
+        
+        Os filtros são aplicados no banco (ou nos índices em memória) e a
+        página seguinte começa depois do cursor, então o custo de uma
+        página não cresce com o tamanho do banco nem com a profundidade.
         
-        # Ordenar por data de aprovação (mais recentes primeiro)
-        questoes.sort(key=lambda x: x.get('aprovada_em', ''), reverse=True)
+        Args:
+            aba: Chave de ABAS_LISTAGEM
+            status: Status de revisão (substitui a aba)
+            texto: Busca no enunciado
+            cursor: Valor de "proximo_cursor" da página anterior
         
-        return questoes[:limite]
+        Returns:
+            {"questoes": [...], "proximo_cursor": str | None}
+        
+        Raises:
+            ValueError: Aba ou status desconhecido
+            CursorInvalido: Se o cursor não puder ser lido
+        """
+        if status:
+            if status not in self.STATUS_REVISAO:
+                raise ValueError(f"Status desconhecido: {status}")
+            status_revisao = [status]
+        elif aba in self.ABAS_LISTAGEM:
+            status_revisao = self.ABAS_LISTAGEM[aba]
+        else:
+            raise ValueError(f"Aba desconhecida: {aba}")
+        
+        depois_de = _chave_cronologica(*decodificar_cursor(cursor)) if cursor else None
+        texto = (texto or '').strip() or None
+        
+        status_questao = {RevisaoRepository.STATUS_QUESTAO[s] for s in status_revisao}
+        if 'revisao' in status_questao:
+            status_questao.add('rascunho')
+        
+        questoes = self._listar_do_banco(
+            status_questao=sorted(status_questao),
+            status_revisao=status_revisao,
+            materia=materia,
+            professor_id=professor_id,
+            limite=limite + 1,
+            ordem='recentes',
+            dificuldade=dificuldade or None,
+            texto=texto,
+            cursor=cursor
+        )
+        if questoes is None:
+            questoes = self._listar_da_memoria(
+                status_revisao, materia, professor_id, dificuldade, texto, limite + 1, depois_de
+            )
+        
+        return montar_pagina(questoes, limite, chave="questoes")
+    
+    def _listar_da_memoria(
+        self,
+        status_revisao: List[str],
+        materia: Optional[str],
+        professor_id: Optional[str],
+        dificuldade: Optional[str],
+        texto: Optional[str],
+        limite: int,
+        depois_de: Optional[tuple] = None
+    ) -> List[Dict]:
+        """
+        Página das questões em memória, mais recentes primeiro.
+        
+        Percorre os índices a partir do cursor e para ao completar a
+        página; só as questões lidas até lá passam pelos filtros.
+        """
+        status = [s for st in status_revisao for s in self.STATUS_EM_MEMORIA.get(st, [st])]
+        texto = texto.lower() if texto else None
+        
+        self._questoes_cache.descartar_expirados()
+        questoes = []
+        for questao_id in self._indice.recentes(status, materia or None, depois_de):
+            questao = self._questoes_cache.get(questao_id)
+            if questao is None:
+                continue
+            if professor_id and questao.get('professor_id') != professor_id:
+                continue
+            if dificuldade and questao.get('dificuldade') != dificuldade:
+                continue
+            if texto and texto not in (questao.get('enunciado') or '').lower():
+                continue
+            revisoes = self._revisoes_cache.get(questao_id, [])
+            questoes.append({
+                **questao,
+                'id': questao_id,
+                'ultima_revisao': revisoes[-1] if revisoes else None,
+                'total_revisoes': len(revisoes)
+            })
+            if len(questoes) >= limite:
+                break
+        return questoes
     
     def adicionar_questao_para_revisao(self, questao: Dict) -> str:
         """
@@ -176,19 +868,73 @@ class RevisaoService:
             'versao': 1
         }
         
-        self._questoes_cache[questao_id] = questao_data
+        self._guardar(questao_id, questao_data)
         self._revisoes_cache[questao_id] = []
         
+        # Cópia: a questão em cache muda com as revisões (gravadas à parte)
+        dados = dict(questao_data)
+        self._gravar_no_banco(questao_id, lambda: self._inserir_no_banco(dados))
+        
         logger.info(f"Questão {questao_id} adicionada para revisão")
         return questao_id
     
     def obter_questao(self, questao_id: str) -> Optional[Dict]:
-        """Obtém uma questão pelo ID."""
-        return self._questoes_cache.get(questao_id)
+        """Obtém uma questão pelo ID (do cache ou, na falta, do banco)."""
+        questao = self._questoes_cache.get(questao_id)
+        if questao is None:
+            questao = (self._no_banco(lambda: self._buscar_no_banco([questao_id])) or {}).get(questao_id)
+        return questao
+    
+    def obter_questoes(self, questoes_ids: List[str]) -> List[Dict]:
+        """
+        Obtém várias questões pelos IDs, na ordem pedida.
+        
+        As que não estão em memória são lidas do banco em um único lote
+        (QuestaoRepository.buscar_questoes_por_ids), e não uma a uma.
+        IDs não encontrados são omitidos.
+        """
+        faltantes = [i for i in questoes_ids if i not in self._questoes_cache]
+        
+        do_banco = {}
+        if faltantes:
+            do_banco = self._no_banco(lambda: self._buscar_no_banco(faltantes)) or {}
+        
+        questoes = []
+        for questao_id in questoes_ids:
+            questao = self._questoes_cache.get(questao_id) or do_banco.get(questao_id)
+            if questao:
+                questoes.append(questao)
+        return questoes
+    
+    def excluir_questao(self, questao_id: str) -> bool:
+        """
+        Exclui uma questão (soft delete no banco) e a retira do cache.
+        
+        Returns:
+            True se a questão existia
+        """
+        em_memoria = self._questoes_cache.pop(questao_id, None) is not None
+        self._indice.remover(questao_id)
+        self._revisoes_cache.pop(questao_id, None)
+        
+        no_banco = self._gravar_no_banco(
+            questao_id, lambda: self.revisao_repository.excluir_questao(questao_id), fixar=False
+        )
+        return em_memoria or bool(no_banco)
     
     def obter_revisoes(self, questao_id: str) -> List[Dict]:
         """Obtém histórico de revisões de uma questão."""
-        return self._revisoes_cache.get(questao_id, [])
+        revisoes = self._revisoes_cache.get(questao_id)
+        if revisoes is None:
+            revisoes = self._no_banco(lambda: self.revisao_repository.buscar_revisoes(questao_id))
+            if revisoes is None:
+                return []
+            for revisao in revisoes:
+                for campo in ('created_at', 'updated_at', 'aprovada_em'):
+                    if isinstance(revisao.get(campo), datetime):
+                        revisao[campo] = revisao[campo].isoformat()
+            self._revisoes_cache[questao_id] = revisoes
+        return revisoes
     
     def salvar_revisao(self, revisao: RevisaoQuestao) -> Dict:
         """
@@ -202,7 +948,8 @@ class RevisaoService:
         """
         questao_id = revisao.questao_id
         
-        if questao_id not in self._questoes_cache:
+        questao = self.obter_questao(questao_id)
+        if questao is None:
             return {"erro": "Questão não encontrada", "sucesso": False}
         
         # Criar registro de revisão
@@ -223,18 +970,26 @@ class RevisaoService:
             'created_at': datetime.now().isoformat()
         }
         
-        # Adicionar ao histórico
-        if questao_id not in self._revisoes_cache:
-            self._revisoes_cache[questao_id] = []
-        self._revisoes_cache[questao_id].append(revisao_data)
+        aprovada_em = datetime.now().isoformat() if revisao.status == 'aprovada' else None
+        
+        # Gravar no banco; o histórico em cache é descartado e relido depois
+        if self._gravar_no_banco(
+            questao_id, lambda: self.revisao_repository.registrar_revisao(revisao_data, aprovada_em)
+        ):
+            self._revisoes_cache.pop(questao_id, None)
+        else:
+            if questao_id not in self._revisoes_cache:
+                self._revisoes_cache[questao_id] = []
+            self._revisoes_cache[questao_id].append(revisao_data)
         
         # Atualizar status da questão
-        self._questoes_cache[questao_id]['status'] = revisao.status
-        self._questoes_cache[questao_id]['ultima_revisao'] = revisao_data
+        questao['status'] = revisao.status
+        questao['ultima_revisao'] = revisao_data
         
-        if revisao.status == 'aprovada':
-            self._questoes_cache[questao_id]['aprovada_em'] = datetime.now().isoformat()
-            self._questoes_cache[questao_id]['fontes_bibliograficas'] = revisao_data['fontes_bibliograficas']
+        if aprovada_em:
+            questao['aprovada_em'] = aprovada_em
+            questao['fontes_bibliograficas'] = revisao_data['fontes_bibliograficas']
+        self._guardar(questao_id, questao)
         
         logger.info(f"Revisão salva para questão {questao_id}: status={revisao.status}")
         
@@ -358,11 +1113,10 @@ class RevisaoService:
         Returns:
             Resultado da operação
         """
-        if questao_id not in self._questoes_cache:
+        questao = self.obter_questao(questao_id)
+        if questao is None:
             return {"erro": "Questão não encontrada", "sucesso": False}
         
-        questao = self._questoes_cache[questao_id]
-        
         if novo_enunciado:
             questao['enunciado'] = novo_enunciado
         
@@ -377,6 +1131,18 @@ class RevisaoService:
         questao['status'] = 'pendente'  # Volta para revisão
         questao['updated_at'] = datetime.now().isoformat()
         
+        versao = questao['versao']
+        gravou = self._gravar_no_banco(questao_id, lambda: self.revisao_repository.atualizar_conteudo(
+            questao_id,
+            versao=versao,
+            enunciado=novo_enunciado,
+            alternativas=novas_alternativas,
+            resposta=nova_resposta
+        ))
+        if gravou:
+            self._revisoes_cache.pop(questao_id, None)
+        self._guardar(questao_id, questao)
+        
         logger.info(f"Correções aplicadas na questão {questao_id}, versão {questao['versao']}")
         
         return {
@@ -400,17 +1166,22 @@ class RevisaoService:
         Returns:
             Resultado da operação
         """
-        if questao_id not in self._questoes_cache:
+        questao = self.obter_questao(questao_id)
+        if questao is None:
             return {"erro": "Questão não encontrada", "sucesso": False}
         
-        questao = self._questoes_cache[questao_id]
-        
         if 'fontes_bibliograficas' not in questao:
             questao['fontes_bibliograficas'] = []
         
         fonte_obj = FonteBibliografica(**fonte)
         questao['fontes_bibliograficas'].append(fonte_obj.to_dict())
         
+        fontes = list(questao['fontes_bibliograficas'])
+        self._gravar_no_banco(
+            questao_id, lambda: self.revisao_repository.atualizar_fontes(questao_id, fontes)
+        )
+        self._guardar(questao_id, questao)
+        
         return {
             "sucesso": True,
             "total_fontes": len(questao['fontes_bibliograficas'])
@@ -426,6 +1197,27 @@ class RevisaoService:
         Returns:
             Dicionário com estatísticas
         """
+        contagens = self._no_banco(lambda: [
+            (
+                linha['status_revisao'],
+                MATERIAS_POR_CODIGO.get(linha['materia_codigo'], (linha['materia_codigo'] or 'outros').lower()),
+                int(linha['total'])
+            )
+            for linha in self.revisao_repository.contar_por_status(professor_id)
+        ])
+        
+        if contagens is None:
+            # Sem banco: contadores dos índices (por professor, varre a memória)
+            if professor_id:
+                contagens = [
+                    (questao.get('status', 'pendente'), questao.get('materia', 'outros'), 1)
+                    for questao in self._questoes_cache.values()
+                    if questao.get('professor_id') == professor_id
+                ]
+            else:
+                self._questoes_cache.descartar_expirados()
+                contagens = self._indice.contar()
+        
         stats = {
             'total': 0,
             'pendentes': 0,
@@ -435,29 +1227,24 @@ class RevisaoService:
             'por_materia': {}
         }
         
-        for questao in self._questoes_cache.values():
-            if professor_id and questao.get('professor_id') != professor_id:
-                continue
-            
-            stats['total'] += 1
-            status = questao.get('status', 'pendente')
+        for status, materia, total in contagens:
+            stats['total'] += total
             
             if status in ['pendente', 'rascunho']:
-                stats['pendentes'] += 1
+                stats['pendentes'] += total
             elif status == 'aprovada':
-                stats['aprovadas'] += 1
+                stats['aprovadas'] += total
             elif status == 'rejeitada':
-                stats['rejeitadas'] += 1
+                stats['rejeitadas'] += total
             elif status == 'correcao_pendente':
-                stats['correcao_pendente'] += 1
+                stats['correcao_pendente'] += total
             
             # Por matéria
-            materia = questao.get('materia', 'outros')
             if materia not in stats['por_materia']:
                 stats['por_materia'][materia] = {'total': 0, 'aprovadas': 0}
-            stats['por_materia'][materia]['total'] += 1
+            stats['por_materia'][materia]['total'] += total
             if status == 'aprovada':
-                stats['por_materia'][materia]['aprovadas'] += 1
+                stats['por_materia'][materia]['aprovadas'] += total
         
         return stats
 
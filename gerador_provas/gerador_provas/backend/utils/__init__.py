@@ -6,21 +6,34 @@ Módulos:
 - validator: Validação de respostas matemáticas
 - latex_generator: Geração de PDFs simples
 - prova_pdf_generator: Geração de provas ABNT com gabarito
+- prova_pdf_reportlab: Backend ReportLab (sem LaTeX) do gerador de provas
 - dashboard: Gráficos e métricas
+- llm_cache: Cache persistente de respostas do LLM
 """
 
-from backend.utils.logger import log_questao_gerada, get_logger
-from backend.utils.validator import validar_resposta
-from backend.utils.latex_generator import gerar_pdf
-from backend.utils.prova_pdf_generator import ProvaPDFGenerator
-from backend.utils.dashboard import gerar_grafico_acertos
+import importlib
 
-__all__ = [
-    'log_questao_gerada',
-    'get_logger',
-    'validar_resposta',
-    'gerar_pdf',
-    'ProvaPDFGenerator',
-    'gerar_grafico_acertos'
-]
+# Nome exportado -> módulo. Importados sob demanda: quem usa só o logger ou
+# o compilador de PDFs não carrega pandas/plotly (dashboard) nem ReportLab
+_EXPORTACOES = {
+    'log_questao_gerada': 'backend.utils.logger',
+    'get_logger': 'backend.utils.logger',
+    'validar_resposta': 'backend.utils.validator',
+    'gerar_pdf': 'backend.utils.latex_generator',
+    'ProvaPDFGenerator': 'backend.utils.prova_pdf_generator',
+    'ProvaPDFReportLab': 'backend.utils.prova_pdf_reportlab',
+    'gerar_grafico_acertos': 'backend.utils.dashboard',
+    'CacheRespostasLLM': 'backend.utils.llm_cache',
+    'get_llm_cache': 'backend.utils.llm_cache',
+}
 
+__all__ = list(_EXPORTACOES)
+
+
+def __getattr__(nome):
+    modulo = _EXPORTACOES.get(nome)
+    if modulo is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {nome!r}")
+    valor = getattr(importlib.import_module(modulo), nome)
+    globals()[nome] = valor
+    return valor
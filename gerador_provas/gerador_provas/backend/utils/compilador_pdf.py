@@ -0,0 +1,217 @@
+"""
+Compilação paralela dos PDFs de provas individuais.
+
+Cada aluno tem sua prova e seu gabarito compilados em um processo do
+pool, dentro de um diretório temporário isolado (os arquivos auxiliares
+do pdflatex de um aluno nunca colidem com os de outro). Ao final, só os
+arquivos finais são movidos para os diretórios do lote.
+
+Os resultados são devolvidos na mesma ordem das tarefas.
+
+O pool de processos é um só para o processo inteiro, criado no primeiro
+uso com PDF_WORKERS processos e compartilhado por todos os lotes (que
+rodam em threads da fila). Os processos são iniciados com "spawn": um
+fork a partir de um processo com várias threads herdaria locks presos e
+sockets do pool de conexões do banco. Cada processo novo importa só este
+módulo e o gerador de PDF (os pacotes do backend exportam sob demanda, sem
+carregar o CrewAI); app.py, reimportado como __mp_main__, não monta os
+serviços.
+"""
+
+import os
+import sys
+import atexit
+import shutil
+import tempfile
+import threading
+import multiprocessing
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Dict, Iterator, List, Optional
+
+# Adicionar diretório raiz ao path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(__file__))))
+
+from backend.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+try:
+    from config import settings
+    PDF_WORKERS = settings.PDF_WORKERS
+except (ImportError, AttributeError):
+    PDF_WORKERS = int(os.getenv('PDF_WORKERS', 0))
+
+
+def get_num_workers(max_workers: Optional[int] = None) -> int:
+    """Número de processos de compilação (0 ou None = número de CPUs)."""
+    workers = max_workers if max_workers is not None else PDF_WORKERS
+    if not workers or workers < 1:
+        workers = os.cpu_count() or 1
+    return workers
+
+
+# Pool compartilhado (criado sob demanda; recriado se um processo morrer)
+_pool: Optional[ProcessPoolExecutor] = None
+_pool_lock = threading.Lock()
+
+
+def _obter_pool() -> ProcessPoolExecutor:
+    """Retorna o pool de compilação do processo, criando-o no primeiro uso."""
+    global _pool
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                _pool = ProcessPoolExecutor(
+                    max_workers=get_num_workers(),
+                    mp_context=multiprocessing.get_context("spawn")
+                )
+    return _pool
+
+
+def _descartar_pool(pool: ProcessPoolExecutor):
+    """Descarta um pool quebrado (o próximo lote cria outro)."""
+    global _pool
+    with _pool_lock:
+        if _pool is pool:
+            _pool = None
+    pool.shutdown(wait=False, cancel_futures=True)
+
+
+@atexit.register
+def encerrar_pool():
+    """Encerra os processos do pool compartilhado (ao sair do processo)."""
+    global _pool
+    with _pool_lock:
+        pool, _pool = _pool, None
+    if pool is not None:
+        pool.shutdown(wait=True, cancel_futures=True)
+
+
+def _mover_para(caminho: str, destino_dir: str) -> str:
+    """Move o arquivo gerado para o diretório final e retorna o novo caminho."""
+    os.makedirs(destino_dir, exist_ok=True)
+    destino = os.path.join(destino_dir, os.path.basename(caminho))
+    shutil.move(caminho, destino)
+    return destino
+
+
+def compilar_prova_aluno(tarefa: Dict) -> Dict:
+    """
+    Compila prova e gabarito de um aluno em um diretório temporário.
+
+    Executada nos processos do pool (precisa ser uma função de módulo).
+
+    Args:
+        tarefa: Dicionário com
+            - prova: dados da prova (dict pronto para o PDF)
+            - nome_prova / nome_gabarito: nomes dos arquivos (sem extensão)
+            - provas_dir / gabaritos_dir: diretórios finais
+            - instituicao, instrucoes: opcionais
+
+    Returns:
+        {"caminho_pdf": ..., "caminho_gabarito": ..., "erro": None | str}
+    """
+    from backend.utils.prova_pdf_generator import ProvaPDFGenerator
+
+    resultado = {"caminho_pdf": None, "caminho_gabarito": None, "erro": None}
+    temp_dir = tempfile.mkdtemp(prefix="prova_aluno_")
+
+    try:
+        gerador = ProvaPDFGenerator()
+        prova = tarefa["prova"]
+
+        caminho = gerador.gerar_prova_pdf(
+            prova,
+            nome_arquivo=tarefa["nome_prova"],
+            instituicao=tarefa.get("instituicao"),
+            instrucoes=tarefa.get("instrucoes"),
+            output_dir=temp_dir
+        )
+        resultado["caminho_pdf"] = _mover_para(caminho, tarefa["provas_dir"])
+
+        caminho = gerador.gerar_gabarito_pdf(
+            prova,
+            nome_arquivo=tarefa["nome_gabarito"],
+            instituicao=tarefa.get("instituicao"),
+            output_dir=temp_dir
+        )
+        resultado["caminho_gabarito"] = _mover_para(caminho, tarefa["gabaritos_dir"])
+
+    except Exception as e:
+        resultado["erro"] = str(e)
+    finally:
+        shutil.rmtree(temp_dir, ignore_errors=True)
+
+    return resultado
+
+
+def compilar_provas_alunos(
+    tarefas: List[Dict],
+    max_workers: Optional[int] = None
+) -> Iterator[Dict]:
+    """
+    Compila as provas de vários alunos em paralelo, no pool compartilhado.
+
+    Args:
+        tarefas: Lista de tarefas (ver compilar_prova_aluno)
+        max_workers: Tarefas deste lote em andamento ao mesmo tempo (padrão:
+            PDF_WORKERS ou nº de CPUs); 1 compila em sequência, sem o pool.
+            O total de processos é sempre o do pool compartilhado.
+
+    Yields:
+        Resultado de cada tarefa, na ordem das tarefas
+    """
+    workers = min(get_num_workers(max_workers), len(tarefas))
+
+    if workers <= 1:
+        for tarefa in tarefas:
+            yield compilar_prova_aluno(tarefa)
+        return
+
+    try:
+        pool = _obter_pool()
+    except (OSError, ValueError) as e:
+        logger.warning(f"Pool de processos indisponível ({e}); compilando em sequência")
+        for tarefa in tarefas:
+            yield compilar_prova_aluno(tarefa)
+        return
+
+    # Janela de `workers` tarefas por lote: lotes simultâneos dividem o pool
+    pendentes = iter(tarefas)
+    futuros = deque()
+
+    def _submeter_proxima() -> bool:
+        tarefa = next(pendentes, None)
+        if tarefa is None:
+            return False
+        try:
+            futuros.append(pool.submit(compilar_prova_aluno, tarefa))
+        except (BrokenProcessPool, RuntimeError) as e:
+            futuros.append(e)
+        return True
+
+    for _ in range(workers):
+        _submeter_proxima()
+
+    try:
+        while futuros:
+            futuro = futuros.popleft()
+            try:
+                if isinstance(futuro, Exception):
+                    raise futuro
+                yield futuro.result()
+            except BrokenProcessPool as e:
+                # Um processo morreu: o pool não aceita mais tarefas
+                _descartar_pool(pool)
+                yield {"caminho_pdf": None, "caminho_gabarito": None, "erro": str(e) or "Processo de compilação encerrado"}
+            except Exception as e:
+                # Falha do processo (ex.: worker encerrado), não da compilação
+                yield {"caminho_pdf": None, "caminho_gabarito": None, "erro": str(e)}
+            _submeter_proxima()
+    finally:
+        # Consumidor desistiu: não deixa tarefas deste lote ocupando o pool
+        for futuro in futuros:
+            if not isinstance(futuro, Exception):
+                futuro.cancel()
@@ -0,0 +1,186 @@
+"""
+Empacotamento em ZIP dos lotes de provas individuais.
+
+Dois modos:
+
+1. EmpacotadorZip: grava o ZIP de forma incremental, à medida que cada
+   PDF fica pronto (o empacotamento acontece junto com a compilação, e
+   não depois dela).
+2. gerar_zip_stream(): produz o ZIP em pedaços de bytes para enviar
+   direto na resposta HTTP, sem gravá-lo em disco.
+
+PDFs e imagens já são comprimidos e entram com ZIP_STORED; JSON e .tex
+usam DEFLATE.
+"""
+
+import os
+import sys
+import zipfile
+import threading
+from typing import Iterable, Iterator, Optional, Set, Tuple
+
+# Adicionar diretório raiz ao path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(__file__))))
+
+from backend.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+# Extensões de arquivos já comprimidos (recompressão só gasta CPU)
+EXTENSOES_SEM_COMPRESSAO = {'.pdf', '.png', '.jpg', '.jpeg', '.gif', '.zip'}
+
+# Tamanho dos blocos lidos dos arquivos ao montar o stream
+TAMANHO_BLOCO = 64 * 1024
+
+
+def metodo_compressao(caminho: str) -> int:
+    """ZIP_STORED para arquivos já comprimidos, ZIP_DEFLATED para o resto."""
+    extensao = os.path.splitext(caminho)[1].lower()
+    return zipfile.ZIP_STORED if extensao in EXTENSOES_SEM_COMPRESSAO else zipfile.ZIP_DEFLATED
+
+
+def listar_arquivos(diretorio: str) -> Iterator[Tuple[str, str]]:
+    """Lista (caminho, nome no ZIP) dos arquivos do diretório, em ordem."""
+    for raiz, dirs, arquivos in os.walk(diretorio):
+        dirs.sort()
+        for arquivo in sorted(arquivos):
+            caminho = os.path.join(raiz, arquivo)
+            yield caminho, os.path.relpath(caminho, diretorio)
+
+
+class EmpacotadorZip:
+    """
+    Escreve um ZIP incrementalmente.
+
+    O arquivo é gravado como <caminho>.parcial e só é renomeado ao
+    fechar, para que o download nunca pegue um ZIP pela metade.
+
+    Uso:
+        with EmpacotadorZip("lote.zip") as zip_lote:
+            zip_lote.adicionar_arquivo("provas/prova_A1.pdf", "provas/prova_A1.pdf")
+    """
+
+    def __init__(self, caminho: str):
+        self.caminho = caminho
+        self._caminho_parcial = caminho + '.parcial'
+        self._zip = zipfile.ZipFile(self._caminho_parcial, 'w')
+        self._adicionados: Set[str] = set()
+        self._lock = threading.Lock()
+
+    def adicionar_arquivo(self, caminho: str, nome_no_zip: str) -> bool:
+        """
+        Adiciona um arquivo já gerado (ignora repetidos e inexistentes).
+
+        Returns:
+            True se o arquivo entrou no ZIP
+        """
+        if not caminho or not os.path.isfile(caminho):
+            return False
+        with self._lock:
+            if nome_no_zip in self._adicionados:
+                return False
+            self._zip.write(caminho, nome_no_zip, compress_type=metodo_compressao(caminho))
+            self._adicionados.add(nome_no_zip)
+        return True
+
+    def adicionar_diretorio(self, diretorio: str, base: str):
+        """
+        Adiciona os arquivos do diretório que ainda não estão no ZIP.
+
+        Args:
+            diretorio: Diretório a percorrer
+            base: Diretório de referência para os nomes no ZIP
+        """
+        for caminho, _ in listar_arquivos(diretorio):
+            self.adicionar_arquivo(caminho, os.path.relpath(caminho, base))
+
+    def fechar(self) -> str:
+        """Finaliza o ZIP e o move para o caminho definitivo."""
+        with self._lock:
+            self._zip.close()
+            os.replace(self._caminho_parcial, self.caminho)
+        logger.info(f"ZIP criado: {self.caminho} ({len(self._adicionados)} arquivos)")
+        return self.caminho
+
+    def descartar(self):
+        """Cancela o ZIP (ex.: erro na geração do lote)."""
+        with self._lock:
+            self._zip.close()
+            try:
+                os.remove(self._caminho_parcial)
+            except OSError:
+                pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type:
+            self.descartar()
+        else:
+            self.fechar()
+        return False
+
+
+class _BufferSaida:
+    """Destino não posicionável do zipfile: acumula bytes até serem lidos."""
+
+    def __init__(self):
+        self._partes = []
+
+    def write(self, dados: bytes) -> int:
+        self._partes.append(bytes(dados))
+        return len(dados)
+
+    def flush(self):
+        pass
+
+    def esvaziar(self) -> bytes:
+        dados = b''.join(self._partes)
+        self._partes.clear()
+        return dados
+
+
+def gerar_zip_stream(
+    arquivos: Iterable[Tuple[str, str]],
+    tamanho_bloco: Optional[int] = None
+) -> Iterator[bytes]:
+    """
+    Gera o ZIP em pedaços, sem gravá-lo em disco.
+
+    Como o destino não é posicionável, o zipfile grava os tamanhos em
+    descritores de dados após cada arquivo; o ZIP resultante é padrão.
+
+    Args:
+        arquivos: Pares (caminho, nome no ZIP)
+        tamanho_bloco: Bytes lidos por vez de cada arquivo
+
+    Yields:
+        Pedaços do ZIP, na ordem
+    """
+    tamanho_bloco = tamanho_bloco or TAMANHO_BLOCO
+    saida = _BufferSaida()
+
+    with zipfile.ZipFile(saida, 'w') as zip_stream:
+        for caminho, nome_no_zip in arquivos:
+            info = zipfile.ZipInfo.from_file(caminho, nome_no_zip)
+            info.compress_type = metodo_compressao(caminho)
+
+            with open(caminho, 'rb') as origem, zip_stream.open(info, 'w') as destino:
+                while True:
+                    bloco = origem.read(tamanho_bloco)
+                    if not bloco:
+                        break
+                    destino.write(bloco)
+                    dados = saida.esvaziar()
+                    if dados:
+                        yield dados
+
+            dados = saida.esvaziar()
+            if dados:
+                yield dados
+
+    # Diretório central
+    dados = saida.esvaziar()
+    if dados:
+        yield dados
@@ -0,0 +1,143 @@
+"""
+Preâmbulo LaTeX pré-compilado (formato .fmt via mylatexformat).
+
+O preâmbulo ABNT (babel, fontenc, times, tcolorbox, fancyhdr, lastpage,
+tabularx...) é o mesmo em todas as provas, e carregá-lo domina o tempo
+de compilação de documentos pequenos. Neste modo o preâmbulo é despejado
+uma vez em um arquivo .fmt e cada documento é compilado com -fmt,
+pulando tudo o que vem antes do marcador \\endofdump.
+
+Os formatos são identificados pelo hash do texto do preâmbulo: se um
+documento precisar de pacotes extras, um novo formato é gerado para ele.
+Qualquer falha (pdflatex ou mylatexformat ausentes, formato de outra
+versão do TeX) faz o gerador voltar à compilação normal.
+"""
+
+import os
+import sys
+import shutil
+import hashlib
+import tempfile
+import threading
+import subprocess
+from typing import Dict, Optional
+
+# Adicionar diretório raiz ao path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(__file__))))
+
+from backend.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+try:
+    from config import settings
+    LATEX_FORMATO_DIR = settings.LATEX_FORMATO_DIR
+except (ImportError, AttributeError):
+    LATEX_FORMATO_DIR = os.getenv('LATEX_FORMATO_DIR', 'output/cache/latex_fmt')
+
+# Fim do trecho do preâmbulo que vai para o formato
+MARCADOR_FIM_PREAMBULO = r'\endofdump'
+
+# Tempo máximo para gerar um formato (segundos)
+TIMEOUT_FORMATO_SEG = 120
+
+# Formatos já resolvidos neste processo: hash -> caminho sem extensão (None = falhou)
+_formatos: Dict[str, Optional[str]] = {}
+_lock = threading.Lock()
+
+
+def calcular_hash_preambulo(preambulo: str) -> str:
+    """Hash curto que identifica o formato de um preâmbulo."""
+    return hashlib.sha256(preambulo.encode('utf-8')).hexdigest()[:16]
+
+
+def _gerar_formato(preambulo: str, destino: str) -> bool:
+    """
+    Despeja o preâmbulo em destino + '.fmt'.
+
+    A geração acontece em um diretório temporário e o arquivo final é
+    movido de forma atômica, então processos concorrentes nunca leem
+    um formato pela metade.
+    """
+    temp_dir = tempfile.mkdtemp(prefix="latex_fmt_")
+    try:
+        fonte = os.path.join(temp_dir, "preambulo.tex")
+        with open(fonte, 'w', encoding='utf-8') as f:
+            f.write(preambulo)
+            f.write('\n' + MARCADOR_FIM_PREAMBULO + '\n')
+            f.write('\\begin{document}\n\\end{document}\n')
+
+        comando = [
+            'pdflatex', '-ini', '-interaction=nonstopmode',
+            '-jobname=formato', '&pdflatex', 'mylatexformat.ltx', fonte
+        ]
+        subprocess.run(
+            comando,
+            cwd=temp_dir,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.STDOUT,
+            timeout=TIMEOUT_FORMATO_SEG,
+            check=True
+        )
+
+        gerado = os.path.join(temp_dir, "formato.fmt")
+        if not os.path.exists(gerado):
+            return False
+
+        os.makedirs(os.path.dirname(destino), exist_ok=True)
+        os.replace(gerado, destino + '.fmt')
+        return True
+
+    except (OSError, subprocess.SubprocessError) as e:
+        logger.warning(f"Não foi possível pré-compilar o preâmbulo LaTeX: {e}")
+        return False
+    finally:
+        shutil.rmtree(temp_dir, ignore_errors=True)
+
+
+def obter_formato(preambulo: str, formato_dir: str = None) -> Optional[str]:
+    """
+    Retorna o formato pré-compilado do preâmbulo, gerando-o se preciso.
+
+    Args:
+        preambulo: Texto do documento até o marcador \\endofdump
+        formato_dir: Diretório dos arquivos .fmt (padrão: LATEX_FORMATO_DIR)
+
+    Returns:
+        Caminho absoluto do formato sem a extensão (para -fmt=),
+        ou None se o formato não puder ser usado
+    """
+    chave = calcular_hash_preambulo(preambulo)
+
+    with _lock:
+        if chave in _formatos:
+            return _formatos[chave]
+
+        destino = os.path.abspath(
+            os.path.join(formato_dir or LATEX_FORMATO_DIR, f"prova_abnt_{chave}")
+        )
+        if os.path.exists(destino + '.fmt') or _gerar_formato(preambulo, destino):
+            _formatos[chave] = destino
+            logger.info(f"Preâmbulo LaTeX pré-compilado: {destino}.fmt")
+        else:
+            _formatos[chave] = None
+
+        return _formatos[chave]
+
+
+def invalidar_formato(preambulo: str):
+    """
+    Descarta um formato que falhou na compilação (ex.: TeX atualizado).
+
+    O arquivo é removido para que a próxima execução o gere de novo; neste
+    processo o preâmbulo passa a ser compilado da forma normal.
+    """
+    chave = calcular_hash_preambulo(preambulo)
+    with _lock:
+        destino = _formatos.get(chave)
+        _formatos[chave] = None
+    if destino:
+        try:
+            os.remove(destino + '.fmt')
+        except OSError:
+            pass
@@ -0,0 +1,359 @@
+"""
+Cache persistente de respostas do LLM.
+
+Evita repetir chamadas à API quando o mesmo prompt é enviado ao mesmo
+modelo com a mesma temperatura. As respostas ficam em um arquivo SQLite
+com expiração por tempo (TTL) e limite de entradas (remove as menos
+acessadas recentemente).
+
+Uso:
+    from backend.utils.llm_cache import get_llm_cache
+
+    cache = get_llm_cache()
+    texto = cache.obter_ou_gerar(modelo, prompt, 0.7, lambda: chamar_api())
+"""
+
+import os
+import sys
+import time
+import sqlite3
+import hashlib
+import json
+import threading
+from typing import Callable, Optional, Dict, Any, Tuple
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(__file__))))
+
+from backend.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+try:
+    from config import settings
+    LLM_CACHE_ENABLED = settings.LLM_CACHE_ENABLED
+    LLM_CACHE_PATH = settings.LLM_CACHE_PATH
+    LLM_CACHE_TTL_SEG = settings.LLM_CACHE_TTL_SEG
+    LLM_CACHE_MAX_ENTRADAS = settings.LLM_CACHE_MAX_ENTRADAS
+except (ImportError, AttributeError):
+    LLM_CACHE_ENABLED = os.getenv('LLM_CACHE_ENABLED', 'true').lower() == 'true'
+    LLM_CACHE_PATH = os.getenv('LLM_CACHE_PATH', 'output/cache/llm_respostas.sqlite3')
+    LLM_CACHE_TTL_SEG = int(os.getenv('LLM_CACHE_TTL_SEG', 7 * 24 * 3600))
+    LLM_CACHE_MAX_ENTRADAS = int(os.getenv('LLM_CACHE_MAX_ENTRADAS', 5000))
+
+
+class CacheRespostasLLM:
+    """
+    Cache de respostas do LLM em SQLite.
+
+    A chave é o SHA-256 de (modelo, prompt, temperatura). Cada operação
+    abre sua própria conexão, então a instância pode ser compartilhada
+    entre threads.
+    """
+
+    def __init__(
+        self,
+        caminho: str = None,
+        ttl_seg: int = None,
+        max_entradas: int = None,
+        habilitado: bool = None
+    ):
+        """
+        Inicializa o cache.
+
+        Args:
+            caminho: Arquivo SQLite (padrão: LLM_CACHE_PATH)
+            ttl_seg: Tempo de vida das entradas em segundos (0 = sem expiração)
+            max_entradas: Número máximo de respostas guardadas (0 = sem limite)
+            habilitado: Se False, o cache nunca lê nem grava
+        """
+        self.caminho = caminho or LLM_CACHE_PATH
+        self.ttl_seg = LLM_CACHE_TTL_SEG if ttl_seg is None else ttl_seg
+        self.max_entradas = LLM_CACHE_MAX_ENTRADAS if max_entradas is None else max_entradas
+        self.habilitado = LLM_CACHE_ENABLED if habilitado is None else habilitado
+        self._lock = threading.Lock()
+        self._contadores_lock = threading.Lock()
+        self._inicializado = False
+        self.acertos = 0
+        self.falhas = 0
+
+    # =========================================================================
+    # Infraestrutura
+    # =========================================================================
+
+    def _conectar(self) -> sqlite3.Connection:
+        """Abre conexão com o arquivo do cache, criando a tabela se necessário."""
+        if not self._inicializado:
+            with self._lock:
+                if not self._inicializado:
+                    diretorio = os.path.dirname(self.caminho)
+                    if diretorio:
+                        os.makedirs(diretorio, exist_ok=True)
+                    conn = sqlite3.connect(self.caminho, timeout=10)
+                    try:
+                        conn.execute("PRAGMA journal_mode=WAL")
+                        conn.execute("""
+                            CREATE TABLE IF NOT EXISTS respostas (
+                                chave TEXT PRIMARY KEY,
+                                modelo TEXT,
+                                resposta TEXT NOT NULL,
+                                criado_em REAL NOT NULL,
+                                ultimo_acesso REAL NOT NULL,
+                                acessos INTEGER NOT NULL DEFAULT 0
+                            )
+                        """)
+                        conn.execute(
+                            "CREATE INDEX IF NOT EXISTS idx_respostas_ultimo_acesso "
+                            "ON respostas (ultimo_acesso)"
+                        )
+                        conn.commit()
+                    finally:
+                        conn.close()
+                    self._inicializado = True
+        return sqlite3.connect(self.caminho, timeout=10)
+
+    @staticmethod
+    def gerar_chave(modelo: str, prompt: str, temperatura: float) -> str:
+        """
+        Gera a chave do cache para uma chamada.
+
+        Args:
+            modelo: Nome do modelo no formato do LiteLLM (ex: gemini/gemini-2.0-flash)
+            prompt: Prompt já renderizado
+            temperatura: Temperatura da chamada
+
+        Returns:
+            Hash SHA-256 em hexadecimal
+        """
+        conteudo = json.dumps(
+            {"modelo": modelo, "prompt": prompt, "temperatura": round(float(temperatura), 4)},
+            sort_keys=True,
+            ensure_ascii=False
+        )
+        return hashlib.sha256(conteudo.encode("utf-8")).hexdigest()
+
+    # =========================================================================
+    # Leitura e escrita
+    # =========================================================================
+
+    def obter(self, chave: str) -> Optional[str]:
+        """
+        Busca uma resposta no cache.
+
+        Args:
+            chave: Chave gerada por gerar_chave
+
+        Returns:
+            Texto da resposta ou None se ausente/expirada
+        """
+        if not self.habilitado:
+            return None
+
+        agora = time.time()
+        try:
+            conn = self._conectar()
+            try:
+                row = conn.execute(
+                    "SELECT resposta, criado_em FROM respostas WHERE chave = ?",
+                    (chave,)
+                ).fetchone()
+
+                if row is None:
+                    return None
+
+                resposta, criado_em = row
+                if self.ttl_seg and agora - criado_em > self.ttl_seg:
+                    conn.execute("DELETE FROM respostas WHERE chave = ?", (chave,))
+                    conn.commit()
+                    return None
+
+                conn.execute(
+                    "UPDATE respostas SET ultimo_acesso = ?, acessos = acessos + 1 WHERE chave = ?",
+                    (agora, chave)
+                )
+                conn.commit()
+                return resposta
+            finally:
+                conn.close()
+        except sqlite3.Error as e:
+            logger.warning(f"Falha ao ler cache do LLM: {e}")
+            return None
+
+    def salvar(self, chave: str, resposta: str, modelo: str = None) -> bool:
+        """
+        Grava uma resposta no cache e aplica a política de remoção.
+
+        Args:
+            chave: Chave gerada por gerar_chave
+            resposta: Texto retornado pelo LLM
+            modelo: Nome do modelo (informativo)
+
+        Returns:
+            True se gravou
+        """
+        if not self.habilitado or not resposta:
+            return False
+
+        agora = time.time()
+        try:
+            conn = self._conectar()
+            try:
+                conn.execute(
+                    """
+                    INSERT OR REPLACE INTO respostas
+                        (chave, modelo, resposta, criado_em, ultimo_acesso, acessos)
+                    VALUES (?, ?, ?, ?, ?, 0)
+                    """,
+                    (chave, modelo, resposta, agora, agora)
+                )
+                self._remover_excedentes(conn, agora)
+                conn.commit()
+                return True
+            finally:
+                conn.close()
+        except sqlite3.Error as e:
+            logger.warning(f"Falha ao gravar cache do LLM: {e}")
+            return False
+
+    def _remover_excedentes(self, conn: sqlite3.Connection, agora: float):
+        """Remove entradas expiradas e as menos usadas acima do limite."""
+        if self.ttl_seg:
+            conn.execute(
+                "DELETE FROM respostas WHERE criado_em < ?",
+                (agora - self.ttl_seg,)
+            )
+
+        if self.max_entradas:
+            total = conn.execute("SELECT COUNT(*) FROM respostas").fetchone()[0]
+            excesso = total - self.max_entradas
+            if excesso > 0:
+                conn.execute(
+                    """
+                    DELETE FROM respostas WHERE chave IN (
+                        SELECT chave FROM respostas
+                        ORDER BY ultimo_acesso ASC
+                        LIMIT ?
+                    )
+                    """,
+                    (excesso,)
+                )
+
+    def consultar(self, modelo: str, prompt: str, temperatura: float) -> Tuple[Optional[str], Optional[str]]:
+        """
+        Busca a resposta de uma chamada e contabiliza acerto/falha.
+
+        Usado por quem faz a chamada ao LLM por conta própria (ex.: o
+        cliente assíncrono), que depois grava a resposta com salvar().
+
+        Returns:
+            Tupla (chave, resposta); chave é None com o cache desabilitado
+            e resposta é None quando não há entrada válida
+        """
+        if not self.habilitado:
+            return None, None
+
+        chave = self.gerar_chave(modelo, prompt, temperatura)
+        resposta = self.obter(chave)
+        self._contabilizar(resposta is not None)
+        if resposta is not None:
+            logger.debug(f"Cache do LLM: acerto ({modelo})")
+        return chave, resposta
+
+    def _contabilizar(self, acerto: bool):
+        """Incrementa o contador de acertos ou de falhas (thread-safe)."""
+        with self._contadores_lock:
+            if acerto:
+                self.acertos += 1
+            else:
+                self.falhas += 1
+
+    def obter_ou_gerar(
+        self,
+        modelo: str,
+        prompt: str,
+        temperatura: float,
+        gerar: Callable[[], str],
+        usar_cache: bool = True
+    ) -> str:
+        """
+        Retorna a resposta do cache ou chama `gerar` e guarda o resultado.
+
+        Args:
+            modelo: Nome do modelo no formato do LiteLLM
+            prompt: Prompt já renderizado
+            temperatura: Temperatura da chamada
+            gerar: Função sem argumentos que faz a chamada ao LLM
+            usar_cache: Se False, ignora o cache (não lê nem grava)
+
+        Returns:
+            Texto da resposta
+        """
+        if not usar_cache or not self.habilitado:
+            return gerar()
+
+        chave, resposta = self.consultar(modelo, prompt, temperatura)
+        if resposta is not None:
+            return resposta
+
+        resposta = gerar()
+        self.salvar(chave, resposta, modelo)
+        return resposta
+
+    # =========================================================================
+    # Manutenção
+    # =========================================================================
+
+    def limpar(self) -> int:
+        """
+        Remove todas as entradas do cache.
+
+        Returns:
+            Número de entradas removidas
+        """
+        try:
+            conn = self._conectar()
+            try:
+                cursor = conn.execute("DELETE FROM respostas")
+                conn.commit()
+                return cursor.rowcount
+            finally:
+                conn.close()
+        except sqlite3.Error as e:
+            logger.warning(f"Falha ao limpar cache do LLM: {e}")
+            return 0
+
+    def obter_estatisticas(self) -> Dict[str, Any]:
+        """Retorna estatísticas do cache."""
+        estatisticas = {
+            "habilitado": self.habilitado,
+            "caminho": self.caminho,
+            "acertos": self.acertos,
+            "falhas": self.falhas,
+            "entradas": 0,
+        }
+        if not self.habilitado:
+            return estatisticas
+
+        try:
+            conn = self._conectar()
+            try:
+                estatisticas["entradas"] = conn.execute(
+                    "SELECT COUNT(*) FROM respostas"
+                ).fetchone()[0]
+            finally:
+                conn.close()
+        except sqlite3.Error as e:
+            logger.warning(f"Falha ao ler estatísticas do cache do LLM: {e}")
+
+        return estatisticas
+
+
+# Instância global
+_llm_cache_global = None
+
+
+def get_llm_cache() -> CacheRespostasLLM:
+    """Retorna instância global do cache (singleton)."""
+    global _llm_cache_global
+    if _llm_cache_global is None:
+        _llm_cache_global = CacheRespostasLLM()
+    return _llm_cache_global
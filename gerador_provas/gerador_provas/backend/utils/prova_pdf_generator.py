@@ -4,10 +4,20 @@ Gerador de PDFs de Provas em formato ABNT.
 Gera:
 1. Prova para o aluno (sem respostas)
 2. Prova espelho/gabarito (com respostas detalhadas)
+
+O PDF é compilado com pdflatex (PDF_BACKEND=latex) ou renderizado no
+próprio processo com ReportLab (PDF_BACKEND=reportlab). Com
+PDF_BACKEND=auto, usa o ReportLab quando o pdflatex não está instalado.
 """
 
 import os
+import re
 import sys
+import json
+import shutil
+import hashlib
+import threading
+from collections import OrderedDict
 from datetime import datetime
 from typing import List, Dict, Optional, Any
 
@@ -19,14 +29,58 @@ from pylatex import NoEscape, MiniPage, LineBreak, NewLine, NewPage
 from pylatex import Tabular, MultiColumn, LongTable
 from pylatex.utils import bold, italic
 
+from backend.utils.formato_latex import (
+    MARCADOR_FIM_PREAMBULO,
+    obter_formato,
+    invalidar_formato
+)
+from backend.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
 try:
     from config import settings
     PDF_OUTPUT_DIR = settings.PDF_OUTPUT_DIR
-except ImportError:
+    LATEX_FORMATO_PRECOMPILADO = settings.LATEX_FORMATO_PRECOMPILADO
+    PDF_BACKEND = settings.PDF_BACKEND
+except (ImportError, AttributeError):
     PDF_OUTPUT_DIR = os.getenv('PDF_OUTPUT_DIR', 'output/pdf')
+    LATEX_FORMATO_PRECOMPILADO = os.getenv('LATEX_FORMATO_PRECOMPILADO', 'false').lower() == 'true'
+    PDF_BACKEND = os.getenv('PDF_BACKEND', 'latex')
+
+BACKENDS_PDF = ('latex', 'reportlab', 'auto')
+
+INSTRUCOES_PADRAO = [
+    "Leia atentamente cada questão antes de responder.",
+    "Use caneta azul ou preta para as respostas.",
+    "Não é permitido o uso de calculadora, salvo indicação contrária.",
+    "As respostas devem ser justificadas quando solicitado.",
+    "Boa prova!"
+]
 
 os.makedirs(PDF_OUTPUT_DIR, exist_ok=True)
 
+# Total de páginas conhecido por layout (chave -> páginas). As variantes
+# embaralhadas de uma prova têm o mesmo conteúdo e reaproveitam o total
+# da primeira, compilando em uma única passada. Em LRU: uma entrada por
+# layout distinto, e o servidor compila layouts novos indefinidamente.
+_totais_paginas: "OrderedDict[str, int]" = OrderedDict()
+_totais_lock = threading.Lock()
+MAX_TOTAIS_PAGINAS = 1000
+
+# \newlabel{LastPage}{{}{3}{}{page.3}{}} gravado pelo pacote lastpage no .aux
+_RE_LASTPAGE = re.compile(r'\\newlabel\{LastPage\}\{\{[^}]*\}\{(\d+)\}')
+
+EXTENSOES_AUXILIARES = ['aux', 'log', 'out', 'fls', 'fdb_latexmk']
+
+# Fragmentos LaTeX já renderizados ((tipo, texto) -> fragmento), em LRU
+_fragmentos: "OrderedDict[tuple, str]" = OrderedDict()
+_fragmentos_lock = threading.Lock()
+MAX_FRAGMENTOS = 10000
+
+# Separador usado pelo PyLaTeX entre itens do documento ('%' anula a quebra)
+SEPARADOR_LATEX = '%\n'
+
 
 class ProvaPDFGenerator:
     """
@@ -39,8 +93,35 @@ class ProvaPDFGenerator:
     - Títulos em negrito
     """
     
-    def __init__(self):
+    def __init__(self, usar_formato_precompilado: bool = None, backend: str = None):
+        """
+        Args:
+            usar_formato_precompilado: Compila contra o preâmbulo ABNT
+                pré-compilado (padrão: LATEX_FORMATO_PRECOMPILADO)
+            backend: 'latex', 'reportlab' ou 'auto' (padrão: PDF_BACKEND)
+        """
         self.output_dir = PDF_OUTPUT_DIR
+        self.backend = self._resolver_backend(backend or PDF_BACKEND)
+        self._reportlab = None
+        if self.backend == 'reportlab':
+            from backend.utils.prova_pdf_reportlab import ProvaPDFReportLab
+            self._reportlab = ProvaPDFReportLab(self.output_dir)
+        self.usar_formato_precompilado = (
+            LATEX_FORMATO_PRECOMPILADO if usar_formato_precompilado is None
+            else usar_formato_precompilado
+        )
+        # Itens de doc.preamble comuns a todas as provas (vão para o .fmt)
+        self._itens_preambulo_fixo = 0
+    
+    @staticmethod
+    def _resolver_backend(backend: str) -> str:
+        """Valida o backend; 'auto' vira reportlab quando não há pdflatex."""
+        backend = backend.lower()
+        if backend not in BACKENDS_PDF:
+            raise ValueError(f"Backend de PDF inválido: {backend} (use {', '.join(BACKENDS_PDF)})")
+        if backend == 'auto':
+            return 'latex' if shutil.which('pdflatex') else 'reportlab'
+        return backend
     
     def _criar_documento_abnt(self) -> Document:
         """Cria um documento LaTeX com formatação ABNT."""
@@ -83,8 +164,151 @@ class ProvaPDFGenerator:
         doc.preamble.append(NoEscape(r'\renewcommand{\headrulewidth}{0.5pt}'))
         doc.preamble.append(NoEscape(r'\renewcommand{\footrulewidth}{0.5pt}'))
         
+        self._itens_preambulo_fixo = len(doc.preamble)
         return doc
     
+    def _chave_layout(self, prova: Dict, tipo: str, *extras) -> str:
+        """
+        Identifica provas com o mesmo conteúdo, independente da ordem.
+        
+        Variantes embaralhadas de um lote (mesmas questões e alternativas
+        em outra ordem) têm a mesma chave e, em geral, o mesmo número de
+        páginas.
+        """
+        assinaturas = []
+        for questao in prova.get('questoes', []):
+            alternativas = sorted(
+                str(alt.get('texto', '')) if isinstance(alt, dict) else str(alt)
+                for alt in questao.get('alternativas') or []
+            )
+            assinaturas.append(json.dumps(
+                [questao.get('enunciado', ''), alternativas,
+                 questao.get('explicacao', ''), questao.get('resolucao', '')],
+                ensure_ascii=False, default=str
+            ))
+        
+        conteudo = json.dumps(
+            [tipo, prova.get('titulo', ''), prova.get('materia', ''),
+             prova.get('tempo_limite_min'), sorted(assinaturas), [str(e) for e in extras]],
+            ensure_ascii=False, default=str
+        )
+        return hashlib.sha256(conteudo.encode('utf-8')).hexdigest()[:16]
+    
+    def _definir_total_paginas(self, doc: Document, total: Optional[int]):
+        """Fixa o total de páginas do cabeçalho (None = \\pageref{LastPage})."""
+        valor = str(total) if total else r'\pageref{LastPage}'
+        for i, item in enumerate(doc.preamble):
+            if str(item).startswith(r'\newcommand{\totalpaginas}'):
+                doc.preamble[i] = NoEscape(r'\newcommand{\totalpaginas}{' + valor + '}')
+                return
+    
+    def _ler_total_paginas(self, caminho: str) -> Optional[int]:
+        """Lê o total de páginas gravado pelo lastpage no .aux."""
+        try:
+            with open(caminho + '.aux', encoding='utf-8', errors='ignore') as f:
+                encontrado = _RE_LASTPAGE.search(f.read())
+        except OSError:
+            return None
+        return int(encontrado.group(1)) if encontrado else None
+    
+    def _limpar_auxiliares(self, caminho: str):
+        """Remove os arquivos auxiliares do pdflatex."""
+        for ext in EXTENSOES_AUXILIARES:
+            try:
+                os.remove(f"{caminho}.{ext}")
+            except OSError:
+                pass
+    
+    def _compilar(self, doc: Document, caminho: str, chave_layout: str = None) -> str:
+        """
+        Compila o documento em caminho + '.pdf'.
+        
+        O total de páginas do cabeçalho é escrito como número: se o layout
+        já foi compilado neste processo, uma passada basta. Senão (ou se o
+        total divergir), o total lido do .aux é fixado e o documento é
+        compilado mais uma vez.
+        
+        Se o LaTeX não estiver disponível, salva apenas o .tex.
+        
+        Returns:
+            Caminho do arquivo gerado
+        """
+        with _totais_lock:
+            total = _totais_paginas.get(chave_layout) if chave_layout else None
+            if total is not None:
+                _totais_paginas.move_to_end(chave_layout)
+        self._definir_total_paginas(doc, total)
+        
+        try:
+            gerado = self._executar_compilacao(doc, caminho)
+            if gerado.endswith('.pdf'):
+                paginas = self._ler_total_paginas(caminho)
+                if paginas and paginas != total:
+                    self._definir_total_paginas(doc, paginas)
+                    gerado = self._executar_compilacao(doc, caminho)
+                if chave_layout and paginas:
+                    with _totais_lock:
+                        _totais_paginas[chave_layout] = paginas
+                        _totais_paginas.move_to_end(chave_layout)
+                        while len(_totais_paginas) > MAX_TOTAIS_PAGINAS:
+                            _totais_paginas.popitem(last=False)
+        finally:
+            self._limpar_auxiliares(caminho)
+        
+        return gerado
+    
+    def _executar_compilacao(self, doc: Document, caminho: str) -> str:
+        """Uma passada do pdflatex (ou o .tex, se não houver LaTeX)."""
+        if self.usar_formato_precompilado:
+            gerado = self._compilar_com_formato(doc, caminho)
+            if gerado:
+                return gerado
+        
+        try:
+            doc.generate_pdf(caminho, clean=False, clean_tex=False, compiler='pdflatex')
+            return caminho + '.pdf'
+        except Exception as e:
+            # Se não conseguir gerar PDF, salva o .tex
+            doc.generate_tex(caminho)
+            return caminho + '.tex'
+    
+    def _compilar_com_formato(self, doc: Document, caminho: str) -> Optional[str]:
+        """
+        Compila usando o preâmbulo pré-compilado (mylatexformat).
+        
+        O marcador \\endofdump separa o preâmbulo fixo (que vai para o
+        .fmt) do que muda a cada prova, como o cabeçalho com o título.
+        
+        Returns:
+            Caminho do PDF, ou None para compilar da forma normal
+        """
+        if not shutil.which('pdflatex'):
+            return None
+        
+        marcador = NoEscape(MARCADOR_FIM_PREAMBULO)
+        doc.preamble.insert(self._itens_preambulo_fixo, marcador)
+        try:
+            preambulo = doc.dumps().split(MARCADOR_FIM_PREAMBULO, 1)[0]
+            formato = obter_formato(preambulo)
+            if not formato:
+                return None
+            
+            try:
+                doc.generate_pdf(
+                    caminho,
+                    clean=False,
+                    clean_tex=False,
+                    compiler='pdflatex',
+                    compiler_args=[f'-fmt={formato}']
+                )
+                return caminho + '.pdf'
+            except Exception as e:
+                logger.warning(f"Falha ao compilar com o preâmbulo pré-compilado: {e}")
+                invalidar_formato(preambulo)
+                return None
+        finally:
+            doc.preamble.remove(marcador)
+    
     def _adicionar_cabecalho(
         self, 
         doc: Document, 
@@ -97,12 +321,13 @@ class ProvaPDFGenerator:
         if is_gabarito:
             titulo = f"{titulo} - GABARITO"
         
-        # Cabeçalho superior
+        # Cabeçalho superior (\totalpaginas é fixado em _compilar)
+        doc.preamble.append(NoEscape(r'\newcommand{\totalpaginas}{\pageref{LastPage}}'))
         doc.preamble.append(NoEscape(
             r'\fancyhead[L]{\small ' + (instituicao or 'Instituição de Ensino') + r'}'
         ))
         doc.preamble.append(NoEscape(
-            r'\fancyhead[R]{\small Página \thepage\ de \pageref{LastPage}}'
+            r'\fancyhead[R]{\small Página \thepage\ de \totalpaginas}'
         ))
         doc.preamble.append(NoEscape(
             r'\fancyfoot[C]{\small ' + titulo + r'}'
@@ -147,13 +372,7 @@ class ProvaPDFGenerator:
     def _adicionar_instrucoes(self, doc: Document, instrucoes: List[str] = None):
         """Adiciona instruções da prova."""
         if not instrucoes:
-            instrucoes = [
-                "Leia atentamente cada questão antes de responder.",
-                "Use caneta azul ou preta para as respostas.",
-                "Não é permitido o uso de calculadora, salvo indicação contrária.",
-                "As respostas devem ser justificadas quando solicitado.",
-                "Boa prova!"
-            ]
+            instrucoes = INSTRUCOES_PADRAO
         
         doc.append(NoEscape(r'\noindent\textbf{INSTRUÇÕES:}'))
         doc.append(NoEscape(r'\begin{itemize}[leftmargin=1cm]'))
@@ -164,6 +383,62 @@ class ProvaPDFGenerator:
         doc.append(NoEscape(r'\hrule'))
         doc.append(NoEscape(r'\vspace{0.5cm}'))
     
+    def _fragmento(self, tipo: str, texto: str, montar) -> str:
+        """
+        Retorna o fragmento LaTeX de um trecho de questão, renderizando-o
+        só na primeira vez.
+        
+        As variantes embaralhadas de um lote repetem os mesmos enunciados
+        e alternativas; apenas a ordem e a numeração mudam. O fragmento
+        depende só do texto, então é reaproveitado entre todas elas.
+        """
+        chave = (tipo, texto)
+        with _fragmentos_lock:
+            fragmento = _fragmentos.get(chave)
+            if fragmento is not None:
+                _fragmentos.move_to_end(chave)
+                return fragmento
+        
+        fragmento = montar()
+        with _fragmentos_lock:
+            _fragmentos[chave] = fragmento
+            while len(_fragmentos) > MAX_FRAGMENTOS:
+                _fragmentos.popitem(last=False)
+        return fragmento
+    
+    def _titulo_questao(self, numero: int, questao: Dict) -> List[str]:
+        """Número, pontuação e tópico (muda a cada variante)."""
+        pontuacao = questao.get('pontuacao', 1.0)
+        topico = questao.get('topico', '')
+        
+        partes = [
+            r'\noindent\textbf{Questão ' + str(numero) +
+            r'} (' + str(pontuacao) + r' ponto' + ('s' if pontuacao != 1 else '') + r')'
+        ]
+        if topico:
+            partes.append(r' \textit{[' + topico + r']}')
+        partes.append(r'\\[0.2cm]')
+        return partes
+    
+    def _fragmento_enunciado(self, questao: Dict) -> str:
+        """Enunciado escapado e diagrama (se existir)."""
+        enunciado = questao.get('enunciado', '')
+        diagrama = questao.get('diagrama') or ''
+        
+        def montar():
+            partes = [
+                r'\noindent ' + self._escapar_latex(enunciado),
+                r'\\[0.3cm]'
+            ]
+            if diagrama and os.path.exists(diagrama.replace('/static/', 'static/')):
+                partes.append(r'\begin{center}')
+                partes.append(r'\includegraphics[width=0.5\textwidth]{' +
+                              diagrama.replace('/static/', 'static/') + r'}')
+                partes.append(r'\end{center}')
+            return SEPARADOR_LATEX.join(partes)
+        
+        return self._fragmento('enunciado', enunciado + '\x1f' + diagrama, montar)
+    
     def _adicionar_questao_dissertativa(
         self, 
         doc: Document, 
@@ -172,60 +447,39 @@ class ProvaPDFGenerator:
         mostrar_resposta: bool = False
     ):
         """Adiciona uma questão dissertativa."""
-        enunciado = questao.get('enunciado', '')
-        pontuacao = questao.get('pontuacao', 1.0)
-        topico = questao.get('topico', '')
-        
-        # Cabeçalho da questão
-        doc.append(NoEscape(
-            r'\noindent\textbf{Questão ' + str(numero) + 
-            r'} (' + str(pontuacao) + r' ponto' + ('s' if pontuacao != 1 else '') + r')'
-        ))
-        
-        if topico:
-            doc.append(NoEscape(r' \textit{[' + topico + r']}'))
-        
-        doc.append(NoEscape(r'\\[0.2cm]'))
-        
-        # Enunciado
-        doc.append(NoEscape(r'\noindent ' + self._escapar_latex(enunciado)))
-        doc.append(NoEscape(r'\\[0.3cm]'))
-        
-        # Diagrama se existir
-        diagrama = questao.get('diagrama')
-        if diagrama and os.path.exists(diagrama.replace('/static/', 'static/')):
-            doc.append(NoEscape(r'\begin{center}'))
-            doc.append(NoEscape(r'\includegraphics[width=0.5\textwidth]{' + 
-                               diagrama.replace('/static/', 'static/') + r'}'))
-            doc.append(NoEscape(r'\end{center}'))
+        partes = self._titulo_questao(numero, questao)
+        partes.append(self._fragmento_enunciado(questao))
         
         if mostrar_resposta:
             # Mostrar resposta detalhada
             resposta = questao.get('resposta', '')
             explicacao = questao.get('explicacao', '')
             
-            doc.append(NoEscape(r'\vspace{0.3cm}'))
-            doc.append(NoEscape(r'\noindent\fbox{\parbox{\textwidth}{'))
-            doc.append(NoEscape(r'\textbf{Resposta:} ' + self._escapar_latex(resposta)))
-            
-            if explicacao:
-                doc.append(NoEscape(r'\\[0.2cm]'))
-                doc.append(NoEscape(r'\textbf{Explicação:} ' + self._escapar_latex(explicacao)))
+            def montar():
+                caixa = [
+                    r'\noindent\fbox{\parbox{\textwidth}{',
+                    r'\textbf{Resposta:} ' + self._escapar_latex(resposta)
+                ]
+                if explicacao:
+                    caixa.append(r'\\[0.2cm]')
+                    caixa.append(r'\textbf{Explicação:} ' + self._escapar_latex(explicacao))
+                caixa.append(r'}}')
+                return SEPARADOR_LATEX.join(caixa)
             
-            doc.append(NoEscape(r'}}'))
+            partes.append(r'\vspace{0.3cm}')
+            partes.append(self._fragmento('resposta', f"{resposta}\x1f{explicacao}", montar))
         else:
             # Espaço para resposta
             linhas = questao.get('linhas_resposta', 5)
-            doc.append(NoEscape(r'\vspace{0.3cm}'))
-            doc.append(NoEscape(r'\noindent\textbf{Resposta:}'))
-            doc.append(NoEscape(r'\\[0.2cm]'))
+            partes.append(r'\vspace{0.3cm}')
+            partes.append(r'\noindent\textbf{Resposta:}')
+            partes.append(r'\\[0.2cm]')
             for _ in range(linhas):
-                doc.append(NoEscape(r'\noindent\underline{\hspace{\textwidth}}'))
-                doc.append(NoEscape(r'\\[0.3cm]'))
+                partes.append(r'\noindent\underline{\hspace{\textwidth}}')
+                partes.append(r'\\[0.3cm]')
         
-        doc.append(NoEscape(r'\vspace{0.5cm}'))
-        doc.append(NoEscape(r'\hrule'))
-        doc.append(NoEscape(r'\vspace{0.5cm}'))
+        partes += [r'\vspace{0.5cm}', r'\hrule', r'\vspace{0.5cm}']
+        doc.append(NoEscape(SEPARADOR_LATEX.join(partes)))
     
     def _adicionar_questao_multipla_escolha(
         self, 
@@ -235,59 +489,38 @@ class ProvaPDFGenerator:
         mostrar_resposta: bool = False
     ):
         """Adiciona uma questão de múltipla escolha."""
-        enunciado = questao.get('enunciado', '')
         alternativas = questao.get('alternativas', [])
-        pontuacao = questao.get('pontuacao', 1.0)
-        topico = questao.get('topico', '')
-        
-        # Cabeçalho da questão
-        doc.append(NoEscape(
-            r'\noindent\textbf{Questão ' + str(numero) + 
-            r'} (' + str(pontuacao) + r' ponto' + ('s' if pontuacao != 1 else '') + r')'
-        ))
         
-        if topico:
-            doc.append(NoEscape(r' \textit{[' + topico + r']}'))
-        
-        doc.append(NoEscape(r'\\[0.2cm]'))
-        
-        # Enunciado
-        doc.append(NoEscape(r'\noindent ' + self._escapar_latex(enunciado)))
-        doc.append(NoEscape(r'\\[0.3cm]'))
-        
-        # Diagrama se existir
-        diagrama = questao.get('diagrama')
-        if diagrama and os.path.exists(diagrama.replace('/static/', 'static/')):
-            doc.append(NoEscape(r'\begin{center}'))
-            doc.append(NoEscape(r'\includegraphics[width=0.5\textwidth]{' + 
-                               diagrama.replace('/static/', 'static/') + r'}'))
-            doc.append(NoEscape(r'\end{center}'))
+        partes = self._titulo_questao(numero, questao)
+        partes.append(self._fragmento_enunciado(questao))
         
-        # Alternativas
-        doc.append(NoEscape(r'\begin{enumerate}[(A)]'))
+        # Alternativas (as letras vêm da posição no enumerate)
+        partes.append(r'\begin{enumerate}[(A)]')
         for alt in alternativas:
-            letra = alt.get('letra', '')
             texto = alt.get('texto', '')
-            correta = alt.get('correta', False)
-            
-            if mostrar_resposta and correta:
-                doc.append(NoEscape(r'\item \textbf{' + self._escapar_latex(texto) + 
-                                   r'} $\leftarrow$ \textit{Resposta correta}'))
+            if mostrar_resposta and alt.get('correta', False):
+                partes.append(self._fragmento('alternativa_correta', texto, lambda: (
+                    r'\item \textbf{' + self._escapar_latex(texto) +
+                    r'} $\leftarrow$ \textit{Resposta correta}'
+                )))
             else:
-                doc.append(NoEscape(r'\item ' + self._escapar_latex(texto)))
-        doc.append(NoEscape(r'\end{enumerate}'))
+                partes.append(self._fragmento(
+                    'alternativa', texto, lambda: r'\item ' + self._escapar_latex(texto)
+                ))
+        partes.append(r'\end{enumerate}')
         
         if mostrar_resposta:
             explicacao = questao.get('explicacao', '')
             if explicacao:
-                doc.append(NoEscape(r'\vspace{0.2cm}'))
-                doc.append(NoEscape(r'\noindent\fbox{\parbox{\textwidth}{'))
-                doc.append(NoEscape(r'\textbf{Explicação:} ' + self._escapar_latex(explicacao)))
-                doc.append(NoEscape(r'}}'))
-        
-        doc.append(NoEscape(r'\vspace{0.5cm}'))
-        doc.append(NoEscape(r'\hrule'))
-        doc.append(NoEscape(r'\vspace{0.5cm}'))
+                partes.append(r'\vspace{0.2cm}')
+                partes.append(self._fragmento('explicacao', explicacao, lambda: SEPARADOR_LATEX.join([
+                    r'\noindent\fbox{\parbox{\textwidth}{',
+                    r'\textbf{Explicação:} ' + self._escapar_latex(explicacao),
+                    r'}}'
+                ])))
+        
+        partes += [r'\vspace{0.5cm}', r'\hrule', r'\vspace{0.5cm}']
+        doc.append(NoEscape(SEPARADOR_LATEX.join(partes)))
     
     def _adicionar_tabela_gabarito(self, doc: Document, questoes: List[Dict]):
         """Adiciona tabela resumo do gabarito."""
@@ -356,7 +589,8 @@ class ProvaPDFGenerator:
         prova: Dict,
         nome_arquivo: str = None,
         instituicao: str = None,
-        instrucoes: List[str] = None
+        instrucoes: List[str] = None,
+        output_dir: str = None
     ) -> str:
         """
         Gera o PDF da prova (versão do aluno, sem respostas).
@@ -366,10 +600,16 @@ class ProvaPDFGenerator:
             nome_arquivo: Nome do arquivo (sem extensão)
             instituicao: Nome da instituição
             instrucoes: Lista de instruções
+            output_dir: Diretório de saída (opcional)
         
         Returns:
             Caminho do PDF gerado
         """
+        if self._reportlab:
+            return self._reportlab.gerar_prova_pdf(
+                prova, nome_arquivo, instituicao, instrucoes, output_dir
+            )
+        
         doc = self._criar_documento_abnt()
         
         self._adicionar_cabecalho(doc, prova, instituicao, is_gabarito=False)
@@ -387,22 +627,22 @@ class ProvaPDFGenerator:
         if not nome_arquivo:
             nome_arquivo = f"prova_{datetime.now().strftime('%Y%m%d_%H%M%S')}"
         
-        caminho = os.path.join(self.output_dir, nome_arquivo)
+        save_dir = output_dir or self.output_dir
+        os.makedirs(save_dir, exist_ok=True)
+        caminho = os.path.join(save_dir, nome_arquivo)
         
-        try:
-            doc.generate_pdf(caminho, clean_tex=False, compiler='pdflatex')
-            return caminho + '.pdf'
-        except Exception as e:
-            # Se não conseguir gerar PDF, salva o .tex
-            doc.generate_tex(caminho)
-            return caminho + '.tex'
+        return self._compilar(
+            doc, caminho,
+            chave_layout=self._chave_layout(prova, 'prova', instituicao, instrucoes)
+        )
     
     def gerar_gabarito_pdf(
         self,
         prova: Dict,
         nome_arquivo: str = None,
         instituicao: str = None,
-        incluir_explicacoes: bool = True
+        incluir_explicacoes: bool = True,
+        output_dir: str = None
     ) -> str:
         """
         Gera o PDF do gabarito (prova espelho com respostas).
@@ -412,10 +652,16 @@ class ProvaPDFGenerator:
             nome_arquivo: Nome do arquivo (sem extensão)
             instituicao: Nome da instituição
             incluir_explicacoes: Se True, inclui explicações detalhadas
+            output_dir: Diretório de saída (opcional)
         
         Returns:
             Caminho do PDF gerado
         """
+        if self._reportlab:
+            return self._reportlab.gerar_gabarito_pdf(
+                prova, nome_arquivo, instituicao, incluir_explicacoes, output_dir
+            )
+        
         doc = self._criar_documento_abnt()
         
         self._adicionar_cabecalho(doc, prova, instituicao, is_gabarito=True)
@@ -437,14 +683,14 @@ class ProvaPDFGenerator:
         if not nome_arquivo:
             nome_arquivo = f"gabarito_{datetime.now().strftime('%Y%m%d_%H%M%S')}"
         
-        caminho = os.path.join(self.output_dir, nome_arquivo)
+        save_dir = output_dir or self.output_dir
+        os.makedirs(save_dir, exist_ok=True)
+        caminho = os.path.join(save_dir, nome_arquivo)
         
-        try:
-            doc.generate_pdf(caminho, clean_tex=False, compiler='pdflatex')
-            return caminho + '.pdf'
-        except Exception as e:
-            doc.generate_tex(caminho)
-            return caminho + '.tex'
+        return self._compilar(
+            doc, caminho,
+            chave_layout=self._chave_layout(prova, 'gabarito', instituicao, incluir_explicacoes)
+        )
     
     def gerar_prova_professor_pdf(
         self,
@@ -472,6 +718,11 @@ class ProvaPDFGenerator:
         Returns:
             Caminho do PDF gerado
         """
+        if self._reportlab:
+            return self._reportlab.gerar_prova_professor_pdf(
+                prova, nome_arquivo, output_dir, instituicao
+            )
+        
         doc = self._criar_documento_abnt()
         
         # Cabeçalho especial para prova do professor
@@ -645,14 +896,10 @@ class ProvaPDFGenerator:
             nome_arquivo = f"prova_professor_{datetime.now().strftime('%Y%m%d_%H%M%S')}"
         
         save_dir = output_dir or self.output_dir
+        os.makedirs(save_dir, exist_ok=True)
         caminho = os.path.join(save_dir, nome_arquivo)
         
-        try:
-            doc.generate_pdf(caminho, clean_tex=False, compiler='pdflatex')
-            return caminho + '.pdf'
-        except Exception as e:
-            doc.generate_tex(caminho)
-            return caminho + '.tex'
+        return self._compilar(doc, caminho)
     
     def _adicionar_tabela_gabarito_professor(self, doc, gabarito: Dict) -> None:
         """Adiciona tabela resumida do gabarito para o professor."""
@@ -0,0 +1,670 @@
+"""
+Renderizador de provas em PDF com ReportLab (sem LaTeX).
+
+Reproduz o layout ABNT do ProvaPDFGenerator (Times 12pt, margens 3/2cm,
+espaçamento 1,5, cabeçalho "Página X de N" e título no rodapé) gerando o
+PDF no próprio processo, sem chamar o pdflatex. É usado pelo
+ProvaPDFGenerator quando PDF_BACKEND=reportlab (ou auto, sem TeX).
+
+Gera:
+1. Prova para o aluno (sem respostas)
+2. Gabarito (prova espelho com respostas)
+3. Prova do professor (gabarito comentado)
+"""
+
+import os
+import sys
+from datetime import datetime
+from functools import partial
+from typing import List, Dict, Optional
+from xml.sax.saxutils import escape
+
+# Adicionar diretório raiz ao path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(__file__))))
+
+from reportlab.lib import colors
+from reportlab.lib.enums import TA_CENTER, TA_JUSTIFY
+from reportlab.lib.pagesizes import A4
+from reportlab.lib.styles import ParagraphStyle
+from reportlab.lib.units import cm
+from reportlab.lib.utils import ImageReader
+from reportlab.pdfbase.pdfmetrics import stringWidth
+from reportlab.pdfgen import canvas
+from reportlab.platypus import (
+    SimpleDocTemplate, Paragraph, Spacer, Table, TableStyle,
+    HRFlowable, ListFlowable, ListItem, KeepTogether, Image
+)
+
+from backend.utils.prova_pdf_generator import PDF_OUTPUT_DIR, INSTRUCOES_PADRAO
+
+
+# =============================================================================
+# LAYOUT ABNT
+# =============================================================================
+
+MARGEM_SUPERIOR = 3 * cm
+MARGEM_INFERIOR = 2 * cm
+MARGEM_ESQUERDA = 3 * cm
+MARGEM_DIREITA = 2 * cm
+LARGURA_TEXTO = A4[0] - MARGEM_ESQUERDA - MARGEM_DIREITA
+
+FONTE = 'Times-Roman'
+FONTE_NEGRITO = 'Times-Bold'
+FONTE_ITALICO = 'Times-Italic'
+
+# Cores equivalentes às do tcolorbox (green!10, green!50!black, ...)
+VERDE_FUNDO = colors.Color(0.90, 1.0, 0.90)
+VERDE_MOLDURA = colors.Color(0.0, 0.5, 0.0)
+VERMELHO_FUNDO = colors.Color(1.0, 0.95, 0.95)
+VERMELHO_MOLDURA = colors.Color(0.5, 0.0, 0.0)
+AZUL_FUNDO = colors.Color(0.95, 0.95, 1.0)
+AZUL_MOLDURA = colors.Color(0.0, 0.0, 0.5)
+
+
+def _criar_estilos() -> Dict[str, ParagraphStyle]:
+    """Estilos de parágrafo (tamanhos equivalentes aos do LaTeX em 12pt)."""
+    corpo = ParagraphStyle('corpo', fontName=FONTE, fontSize=12, leading=18, alignment=TA_JUSTIFY)
+    return {
+        'corpo': corpo,
+        'centro': ParagraphStyle('centro', parent=corpo, alignment=TA_CENTER),
+        'instituicao': ParagraphStyle(
+            'instituicao', parent=corpo, fontName=FONTE_NEGRITO,
+            fontSize=17.28, leading=22, alignment=TA_CENTER
+        ),
+        'titulo': ParagraphStyle(
+            'titulo', parent=corpo, fontName=FONTE_NEGRITO,
+            fontSize=14.4, leading=20, alignment=TA_CENTER, spaceBefore=4
+        ),
+        'secao': ParagraphStyle(
+            'secao', parent=corpo, fontName=FONTE_NEGRITO,
+            fontSize=17.28, leading=22, spaceBefore=12, spaceAfter=8
+        ),
+        'subsecao': ParagraphStyle(
+            'subsecao', parent=corpo, fontName=FONTE_NEGRITO,
+            fontSize=14.4, leading=20, spaceBefore=10, spaceAfter=6
+        ),
+        'alternativa': ParagraphStyle(
+            'alternativa', parent=corpo, leftIndent=1 * cm, firstLineIndent=-0.7 * cm
+        ),
+        'caixa_titulo': ParagraphStyle(
+            'caixa_titulo', parent=corpo, fontName=FONTE_NEGRITO, textColor=colors.white
+        ),
+        'destaque': ParagraphStyle(
+            'destaque', parent=corpo, fontName=FONTE_NEGRITO,
+            fontSize=17.28, leading=22, alignment=TA_CENTER
+        ),
+    }
+
+
+ESTILOS = _criar_estilos()
+
+
+def _texto(valor) -> str:
+    """Escapa o texto para a marcação de Paragraph (quebras de linha viram <br/>)."""
+    if valor is None:
+        return ''
+    return escape(str(valor)).replace('\n', '<br/>')
+
+
+class _CanvasNumerado(canvas.Canvas):
+    """
+    Canvas que adia cabeçalho e rodapé até o fim do documento.
+
+    Equivale ao fancyhdr + lastpage: com todas as páginas conhecidas,
+    cada uma recebe "Página X de N" em uma única renderização.
+    """
+
+    def __init__(self, *args, cabecalho: str = '', rodape: str = '', **kwargs):
+        super().__init__(*args, **kwargs)
+        self._cabecalho = cabecalho
+        self._rodape = rodape
+        self._paginas = []
+
+    def showPage(self):
+        self._paginas.append(dict(self.__dict__))
+        self._startPage()
+
+    def save(self):
+        total = len(self._paginas)
+        for estado in self._paginas:
+            self.__dict__.update(estado)
+            self._desenhar_cabecalho_rodape(total)
+            super().showPage()
+        super().save()
+
+    def _desenhar_cabecalho_rodape(self, total: int):
+        largura, altura = A4
+        direita = largura - MARGEM_DIREITA
+        y_cabecalho = altura - MARGEM_SUPERIOR + 0.6 * cm
+        y_rodape = MARGEM_INFERIOR - 1.0 * cm
+
+        self.saveState()
+        self.setFont(FONTE, 10)
+        self.drawString(MARGEM_ESQUERDA, y_cabecalho, self._cabecalho)
+        self.drawRightString(direita, y_cabecalho, f"Página {self._pageNumber} de {total}")
+        self.drawCentredString(MARGEM_ESQUERDA + LARGURA_TEXTO / 2, y_rodape, self._rodape)
+
+        self.setLineWidth(0.5)
+        self.line(MARGEM_ESQUERDA, y_cabecalho - 0.15 * cm, direita, y_cabecalho - 0.15 * cm)
+        self.line(MARGEM_ESQUERDA, y_rodape + 0.45 * cm, direita, y_rodape + 0.45 * cm)
+        self.restoreState()
+
+
+class ProvaPDFReportLab:
+    """
+    Gerador de provas em PDF com ReportLab, no mesmo layout ABNT do
+    gerador LaTeX.
+    """
+
+    def __init__(self, output_dir: str = None):
+        self.output_dir = output_dir or PDF_OUTPUT_DIR
+
+    # =========================================================================
+    # Montagem do documento
+    # =========================================================================
+
+    def _salvar(
+        self,
+        elementos: List,
+        nome_arquivo: str,
+        output_dir: Optional[str],
+        cabecalho: str,
+        rodape: str
+    ) -> str:
+        """Renderiza os elementos em <output_dir>/<nome_arquivo>.pdf."""
+        save_dir = output_dir or self.output_dir
+        os.makedirs(save_dir, exist_ok=True)
+        caminho = os.path.join(save_dir, nome_arquivo + '.pdf')
+
+        doc = SimpleDocTemplate(
+            caminho,
+            pagesize=A4,
+            topMargin=MARGEM_SUPERIOR,
+            bottomMargin=MARGEM_INFERIOR,
+            leftMargin=MARGEM_ESQUERDA,
+            rightMargin=MARGEM_DIREITA,
+            title=rodape
+        )
+        doc.build(
+            elementos,
+            canvasmaker=partial(_CanvasNumerado, cabecalho=cabecalho, rodape=rodape)
+        )
+        return caminho
+
+    def _separador(self) -> List:
+        return [
+            Spacer(1, 0.5 * cm),
+            HRFlowable(width='100%', thickness=0.4, color=colors.black),
+            Spacer(1, 0.5 * cm)
+        ]
+
+    def _lista(self, itens: List[str], italico: bool = False) -> ListFlowable:
+        estilo = ESTILOS['corpo']
+        itens_formatados = [
+            ListItem(Paragraph(f"<i>{_texto(item)}</i>" if italico else _texto(item), estilo))
+            for item in itens
+        ]
+        return ListFlowable(itens_formatados, bulletType='bullet', start='•', leftIndent=1 * cm)
+
+    def _caixa(
+        self,
+        corpo: str,
+        moldura=colors.black,
+        fundo=None,
+        titulo: str = None,
+        inferior: str = None
+    ) -> Table:
+        """
+        Caixa com moldura (equivale ao fbox/tcolorbox).
+
+        O título aparece em branco sobre a cor da moldura; o texto
+        inferior fica separado por uma linha, como no \\tcblower.
+        """
+        linhas = []
+        if titulo:
+            linhas.append([Paragraph(titulo, ESTILOS['caixa_titulo'])])
+        linhas.append([Paragraph(corpo, ESTILOS['corpo'])])
+        if inferior:
+            linhas.append([Paragraph(inferior, ESTILOS['corpo'])])
+
+        estilo = [
+            ('BOX', (0, 0), (-1, -1), 0.8 if titulo else 0.4, moldura),
+            ('LEFTPADDING', (0, 0), (-1, -1), 6),
+            ('RIGHTPADDING', (0, 0), (-1, -1), 6),
+        ]
+        if fundo is not None:
+            estilo.append(('BACKGROUND', (0, 0), (-1, -1), fundo))
+        if titulo:
+            estilo.append(('BACKGROUND', (0, 0), (-1, 0), moldura))
+        if inferior:
+            estilo.append(('LINEABOVE', (0, -1), (-1, -1), 0.4, moldura))
+
+        tabela = Table(linhas, colWidths=[LARGURA_TEXTO])
+        tabela.setStyle(TableStyle(estilo))
+        return tabela
+
+    def _diagrama(self, questao: Dict) -> List:
+        """Imagem da questão (metade da largura, centralizada), se existir."""
+        diagrama = questao.get('diagrama')
+        if not diagrama:
+            return []
+        caminho = diagrama.replace('/static/', 'static/')
+        if not os.path.exists(caminho):
+            return []
+
+        largura_img, altura_img = ImageReader(caminho).getSize()
+        largura = LARGURA_TEXTO / 2
+        return [Image(caminho, width=largura, height=largura * altura_img / largura_img), Spacer(1, 0.3 * cm)]
+
+    # =========================================================================
+    # Blocos da prova
+    # =========================================================================
+
+    def _cabecalho(self, prova: Dict, instituicao: str = None, is_gabarito: bool = False) -> List:
+        """Título centralizado, dados da prova e campos de identificação."""
+        titulo = prova.get('titulo', 'Prova')
+        if is_gabarito:
+            titulo = f"{titulo} - GABARITO"
+
+        elementos = [
+            Paragraph(_texto(instituicao or 'INSTITUIÇÃO DE ENSINO'), ESTILOS['instituicao']),
+            Spacer(1, 0.3 * cm),
+            Paragraph(_texto(titulo), ESTILOS['titulo']),
+            Spacer(1, 0.2 * cm),
+        ]
+
+        materia = prova.get('materia', '')
+        if materia:
+            elementos.append(Paragraph(f"Disciplina: {_texto(materia.capitalize())}", ESTILOS['centro']))
+
+        data = prova.get('data', datetime.now().strftime('%d/%m/%Y'))
+        elementos.append(Paragraph(f"Data: {_texto(data)}", ESTILOS['centro']))
+
+        tempo = prova.get('tempo_limite_min')
+        if tempo:
+            elementos.append(Paragraph(f"Duração: {tempo} minutos", ESTILOS['centro']))
+
+        elementos.append(Spacer(1, 0.3 * cm))
+
+        # Campos para preenchimento (apenas na prova, não no gabarito)
+        if not is_gabarito:
+            elementos.append(self._campos([('Nome:', 10 * cm)]))
+            elementos.append(Spacer(1, 0.3 * cm))
+            elementos.append(self._campos([('Turma:', 3 * cm), ('Nº:', 2 * cm)]))
+            elementos.append(Spacer(1, 0.5 * cm))
+
+        elementos.append(HRFlowable(width='100%', thickness=0.4, color=colors.black))
+        elementos.append(Spacer(1, 0.5 * cm))
+        return elementos
+
+    def _campos(self, campos: List) -> Table:
+        """Linha com rótulos em negrito seguidos de espaço sublinhado."""
+        linha, larguras, estilo = [], [], [('LEFTPADDING', (0, 0), (-1, -1), 0)]
+        for rotulo, largura in campos:
+            if linha:
+                linha.append('')
+                larguras.append(2 * cm)
+            linha.extend([Paragraph(f"<b>{rotulo}</b>", ESTILOS['corpo']), ''])
+            larguras.extend([stringWidth(rotulo, FONTE_NEGRITO, 12) + 8, largura])
+            estilo.append(('LINEBELOW', (len(linha) - 1, 0), (len(linha) - 1, 0), 0.4, colors.black))
+
+        tabela = Table([linha], colWidths=larguras, hAlign='LEFT')
+        tabela.setStyle(TableStyle(estilo))
+        return tabela
+
+    def _instrucoes(self, instrucoes: List[str] = None) -> List:
+        elementos = [
+            Paragraph('<b>INSTRUÇÕES:</b>', ESTILOS['corpo']),
+            self._lista(instrucoes or INSTRUCOES_PADRAO),
+        ]
+        return elementos + self._separador()
+
+    def _titulo_questao(self, numero: int, questao: Dict) -> Paragraph:
+        pontuacao = questao.get('pontuacao', 1.0)
+        topico = questao.get('topico', '')
+        texto = f"<b>Questão {numero}</b> ({pontuacao} ponto{'s' if pontuacao != 1 else ''})"
+        if topico:
+            texto += f" <i>[{_texto(topico)}]</i>"
+        return Paragraph(texto, ESTILOS['corpo'])
+
+    def _questao_dissertativa(self, numero: int, questao: Dict, mostrar_resposta: bool = False) -> List:
+        elementos = [
+            self._titulo_questao(numero, questao),
+            Spacer(1, 0.2 * cm),
+            Paragraph(_texto(questao.get('enunciado', '')), ESTILOS['corpo']),
+            Spacer(1, 0.3 * cm),
+        ]
+        elementos.extend(self._diagrama(questao))
+
+        if mostrar_resposta:
+            corpo = f"<b>Resposta:</b> {_texto(questao.get('resposta', ''))}"
+            explicacao = questao.get('explicacao', '')
+            if explicacao:
+                corpo += f"<br/><b>Explicação:</b> {_texto(explicacao)}"
+            elementos.append(self._caixa(corpo))
+        else:
+            # Espaço para resposta
+            elementos.append(Paragraph('<b>Resposta:</b>', ESTILOS['corpo']))
+            for _ in range(questao.get('linhas_resposta', 5)):
+                elementos.append(Spacer(1, 0.6 * cm))
+                elementos.append(HRFlowable(width='100%', thickness=0.4, color=colors.black))
+
+        return [KeepTogether(elementos[:4])] + elementos[4:] + self._separador()
+
+    def _questao_multipla_escolha(self, numero: int, questao: Dict, mostrar_resposta: bool = False) -> List:
+        elementos = [
+            self._titulo_questao(numero, questao),
+            Spacer(1, 0.2 * cm),
+            Paragraph(_texto(questao.get('enunciado', '')), ESTILOS['corpo']),
+            Spacer(1, 0.3 * cm),
+        ]
+        elementos.extend(self._diagrama(questao))
+
+        alternativas = []
+        for i, alt in enumerate(questao.get('alternativas', [])):
+            letra = alt.get('letra') or chr(ord('A') + i)
+            texto = _texto(alt.get('texto', ''))
+            if mostrar_resposta and alt.get('correta', False):
+                texto = f"<b>{texto}</b> &lt;- <i>Resposta correta</i>"
+            alternativas.append(Paragraph(f"({letra})&nbsp;&nbsp;{texto}", ESTILOS['alternativa']))
+        elementos.append(KeepTogether(alternativas))
+
+        if mostrar_resposta:
+            explicacao = questao.get('explicacao', '')
+            if explicacao:
+                elementos.append(Spacer(1, 0.2 * cm))
+                elementos.append(self._caixa(f"<b>Explicação:</b> {_texto(explicacao)}"))
+
+        return elementos + self._separador()
+
+    def _tabela(self, linhas: List[List], estilo_extra: List = None) -> Table:
+        """Tabela centralizada com grade (equivale ao tabular |c|c|)."""
+        tabela = Table(linhas, hAlign='CENTER')
+        tabela.setStyle(TableStyle([
+            ('GRID', (0, 0), (-1, -1), 0.5, colors.black),
+            ('FONT', (0, 0), (-1, -1), FONTE, 12),
+            ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
+            ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
+        ] + (estilo_extra or [])))
+        return tabela
+
+    def _tabela_gabarito(self, questoes: List[Dict]) -> List:
+        """Gabarito resumido, em blocos de 10 questões."""
+        elementos = [Paragraph('Gabarito Resumido', ESTILOS['secao'])]
+
+        for inicio in range(0, len(questoes), 10):
+            bloco = questoes[inicio:inicio + 10]
+            cabecalho = ['Questão'] + [str(inicio + i) for i in range(1, len(bloco) + 1)]
+            respostas = ['Resposta']
+            for q in bloco:
+                if q.get('alternativas'):
+                    corretas = [alt.get('letra', '') for alt in q['alternativas'] if alt.get('correta')]
+                    respostas.append(corretas[0] if corretas else '-')
+                else:
+                    respostas.append(str(q.get('resposta', '-'))[:10])
+
+            elementos.append(self._tabela(
+                [cabecalho, respostas],
+                [('FONT', (0, 0), (-1, 0), FONTE_NEGRITO, 12),
+                 ('FONT', (0, 0), (0, -1), FONTE_NEGRITO, 12)]
+            ))
+            elementos.append(Spacer(1, 0.3 * cm))
+
+        elementos.append(Spacer(1, 0.7 * cm))
+        return elementos
+
+    def _tabela_gabarito_professor(self, gabarito: Dict) -> List:
+        """Gabarito em três pares de colunas (Q / Resp.)."""
+        linhas = [['Q', 'Resp.'] * 3]
+        itens = list(gabarito.items())
+        for i in range(0, len(itens), 3):
+            linha = []
+            for num, resp in itens[i:i + 3]:
+                if isinstance(resp, list):
+                    resp = ', '.join(resp)
+                linha.extend([str(num), str(resp)[:20]])
+            linha.extend([''] * (6 - len(linha)))
+            linhas.append(linha)
+
+        tabela = self._tabela(linhas, [
+            ('FONT', (0, 0), (-1, 0), FONTE_NEGRITO, 12),
+            ('LINEAFTER', (1, 0), (1, -1), 1.5, colors.black),
+            ('LINEAFTER', (3, 0), (3, -1), 1.5, colors.black),
+        ])
+        return [tabela, Spacer(1, 0.5 * cm)]
+
+    # =========================================================================
+    # Documentos
+    # =========================================================================
+
+    def gerar_prova_pdf(
+        self,
+        prova: Dict,
+        nome_arquivo: str = None,
+        instituicao: str = None,
+        instrucoes: List[str] = None,
+        output_dir: str = None
+    ) -> str:
+        """
+        Gera o PDF da prova (versão do aluno, sem respostas).
+
+        Returns:
+            Caminho do PDF gerado
+        """
+        elementos = self._cabecalho(prova, instituicao, is_gabarito=False)
+        elementos += self._instrucoes(instrucoes)
+
+        for i, questao in enumerate(prova.get('questoes', []), 1):
+            if questao.get('alternativas'):
+                elementos += self._questao_multipla_escolha(i, questao, mostrar_resposta=False)
+            else:
+                elementos += self._questao_dissertativa(i, questao, mostrar_resposta=False)
+
+        if not nome_arquivo:
+            nome_arquivo = f"prova_{datetime.now().strftime('%Y%m%d_%H%M%S')}"
+
+        return self._salvar(
+            elementos, nome_arquivo, output_dir,
+            cabecalho=instituicao or 'Instituição de Ensino',
+            rodape=prova.get('titulo', 'Prova')
+        )
+
+    def gerar_gabarito_pdf(
+        self,
+        prova: Dict,
+        nome_arquivo: str = None,
+        instituicao: str = None,
+        incluir_explicacoes: bool = True,
+        output_dir: str = None
+    ) -> str:
+        """
+        Gera o PDF do gabarito (prova espelho com respostas).
+
+        Returns:
+            Caminho do PDF gerado
+        """
+        questoes = prova.get('questoes', [])
+        if not incluir_explicacoes:
+            questoes = [{k: v for k, v in q.items() if k != 'explicacao'} for q in questoes]
+
+        elementos = self._cabecalho(prova, instituicao, is_gabarito=True)
+        elementos += self._tabela_gabarito(questoes)
+        elementos.append(Paragraph('Respostas Detalhadas', ESTILOS['secao']))
+
+        for i, questao in enumerate(questoes, 1):
+            if questao.get('alternativas'):
+                elementos += self._questao_multipla_escolha(i, questao, mostrar_resposta=True)
+            else:
+                elementos += self._questao_dissertativa(i, questao, mostrar_resposta=True)
+
+        if not nome_arquivo:
+            nome_arquivo = f"gabarito_{datetime.now().strftime('%Y%m%d_%H%M%S')}"
+
+        return self._salvar(
+            elementos, nome_arquivo, output_dir,
+            cabecalho=instituicao or 'Instituição de Ensino',
+            rodape=f"{prova.get('titulo', 'Prova')} - GABARITO"
+        )
+
+    def gerar_prova_professor_pdf(
+        self,
+        prova: Dict,
+        nome_arquivo: str = None,
+        output_dir: str = None,
+        instituicao: str = None
+    ) -> str:
+        """
+        Gera o PDF da prova do professor (mestre comentada).
+
+        Returns:
+            Caminho do PDF gerado
+        """
+        # Cabeçalho especial para prova do professor
+        destaque = Table(
+            [[Paragraph('PROVA DO PROFESSOR - GABARITO COMENTADO', ESTILOS['destaque'])]],
+            colWidths=[0.9 * LARGURA_TEXTO]
+        )
+        destaque.setStyle(TableStyle([
+            ('BOX', (0, 0), (-1, -1), 1, colors.red),
+            ('BACKGROUND', (0, 0), (-1, -1), colors.yellow),
+        ]))
+        elementos = [destaque, Spacer(1, 0.5 * cm)]
+
+        # Informações básicas
+        titulo = prova.get('titulo', 'Prova').replace(' - PROVA DO PROFESSOR', '')
+        informacoes = []
+        if instituicao:
+            informacoes.append(('Instituição', instituicao))
+        informacoes += [
+            ('Prova', titulo),
+            ('Data', prova.get('data', '')),
+            ('Total de questões', prova.get('num_questoes', 0)),
+        ]
+        resumo = prova.get('resumo_por_tipo', {})
+        if resumo:
+            informacoes.append(('Composição', ', '.join(
+                f"{v} {k.replace('_', ' ')}" for k, v in resumo.items()
+            )))
+        for rotulo, valor in informacoes:
+            elementos.append(Paragraph(f"<b>{rotulo}:</b> {_texto(valor)}", ESTILOS['corpo']))
+        elementos += self._separador()
+
+        # Instruções para o professor
+        instrucoes_prof = prova.get('instrucoes_professor', [])
+        if instrucoes_prof:
+            elementos.append(Paragraph('<b>Orientações:</b>', ESTILOS['corpo']))
+            elementos.append(self._lista(instrucoes_prof))
+            elementos.append(Spacer(1, 0.5 * cm))
+
+        # Tabela resumo do gabarito
+        gabarito = prova.get('gabarito_completo', {})
+        if gabarito:
+            elementos.append(Paragraph('Gabarito Resumido', ESTILOS['secao']))
+            elementos += self._tabela_gabarito_professor(gabarito)
+
+        elementos.append(Paragraph('Questões com Respostas e Comentários Detalhados', ESTILOS['secao']))
+
+        comentarios = prova.get('comentarios', {})
+        for questao in prova.get('questoes', []):
+            elementos += self._questao_professor(questao, gabarito, comentarios)
+
+        # Fontes bibliográficas
+        fontes = prova.get('fontes_bibliograficas', [])
+        if fontes:
+            elementos.append(Paragraph('Referências Bibliográficas', ESTILOS['secao']))
+            referencias = []
+            for fonte in fontes:
+                ref = f"{_texto(fonte.get('autor', 'Autor desconhecido'))}. <i>{_texto(fonte.get('titulo', 'Sem título'))}</i>"
+                if fonte.get('ano', ''):
+                    ref += f". {_texto(fonte['ano'])}"
+                referencias.append(ListItem(Paragraph(ref, ESTILOS['corpo'])))
+            elementos.append(ListFlowable(referencias, bulletType='bullet', start='•', leftIndent=1 * cm))
+
+        if not nome_arquivo:
+            nome_arquivo = f"prova_professor_{datetime.now().strftime('%Y%m%d_%H%M%S')}"
+
+        return self._salvar(
+            elementos, nome_arquivo, output_dir,
+            cabecalho=instituicao or 'Instituição de Ensino',
+            rodape=prova.get('titulo', 'Prova')
+        )
+
+    def _questao_professor(self, questao: Dict, gabarito: Dict, comentarios: Dict) -> List:
+        """Questão com alternativas analisadas, resolução e dicas de correção."""
+        numero_str = str(questao.get('numero', 0))
+        tipo = questao.get('tipo_questao', questao.get('tipo_identificado', 'multipla_escolha'))
+
+        elementos = [
+            Paragraph(
+                f"Questão {numero_str} <font size=10>[{_texto(tipo.replace('_', ' ').title())}]</font>",
+                ESTILOS['subsecao']
+            ),
+            Paragraph(f"<b>Enunciado:</b> {_texto(questao.get('enunciado', ''))}", ESTILOS['corpo']),
+            Spacer(1, 0.4 * cm),
+        ]
+
+        alternativas = questao.get('alternativas', [])
+        if alternativas:
+            elementos.append(Paragraph('<b>Análise das Alternativas:</b>', ESTILOS['corpo']))
+            elementos.append(Spacer(1, 0.2 * cm))
+
+            for alt in alternativas:
+                letra = _texto(alt.get('letra', '?'))
+                explicacao_alt = _texto(alt.get('explicacao', ''))
+
+                if alt.get('correta', False) or alt.get('destaque', False):
+                    elementos.append(self._caixa(
+                        _texto(alt.get('texto', '')),
+                        moldura=VERDE_MOLDURA, fundo=VERDE_FUNDO,
+                        titulo=f"({letra}) CORRETA",
+                        inferior=f"<b>Por que está correta:</b> {explicacao_alt}" if explicacao_alt else None
+                    ))
+                else:
+                    elementos.append(self._caixa(
+                        _texto(alt.get('texto', '')),
+                        moldura=VERMELHO_MOLDURA, fundo=VERMELHO_FUNDO,
+                        titulo=f"({letra}) INCORRETA ×",
+                        inferior=f"<b>Por que está errada:</b> {explicacao_alt}" if explicacao_alt else None
+                    ))
+                elementos.append(Spacer(1, 0.1 * cm))
+        else:
+            # Questão dissertativa ou numérica
+            resposta = questao.get('resposta', gabarito.get(numero_str, ''))
+            elementos.append(self._caixa(
+                _texto(resposta), moldura=VERDE_MOLDURA, fundo=VERDE_FUNDO, titulo='Resposta Esperada'
+            ))
+
+            criterios = questao.get('criterios_correcao', [])
+            if criterios:
+                elementos.append(Spacer(1, 0.2 * cm))
+                elementos.append(Paragraph('<b>Critérios de Correção:</b>', ESTILOS['corpo']))
+                elementos.append(self._lista(criterios))
+
+            pontos = questao.get('pontos_chave', [])
+            if pontos:
+                elementos.append(Paragraph('<b>Pontos-chave a observar:</b>', ESTILOS['corpo']))
+                elementos.append(self._lista(pontos))
+
+        # Explicação geral da questão
+        explicacao_geral = questao.get(
+            'explicacao_geral', comentarios.get(numero_str, questao.get('explicacao', ''))
+        )
+        if explicacao_geral:
+            elementos.append(Spacer(1, 0.3 * cm))
+            elementos.append(self._caixa(
+                _texto(explicacao_geral), moldura=AZUL_MOLDURA, fundo=AZUL_FUNDO,
+                titulo='Explicação Geral / Resolução'
+            ))
+
+        erros_comuns = questao.get('erros_comuns', [])
+        if erros_comuns:
+            elementos.append(Spacer(1, 0.2 * cm))
+            elementos.append(Paragraph('<b>Erros Comuns dos Alunos:</b>', ESTILOS['corpo']))
+            elementos.append(self._lista(erros_comuns, italico=True))
+
+        dicas = questao.get('dicas_correcao', [])
+        if dicas:
+            elementos.append(Paragraph('<b>Dicas para Correção:</b>', ESTILOS['corpo']))
+            elementos.append(self._lista(dicas))
+
+        return elementos + self._separador()
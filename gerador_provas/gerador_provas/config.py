@@ -33,6 +33,16 @@ class Config:
     POSTGRES_HOST = os.getenv('POSTGRES_HOST', 'localhost')
     POSTGRES_PORT = int(os.getenv('POSTGRES_PORT', 5432))
     
+    # Pool de conexões (engine compartilhada por todo o processo)
+    DB_POOL_SIZE = int(os.getenv('DB_POOL_SIZE', 10))
+    DB_MAX_OVERFLOW = int(os.getenv('DB_MAX_OVERFLOW', 20))
+    DB_POOL_TIMEOUT_SEG = int(os.getenv('DB_POOL_TIMEOUT_SEG', 30))
+    DB_POOL_RECYCLE_SEG = int(os.getenv('DB_POOL_RECYCLE_SEG', 1800))
+    DB_POOL_PRE_PING = os.getenv('DB_POOL_PRE_PING', 'false').lower() == 'true'
+    DB_STATEMENT_TIMEOUT_MS = int(os.getenv('DB_STATEMENT_TIMEOUT_MS', 30000))  # 0 = sem limite
+    # Prepared statements nas consultas frequentes (desligar atrás de pgbouncer em modo transaction)
+    DB_PREPARED_STATEMENTS = os.getenv('DB_PREPARED_STATEMENTS', 'true').lower() == 'true'
+    
     # Diagramas
     DIAGRAMAS_DIR = os.getenv('DIAGRAMAS_DIR', 'static/diagramas')
     DIAGRAMAS_DPI = int(os.getenv('DIAGRAMAS_DPI', 150))
@@ -45,11 +55,34 @@ class Config:
     OUTPUT_DIR = os.getenv('OUTPUT_DIR', 'output')
     PDF_OUTPUT_DIR = os.getenv('PDF_OUTPUT_DIR', 'output/pdf')
     LATEX_OUTPUT_DIR = os.getenv('LATEX_OUTPUT_DIR', 'output/latex')
+    PDF_BACKEND = os.getenv('PDF_BACKEND', 'latex')  # latex, reportlab ou auto
+    PDF_WORKERS = int(os.getenv('PDF_WORKERS', 0))  # 0 = número de CPUs
+    LATEX_FORMATO_PRECOMPILADO = os.getenv('LATEX_FORMATO_PRECOMPILADO', 'false').lower() == 'true'
+    LATEX_FORMATO_DIR = os.getenv('LATEX_FORMATO_DIR', 'output/cache/latex_fmt')
+    
+    # Cache dos IDs de matérias/tópicos (segundos; 0 = até invalidar)
+    DOMINIO_CACHE_TTL_SEG = int(os.getenv('DOMINIO_CACHE_TTL_SEG', 3600))
+    
+    # Fluxo de revisão: questões em cache por processo e validade do cache
+    REVISAO_CACHE_MAX = int(os.getenv('REVISAO_CACHE_MAX', 2000))
+    REVISAO_CACHE_TTL_SEG = int(os.getenv('REVISAO_CACHE_TTL_SEG', 60))
+    REVISAO_BANCO_RETENTATIVA_SEG = int(os.getenv('REVISAO_BANCO_RETENTATIVA_SEG', 30))
+    
+    # Lotes de provas individuais (geração em segundo plano)
+    LOTES_MAX_WORKERS = int(os.getenv('LOTES_MAX_WORKERS', 2))
+    # Tempo que um lote finalizado fica em memória (depois, só no banco)
+    LOTES_RETENCAO_SEG = int(os.getenv('LOTES_RETENCAO_SEG', 3600))
     
     # LLM (Opcional)
     OPENAI_API_KEY = os.getenv('OPENAI_API_KEY')
     OPENAI_MODEL = os.getenv('OPENAI_MODEL', 'gpt-4')
     ANTHROPIC_API_KEY = os.getenv('ANTHROPIC_API_KEY')
+    
+    # Cache de respostas do LLM
+    LLM_CACHE_ENABLED = os.getenv('LLM_CACHE_ENABLED', 'true').lower() == 'true'
+    LLM_CACHE_PATH = os.getenv('LLM_CACHE_PATH', 'output/cache/llm_respostas.sqlite3')
+    LLM_CACHE_TTL_SEG = int(os.getenv('LLM_CACHE_TTL_SEG', 7 * 24 * 3600))
+    LLM_CACHE_MAX_ENTRADAS = int(os.getenv('LLM_CACHE_MAX_ENTRADAS', 5000))
 
 
 class DevelopmentConfig(Config):
@@ -0,0 +1,46 @@
+-- ============================================================================
+-- GERADOR DE PROVAS - MIGRAÇÃO 011: LISTAGEM DE LOTES PELO BANCO
+-- ============================================================================
+-- Descrição: Os lotes de provas individuais passam a ser listados a partir
+--            de provas.lotes_prova (e não mais varrendo o diretório de
+--            saída). Guarda o nome/diretório do lote e cria os índices da
+--            listagem paginada (mais recentes primeiro).
+-- Autor: Sistema
+-- Data: 2024-12-20
+-- ============================================================================
+
+SET search_path TO provas, public;
+
+-- ============================================================================
+-- ALTERAÇÕES NA TABELA DE LOTES
+-- ============================================================================
+
+ALTER TABLE provas.lotes_prova
+ADD COLUMN IF NOT EXISTS nome VARCHAR(200),
+ADD COLUMN IF NOT EXISTS diretorio VARCHAR(500);
+
+COMMENT ON COLUMN provas.lotes_prova.nome IS 'Nome do diretório do lote (ex: prova_fisica_20241220_101500)';
+
+-- ============================================================================
+-- ÍNDICES
+-- ============================================================================
+
+-- Listagem paginada: ORDER BY created_at DESC, id DESC
+CREATE INDEX IF NOT EXISTS idx_lotes_created
+    ON provas.lotes_prova (created_at DESC, id DESC);
+
+-- Estatísticas por nome do lote
+CREATE UNIQUE INDEX IF NOT EXISTS idx_lotes_nome
+    ON provas.lotes_prova (nome) WHERE nome IS NOT NULL;
+
+-- ============================================================================
+-- REGISTRAR MIGRAÇÃO
+-- ============================================================================
+
+INSERT INTO provas.migrations (nome, checksum)
+VALUES ('011_listagem_lotes.sql', md5('011_listagem_lotes'))
+ON CONFLICT (nome) DO NOTHING;
+
+-- ============================================================================
+-- FIM DA MIGRAÇÃO 011
+-- ============================================================================
@@ -0,0 +1,42 @@
+-- ============================================================================
+-- GERADOR DE PROVAS - MIGRAÇÃO 012: PAGINAÇÃO POR CURSOR DE QUESTÕES
+-- ============================================================================
+-- Descrição: Índices para a paginação por chave (created_at, id) do banco
+--            de questões. Substituem o ORDER BY created_at ... OFFSET, cujo
+--            custo cresce com a profundidade da página.
+-- Autor: Sistema
+-- Data: 2024-12-20
+-- ============================================================================
+
+SET search_path TO provas, public;
+
+-- ============================================================================
+-- ÍNDICES PARA PAGINAÇÃO
+-- ============================================================================
+
+-- Listagem geral: WHERE (created_at, id) < (...) ORDER BY created_at DESC, id DESC
+CREATE INDEX IF NOT EXISTS idx_questoes_created_id
+    ON provas.questoes (created_at DESC, id DESC)
+    WHERE deleted_at IS NULL;
+
+-- Listagem filtrada por matéria
+CREATE INDEX IF NOT EXISTS idx_questoes_materia_created_id
+    ON provas.questoes (materia_id, created_at DESC, id DESC)
+    WHERE deleted_at IS NULL;
+
+-- Listagem filtrada por status (pendentes, aprovadas...)
+CREATE INDEX IF NOT EXISTS idx_questoes_status_created_id
+    ON provas.questoes (status, created_at DESC, id DESC)
+    WHERE deleted_at IS NULL;
+
+-- ============================================================================
+-- REGISTRAR MIGRAÇÃO
+-- ============================================================================
+
+INSERT INTO provas.migrations (nome, checksum)
+VALUES ('012_paginacao_questoes.sql', md5('012_paginacao_questoes'))
+ON CONFLICT (nome) DO NOTHING;
+
+-- ============================================================================
+-- FIM DA MIGRAÇÃO 012
+-- ============================================================================
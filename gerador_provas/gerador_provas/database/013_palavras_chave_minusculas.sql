@@ -0,0 +1,41 @@
+-- ============================================================================
+-- GERADOR DE PROVAS - MIGRAÇÃO 013: PALAVRAS-CHAVE EM MINÚSCULAS
+-- ============================================================================
+-- Descrição: A busca por palavras-chave (palavras_chave @> ARRAY[...]) usa o
+--            índice GIN, que compara os textos exatamente. As palavras-chave
+--            passam a ser gravadas em minúsculas; esta migração normaliza as
+--            questões já cadastradas.
+-- Autor: Sistema
+-- Data: 2024-12-20
+-- ============================================================================
+
+SET search_path TO provas, public;
+
+-- ============================================================================
+-- NORMALIZAÇÃO DAS PALAVRAS-CHAVE EXISTENTES
+-- ============================================================================
+
+UPDATE provas.questoes
+SET palavras_chave = ARRAY(
+    SELECT lower(btrim(palavra))
+    FROM unnest(palavras_chave) WITH ORDINALITY AS p(palavra, posicao)
+    WHERE btrim(palavra) <> ''
+    ORDER BY posicao
+)
+WHERE palavras_chave IS NOT NULL
+  AND EXISTS (
+      SELECT 1 FROM unnest(palavras_chave) AS palavra
+      WHERE palavra IS DISTINCT FROM lower(btrim(palavra))
+  );
+
+-- ============================================================================
+-- REGISTRAR MIGRAÇÃO
+-- ============================================================================
+
+INSERT INTO provas.migrations (nome, checksum)
+VALUES ('013_palavras_chave_minusculas.sql', md5('013_palavras_chave_minusculas'))
+ON CONFLICT (nome) DO NOTHING;
+
+-- ============================================================================
+-- FIM DA MIGRAÇÃO 013
+-- ============================================================================
@@ -21,7 +21,7 @@ sys.path.insert(0, str(Path(__file__).parent.parent))
 
 try:
     from config import settings
-    from sqlalchemy import create_engine, text
+    from sqlalchemy import text
 except ImportError:
     print("Erro: Não foi possível importar configurações.")
     print("Execute: pip install sqlalchemy python-dotenv")
@@ -41,12 +41,23 @@ MIGRATIONS_ORDER = [
     "006_tabelas_auditoria.sql",
     "007_indices.sql",
     "008_dados_iniciais.sql",
+    "009_fluxo_revisao_provas.sql",
+    "010_questao_comentada_completa.sql",
+    "011_listagem_lotes.sql",
+    "012_paginacao_questoes.sql",
+    "013_palavras_chave_minusculas.sql",
 ]
 
 
 def get_engine():
-    """Cria conexão com o banco de dados."""
-    return create_engine(settings.DATABASE_URL)
+    """
+    Engine do banco de dados (a mesma dos repositórios).
+    
+    Importar backend.repositories não carrega o CrewAI (os pacotes do
+    backend exportam sob demanda): as migrações só precisam do SQLAlchemy.
+    """
+    from backend.repositories.base import get_db_engine
+    return get_db_engine()
 
 
 def get_checksum(file_path: Path) -> str:
@@ -94,6 +105,10 @@ def execute_migration(engine, file_name: str, force: bool = False) -> bool:
             sql = f.read()
         
         with engine.connect() as conn:
+            # Migrações (ex.: criação de índices) não seguem o statement_timeout da aplicação
+            if engine.dialect.name == 'postgresql':
+                conn.execute(text("SET LOCAL statement_timeout = 0"))
+            
             # Executar em blocos separados por ;
             for statement in sql.split(';'):
                 statement = statement.strip()
@@ -7,6 +7,8 @@ Executa: pytest tests/test_embaralhamento_service.py -v
 import pytest
 import sys
 import os
+import json
+from array import array
 from collections import Counter
 
 # Adicionar diretório raiz ao path
@@ -17,8 +19,10 @@ from backend.services.embaralhamento_service import (
     ProvaEmbaralhada,
     MapeamentoQuestao,
     MapeamentoAlternativas,
+    QuestoesLote,
     TipoQuestao
 )
+from backend.services.questao_snapshot import QuestaoSnapshot
 
 
 class TestEmbaralhamentoBasico:
@@ -892,6 +896,170 @@ class TestProvaMista:
                     assert q["tipo_identificado"] == "multipla_escolha"
 
 
+class TestSnapshotsQuestao:
+    """Testes dos snapshots imutáveis compartilhados pelas variantes do lote."""
+    
+    @pytest.fixture
+    def service(self):
+        return EmbaralhamentoService(seed=42)
+    
+    @pytest.fixture
+    def questoes(self):
+        return [
+            {
+                "id": f"q{i}",
+                "enunciado": f"Enunciado longo da questão {i} " * 50,
+                "fontes_bibliograficas": [{"autor": "Autor", "titulo": f"Livro {i}"}],
+                "alternativas": [
+                    {"letra": letra, "texto": f"Texto {letra} " * 20, "correta": letra == "C"}
+                    for letra in "ABCDE"
+                ]
+            }
+            for i in range(1, 5)
+        ]
+    
+    def test_snapshot_imutavel(self, questoes):
+        """Testa que o snapshot não aceita alterações."""
+        snapshot = QuestaoSnapshot(questoes[0])
+        
+        assert snapshot.chave == ("q1", 1)
+        with pytest.raises(AttributeError):
+            snapshot.id = "outro"
+        with pytest.raises(TypeError):
+            snapshot.dados["enunciado"] = "outro"
+        with pytest.raises(TypeError):
+            snapshot.alternativas[0]["letra"] = "Z"
+    
+    def test_variantes_compartilham_textos(self, service, questoes):
+        """Testa que as variantes referenciam os textos do snapshot, sem copiá-los."""
+        provas = service.gerar_multiplas_provas(questoes, quantidade_alunos=5)
+        
+        for prova in provas:
+            for questao in prova.questoes:
+                original = questoes[int(questao["id"][1:]) - 1]
+                assert questao["enunciado"] is original["enunciado"]
+                assert questao["fontes_bibliograficas"] is original["fontes_bibliograficas"]
+                textos = {alt["texto"] for alt in original["alternativas"]}
+                assert all(alt["texto"] in textos for alt in questao["alternativas"])
+    
+    def test_questoes_originais_intactas(self, service, questoes):
+        """Testa que as letras novas não alteram as questões originais nem os snapshots."""
+        snapshots = QuestaoSnapshot.de_questoes(questoes)
+        
+        service.gerar_multiplas_provas(snapshots, quantidade_alunos=5)
+        service.embaralhar_questoes(questoes)
+        
+        for questao, snapshot in zip(questoes, snapshots):
+            assert [a["letra"] for a in questao["alternativas"]] == list("ABCDE")
+            assert [a["letra"] for a in snapshot.alternativas] == list("ABCDE")
+            assert "numero" not in questao
+    
+    def test_mesmo_resultado_com_dicts_ou_snapshots(self, questoes):
+        """Testa que a variante é a mesma partindo de dicts ou de snapshots."""
+        com_dicts = EmbaralhamentoService(seed=7).gerar_prova_embaralhada(questoes, 3)
+        com_snapshots = EmbaralhamentoService(seed=7).gerar_prova_embaralhada(
+            QuestaoSnapshot.de_questoes(questoes), 3
+        )
+        
+        assert com_dicts.questoes == com_snapshots.questoes
+        assert com_dicts.gabarito == com_snapshots.gabarito
+        assert com_dicts.hash_verificacao == com_snapshots.hash_verificacao
+
+
+class TestProvaCompacta:
+    """Testes da forma compacta da prova (ordem + permutações)."""
+    
+    @pytest.fixture
+    def service(self):
+        return EmbaralhamentoService(seed=42)
+    
+    @pytest.fixture
+    def questoes(self):
+        questoes = [
+            {
+                "id": f"q{i}",
+                "enunciado": f"Enunciado da questão {i} " * 30,
+                "alternativas": [
+                    {"letra": letra, "texto": f"Texto {letra}{i}", "correta": letra == "B"}
+                    for letra in "ABCDE"
+                ]
+            }
+            for i in range(1, 11)
+        ]
+        questoes.append({
+            "id": "assoc",
+            "tipo": "associacao",
+            "enunciado": "Associe",
+            "coluna_a": ["1", "2", "3"],
+            "coluna_b": ["x", "y", "z"],
+            "gabarito_associacao": {"1": 1, "2": 2, "3": 3}
+        })
+        questoes.append({"id": "diss", "tipo": "dissertativa", "enunciado": "Explique", "resposta": "Texto"})
+        return questoes
+    
+    def test_armazenamento_compacto(self, service, questoes):
+        """Testa que a prova guarda só índices e permutações em bytes."""
+        prova = service.gerar_prova_embaralhada(questoes, 1)
+        
+        assert isinstance(prova.lote, QuestoesLote)
+        assert isinstance(prova.ordem, array)
+        assert sorted(prova.ordem) == list(range(len(questoes)))
+        
+        for posicao, permutacao in enumerate(prova.permutacoes):
+            tipo = prova.lote.tipos[prova.ordem[posicao]]
+            if tipo == TipoQuestao.DISSERTATIVA:
+                assert permutacao is None
+            else:
+                assert isinstance(permutacao, bytes)
+    
+    def test_lote_compartilhado(self, service, questoes):
+        """Testa que todas as provas do lote apontam para as mesmas questões."""
+        provas = service.gerar_multiplas_provas(questoes, quantidade_alunos=5)
+        
+        assert all(prova.lote is provas[0].lote for prova in provas)
+    
+    def test_gabarito_derivado_confere_com_alternativas(self, service, questoes):
+        """Testa que o gabarito derivado aponta para a alternativa correta."""
+        for prova in service.gerar_multiplas_provas(questoes, quantidade_alunos=5):
+            for questao in prova.questoes:
+                if questao.get("alternativas"):
+                    correta = next(a["letra"] for a in questao["alternativas"] if a["correta"])
+                    assert prova.gabarito[str(questao["numero"])] == correta
+    
+    def test_ida_e_volta_compacta(self, service, questoes):
+        """Testa que para_compacto()/de_compacto() reconstroem a mesma prova."""
+        provas = service.gerar_multiplas_provas(questoes, quantidade_alunos=5)
+        
+        exportado = json.loads(json.dumps(service.exportar_variantes(provas)))
+        assert [q["id"] for q in exportado["questoes"]] == [q["id"] for q in questoes]
+        
+        for prova, dados in zip(provas, exportado["provas"]):
+            reconstruida = ProvaEmbaralhada.de_compacto(dados, prova.lote)
+            assert reconstruida.questoes == prova.questoes
+            assert reconstruida.gabarito == prova.gabarito
+            assert service.verificar_integridade(reconstruida, prova.hash_verificacao)
+    
+    def test_exportacao_menor_que_dict_completo(self, service, questoes):
+        """Testa que a exportação compacta é muito menor que converter_para_dict()."""
+        provas = service.gerar_multiplas_provas(questoes, quantidade_alunos=20)
+        
+        compacto = len(json.dumps(service.exportar_variantes(provas)))
+        completo = len(json.dumps([service.converter_para_dict(p) for p in provas]))
+        
+        assert compacto * 10 < completo
+    
+    def test_integridade_detecta_permutacao_alterada(self, service, questoes):
+        """Testa que alterar uma permutação muda o hash de verificação."""
+        prova = service.gerar_prova_embaralhada(questoes, 1)
+        posicao = next(i for i, p in enumerate(prova.permutacoes) if p is not None and p != bytes(sorted(p)))
+        
+        permutacoes = list(prova.permutacoes)
+        permutacoes[posicao] = bytes(sorted(permutacoes[posicao]))
+        prova.permutacoes = tuple(permutacoes)
+        
+        assert not service.verificar_integridade(prova, prova.hash_verificacao)
+
+
 if __name__ == "__main__":
     pytest.main([__file__, "-v"])
 
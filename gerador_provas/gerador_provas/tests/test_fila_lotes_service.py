@@ -0,0 +1,183 @@
+"""
+Testes para a Fila de Lotes (geração de provas em segundo plano).
+
+Executa: pytest tests/test_fila_lotes_service.py -v
+"""
+
+import pytest
+import sys
+import os
+import threading
+
+# Adicionar diretório raiz ao path
+sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
+
+from backend.services.fila_lotes_service import FilaLotesService, TarefaLote
+from backend.services.prova_individual_service import (
+    ProvaIndividualService,
+    ConfiguracaoProvaIndividual
+)
+
+
+def _questao(i: int) -> dict:
+    return {
+        "enunciado": f"Questão {i}",
+        "resposta": "A",
+        "materia": "fisica",
+        "dificuldade": "facil",
+        "alternativas": [
+            {"letra": "A", "texto": f"Certa {i}", "correta": True},
+            {"letra": "B", "texto": f"Errada {i}", "correta": False},
+            {"letra": "C", "texto": f"Outra {i}", "correta": False},
+        ]
+    }
+
+
+class TestFilaLotesService:
+    """Testes para o executor de lotes em segundo plano."""
+
+    @pytest.fixture
+    def service(self):
+        return ProvaIndividualService()
+
+    @pytest.fixture
+    def questoes_ids(self, service):
+        ids = []
+        for i in range(3):
+            q_id = service.revisao_service.adicionar_questao_para_revisao(_questao(i))
+            service.revisao_service.aprovar_questao(q_id)
+            ids.append(q_id)
+        return ids
+
+    @pytest.fixture
+    def fila(self, service):
+        return FilaLotesService(service, max_workers=1, persistir=False)
+
+    def test_submeter_retorna_imediatamente(self, fila, questoes_ids):
+        """Testa que submeter devolve o lote_id antes da geração terminar."""
+        liberar = threading.Event()
+        gerar_original = fila.prova_individual_service.gerar_provas_individuais
+
+        def gerar_bloqueado(*args, **kwargs):
+            liberar.wait(5)
+            return gerar_original(*args, **kwargs)
+
+        fila.prova_individual_service.gerar_provas_individuais = gerar_bloqueado
+
+        config = ConfiguracaoProvaIndividual(
+            titulo="Prova Fila",
+            questoes_ids=questoes_ids,
+            quantidade_alunos=4,
+            gerar_pdf=False,
+            gerar_zip=False
+        )
+        lote_id = fila.submeter(config)
+
+        progresso = fila.obter_progresso(lote_id)
+        assert progresso["status"] in ("na_fila", "gerando")
+        assert fila.obter_resultado(lote_id) is None
+
+        liberar.set()
+        resultado = fila.aguardar(lote_id, timeout=10)
+
+        assert resultado is not None
+        assert resultado.lote_id == lote_id
+        assert resultado.status == "concluido"
+
+    def test_progresso_final(self, fila, questoes_ids):
+        """Testa contagem de provas e percentual ao final do lote."""
+        config = ConfiguracaoProvaIndividual(
+            titulo="Prova Fila",
+            questoes_ids=questoes_ids,
+            quantidade_alunos=6,
+            gerar_pdf=False,
+            gerar_zip=False
+        )
+        lote_id = fila.submeter(config)
+        fila.aguardar(lote_id, timeout=10)
+
+        progresso = fila.obter_progresso(lote_id)
+        assert progresso["status"] == "concluido"
+        assert progresso["provas_concluidas"] == 6
+        assert progresso["total_provas"] == 6
+        assert progresso["percentual"] == 100.0
+        assert progresso["eta_seg"] == 0.0
+
+    def test_lote_com_erro(self, fila):
+        """Testa que erros do lote ficam registrados na tarefa."""
+        config = ConfiguracaoProvaIndividual(
+            titulo="Prova Fila",
+            questoes_ids=["inexistente"],
+            quantidade_alunos=3,
+            gerar_pdf=False,
+            gerar_zip=False
+        )
+        lote_id = fila.submeter(config)
+        fila.aguardar(lote_id, timeout=10)
+
+        progresso = fila.obter_progresso(lote_id)
+        assert progresso["status"] == "erro"
+        assert "Nenhuma questão" in progresso["erro"]
+
+    def test_registro_no_banco_feito_pelo_worker(self, service, questoes_ids):
+        """Testa que submeter() não grava no banco na thread da requisição."""
+        fila = FilaLotesService(service, max_workers=1, persistir=True)
+        threads = []
+        fila._persistir_criacao = lambda tarefa, config: threads.append(threading.current_thread().name)
+
+        config = ConfiguracaoProvaIndividual(
+            titulo="Prova Fila",
+            questoes_ids=questoes_ids,
+            quantidade_alunos=2,
+            gerar_pdf=False,
+            gerar_zip=False
+        )
+        fila.aguardar(fila.submeter(config), timeout=10)
+
+        assert len(threads) == 1
+        assert threads[0].startswith("lote-provas")
+
+    def test_lotes_finalizados_descartados_apos_retencao(self, service, questoes_ids):
+        """Testa que lotes finalizados saem da memória após o tempo de retenção."""
+        config = ConfiguracaoProvaIndividual(
+            titulo="Prova Fila",
+            questoes_ids=questoes_ids,
+            quantidade_alunos=2,
+            gerar_pdf=False,
+            gerar_zip=False
+        )
+
+        fila = FilaLotesService(service, max_workers=1, persistir=False, retencao_seg=3600)
+        lote_id = fila.submeter(config)
+        fila.aguardar(lote_id, timeout=10)
+        assert fila.obter_resultado(lote_id) is not None
+
+        fila.retencao_seg = 0
+        assert fila.obter_tarefa(lote_id) is None
+        assert fila.listar_tarefas() == []
+
+    def test_lote_desconhecido(self, fila):
+        """Testa consulta de lote inexistente."""
+        assert fila.obter_progresso("nao-existe") is None
+        assert fila.obter_resultado("nao-existe") is None
+
+
+class TestTarefaLote:
+    """Testes para o cálculo de progresso da tarefa."""
+
+    def test_eta_proporcional(self):
+        """Testa ETA com base na média por prova."""
+        from datetime import datetime, timedelta
+
+        tarefa = TarefaLote(lote_id="x", titulo="T", total=10, status="gerando")
+        tarefa.iniciado_em = datetime.now() - timedelta(seconds=20)
+        tarefa.concluidas = 4
+
+        eta = tarefa.calcular_eta_seg()
+        assert 29 <= eta <= 31
+        assert tarefa.to_dict()["percentual"] == 40.0
+
+    def test_eta_sem_progresso(self):
+        """Testa que ETA é desconhecido antes da primeira prova."""
+        tarefa = TarefaLote(lote_id="x", titulo="T", total=10)
+        assert tarefa.calcular_eta_seg() is None
@@ -278,6 +278,310 @@ class TestGeradorIA:
         assert result["enunciado"] == texto
 
 
+class TestCacheRespostasLLM:
+    """Testes para o cache persistente de respostas do LLM."""
+    
+    def _criar_cache(self, **kwargs):
+        import tempfile
+        from backend.utils.llm_cache import CacheRespostasLLM
+        caminho = os.path.join(tempfile.mkdtemp(), "cache.sqlite3")
+        return CacheRespostasLLM(caminho=caminho, habilitado=True, **kwargs)
+    
+    def test_chave_depende_de_modelo_prompt_temperatura(self):
+        """Testa que a chave muda com qualquer parte da chamada."""
+        from backend.utils.llm_cache import CacheRespostasLLM
+        
+        base = CacheRespostasLLM.gerar_chave("gemini/x", "prompt", 0.7)
+        assert base == CacheRespostasLLM.gerar_chave("gemini/x", "prompt", 0.7)
+        assert base != CacheRespostasLLM.gerar_chave("openai/x", "prompt", 0.7)
+        assert base != CacheRespostasLLM.gerar_chave("gemini/x", "outro", 0.7)
+        assert base != CacheRespostasLLM.gerar_chave("gemini/x", "prompt", 0.3)
+    
+    def test_segunda_chamada_usa_cache(self):
+        """Testa que a mesma chamada não é repetida."""
+        cache = self._criar_cache()
+        chamadas = []
+        
+        def gerar():
+            chamadas.append(1)
+            return '{"enunciado": "Q"}'
+        
+        r1 = cache.obter_ou_gerar("m", "p", 0.7, gerar)
+        r2 = cache.obter_ou_gerar("m", "p", 0.7, gerar)
+        
+        assert r1 == r2
+        assert len(chamadas) == 1
+        assert cache.acertos == 1
+    
+    def test_opt_out_por_chamada(self):
+        """Testa que usar_cache=False sempre chama a API."""
+        cache = self._criar_cache()
+        chamadas = []
+        
+        def gerar():
+            chamadas.append(1)
+            return "resposta"
+        
+        cache.obter_ou_gerar("m", "p", 0.7, gerar)
+        cache.obter_ou_gerar("m", "p", 0.7, gerar, usar_cache=False)
+        
+        assert len(chamadas) == 2
+    
+    def test_consultar_contabiliza_no_cache(self):
+        """Testa que consultar() conta acertos e falhas dentro do próprio cache."""
+        cache = self._criar_cache()
+        
+        chave, resposta = cache.consultar("m", "p", 0.7)
+        assert resposta is None
+        cache.salvar(chave, "resposta", "m")
+        assert cache.consultar("m", "p", 0.7) == (chave, "resposta")
+        
+        assert (cache.acertos, cache.falhas) == (1, 1)
+    
+    def test_expiracao_por_ttl(self):
+        """Testa que entradas expiradas não são retornadas."""
+        import time
+        cache = self._criar_cache(ttl_seg=1)
+        chave = cache.gerar_chave("m", "p", 0.7)
+        cache.salvar(chave, "resposta")
+        
+        assert cache.obter(chave) == "resposta"
+        
+        time.sleep(1.1)
+        assert cache.obter(chave) is None
+    
+    def test_limite_de_entradas(self):
+        """Testa que as entradas menos usadas são removidas."""
+        cache = self._criar_cache(max_entradas=2)
+        for i in range(3):
+            cache.salvar(cache.gerar_chave("m", f"p{i}", 0.7), f"r{i}")
+        
+        assert cache.obter_estatisticas()["entradas"] == 2
+        assert cache.obter(cache.gerar_chave("m", "p0", 0.7)) is None
+        assert cache.obter(cache.gerar_chave("m", "p2", 0.7)) == "r2"
+    
+    def test_cache_desabilitado(self):
+        """Testa que o cache desabilitado não grava nada."""
+        cache = self._criar_cache()
+        cache.habilitado = False
+        chave = cache.gerar_chave("m", "p", 0.7)
+        
+        assert cache.salvar(chave, "resposta") is False
+        assert cache.obter(chave) is None
+
+
+class TestGeracaoParalela:
+    """Testes para geração de múltiplas questões em paralelo."""
+    
+    def test_ordem_preservada_e_falhas_parciais(self, monkeypatch):
+        """Testa que a ordem é mantida e falhas não descartam as demais."""
+        import time
+        import backend.gerador_ia as gerador_ia
+        
+        def falso_gerar(disciplina, topico, dificuldade, observacoes, usar_cache=True):
+            indice = int(observacoes.split("Questão ")[1].split(" ")[0]) - 1
+            time.sleep(0.05 * (4 - indice))  # As primeiras terminam por último
+            if indice == 2:
+                raise ValueError("JSON inválido")
+            return {"enunciado": f"Q{indice}", "materia": disciplina}
+        
+        monkeypatch.setattr(gerador_ia, "gerar_questao_direta", falso_gerar)
+        
+        questoes = gerador_ia.gerar_multiplas_paralelo("farmacologia", 4, max_concorrencia=4)
+        
+        assert len(questoes) == 4
+        assert [q.get("enunciado") for q in questoes] == ["Q0", "Q1", None, "Q3"]
+        assert questoes[2]["erro"] == "JSON inválido"
+        assert questoes[2]["indice"] == 2
+    
+    def test_respeita_limite_de_concorrencia(self, monkeypatch):
+        """Testa que no máximo max_concorrencia chamadas rodam ao mesmo tempo."""
+        import time
+        import threading
+        import backend.gerador_ia as gerador_ia
+        
+        ativas = []
+        pico = []
+        lock = threading.Lock()
+        
+        def falso_gerar(disciplina, topico, dificuldade, observacoes, usar_cache=True):
+            with lock:
+                ativas.append(1)
+                pico.append(len(ativas))
+            time.sleep(0.02)
+            with lock:
+                ativas.pop()
+            return {"enunciado": "Q"}
+        
+        monkeypatch.setattr(gerador_ia, "gerar_questao_direta", falso_gerar)
+        
+        questoes = gerador_ia.gerar_multiplas_paralelo("anatomia", 10, max_concorrencia=3)
+        
+        assert len(questoes) == 10
+        assert max(pico) <= 3
+    
+    def test_limitador_taxa_espaca_chamadas(self):
+        """Testa que o limitador espaça as requisições."""
+        from backend.llm_config import LimitadorTaxa
+        
+        limitador = LimitadorTaxa(requisicoes_por_minuto=1200)  # 50ms entre chamadas
+        assert limitador.aguardar() == 0.0
+        assert limitador.aguardar() > 0.0
+    
+    def test_limitador_sem_limite(self):
+        """Testa que rpm=0 não espera."""
+        from backend.llm_config import LimitadorTaxa
+        
+        limitador = LimitadorTaxa(0)
+        assert limitador.aguardar() == 0.0
+        assert limitador.aguardar() == 0.0
+
+
+class TestClienteLLM:
+    """Testes para o cliente compartilhado de chamadas diretas ao LLM."""
+    
+    def test_resolver_modelo_por_provider(self):
+        """Testa o formato LiteLLM do nome do modelo."""
+        from backend.llm_config import resolver_modelo_litellm
+        
+        assert resolver_modelo_litellm("gemini", "gemini-2.0-flash")[1] == "gemini/gemini-2.0-flash"
+        assert resolver_modelo_litellm("openai", "gpt-4o-mini")[1] == "gpt-4o-mini"
+        assert resolver_modelo_litellm("anthropic", "claude-3-haiku")[1] == "anthropic/claude-3-haiku"
+        assert resolver_modelo_litellm("ollama", "llama3.2") == ("ollama", "ollama/llama3.2", None)
+    
+    def test_completar_usa_acompletion(self, monkeypatch):
+        """Testa a fachada síncrona sobre litellm.acompletion."""
+        import tempfile
+        import litellm
+        from types import SimpleNamespace
+        import backend.utils.llm_cache as llm_cache
+        from backend.llm_config import ClienteLLM
+        
+        monkeypatch.setattr(llm_cache, "_llm_cache_global", llm_cache.CacheRespostasLLM(
+            caminho=os.path.join(tempfile.mkdtemp(), "cache.sqlite3"), habilitado=True
+        ))
+        
+        chamadas = []
+        
+        async def falso_acompletion(**kwargs):
+            chamadas.append(kwargs)
+            mensagem = SimpleNamespace(content='{"enunciado": "Q"}')
+            return SimpleNamespace(choices=[SimpleNamespace(message=mensagem)])
+        
+        monkeypatch.setattr(litellm, "acompletion", falso_acompletion)
+        
+        cliente = ClienteLLM("ollama", "llama3.2", timeout=5)
+        assert cliente.completar("prompt", temperatura=0.3) == '{"enunciado": "Q"}'
+        assert cliente.completar("prompt", temperatura=0.3) == '{"enunciado": "Q"}'
+        
+        # Segunda chamada vem do cache
+        assert len(chamadas) == 1
+        assert chamadas[0]["model"] == "ollama/llama3.2"
+        assert chamadas[0]["timeout"] == 5
+        assert chamadas[0]["temperature"] == 0.3
+        assert (llm_cache._llm_cache_global.acertos, llm_cache._llm_cache_global.falhas) == (1, 1)
+    
+    def test_cache_fora_do_event_loop(self, monkeypatch):
+        """Testa que as leituras/gravações no cache SQLite não rodam no event loop."""
+        import tempfile
+        import threading
+        import litellm
+        from types import SimpleNamespace
+        import backend.utils.llm_cache as llm_cache
+        from backend.llm_config import ClienteLLM
+        
+        cache = llm_cache.CacheRespostasLLM(
+            caminho=os.path.join(tempfile.mkdtemp(), "cache.sqlite3"), habilitado=True
+        )
+        monkeypatch.setattr(llm_cache, "_llm_cache_global", cache)
+        
+        threads = []
+        obter, salvar = cache.obter, cache.salvar
+        monkeypatch.setattr(cache, "obter", lambda *a: threads.append(threading.current_thread().name) or obter(*a))
+        monkeypatch.setattr(cache, "salvar", lambda *a: threads.append(threading.current_thread().name) or salvar(*a))
+        
+        async def falso_acompletion(**kwargs):
+            mensagem = SimpleNamespace(content="resposta")
+            return SimpleNamespace(choices=[SimpleNamespace(message=mensagem)])
+        
+        monkeypatch.setattr(litellm, "acompletion", falso_acompletion)
+        
+        cliente = ClienteLLM("ollama", "llama3.2", timeout=5)
+        assert cliente.completar("prompt") == "resposta"
+        
+        assert len(threads) == 2
+        assert "cliente-llm" not in threads
+
+    
+    def test_stream_cancelado_quando_consumidor_para(self):
+        """Testa que fechar o gerador cancela a chamada em andamento."""
+        import asyncio
+        import threading
+        from backend.llm_config import ClienteLLM
+        
+        encerrado = threading.Event()
+        
+        class ClienteFalso(ClienteLLM):
+            async def astream(self, prompt, temperatura=0.7, usar_cache=True):
+                try:
+                    while True:
+                        yield "parte "
+                        await asyncio.sleep(0)
+                finally:
+                    encerrado.set()
+        
+        cliente = ClienteFalso("ollama", "llama3.2", timeout=5)
+        partes = cliente.stream("prompt")
+        assert next(partes) == "parte "
+        partes.close()
+        
+        assert encerrado.wait(timeout=5)
+    
+    def test_stream_sem_resposta_levanta_tempo_esgotado(self):
+        """Testa que a espera por partes vira TempoEsgotadoLLM, não queue.Empty."""
+        import asyncio
+        from backend.llm_config import ClienteLLM, TempoEsgotadoLLM
+        
+        class ClienteFalso(ClienteLLM):
+            async def astream(self, prompt, temperatura=0.7, usar_cache=True):
+                await asyncio.sleep(3600)
+                yield "nunca"
+        
+        cliente = ClienteFalso("ollama", "llama3.2")
+        cliente.timeout = -59.9  # Espera de 0,1s pela próxima parte (timeout + 60)
+        with pytest.raises(TempoEsgotadoLLM):
+            list(cliente.stream("prompt"))
+
+
+class TestDetectorJSONIncremental:
+    """Testes para a detecção do fim do JSON durante o streaming."""
+    
+    def test_detecta_fechamento_em_partes(self):
+        """Testa que o objeto é retornado quando a última chave fecha."""
+        from backend.gerador_ia import DetectorJSONIncremental
+        
+        detector = DetectorJSONIncremental()
+        partes = ['Aqui está:\n```json\n{"enunciado": "Qual ', 'o {efeito}?", ', '"dados": {"a": 1}', '}\n```']
+        resultados = [detector.alimentar(p) for p in partes]
+        
+        assert resultados[:3] == [None, None, None]
+        assert resultados[3] == '{"enunciado": "Qual o {efeito}?", "dados": {"a": 1}}'
+        assert detector.concluido
+    
+    def test_ignora_aspas_escapadas(self):
+        """Testa strings com aspas e chaves escapadas."""
+        import json
+        from backend.gerador_ia import DetectorJSONIncremental
+        
+        detector = DetectorJSONIncremental()
+        texto = json.dumps({"enunciado": 'Dose "alta" } de {x}'})
+        resultado = None
+        for c in texto:
+            resultado = detector.alimentar(c) or resultado
+        
+        assert json.loads(resultado)["enunciado"] == 'Dose "alta" } de {x}'
+
+
 class TestIntegracaoMainCrewai:
     """Testes de integração com main_crewai."""
     
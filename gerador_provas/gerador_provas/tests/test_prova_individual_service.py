@@ -10,6 +10,8 @@ import os
 import tempfile
 import shutil
 
+from sqlalchemy.exc import OperationalError, ProgrammingError
+
 # Adicionar diretório raiz ao path
 sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
 
@@ -441,6 +443,235 @@ class TestIntegracaoCompleta:
             assert len(dados["gabarito"]) == 2
 
 
+class _LoteRepositoryFake:
+    """Repositório de lotes em memória."""
+    
+    def __init__(self, lote_existente=None, lotes=None, erro=None):
+        from sqlalchemy import create_engine
+        self.engine = create_engine("sqlite://")
+        self.lote_existente = lote_existente
+        self.lotes = lotes or []
+        self.erro = erro
+        self.criados = []
+        self.registros = []
+        self.finalizados = []
+        self.provas_alunos = []
+        self.chamadas_listagem = []
+    
+    def buscar_lote_por_id(self, lote_id):
+        return self.lote_existente
+    
+    def buscar_lote_por_nome(self, nome):
+        return self.lote_existente
+    
+    def criar_lote(self, **kwargs):
+        self.criados.append(kwargs)
+        return kwargs["lote_id"]
+    
+    def registrar_provas_alunos(self, **kwargs):
+        self.registros.append(kwargs)
+        return len(kwargs["provas"])
+    
+    def finalizar_lote(self, **kwargs):
+        self.finalizados.append(kwargs)
+        return True
+    
+    def listar_lotes(self, limite=20, antes_de=None):
+        if self.erro:
+            raise self.erro
+        self.chamadas_listagem.append((limite, antes_de))
+        return self.lotes[:limite]
+    
+    def buscar_provas_alunos(self, prova_base_id):
+        return self.provas_alunos
+
+
+class _ProvaRepositoryFake:
+    """Repositório de provas em memória."""
+    
+    def __init__(self):
+        self.criadas = []
+    
+    def criar_prova(self, titulo, **kwargs):
+        self.criadas.append(titulo)
+        return "prova-base-1"
+
+
+class TestPersistenciaLotes:
+    """Testes para o registro dos lotes em provas.lotes_prova / provas_alunos."""
+    
+    @pytest.fixture
+    def service(self):
+        service = ProvaIndividualService()
+        service._prova_repository = _ProvaRepositoryFake()
+        return service
+    
+    @pytest.fixture
+    def questoes_ids(self, service):
+        ids = []
+        for i in range(3):
+            q_id = service.revisao_service.adicionar_questao_para_revisao({
+                "enunciado": f"Questão {i}",
+                "resposta": "A",
+                "materia": "fisica",
+                "dificuldade": "facil",
+                "alternativas": [
+                    {"letra": "A", "texto": f"Certa {i}", "correta": True},
+                    {"letra": "B", "texto": f"Errada {i}", "correta": False},
+                ]
+            })
+            service.revisao_service.aprovar_questao(q_id)
+            ids.append(q_id)
+        return ids
+    
+    def _config(self, questoes_ids, alunos=4):
+        return ConfiguracaoProvaIndividual(
+            titulo="Prova Persistida",
+            questoes_ids=questoes_ids,
+            quantidade_alunos=alunos,
+            gerar_pdf=False,
+            gerar_zip=False
+        )
+    
+    def test_registra_lote_e_mapeamentos(self, service, questoes_ids):
+        """Testa que o lote e os mapeamentos dos alunos vão para o banco de uma vez."""
+        repo = _LoteRepositoryFake()
+        service._lote_repository = repo
+        
+        resultado = service.gerar_provas_individuais(self._config(questoes_ids, alunos=4))
+        
+        assert resultado.status == "concluido"
+        assert service._prova_repository.criadas == ["Prova Persistida"]
+        assert repo.criados[0]["lote_id"] == resultado.lote_id
+        
+        assert len(repo.registros) == 1
+        registro = repo.registros[0]
+        assert registro["prova_base_id"] == "prova-base-1"
+        assert os.path.isdir(registro["diretorio"])
+        assert os.path.basename(registro["diretorio"]) == registro["nome"]
+        
+        provas = registro["provas"]
+        assert [p["numero_aluno"] for p in provas] == [1, 2, 3, 4]
+        for prova, prova_dict in zip(provas, resultado.provas_alunos):
+            assert prova["codigo_prova"] == prova_dict["codigo_prova"]
+            assert prova["gabarito"] == prova_dict["gabarito"]
+            assert len(prova["ordem_questoes"]) == 3
+            assert {"questao_id", "posicao_original", "nova_posicao"} <= set(prova["ordem_questoes"][0])
+        
+        assert repo.finalizados[0]["status"] == "concluido"
+    
+    def test_lote_da_fila_reaproveita_registro(self, service, questoes_ids):
+        """Testa que lotes criados pela fila não geram outra prova base."""
+        repo = _LoteRepositoryFake(lote_existente={"id": "lote-1", "prova_base_id": "base-fila"})
+        service._lote_repository = repo
+        
+        service.gerar_provas_individuais(self._config(questoes_ids), lote_id="lote-1")
+        
+        assert service._prova_repository.criadas == []
+        assert repo.criados == []
+        assert repo.finalizados == []
+        assert repo.registros[0]["prova_base_id"] == "base-fila"
+    
+    def test_sem_persistencia(self, questoes_ids, service):
+        """Testa que persistir=False não toca o banco."""
+        repo = _LoteRepositoryFake()
+        service._lote_repository = repo
+        service.persistir = False
+        
+        resultado = service.gerar_provas_individuais(self._config(questoes_ids))
+        
+        assert resultado.status == "concluido"
+        assert repo.registros == []
+    
+    def test_listar_lotes_pelo_banco(self, service):
+        """Testa listagem paginada a partir de provas.lotes_prova."""
+        from datetime import datetime
+        
+        repo = _LoteRepositoryFake(lotes=[
+            {
+                "id": "lote-2", "nome": "prova_b", "titulo": "Prova B", "status": "concluido",
+                "provas_geradas": 30, "diretorio": "/tmp/prova_b", "caminho_zip": None,
+                "created_at": datetime(2024, 12, 20, 10, 30)
+            }
+        ])
+        service._lote_repository = repo
+        
+        antes_de = "9a1c1b3e-5f55-4d2a-9a43-0c4bd1e1f001"
+        lotes = service.listar_lotes(limite=5, antes_de=antes_de.upper())
+        
+        assert repo.chamadas_listagem == [(5, antes_de)]
+        assert lotes == [{
+            "lote_id": "lote-2",
+            "nome": "prova_b",
+            "titulo": "Prova B",
+            "status": "concluido",
+            "quantidade_provas": 30,
+            "diretorio": "/tmp/prova_b",
+            "caminho_zip": None,
+            "data_criacao": "20/12/2024 10:30"
+        }]
+    
+    def test_listar_lotes_sem_banco(self, service):
+        """Testa que sem banco a listagem varre o diretório de saída."""
+        service._lote_repository = _LoteRepositoryFake(
+            erro=OperationalError("SELECT", {}, Exception("sem banco"))
+        )
+        service.output_dir = tempfile.mkdtemp()
+        try:
+            lote_dir = os.path.join(service.output_dir, "prova_antiga")
+            os.makedirs(lote_dir)
+            with open(os.path.join(lote_dir, "gabarito_consolidado.json"), "w") as f:
+                f.write('{"A01": {}, "A02": {}}')
+            
+            lotes = service.listar_lotes()
+            
+            assert [l["nome"] for l in lotes] == ["prova_antiga"]
+            assert lotes[0]["quantidade_provas"] == 2
+            
+            # Com cursor, o diretório não tem página seguinte (não volta à primeira)
+            assert service.listar_lotes(antes_de="9a1c1b3e-5f55-4d2a-9a43-0c4bd1e1f001") == []
+        finally:
+            shutil.rmtree(service.output_dir, ignore_errors=True)
+    
+    def test_listar_lotes_cursor_invalido(self, service):
+        """Testa que antes_de que não é UUID levanta ValueError, sem consultar o banco."""
+        repo = _LoteRepositoryFake()
+        service._lote_repository = repo
+        
+        with pytest.raises(ValueError):
+            service.listar_lotes(antes_de="lote-9")
+        assert repo.chamadas_listagem == []
+    
+    def test_listar_lotes_erro_de_sql_sobe(self, service):
+        """Testa que só falhas de conexão caem no diretório; outros erros do banco sobem."""
+        service._lote_repository = _LoteRepositoryFake(
+            erro=ProgrammingError("SELECT", {}, Exception("LIMIT must not be negative"))
+        )
+        
+        with pytest.raises(ProgrammingError):
+            service.listar_lotes()
+    
+    def test_estatisticas_lote_pelo_banco(self, service):
+        """Testa estatísticas montadas a partir de provas.provas_alunos."""
+        repo = _LoteRepositoryFake(lote_existente={"id": "lote-1", "prova_base_id": "base-1"})
+        repo.provas_alunos = [
+            {"numero_aluno": 1, "codigo_prova": "A01", "gabarito": {"1": "B"},
+             "hash_verificacao": "h1", "caminho_pdf": "/p/A01.pdf", "caminho_gabarito": "/g/A01.pdf"},
+            {"numero_aluno": 2, "codigo_prova": "A02", "gabarito": {"1": "A"},
+             "hash_verificacao": "h2", "caminho_pdf": None, "caminho_gabarito": None},
+        ]
+        service._lote_repository = repo
+        
+        estatisticas = service.obter_estatisticas_lote("prova_x")
+        
+        assert estatisticas["quantidade_versoes"] == 2
+        assert estatisticas["provas_pdf"] == 1
+        assert estatisticas["gabaritos_pdf"] == 1
+        assert estatisticas["gabarito_consolidado"]["A02"] == {
+            "numero_aluno": 2, "gabarito": {"1": "A"}, "hash": "h2"
+        }
+
+
 class TestProvaProfessor:
     """Testes para a geração da prova do professor (mestre comentada)."""
     
@@ -0,0 +1,791 @@
+"""
+Testes para os repositórios (SQLite em memória no lugar do PostgreSQL).
+
+Executa: pytest tests/test_repositories.py -v
+"""
+
+import pytest
+import sys
+import os
+
+# Adicionar diretório raiz ao path
+sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
+
+from sqlalchemy import create_engine, event, text
+from sqlalchemy.pool import StaticPool
+
+from backend.repositories.base import BaseRepository, unidade_de_trabalho
+from backend.repositories.questao_repository import QuestaoRepository, CacheDominio
+from backend.repositories.prova_repository import ProvaRepository
+from backend.repositories.revisao_repository import RevisaoRepository
+from backend.repositories.paginacao import (
+    CursorInvalido,
+    codificar_cursor,
+    decodificar_cursor
+)
+
+
+TABELAS = [
+    """CREATE TABLE provas.questoes (
+        id TEXT PRIMARY KEY, materia_id TEXT, topico_id TEXT, tipo TEXT,
+        dificuldade TEXT, codigo TEXT, enunciado TEXT, status TEXT,
+        criado_por TEXT, enunciado_complementar TEXT, pontuacao REAL,
+        tempo_estimado_min INT, fonte TEXT, palavras_chave TEXT,
+        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP, deleted_at TEXT,
+        ano_referencia INT, vezes_usada INT, taxa_acerto REAL, revisado_por TEXT,
+        aprovado_por TEXT, updated_at TEXT, professor_id TEXT, aprovada_em TEXT,
+        fontes_bibliograficas TEXT, versao_atual INT, observacoes_professor TEXT,
+        alternativas_comentadas TEXT, explicacao_geral TEXT,
+        resolucao_passo_a_passo TEXT, erros_comuns TEXT, dicas_correcao TEXT,
+        criterios_correcao TEXT, pontos_chave TEXT, nivel_cognitivo TEXT
+    )""",
+    """CREATE TABLE provas.resolucoes (
+        id TEXT PRIMARY KEY, questao_id TEXT REFERENCES questoes(id),
+        resposta_curta TEXT, resposta_completa TEXT, passos TEXT,
+        formulas TEXT, dicas TEXT, erros_comuns TEXT, metodo_resolucao TEXT
+    )""",
+    """CREATE TABLE provas.diagramas (
+        id TEXT PRIMARY KEY, questao_id TEXT, nome_arquivo TEXT, caminho TEXT,
+        tipo_arquivo TEXT, tamanho_bytes INT, tipo_diagrama TEXT, titulo TEXT,
+        descricao TEXT, alt_text TEXT, parametros_geracao TEXT, posicao TEXT
+    )""",
+    """CREATE TABLE provas.materias (
+        id TEXT PRIMARY KEY, codigo TEXT, nome TEXT, deleted_at TEXT
+    )""",
+    """CREATE TABLE provas.topicos (
+        id TEXT PRIMARY KEY, materia_id TEXT, codigo TEXT, nome TEXT, deleted_at TEXT
+    )""",
+    """CREATE TABLE provas.prova_questoes (
+        id TEXT PRIMARY KEY, prova_id TEXT, questao_id TEXT,
+        numero INT, pontuacao REAL
+    )""",
+]
+
+
+@pytest.fixture
+def engine():
+    """Engine SQLite com o schema "provas" anexado."""
+    engine = create_engine("sqlite://", poolclass=StaticPool)
+    with engine.begin() as conn:
+        conn.execute(text("ATTACH DATABASE ':memory:' AS provas"))
+        for ddl in TABELAS:
+            conn.execute(text(ddl))
+    return engine
+
+
+@pytest.fixture
+def instrucoes(engine):
+    """Registra as instruções enviadas ao driver (round trips)."""
+    registradas = []
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def _registrar(conn, cursor, statement, parameters, context, executemany):
+        registradas.append((statement, executemany))
+
+    return registradas
+
+
+def _repositorio(classe, engine):
+    repo = classe()
+    repo.engine = engine
+    return repo
+
+
+def _contar(engine, tabela: str) -> int:
+    with engine.connect() as conn:
+        return conn.execute(text(f"SELECT COUNT(*) FROM provas.{tabela}")).scalar()
+
+
+class TestInsercaoEmLote:
+    """Testes para execute_many / execute_batch / bulk_insert."""
+
+    def test_bulk_insert_uma_instrucao(self, engine, instrucoes):
+        """Testa que 50 linhas vão em uma única instrução."""
+        repo = _repositorio(BaseRepository, engine)
+        linhas = [
+            {"id": f"pq{i}", "prova_id": "p1", "questao_id": f"q{i}", "numero": i, "pontuacao": 1.0}
+            for i in range(50)
+        ]
+
+        assert repo.bulk_insert("prova_questoes", linhas) == 50
+        assert _contar(engine, "prova_questoes") == 50
+        assert len([s for s, _ in instrucoes if s.startswith("INSERT")]) == 1
+
+    def test_bulk_insert_vazio(self, engine, instrucoes):
+        """Testa que lista vazia não toca o banco."""
+        repo = _repositorio(BaseRepository, engine)
+        assert repo.bulk_insert("prova_questoes", []) == 0
+        assert instrucoes == []
+
+    def test_execute_many(self, engine):
+        """Testa executemany com vários conjuntos de parâmetros."""
+        repo = _repositorio(BaseRepository, engine)
+        query = "INSERT INTO provas.prova_questoes (id, numero) VALUES (:id, :numero)"
+
+        assert repo.execute_many(query, [{"id": "a", "numero": 1}, {"id": "b", "numero": 2}]) == 2
+        assert _contar(engine, "prova_questoes") == 2
+
+    def test_execute_batch_atomico(self, engine):
+        """Testa que uma falha no lote desfaz as instruções anteriores."""
+        repo = _repositorio(BaseRepository, engine)
+        query = "INSERT INTO provas.prova_questoes (id) VALUES (:id)"
+
+        with pytest.raises(Exception):
+            repo.execute_batch([(query, {"id": "x"}), (query, {"id": "x"})])
+
+        assert _contar(engine, "prova_questoes") == 0
+
+    def test_adicionar_questoes_prova(self, engine, instrucoes):
+        """Testa a associação das questões da prova em um INSERT."""
+        repo = _repositorio(ProvaRepository, engine)
+        questoes = [{"id": f"q{i}", "numero": i + 1} for i in range(5)]
+
+        ids = repo.adicionar_questoes_prova("p1", questoes)
+
+        assert len(ids) == 5
+        with engine.connect() as conn:
+            numeros = conn.execute(text(
+                "SELECT numero FROM provas.prova_questoes ORDER BY numero"
+            )).scalars().all()
+        assert numeros == [1, 2, 3, 4, 5]
+        assert len([s for s, _ in instrucoes if s.startswith("INSERT")]) == 1
+
+    def test_criar_questao_completa(self, engine, instrucoes):
+        """Testa questão + resolução + diagrama em uma transação."""
+        repo = _repositorio(QuestaoRepository, engine)
+        commits = []
+        event.listen(engine, "commit", lambda conn: commits.append(conn))
+
+        questao_id = repo.criar_questao_completa(
+            questao={"materia_id": "m1", "enunciado": "Quanto é 2 + 2?"},
+            resolucao={"resposta_curta": "4"},
+            diagrama={"nome_arquivo": "d.png", "caminho": "/nao/existe/d.png"}
+        )
+
+        with engine.connect() as conn:
+            resolucao = conn.execute(text(
+                "SELECT questao_id, resposta_curta FROM provas.resolucoes"
+            )).one()
+        assert tuple(resolucao) == (questao_id, "4")
+        assert _contar(engine, "diagramas") == 1
+        assert len(commits) == 1
+
+
+class TestUnidadeDeTrabalho:
+    """Testes para a transação compartilhada entre repositórios."""
+
+    @pytest.fixture
+    def commits(self, engine):
+        registrados = []
+        event.listen(engine, "commit", lambda conn: registrados.append(conn))
+        return registrados
+
+    def test_commit_unico(self, engine, commits):
+        """Testa que questão, resolução e associação à prova fazem um só commit."""
+        questoes = _repositorio(QuestaoRepository, engine)
+        provas = _repositorio(ProvaRepository, engine)
+
+        with unidade_de_trabalho(engine):
+            questao_id = questoes.criar_questao(materia_id="m1", enunciado="Enunciado")
+            questoes.criar_resolucao(questao_id, resposta_curta="42")
+            provas.adicionar_questoes_prova("p1", [{"id": questao_id, "numero": 1}])
+
+        assert len(commits) == 1
+        assert _contar(engine, "questoes") == 1
+        assert _contar(engine, "resolucoes") == 1
+        assert _contar(engine, "prova_questoes") == 1
+
+    def test_rollback_sem_linhas_orfas(self, engine):
+        """Testa que uma falha desfaz as escritas anteriores do bloco."""
+        questoes = _repositorio(QuestaoRepository, engine)
+
+        with pytest.raises(RuntimeError):
+            with unidade_de_trabalho(engine):
+                questoes.criar_questao(materia_id="m1", enunciado="Enunciado")
+                raise RuntimeError("falha no diagrama")
+
+        assert _contar(engine, "questoes") == 0
+
+    def test_leitura_ve_escritas_do_bloco(self, engine):
+        """Testa que consultas dentro do bloco enxergam o que ainda não foi confirmado."""
+        questoes = _repositorio(QuestaoRepository, engine)
+
+        with unidade_de_trabalho(engine):
+            questao_id = questoes.criar_questao(materia_id="m1", enunciado="Enunciado")
+            linhas = questoes.execute_query(
+                "SELECT enunciado FROM provas.questoes WHERE id = :id", {"id": questao_id}
+            )
+
+        assert linhas == [{"enunciado": "Enunciado"}]
+
+    def test_blocos_aninhados(self, engine, commits):
+        """Testa que blocos aninhados participam da transação externa."""
+        questoes = _repositorio(QuestaoRepository, engine)
+
+        with unidade_de_trabalho(engine) as externa:
+            with unidade_de_trabalho(engine) as interna:
+                assert interna is externa
+                questoes.criar_questao_completa(
+                    questao={"materia_id": "m1", "enunciado": "E"},
+                    resolucao={"resposta_curta": "R"}
+                )
+            assert commits == []
+
+        assert len(commits) == 1
+
+    def test_fora_do_bloco_commit_por_operacao(self, engine, commits):
+        """Testa que, sem unidade de trabalho, cada escrita confirma sozinha."""
+        questoes = _repositorio(QuestaoRepository, engine)
+
+        questao_id = questoes.criar_questao(materia_id="m1", enunciado="Enunciado")
+        questoes.criar_resolucao(questao_id, resposta_curta="42")
+
+        assert len(commits) == 2
+
+
+class TestCacheDominio:
+    """Testes para o cache de IDs de matérias e tópicos."""
+
+    @pytest.fixture
+    def cache(self, engine, monkeypatch):
+        with engine.begin() as conn:
+            conn.execute(text(
+                "INSERT INTO provas.materias (id, codigo) VALUES ('m-fis', 'FIS'), ('m-qui', 'QUI')"
+            ))
+            conn.execute(text(
+                "INSERT INTO provas.topicos (id, materia_id, codigo) VALUES ('t-mru', 'm-fis', 'MRU')"
+            ))
+        cache = CacheDominio(ttl_seg=3600)
+        monkeypatch.setattr("backend.repositories.questao_repository.cache_dominio", cache)
+        return cache
+
+    def _selects(self, instrucoes):
+        return [s for s, _ in instrucoes if s.lstrip().startswith("SELECT")]
+
+    def test_consultas_usam_cache(self, engine, cache, instrucoes):
+        """Testa que, após a carga, as consultas não vão ao banco."""
+        repo = _repositorio(QuestaoRepository, engine)
+
+        assert repo.obter_materia_id_por_codigo("fis") == "m-fis"
+        carga = len(self._selects(instrucoes))
+
+        for _ in range(10):
+            assert repo.obter_materia_id_por_codigo("QUI") == "m-qui"
+            assert repo.obter_topico_id_por_codigo("m-fis", "mru") == "t-mru"
+
+        assert carga == 2
+        assert len(self._selects(instrucoes)) == carga
+
+    def test_codigo_novo_buscado_no_banco(self, engine, cache):
+        """Testa que códigos ausentes do cache são buscados e acrescentados."""
+        repo = _repositorio(QuestaoRepository, engine)
+        repo.precarregar_dominio()
+
+        with engine.begin() as conn:
+            conn.execute(text("INSERT INTO provas.materias (id, codigo) VALUES ('m-mat', 'MAT')"))
+
+        assert repo.obter_materia_id_por_codigo("MAT") == "m-mat"
+        assert cache.materias["MAT"] == "m-mat"
+        assert repo.obter_materia_id_por_codigo("XYZ") is None
+
+    def test_invalidar_recarrega(self, engine, cache):
+        """Testa que invalidar() descarta IDs que mudaram no banco."""
+        repo = _repositorio(QuestaoRepository, engine)
+        repo.precarregar_dominio()
+
+        with engine.begin() as conn:
+            conn.execute(text("UPDATE provas.materias SET id = 'm-fis-2' WHERE codigo = 'FIS'"))
+
+        assert repo.obter_materia_id_por_codigo("FIS") == "m-fis"
+        cache.invalidar()
+        assert repo.obter_materia_id_por_codigo("FIS") == "m-fis-2"
+
+    def test_ttl_expirado(self, engine, cache):
+        """Testa a recarga quando o TTL vence."""
+        repo = _repositorio(QuestaoRepository, engine)
+        cache.ttl_seg = 0.01
+        repo.precarregar_dominio()
+
+        assert not cache.expirado()
+        import time
+        time.sleep(0.02)
+        assert cache.expirado()
+
+    def test_precarregar_sem_banco(self, cache):
+        """Testa que a pré-carga sem banco não quebra a inicialização."""
+        repo = _repositorio(QuestaoRepository, create_engine("sqlite://"))
+        assert repo.precarregar_dominio() is False
+        assert cache.expirado()
+
+
+class TestPaginacaoCursor:
+    """Testes para a paginação por chave (created_at, id) do banco de questões."""
+
+    @pytest.fixture
+    def repo(self, engine):
+        from datetime import datetime, timedelta
+
+        inicio = datetime(2024, 1, 1, 8, 0, 0)
+        linhas = [
+            {
+                "id": f"q{i:03d}",
+                "materia_id": "m-fis" if i % 2 else "m-qui",
+                "enunciado": f"Questão {i}",
+                "status": "aprovada",
+                # Pares de questões com o mesmo created_at (desempate pelo id)
+                "created_at": inicio + timedelta(minutes=i // 2)
+            }
+            for i in range(25)
+        ]
+        with engine.begin() as conn:
+            conn.execute(text(
+                "INSERT INTO provas.questoes (id, materia_id, enunciado, status, created_at) "
+                "VALUES (:id, :materia_id, :enunciado, :status, :created_at)"
+            ), linhas)
+        return _repositorio(QuestaoRepository, engine)
+
+    def test_percorre_todas_sem_repetir(self, repo):
+        """Testa que as páginas cobrem todas as questões, em ordem, sem repetições."""
+        vistos, cursor = [], None
+        while True:
+            pagina = repo.buscar_questoes_pagina(limite=7, cursor=cursor)
+            vistos.extend(q["id"] for q in pagina["questoes"])
+            cursor = pagina["proximo_cursor"]
+            if not cursor:
+                break
+
+        assert vistos == [f"q{i:03d}" for i in reversed(range(25))]
+
+    def test_ultima_pagina_sem_cursor(self, repo):
+        """Testa que a página que esgota os resultados não traz cursor."""
+        pagina = repo.buscar_questoes_pagina(limite=25)
+        assert len(pagina["questoes"]) == 25
+        assert pagina["proximo_cursor"] is None
+
+    def test_cursor_com_filtro(self, repo):
+        """Testa paginação combinada com filtro de matéria."""
+        primeira = repo.buscar_questoes_pagina(materia_id="m-fis", limite=5)
+        segunda = repo.buscar_questoes_pagina(
+            materia_id="m-fis", limite=5, cursor=primeira["proximo_cursor"]
+        )
+
+        ids = [q["id"] for q in primeira["questoes"] + segunda["questoes"]]
+        assert ids == [f"q{i:03d}" for i in (23, 21, 19, 17, 15, 13, 11, 9, 7, 5)]
+
+    def test_cursor_invalido(self, repo):
+        """Testa que cursores adulterados são rejeitados."""
+        with pytest.raises(CursorInvalido):
+            repo.buscar_questoes_pagina(cursor="nao-e-um-cursor")
+
+    def test_cursor_ida_e_volta(self):
+        """Testa codificação e decodificação do cursor."""
+        from datetime import datetime
+
+        momento = datetime(2024, 12, 20, 10, 30, 15, 123456)
+        cursor = codificar_cursor(momento, "abc")
+
+        assert "=" not in cursor
+        assert decodificar_cursor(cursor) == (momento, "abc")
+
+
+class TestBuscaTexto:
+    """Testes para a consulta de busca textual (o SQLite não tem tsvector)."""
+
+    @pytest.fixture
+    def consultas(self, monkeypatch):
+        repo = _repositorio(QuestaoRepository, create_engine("sqlite://"))
+        chamadas = []
+
+        def execute_query(query, params=None):
+            chamadas.append((" ".join(query.split()), params))
+            return []
+
+        monkeypatch.setattr(repo, "execute_query", execute_query)
+        return repo, chamadas
+
+    def test_usa_expressao_do_indice(self, consultas):
+        """Testa que o filtro usa a mesma expressão do índice GIN e ordena por relevância."""
+        repo, chamadas = consultas
+        repo.buscar_texto("movimento uniforme -circular", limite=5)
+
+        query, params = chamadas[0]
+        assert "to_tsvector('portuguese', q.enunciado) @@ consulta" in query
+        assert "websearch_to_tsquery('portuguese', :texto)" in query
+        assert "ORDER BY relevancia DESC" in query
+        assert params["texto"] == "movimento uniforme -circular"
+        assert params["limite"] == 5
+
+    def test_filtro_palavras_chave(self, consultas):
+        """Testa o filtro de palavras-chave (contenção de array) e os demais filtros."""
+        repo, chamadas = consultas
+        repo.buscar_texto(palavras_chave=[" Cinemática", "MRU "], materia_id="m-fis", status="aprovada")
+
+        query, params = chamadas[0]
+        assert "q.palavras_chave @> CAST(:palavras_chave AS TEXT[])" in query
+        assert "tsquery" not in query
+        assert params["palavras_chave"] == ["cinemática", "mru"]
+        assert params["materia_id"] == "m-fis"
+        assert params["status"] == "aprovada"
+
+    def test_palavra_chave_maiuscula_gravada_e_buscada_igual(self, consultas):
+        """Testa que a palavra-chave gravada com maiúsculas casa com a busca."""
+        repo, chamadas = consultas
+        _, gravados = repo._montar_questao(
+            materia_id="m-fis", enunciado="Enunciado", palavras_chave=["Cinemática", " MRU", ""]
+        )
+        repo.buscar_texto(palavras_chave=["mru", "CINEMÁTICA"])
+
+        _, params = chamadas[0]
+        assert gravados["palavras_chave"] == ["cinemática", "mru"]
+        assert set(params["palavras_chave"]) <= set(gravados["palavras_chave"])
+
+
+class TestEngineCompartilhada:
+    """Testes para a engine e a fábrica de sessões centralizadas."""
+
+    @pytest.fixture(autouse=True)
+    def engine_limpa(self):
+        from backend.repositories import base
+        base.descartar_engine()
+        yield
+        base.descartar_engine()
+
+    def test_engine_unica(self):
+        """Testa que repositórios, sessões e dashboard compartilham a mesma engine."""
+        from backend.repositories import base
+        from backend.utils.dashboard import _get_engine
+
+        engine = base.get_db_engine()
+        assert base.get_db_engine() is engine
+        assert _get_engine() is engine
+        assert _repositorio(QuestaoRepository, engine).engine is engine
+        assert base.get_session().get_bind() is engine
+
+    def test_fabrica_de_sessoes_reutilizada(self):
+        """Testa que get_session() não recria o sessionmaker a cada chamada."""
+        from backend.repositories import base
+
+        base.get_session().close()
+        fabrica = base._session_factory
+        base.get_session().close()
+
+        assert fabrica is not None
+        assert base._session_factory is fabrica
+
+    def test_pool_configurado(self, monkeypatch):
+        """Testa que o pool e o statement_timeout vêm das configurações."""
+        from backend.repositories import base
+
+        monkeypatch.setattr(base, "DB_POOL_SIZE", 7)
+        monkeypatch.setattr(base, "DB_MAX_OVERFLOW", 3)
+        monkeypatch.setattr(base, "DB_POOL_RECYCLE_SEG", 600)
+        monkeypatch.setattr(base, "DB_POOL_PRE_PING", False)
+        monkeypatch.setattr(base, "DB_STATEMENT_TIMEOUT_MS", 5000)
+
+        argumentos = {}
+        criar = base.create_engine
+
+        def create_engine_espiao(url, **kwargs):
+            argumentos.update(kwargs)
+            return criar(url, **kwargs)
+
+        monkeypatch.setattr(base, "create_engine", create_engine_espiao)
+        engine = base.criar_engine("postgresql://u:s@localhost:5432/provas_db")
+
+        assert engine.pool.size() == 7
+        assert engine.pool._max_overflow == 3
+        assert engine.pool._recycle == 600
+        assert engine.pool._pre_ping is False
+        assert argumentos["connect_args"]["options"] == "-c statement_timeout=5000"
+
+    def test_migracoes_sem_crewai(self):
+        """Testa que a engine das migrações e do dashboard não importa o CrewAI (nem precisa dele instalado)."""
+        import subprocess
+
+        raiz = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+        codigo = (
+            "import sys\n"
+            "for modulo in ('crewai', 'litellm'):\n"
+            "    sys.modules[modulo] = None\n"
+            "sys.path.insert(0, 'database')\n"
+            "import migrate\n"
+            "from backend.utils.dashboard import _get_engine\n"
+            "print(migrate.get_engine() is _get_engine())\n"
+        )
+        saida = subprocess.run(
+            [sys.executable, "-c", codigo], cwd=raiz, capture_output=True, text=True, timeout=120
+        )
+
+        assert saida.returncode == 0, saida.stderr
+        assert saida.stdout.strip().splitlines()[-1] == "True"
+
+
+class TestInstrucoesRegistradas:
+    """Testes para o registro de instruções e os prepared statements."""
+
+    def test_instrucao_montada_uma_vez(self, engine):
+        """Testa que a mesma instrução (e variante de filtros) é reutilizada."""
+        repo = _repositorio(QuestaoRepository, engine)
+
+        assert repo.instrucao("questao_por_id") is repo.instrucao("questao_por_id")
+        assert "{schema}" not in repo.instrucao("questao_por_id").text
+
+        montagens = []
+        montar = lambda: montagens.append(1) or "SELECT 1"
+        repo.instrucao("variante_teste", montar)
+        repo.instrucao("variante_teste", montar)
+        assert len(montagens) == 1
+
+    def test_consultas_por_nome(self, engine):
+        """Testa consultar()/executar() no SQLite (sem prepared statements)."""
+        with engine.begin() as conn:
+            conn.execute(text(
+                "INSERT INTO provas.questoes (id, enunciado) VALUES ('q1', 'Questão 1')"
+            ))
+        repo = _repositorio(QuestaoRepository, engine)
+
+        assert repo.buscar_questao_por_id("q1")["enunciado"] == "Questão 1"
+        repo.incrementar_uso("q1")
+        assert repo.executar("incrementar_uso", {"id": "q1"}) == 1
+        with engine.connect() as conn:
+            assert conn.execute(text("SELECT vezes_usada FROM provas.questoes")).scalar() == 2
+
+    def test_buscar_questoes_variantes(self, engine):
+        """Testa que cada combinação de filtros gera a sua variante registrada."""
+        repo = _repositorio(QuestaoRepository, engine)
+
+        repo.buscar_questoes(materia_id="m1")
+        repo.buscar_questoes(materia_id="m2")
+        repo.buscar_questoes(status="aprovada")
+
+        sql = repo.instrucao("buscar_questoes:materia_id").text
+        assert "q.materia_id = :materia_id" in sql
+        assert "q.status" not in sql
+        assert "q.status = :status" in repo.instrucao("buscar_questoes:status").text
+
+    def test_buscar_questoes_filtro_texto(self, engine):
+        """Testa que o filtro de texto usa a expressão do índice GIN do enunciado."""
+        repo = _repositorio(QuestaoRepository, engine)
+        repo.instrucao("buscar_questoes:materia_id,texto", lambda: repo._sql_buscar_questoes(("materia_id", "texto")))
+
+        sql = repo.instrucao("buscar_questoes:materia_id,texto").text
+        assert "to_tsvector('portuguese', q.enunciado)" in sql
+        assert "websearch_to_tsquery('portuguese', :texto)" in sql
+
+    def test_montar_preparada(self):
+        """Testa a conversão de parâmetros nomeados em posicionais ($n)."""
+        from backend.repositories.base import montar_preparada
+
+        nome, preparar, executar = montar_preparada(
+            "questaorepository_teste",
+            "SELECT id::text FROM t WHERE a = :a AND b = :b OR a2 = :a"
+        )
+
+        assert nome == "questaorepository_teste"
+        assert preparar.text == (
+            "PREPARE questaorepository_teste AS "
+            "SELECT id::text FROM t WHERE a = $1 AND b = $2 OR a2 = $1"
+        )
+        assert executar.text == "EXECUTE questaorepository_teste(:a, :b)"
+
+    def test_montar_preparada_parametro_array(self):
+        """Testa o tipo declarado no PREPARE e o CAST no EXECUTE para arrays (text[] -> uuid[])."""
+        from backend.repositories.base import montar_preparada
+
+        nome, preparar, executar = montar_preparada(
+            "questaorepository_por_ids",
+            "SELECT id FROM t WHERE id = ANY(CAST(:ids AS UUID[])) AND status = :status"
+        )
+
+        assert preparar.text == (
+            "PREPARE questaorepository_por_ids(UUID[], unknown) AS "
+            "SELECT id FROM t WHERE id = ANY($1) AND status = $2"
+        )
+        assert executar.text == (
+            "EXECUTE questaorepository_por_ids(CAST(:ids AS UUID[]), :status)"
+        )
+
+    def test_status_revisao_preparado_com_tipo(self):
+        """Testa que status_revisao declara UUID[] no PREPARE (EXECUTE recebe text[] do driver)."""
+        from backend.repositories.base import montar_preparada
+
+        repo = _repositorio(RevisaoRepository, create_engine("sqlite://"))
+        _, preparar, executar = montar_preparada(
+            "revisaorepository_status_revisao", repo.instrucao("status_revisao").text
+        )
+
+        assert preparar.text.startswith("PREPARE revisaorepository_status_revisao(UUID[]) AS ")
+        assert "ANY($1)" in preparar.text
+        assert "CAST" not in preparar.text
+        assert executar.text == "EXECUTE revisaorepository_status_revisao(CAST(:ids AS UUID[]))"
+
+    def test_montar_preparada_cast_parcial_nao_declara_tipo(self):
+        """Testa que parâmetro usado com e sem CAST continua sem tipo declarado."""
+        from backend.repositories.base import montar_preparada
+
+        _, preparar, executar = montar_preparada(
+            "teste", "SELECT 1 FROM t WHERE CAST(:a AS INT) = :a"
+        )
+
+        assert preparar.text == "PREPARE teste AS SELECT 1 FROM t WHERE CAST($1 AS INT) = $1"
+        assert executar.text == "EXECUTE teste(:a)"
+
+    def test_prepare_uma_vez_por_conexao(self, monkeypatch):
+        """Testa que o PREPARE é enviado só na primeira execução em cada conexão."""
+        from types import SimpleNamespace
+        from backend.repositories import base
+
+        monkeypatch.setattr(base, "DB_PREPARED_STATEMENTS", True)
+        repo = _repositorio(QuestaoRepository, create_engine("sqlite://"))
+
+        def conexao():
+            enviadas = []
+            conn = SimpleNamespace(
+                dialect=SimpleNamespace(name="postgresql"),
+                connection=SimpleNamespace(info={}),
+                execute=lambda instrucao, *args: enviadas.append(instrucao.text)
+            )
+            return conn, enviadas
+
+        conn, enviadas = conexao()
+        primeira = repo._instrucao_para(conn, "questao_por_id")
+        segunda = repo._instrucao_para(conn, "questao_por_id")
+
+        assert primeira is segunda
+        assert primeira.text == "EXECUTE questaorepository_questao_por_id(:id)"
+        assert len(enviadas) == 1
+        assert enviadas[0].startswith("PREPARE questaorepository_questao_por_id AS")
+
+        outra, enviadas_outra = conexao()
+        repo._instrucao_para(outra, "questao_por_id")
+        assert len(enviadas_outra) == 1
+
+        monkeypatch.setattr(base, "DB_PREPARED_STATEMENTS", False)
+        assert repo._instrucao_para(outra, "questao_por_id") is repo.instrucao("questao_por_id")
+
+
+    def test_selects_preparados_listam_colunas(self):
+        """Testa que os SELECTs preparados não usam "tabela.*"."""
+        from backend.repositories.lote_repository import LoteProvaRepository
+
+        engine = create_engine("sqlite://")
+        for classe, nome in [
+            (QuestaoRepository, "questao_por_id"),
+            (ProvaRepository, "prova_por_id"),
+            (ProvaRepository, "questoes_da_prova"),
+            (LoteProvaRepository, "lote_por_id"),
+            (QuestaoRepository, "questoes_por_ids"),
+            (QuestaoRepository, "alternativas_por_questoes"),
+            (QuestaoRepository, "resolucoes_por_questoes"),
+            (QuestaoRepository, "diagramas_por_questoes"),
+            (RevisaoRepository, "revisoes_da_questao"),
+        ]:
+            sql = _repositorio(classe, engine).instrucao(nome).text
+            assert ".*" not in sql, nome
+            assert "{" not in sql, nome
+
+        assert "q.enunciado" in _repositorio(QuestaoRepository, engine).instrucao("questao_por_id").text
+
+    def test_plano_invalidado_desaloca_e_repete(self, monkeypatch):
+        """Testa DEALLOCATE + nova tentativa na mesma conexão após "cached plan must not change result type"."""
+        from contextlib import contextmanager
+        from types import SimpleNamespace
+        from sqlalchemy.exc import NotSupportedError
+        from backend.repositories import base
+
+        monkeypatch.setattr(base, "DB_PREPARED_STATEMENTS", True)
+        repo = _repositorio(QuestaoRepository, create_engine("sqlite://"))
+        enviadas = []
+        falhas = [NotSupportedError("EXECUTE", {}, Exception("cached plan must not change result type"))]
+
+        def execute(instrucao, *args):
+            enviadas.append(instrucao.text.split("(")[0].split(" AS ")[0])
+            if instrucao.text.startswith("EXECUTE") and falhas:
+                raise falhas.pop()
+            return SimpleNamespace(keys=lambda: ["id"], fetchall=lambda: [("q1",)])
+
+        conn = SimpleNamespace(
+            dialect=SimpleNamespace(name="postgresql"),
+            connection=SimpleNamespace(info={"instrucoes_preparadas": {"questaorepository_questao_por_id"}}),
+            execute=execute,
+            rollback=lambda: enviadas.append("ROLLBACK"),
+            commit=lambda: enviadas.append("COMMIT")
+        )
+
+        @contextmanager
+        def connect():
+            yield conn
+
+        repo.engine = SimpleNamespace(connect=connect)
+
+        assert repo.consultar("questao_por_id", {"id": "q1"}) == [{"id": "q1"}]
+        assert enviadas == [
+            "EXECUTE questaorepository_questao_por_id",
+            "ROLLBACK",
+            "DEALLOCATE questaorepository_questao_por_id",
+            "PREPARE questaorepository_questao_por_id",
+            "EXECUTE questaorepository_questao_por_id",
+        ]
+        assert conn.connection.info["instrucoes_invalidas"] == set()
+
+
+class TestBuscaQuestoesPorIds:
+    """Testes para a busca em lote de questões com os relacionados."""
+
+    IDS = [
+        "00000000-0000-0000-0000-00000000000a",
+        "00000000-0000-0000-0000-00000000000b",
+        "00000000-0000-0000-0000-00000000000c",
+    ]
+
+    @pytest.fixture
+    def repo(self, engine, monkeypatch):
+        """Repositório com consultar() simulado (o SQLite não tem ANY/UUID[])."""
+        a, b, c = self.IDS
+        linhas = {
+            "questoes_por_ids": [{"id": c}, {"id": a}, {"id": b}],
+            "alternativas_por_questoes": [
+                {"questao_id": a, "letra": "A"}, {"questao_id": a, "letra": "B"},
+                {"questao_id": c, "letra": "A"},
+            ],
+            "resolucoes_por_questoes": [{"questao_id": b, "resposta_curta": "42"}],
+            "diagramas_por_questoes": [{"questao_id": c, "caminho": "c.png"}],
+        }
+        repo = _repositorio(QuestaoRepository, engine)
+        repo.chamadas = []
+
+        def consultar(nome, params=None):
+            repo.chamadas.append((nome, params))
+            return [dict(linha) for linha in linhas[nome]]
+
+        monkeypatch.setattr(repo, "consultar", consultar)
+        return repo
+
+    def test_uma_consulta_por_tabela(self, repo):
+        """Testa que N questões custam 4 consultas, todas com ANY(:ids)."""
+        repo.buscar_questoes_por_ids(self.IDS * 10)
+
+        assert [nome for nome, _ in repo.chamadas] == [
+            "questoes_por_ids",
+            "alternativas_por_questoes",
+            "resolucoes_por_questoes",
+            "diagramas_por_questoes",
+        ]
+        assert all(params == {"ids": self.IDS} for _, params in repo.chamadas)
+        assert "ANY(CAST(:ids AS UUID[]))" in repo.instrucao("questoes_por_ids").text
+
+    def test_ordem_e_relacionados(self, repo):
+        """Testa a ordem pedida e o agrupamento dos relacionados por questão."""
+        a, b, c = self.IDS
+        questoes = repo.buscar_questoes_por_ids([b, c, "nao-e-uuid", a])
+
+        assert [q["id"] for q in questoes] == [b, c, a]
+        assert [alt["letra"] for alt in questoes[2]["alternativas"]] == ["A", "B"]
+        assert questoes[0]["resolucao"]["resposta_curta"] == "42"
+        assert questoes[1]["resolucao"] is None
+        assert questoes[1]["diagramas"][0]["caminho"] == "c.png"
+
+    def test_sem_ids_validos(self, repo):
+        """Testa que IDs vazios ou inválidos não consultam o banco."""
+        assert repo.buscar_questoes_por_ids(["x", ""]) == []
+        assert repo.chamadas == []
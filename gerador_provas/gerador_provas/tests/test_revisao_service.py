@@ -7,6 +7,10 @@ Executa: pytest tests/test_revisao_service.py -v
 import pytest
 import sys
 import os
+from collections.abc import MutableMapping
+from datetime import datetime
+
+from sqlalchemy.exc import OperationalError, ProgrammingError
 
 # Adicionar diretório raiz ao path
 sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
@@ -14,7 +18,9 @@ sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
 from backend.services.revisao_service import (
     RevisaoService, 
     RevisaoQuestao, 
-    FonteBibliografica
+    FonteBibliografica,
+    CacheLRU,
+    IndiceQuestoes
 )
 
 
@@ -80,8 +86,7 @@ class TestRevisaoService:
         """Fixture que cria uma instância limpa do serviço."""
         service = RevisaoService()
         # Limpar cache para cada teste
-        service._questoes_cache = {}
-        service._revisoes_cache = {}
+        service.limpar_cache()
         return service
     
     @pytest.fixture
@@ -105,8 +110,8 @@ class TestRevisaoService:
     def test_instanciacao(self, service):
         """Testa se o serviço pode ser instanciado."""
         assert service is not None
-        assert isinstance(service._questoes_cache, dict)
-        assert isinstance(service._revisoes_cache, dict)
+        assert isinstance(service._questoes_cache, MutableMapping)
+        assert isinstance(service._revisoes_cache, MutableMapping)
     
     def test_adicionar_questao_para_revisao(self, service, questao_exemplo):
         """Testa adição de questão ao fluxo de revisão."""
@@ -129,6 +134,52 @@ class TestRevisaoService:
         assert questao["id"] == questao_id
         assert questao["enunciado"] == questao_exemplo["enunciado"]
     
+    def test_obter_questoes_em_lote(self, service, questao_exemplo, monkeypatch):
+        """Testa busca em lote: memória + uma única consulta ao banco, na ordem pedida."""
+        id_memoria = service.adicionar_questao_para_revisao(questao_exemplo)
+        chamadas = []
+        
+        def buscar_questoes_por_ids(ids):
+            chamadas.append(list(ids))
+            return [{"id": "banco-2"}, {"id": "banco-1"}]
+        
+        monkeypatch.setattr(service.questao_repository, "buscar_questoes_por_ids", buscar_questoes_por_ids)
+        # Banco de volta: a inclusão pendente da questão em memória é gravada antes
+        monkeypatch.setattr(service, "_inserir_no_banco", lambda questao: True)
+        service._banco_indisponivel_ate = 0.0
+        
+        questoes = service.obter_questoes(["banco-1", id_memoria, "inexistente", "banco-2"])
+        
+        assert [q["id"] for q in questoes] == ["banco-1", id_memoria, "banco-2"]
+        assert chamadas == [["banco-1", "inexistente", "banco-2"]]
+    
+    def test_obter_questoes_sem_banco(self, service, questao_exemplo, monkeypatch):
+        """Testa que a falha do banco não impede devolver as questões em memória."""
+        questao_id = service.adicionar_questao_para_revisao(questao_exemplo)
+        
+        def buscar_questoes_por_ids(ids):
+            raise OperationalError("SELECT", {}, Exception("sem conexão"))
+        
+        monkeypatch.setattr(service.questao_repository, "buscar_questoes_por_ids", buscar_questoes_por_ids)
+        service._banco_indisponivel_ate = 0.0
+        
+        questoes = service.obter_questoes([questao_id, "outra"])
+        
+        assert [q["id"] for q in questoes] == [questao_id]
+        assert service._banco_indisponivel_ate > 0.0
+    
+    def test_erro_de_sql_nao_vira_questao_ausente(self, service, monkeypatch):
+        """Testa que um erro que não é de conexão sobe em vez de parecer "não está no banco"."""
+        def buscar_questoes_por_ids(ids):
+            raise ProgrammingError("SELECT", {}, Exception("operator does not exist: uuid = text"))
+        
+        monkeypatch.setattr(service.questao_repository, "buscar_questoes_por_ids", buscar_questoes_por_ids)
+        service._banco_indisponivel_ate = 0.0
+        
+        with pytest.raises(ProgrammingError):
+            service.obter_questoes(["outra"])
+        assert service._banco_indisponivel_ate == 0.0
+    
     def test_obter_questao_inexistente(self, service):
         """Testa obtenção de questão que não existe."""
         questao = service.obter_questao("id-inexistente")
@@ -327,6 +378,466 @@ class TestRevisaoService:
         assert questoes_fisica[0]["materia"] == "fisica"
 
 
+class TestCacheLRU:
+    """Testes para o cache limitado do serviço de revisão."""
+    
+    def test_descarta_menos_usado(self):
+        """Testa o descarte do item usado há mais tempo."""
+        cache = CacheLRU(maximo=2)
+        cache["a"] = 1
+        cache["b"] = 2
+        cache["a"]
+        cache["c"] = 3
+        
+        assert "b" not in cache
+        assert sorted(cache) == ["a", "c"]
+    
+    def test_fixados_nao_sao_descartados(self):
+        """Testa que itens fixados (só em memória) sobrevivem ao limite."""
+        cache = CacheLRU(maximo=1)
+        cache["local"] = 1
+        cache.fixar("local")
+        cache["b"] = 2
+        cache["c"] = 3
+        
+        assert "local" in cache
+        assert "b" not in cache
+        assert len(cache) == 2
+    
+    def test_validade(self, monkeypatch):
+        """Testa que itens vencidos são tratados como ausentes."""
+        import backend.services.revisao_service as modulo
+        agora = [100.0]
+        monkeypatch.setattr(modulo.time, "monotonic", lambda: agora[0])
+        
+        cache = CacheLRU(maximo=10, ttl_seg=60)
+        cache["a"] = 1
+        cache["fixo"] = 2
+        cache.fixar("fixo")
+        agora[0] += 61
+        
+        assert cache.get("a") is None
+        assert cache.get("fixo") == 2
+        assert cache.items() == [("fixo", 2)]
+
+
+class _QuestaoRepositoryFake:
+    """Repositório de questões em memória (linhas no formato do banco)."""
+    
+    def __init__(self):
+        self.linhas = {}
+        self.buscas = []
+    
+    def obter_materia_id_por_codigo(self, codigo):
+        return "m-fis" if codigo == "FIS" else None
+    
+    def obter_topico_id_por_codigo(self, materia_id, codigo):
+        return None
+    
+    def buscar_questoes_por_ids(self, ids):
+        self.buscas.append(list(ids))
+        return [dict(self.linhas[i]) for i in ids if i in self.linhas]
+
+
+class _RevisaoRepositoryFake:
+    """Registra as gravações do serviço de revisão."""
+    
+    def __init__(self):
+        from sqlalchemy import create_engine
+        self.engine = create_engine("sqlite://")
+        self.inseridas = []
+        self.revisoes = []
+        self.listagens = []
+    
+    def inserir_questao(self, questao, materia_id, topico_id=None):
+        self.inseridas.append((questao["id"], materia_id))
+    
+    def registrar_revisao(self, revisao, aprovada_em=None):
+        self.revisoes.append(dict(revisao, aprovada_em=aprovada_em))
+        return True
+    
+    def buscar_revisoes(self, questao_id):
+        return [r for r in self.revisoes if r["questao_id"] == questao_id]
+    
+    def status_revisao(self, ids):
+        return {r["questao_id"]: r["status"] for r in self.revisoes if r["questao_id"] in ids}
+    
+    def listar_questoes(self, **filtros):
+        self.listagens.append(filtros)
+        return [{"id": "q-banco", "status_revisao": "pendente", "ultima_revisao": None, "total_revisoes": 0}]
+
+
+class TestRevisaoComBanco:
+    """Testes do serviço de revisão lendo e gravando no banco (repositórios simulados)."""
+    
+    @pytest.fixture
+    def service(self):
+        service = RevisaoService()
+        service.questao_repository = _QuestaoRepositoryFake()
+        service.revisao_repository = _RevisaoRepositoryFake()
+        return service
+    
+    def test_grava_questao_nova(self, service):
+        """Testa que a questão nova é gravada no banco (write-through)."""
+        questao_id = service.adicionar_questao_para_revisao({"enunciado": "E", "materia": "fisica"})
+        
+        assert service.revisao_repository.inseridas == [(questao_id, "m-fis")]
+        assert questao_id not in service._questoes_cache._fixados
+    
+    def test_materia_desconhecida_fica_em_memoria(self, service):
+        """Testa que a questão que não pôde ser gravada fica fixada no cache."""
+        questao_id = service.adicionar_questao_para_revisao({"enunciado": "E", "materia": "astronomia"})
+        
+        assert service.revisao_repository.inseridas == []
+        assert questao_id in service._questoes_cache._fixados
+    
+    def test_gravacoes_pendentes_apos_reconexao(self, service, monkeypatch):
+        """Testa que o que foi feito com o banco fora é gravado, em ordem, quando ele volta."""
+        repositorio = service.revisao_repository
+        
+        def sem_conexao(*args, **kwargs):
+            raise OperationalError("INSERT", {}, Exception("sem conexão"))
+        
+        monkeypatch.setattr(repositorio, "inserir_questao", sem_conexao)
+        questao_id = service.adicionar_questao_para_revisao({"enunciado": "E", "materia": "fisica"})
+        service.aprovar_questao(questao_id, comentarios="Ok")
+        
+        assert len(service._gravacoes_pendentes) == 2
+        assert questao_id in service._questoes_cache._fixados
+        
+        monkeypatch.undo()
+        service._banco_indisponivel_ate = 0.0
+        service.obter_questoes_pendentes(limite=10)
+        
+        assert repositorio.inseridas == [(questao_id, "m-fis")]
+        assert [r["status"] for r in repositorio.revisoes] == ["aprovada"]
+        assert not service._gravacoes_pendentes
+        assert questao_id not in service._questoes_cache._fixados
+        assert questao_id not in service._revisoes_cache
+    
+    def test_gravacao_pendente_recusada_e_descartada(self, service, monkeypatch):
+        """Testa que a gravação pendente recusada pelo banco é descartada e a questão segue em memória."""
+        def sem_conexao(*args, **kwargs):
+            raise OperationalError("INSERT", {}, Exception("sem conexão"))
+        
+        def recusada(*args, **kwargs):
+            raise ProgrammingError("INSERT", {}, Exception("coluna inexistente"))
+        
+        monkeypatch.setattr(service.revisao_repository, "inserir_questao", sem_conexao)
+        questao_id = service.adicionar_questao_para_revisao({"enunciado": "E", "materia": "fisica"})
+        
+        monkeypatch.setattr(service.revisao_repository, "inserir_questao", recusada)
+        service._banco_indisponivel_ate = 0.0
+        service.obter_questoes_pendentes(limite=10)
+        
+        assert not service._gravacoes_pendentes
+        assert questao_id in service._questoes_cache._fixados
+    
+    def test_revisao_invalida_historico(self, service):
+        """Testa que a revisão é gravada e o histórico em cache é relido do banco."""
+        questao_id = service.adicionar_questao_para_revisao({"enunciado": "E", "materia": "fisica"})
+        
+        resultado = service.aprovar_questao(questao_id, comentarios="Ok")
+        
+        assert resultado["sucesso"] is True
+        assert service.revisao_repository.revisoes[0]["status"] == "aprovada"
+        assert service.revisao_repository.revisoes[0]["aprovada_em"] is not None
+        assert questao_id not in service._revisoes_cache
+        assert len(service.obter_revisoes(questao_id)) == 1
+        assert service.obter_questao(questao_id)["status"] == "aprovada"
+    
+    def test_leitura_pelo_banco(self, service):
+        """Testa a leitura de uma questão fora do cache (read-through)."""
+        service.questao_repository.linhas["q-banco"] = {
+            "id": "q-banco", "enunciado": "Do banco", "status": "revisao",
+            "materia_codigo": "FIS", "topico_nome": "MRU",
+            "alternativas": [{"letra": "A", "texto": "1", "correta": True}],
+            "resolucao": {"resposta_curta": "A"}, "diagramas": []
+        }
+        
+        questao = service.obter_questao("q-banco")
+        service.obter_questao("q-banco")
+        
+        assert questao["materia"] == "fisica"
+        assert questao["status"] == "pendente"
+        assert questao["resposta"] == "A"
+        assert questao["alternativas"][0]["correta"] is True
+        assert service.questao_repository.buscas == [["q-banco"]]
+    
+    def test_listagem_pelo_banco(self, service):
+        """Testa que a listagem consulta o banco em vez de varrer a memória."""
+        service.questao_repository.linhas["q-banco"] = {
+            "id": "q-banco", "enunciado": "Do banco", "status": "revisao", "materia_codigo": "FIS"
+        }
+        
+        pendentes = service.obter_questoes_pendentes(materia="fisica", limite=10)
+        
+        assert [q["id"] for q in pendentes] == ["q-banco"]
+        assert service.revisao_repository.listagens[0]["materia_id"] == "m-fis"
+        assert service.revisao_repository.listagens[0]["status_revisao"] == ["pendente"]
+        assert service.revisao_repository.listagens[0]["limite"] == 10
+
+
+class TestIndicesRevisao:
+    """Testes dos índices de status/matéria e dos contadores em memória."""
+    
+    @pytest.fixture
+    def service(self):
+        service = RevisaoService(persistir=False)
+        service.limpar_cache()
+        return service
+    
+    def _adicionar(self, service, materia="fisica"):
+        return service.adicionar_questao_para_revisao({
+            "enunciado": f"Questão de {materia}", "resposta": "R", "materia": materia
+        })
+    
+    def test_indice_acompanha_status(self, service):
+        """Testa que aprovar, rejeitar e solicitar correções movem a questão nos índices."""
+        aprovada = self._adicionar(service)
+        rejeitada = self._adicionar(service)
+        corrigir = self._adicionar(service, "quimica")
+        
+        service.aprovar_questao(aprovada)
+        service.rejeitar_questao(rejeitada, motivo="Errada")
+        service.solicitar_correcoes(corrigir, correcoes="Ajustar")
+        
+        assert service._indice.ids(["aprovada"]) == [aprovada]
+        assert service._indice.ids(["rejeitada"]) == [rejeitada]
+        assert service._indice.ids(["correcao_pendente"], "quimica") == [corrigir]
+        assert service._indice.ids(["pendente"]) == []
+    
+    def test_contadores_batem_com_varredura(self, service):
+        """Testa que os contadores incrementais coincidem com uma contagem completa."""
+        ids = [self._adicionar(service, m) for m in ("fisica", "fisica", "quimica", "biologia")]
+        service.aprovar_questao(ids[0])
+        service.rejeitar_questao(ids[2], motivo="Errada")
+        service.excluir_questao(ids[3])
+        
+        from collections import Counter
+        esperado = Counter(
+            (q["status"], q["materia"]) for q in service._questoes_cache.values()
+        )
+        contado = {(s, m): t for s, m, t in service._indice.contar()}
+        
+        assert contado == dict(esperado)
+        stats = service.obter_estatisticas()
+        assert stats["total"] == 3
+        assert stats["aprovadas"] == 1
+        assert stats["rejeitadas"] == 1
+    
+    def test_listagens_nao_varrem_o_cache(self, service, monkeypatch):
+        """Testa que listagens e estatísticas usam os índices, não o cache inteiro."""
+        for i in range(5):
+            questao_id = self._adicionar(service, "fisica" if i % 2 else "quimica")
+            if i < 2:
+                service.aprovar_questao(questao_id)
+        
+        def varredura():
+            raise AssertionError("listagem varreu o cache inteiro")
+        
+        monkeypatch.setattr(service._questoes_cache, "items", varredura)
+        monkeypatch.setattr(service._questoes_cache, "__iter__", varredura, raising=False)
+        
+        pendentes = service.obter_questoes_pendentes(materia="fisica")
+        aprovadas = service.obter_questoes_aprovadas()
+        stats = service.obter_estatisticas()
+        
+        assert [q["materia"] for q in pendentes] == ["fisica"]
+        assert len(aprovadas) == 2
+        assert stats["total"] == 5
+    
+    def test_limite_respeita_ordem_de_inclusao(self, service):
+        """Testa que o limite devolve as primeiras questões incluídas."""
+        ids = [self._adicionar(service) for _ in range(4)]
+        
+        pendentes = service.obter_questoes_pendentes(limite=2)
+        
+        assert [q["id"] for q in pendentes] == ids[:2]
+    
+    def test_ids_de_varios_status_na_ordem_de_inclusao(self, service):
+        """Testa a junção dos grupos de status na ordem de inclusão (e o limite)."""
+        ids = [self._adicionar(service, m) for m in ("fisica", "quimica", "fisica", "quimica")]
+        service.aprovar_questao(ids[1])
+        service.aprovar_questao(ids[2])
+        
+        assert service._indice.ids(["pendente", "aprovada"]) == ids
+        assert service._indice.ids(["pendente", "aprovada"], limite=3) == ids[:3]
+        assert service._indice.ids(["pendente", "aprovada"], "quimica") == [ids[1], ids[3]]
+    
+    def test_indice_ordenado_por_data(self):
+        """Testa que os grupos seguem (created_at, id), não a ordem de inclusão, e partem do cursor."""
+        indice = IndiceQuestoes()
+        indice.LOTE_PERCURSO = 2
+        for questao_id, minuto in (("c", 3), ("a", 1), ("e", 5), ("b", 2), ("d", 4)):
+            status = "aprovada" if questao_id in ("b", "e") else "pendente"
+            indice.atualizar(questao_id, status, "fisica", (datetime(2024, 1, 1, 8, minuto), questao_id))
+        
+        assert indice.ids(["pendente", "aprovada"]) == ["a", "b", "c", "d", "e"]
+        assert list(indice.recentes(["pendente", "aprovada"])) == ["e", "d", "c", "b", "a"]
+        assert list(indice.recentes(["pendente"], antes_de=(datetime(2024, 1, 1, 8, 4), "d"))) == ["c", "a"]
+        
+        indice.atualizar("a", "pendente", "fisica", (datetime(2024, 1, 1, 8, 9), "a"))
+        assert list(indice.recentes(["pendente"])) == ["a", "d", "c"]
+    
+    def test_aprovadas_pela_data_de_aprovacao(self, service):
+        """Testa que as aprovadas em memória saem pela data de aprovação, sem ordenar todas."""
+        ids = [self._adicionar(service) for _ in range(3)]
+        for questao_id in (ids[2], ids[0], ids[1]):
+            service.aprovar_questao(questao_id)
+        
+        aprovadas = service.obter_questoes_aprovadas(limite=2)
+        
+        assert [q["id"] for q in aprovadas] == [ids[1], ids[0]]
+        service.excluir_questao(ids[1])
+        assert [q["id"] for q in service.obter_questoes_aprovadas()] == [ids[0], ids[2]]
+    
+    def test_pagina_le_so_o_necessario(self, service, monkeypatch):
+        """Testa que a página em memória lê do cache só as questões que devolve."""
+        ids = [self._adicionar(service) for _ in range(50)]
+        lidas = []
+        original = service._questoes_cache.get
+        monkeypatch.setattr(
+            service._questoes_cache, "get", lambda chave, *args: lidas.append(chave) or original(chave, *args)
+        )
+        
+        pagina = service.listar_questoes_pagina(limite=3)
+        
+        assert [q["id"] for q in pagina["questoes"]] == ids[:-4:-1]
+        assert len(lidas) == 4
+    
+    def test_questoes_vencidas_saem_dos_contadores(self, monkeypatch):
+        """Testa que questões vencidas no cache deixam de contar antes de serem lidas de novo."""
+        from backend.services import revisao_service
+        
+        service = RevisaoService(persistir=False)
+        service._guardar("a", {"status": "pendente", "materia": "fisica"})
+        service._guardar("b", {"status": "aprovada", "materia": "fisica"})
+        assert service.obter_estatisticas()["total"] == 2
+        
+        agora = revisao_service.time.monotonic()
+        monkeypatch.setattr(
+            revisao_service.time, "monotonic",
+            lambda: agora + revisao_service.REVISAO_CACHE_TTL_SEG + 1
+        )
+        
+        assert service.obter_estatisticas()["total"] == 0
+        assert service._indice.contar() == []
+        assert service.obter_questoes_pendentes() == []
+    
+    def test_questoes_fixadas_nao_vencem(self, service, monkeypatch):
+        """Testa que questões só em memória (fixadas) continuam indexadas após o TTL."""
+        from backend.services import revisao_service
+        
+        questao_id = self._adicionar(service)
+        agora = revisao_service.time.monotonic()
+        monkeypatch.setattr(
+            revisao_service.time, "monotonic",
+            lambda: agora + revisao_service.REVISAO_CACHE_TTL_SEG + 1
+        )
+        
+        assert [q["id"] for q in service.obter_questoes_pendentes()] == [questao_id]
+    
+    def test_descarte_do_cache_remove_do_indice(self):
+        """Testa que questões descartadas pelo LRU saem dos índices."""
+        service = RevisaoService(persistir=False, cache_max=1)
+        service._questoes_cache["a"] = {"status": "aprovada", "materia": "fisica"}
+        service._guardar("a", service._questoes_cache["a"])
+        service._guardar("b", {"status": "pendente", "materia": "fisica"})
+        
+        assert "a" not in service._questoes_cache
+        assert service._indice.ids(["aprovada"]) == []
+        assert service._indice.ids(["pendente"]) == ["b"]
+
+
+class TestPaginacaoRevisao:
+    """Testes da listagem paginada por cursor do banco de questões (em memória)."""
+    
+    @pytest.fixture
+    def service(self):
+        service = RevisaoService(persistir=False)
+        service.limpar_cache()
+        for i in range(7):
+            questao_id = service.adicionar_questao_para_revisao({
+                "id": f"q{i}",
+                "enunciado": f"Questão {i} sobre {'energia' if i % 2 else 'velocidade'}",
+                "materia": "fisica" if i < 5 else "quimica",
+                "dificuldade": "facil" if i % 3 == 0 else "medio"
+            })
+            # Datas distintas e crescentes (regravada para reindexar)
+            service._guardar(questao_id, {
+                **service._questoes_cache[questao_id], "created_at": f"2024-01-01T08:0{i}:00"
+            })
+            if i in (1, 4):
+                service.aprovar_questao(questao_id)
+        return service
+    
+    def _todas(self, service, **filtros):
+        vistos, cursor = [], None
+        while True:
+            pagina = service.listar_questoes_pagina(limite=2, cursor=cursor, **filtros)
+            vistos.extend(q["id"] for q in pagina["questoes"])
+            cursor = pagina["proximo_cursor"]
+            if not cursor:
+                return vistos
+    
+    def test_percorre_sem_repetir(self, service):
+        """Testa que as páginas cobrem todas as questões, das mais recentes às mais antigas."""
+        assert self._todas(service) == [f"q{i}" for i in reversed(range(7))]
+    
+    def test_abas_e_status(self, service):
+        """Testa a separação por aba e o filtro de status."""
+        assert self._todas(service, aba="aprovadas") == ["q4", "q1"]
+        assert self._todas(service, aba="pendentes") == ["q6", "q5", "q3", "q2", "q0"]
+        assert self._todas(service, aba="pendentes", status="aprovada") == ["q4", "q1"]
+    
+    def test_filtros(self, service):
+        """Testa os filtros de matéria, dificuldade e texto."""
+        assert self._todas(service, materia="quimica") == ["q6", "q5"]
+        assert self._todas(service, dificuldade="facil") == ["q6", "q3", "q0"]
+        assert self._todas(service, texto="ENERGIA", materia="fisica") == ["q3", "q1"]
+    
+    def test_ultima_pagina_sem_cursor(self, service):
+        """Testa que a página que esgota os resultados não traz cursor."""
+        pagina = service.listar_questoes_pagina(limite=7)
+        
+        assert len(pagina["questoes"]) == 7
+        assert pagina["proximo_cursor"] is None
+    
+    def test_parametros_invalidos(self, service):
+        """Testa aba, status e cursor inválidos."""
+        from backend.repositories.paginacao import CursorInvalido
+        
+        with pytest.raises(ValueError):
+            service.listar_questoes_pagina(aba="lixeira")
+        with pytest.raises(ValueError):
+            service.listar_questoes_pagina(status="publicada")
+        with pytest.raises(CursorInvalido):
+            service.listar_questoes_pagina(cursor="@@@")
+    
+    def test_filtros_repassados_ao_banco(self):
+        """Testa que, com banco, filtros e cursor vão para a consulta."""
+        service = RevisaoService()
+        service.questao_repository = _QuestaoRepositoryFake()
+        service.revisao_repository = _RevisaoRepositoryFake()
+        service.questao_repository.linhas["q-banco"] = {
+            "id": "q-banco", "enunciado": "Do banco", "status": "revisao",
+            "materia_codigo": "FIS", "created_at": "2024-01-01T08:00:00"
+        }
+        
+        pagina = service.listar_questoes_pagina(
+            aba="pendentes", materia="fisica", dificuldade="medio", texto="banco", limite=10
+        )
+        
+        filtros = service.revisao_repository.listagens[0]
+        assert [q["id"] for q in pagina["questoes"]] == ["q-banco"]
+        assert filtros["limite"] == 11
+        assert filtros["status_revisao"] == ["pendente"]
+        assert filtros["status_questao"] == ["rascunho", "revisao"]
+        assert filtros["dificuldade"] == "medio"
+        assert filtros["texto"] == "banco"
+
+
 class TestRevisaoQuestao:
     """Testes para a classe RevisaoQuestao."""
     
@@ -374,8 +885,7 @@ class TestIntegracaoRevisao:
     def test_fluxo_completo_aprovacao(self):
         """Testa fluxo completo até aprovação."""
         service = RevisaoService()
-        service._questoes_cache = {}
-        service._revisoes_cache = {}
+        service.limpar_cache()
         
         # 1. Gerar questão
         questao = {
@@ -411,8 +921,7 @@ class TestIntegracaoRevisao:
     def test_fluxo_rejeicao(self):
         """Testa fluxo de rejeição."""
         service = RevisaoService()
-        service._questoes_cache = {}
-        service._revisoes_cache = {}
+        service.limpar_cache()
         
         questao = {
             "enunciado": "Questão com problema",
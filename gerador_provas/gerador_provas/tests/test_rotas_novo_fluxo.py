@@ -28,11 +28,9 @@ class TestRotasBancoQuestoes:
     def limpar_cache(self):
         """Fixture que limpa o cache antes de cada teste."""
         from app import revisao_service
-        revisao_service._questoes_cache = {}
-        revisao_service._revisoes_cache = {}
+        revisao_service.limpar_cache()
         yield
-        revisao_service._questoes_cache = {}
-        revisao_service._revisoes_cache = {}
+        revisao_service.limpar_cache()
     
     def test_banco_questoes_get(self, client, limpar_cache):
         """Testa GET /banco-questoes."""
@@ -74,8 +72,7 @@ class TestRotasRevisao:
     def questao_id(self):
         """Fixture que cria uma questão para teste."""
         from app import revisao_service
-        revisao_service._questoes_cache = {}
-        revisao_service._revisoes_cache = {}
+        revisao_service.limpar_cache()
         
         questao = {
             "enunciado": "Questão de teste",
@@ -87,8 +84,7 @@ class TestRotasRevisao:
         q_id = revisao_service.adicionar_questao_para_revisao(questao)
         yield q_id
         
-        revisao_service._questoes_cache = {}
-        revisao_service._revisoes_cache = {}
+        revisao_service.limpar_cache()
     
     def test_revisar_questao_get(self, client, questao_id):
         """Testa GET /revisar/<id>."""
@@ -100,7 +96,7 @@ class TestRotasRevisao:
     def test_revisar_questao_inexistente(self, client):
         """Testa revisão de questão inexistente."""
         from app import revisao_service
-        revisao_service._questoes_cache = {}
+        revisao_service.limpar_cache()
         
         response = client.get('/revisar/id-inexistente', follow_redirects=True)
         
@@ -164,8 +160,7 @@ class TestRotasMontarProva:
     def questoes_aprovadas(self):
         """Fixture com questões aprovadas."""
         from app import revisao_service
-        revisao_service._questoes_cache = {}
-        revisao_service._revisoes_cache = {}
+        revisao_service.limpar_cache()
         
         questoes = [
             {
@@ -192,8 +187,7 @@ class TestRotasMontarProva:
         
         yield ids
         
-        revisao_service._questoes_cache = {}
-        revisao_service._revisoes_cache = {}
+        revisao_service.limpar_cache()
     
     def test_montar_prova_get(self, client):
         """Testa GET /montar-prova."""
@@ -223,11 +217,9 @@ class TestAPIsNovoFluxo:
     @pytest.fixture
     def limpar_cache(self):
         from app import revisao_service
-        revisao_service._questoes_cache = {}
-        revisao_service._revisoes_cache = {}
+        revisao_service.limpar_cache()
         yield
-        revisao_service._questoes_cache = {}
-        revisao_service._revisoes_cache = {}
+        revisao_service.limpar_cache()
     
     @pytest.fixture
     def questao_teste(self, limpar_cache):
@@ -339,6 +331,74 @@ class TestAPIsNovoFluxo:
         data = json.loads(response.data)
         assert 'lotes' in data
         assert 'total' in data
+    
+    def test_api_lotes_provas_parametros_invalidos(self, client):
+        """Testa 400 (e não 500 ou a primeira página de novo) para limite/antes_de inválidos."""
+        for query in ('limite=abc', 'antes_de=nao-e-um-lote'):
+            response = client.get(f'/api/lotes-provas?{query}')
+            
+            assert response.status_code == 400, query
+            assert query.split('=')[0] in json.loads(response.data)["erro"]
+
+
+class TestAPIQuestaoStream:
+    """Testes para a API de geração de questão por streaming (SSE)."""
+    
+    @pytest.fixture
+    def client(self):
+        from app import app
+        app.config['TESTING'] = True
+        with app.test_client() as client:
+            yield client
+    
+    def test_stream_emite_tokens_e_questao(self, client, monkeypatch):
+        """Testa que os eventos chegam no formato SSE."""
+        import app as app_module
+        
+        def falso_stream(materia, topico, dificuldade, observacoes, usar_cache=True):
+            yield {"evento": "token", "texto": '{"enunciado": '}
+            yield {"evento": "token", "texto": '"Q"}'}
+            yield {"evento": "questao", "questao": {"enunciado": "Q", "materia": materia}}
+        
+        monkeypatch.setattr(app_module, "IA_DISPONIVEL", True)
+        monkeypatch.setattr(app_module, "gerar_questao_stream", falso_stream, raising=False)
+        
+        response = client.post('/api/questao/stream', json={"materia": "farmacologia"})
+        
+        assert response.status_code == 200
+        assert response.mimetype == "text/event-stream"
+        
+        corpo = response.get_data(as_text=True)
+        eventos = [bloco.split("\n")[0] for bloco in corpo.strip().split("\n\n")]
+        assert eventos == [
+            "event: inicio", "event: token", "event: token", "event: questao", "event: fim"
+        ]
+        assert '"materia": "farmacologia"' in corpo
+    
+    def test_stream_erro_vira_evento(self, client, monkeypatch):
+        """Testa que falhas do LLM são enviadas como evento de erro."""
+        import app as app_module
+        
+        def falso_stream(*args, **kwargs):
+            raise RuntimeError("timeout")
+            yield
+        
+        monkeypatch.setattr(app_module, "IA_DISPONIVEL", True)
+        monkeypatch.setattr(app_module, "gerar_questao_stream", falso_stream, raising=False)
+        
+        corpo = client.get('/api/questao/stream?materia=anatomia').get_data(as_text=True)
+        
+        assert "event: erro" in corpo
+        assert "timeout" in corpo
+        assert corpo.strip().endswith("data: {}")
+    
+    def test_stream_sem_ia(self, client, monkeypatch):
+        """Testa resposta 503 quando a IA não está disponível."""
+        import app as app_module
+        monkeypatch.setattr(app_module, "IA_DISPONIVEL", False)
+        
+        response = client.post('/api/questao/stream', json={})
+        assert response.status_code == 503
 
 
 class TestAPIProvasIndividuais:
@@ -355,8 +415,7 @@ class TestAPIProvasIndividuais:
     def questoes_ids(self):
         """Fixture com questões aprovadas."""
         from app import revisao_service
-        revisao_service._questoes_cache = {}
-        revisao_service._revisoes_cache = {}
+        revisao_service.limpar_cache()
         
         ids = []
         for i in range(3):
@@ -375,8 +434,7 @@ class TestAPIProvasIndividuais:
         
         yield ids
         
-        revisao_service._questoes_cache = {}
-        revisao_service._revisoes_cache = {}
+        revisao_service.limpar_cache()
     
     def test_api_provas_individuais_sem_dados(self, client):
         """Testa POST sem dados."""
@@ -419,6 +477,246 @@ class TestAPIProvasIndividuais:
         assert data['provas_geradas'] == 5
         assert 'gabarito_consolidado' in data
         assert len(data['gabarito_consolidado']) == 5
+    
+    def test_api_submeter_lote_sem_questoes(self, client):
+        """Testa POST /api/lotes-provas sem questões."""
+        response = client.post(
+            '/api/lotes-provas',
+            data=json.dumps({'titulo': 'Prova'}),
+            content_type='application/json'
+        )
+        
+        assert response.status_code == 400
+    
+    def test_api_progresso_lote_inexistente(self, client):
+        """Testa progresso de lote desconhecido."""
+        response = client.get('/api/lotes-provas/nao-existe')
+        assert response.status_code == 404
+        
+        response = client.get('/api/lotes-provas/nao-existe/resultado')
+        assert response.status_code == 404
+
+
+class TestDownloadZip:
+    """Testes para o download do ZIP de um lote."""
+    
+    @pytest.fixture
+    def client(self):
+        from app import app
+        app.config['TESTING'] = True
+        with app.test_client() as client:
+            yield client
+    
+    @pytest.fixture
+    def lote_dir(self, tmp_path, monkeypatch):
+        import app as app_module
+        
+        monkeypatch.setattr(app_module.settings, "OUTPUT_DIR", str(tmp_path))
+        lote = tmp_path / "provas_individuais" / "lote_teste"
+        (lote / "provas_alunos").mkdir(parents=True)
+        (lote / "provas_alunos" / "prova_A1.pdf").write_bytes(b"%PDF-1.4 teste")
+        (lote / "gabarito_consolidado.json").write_text('{"A1": {}}')
+        return lote
+    
+    def test_zip_em_streaming(self, client, lote_dir):
+        """Testa ZIP montado na hora a partir do diretório do lote."""
+        import io
+        import zipfile
+        
+        response = client.get('/download/zip/lote_teste.zip')
+        
+        assert response.status_code == 200
+        assert response.mimetype == 'application/zip'
+        with zipfile.ZipFile(io.BytesIO(response.data)) as zip_lote:
+            assert sorted(zip_lote.namelist()) == [
+                "gabarito_consolidado.json", "provas_alunos/prova_A1.pdf"
+            ]
+            assert zip_lote.read("provas_alunos/prova_A1.pdf") == b"%PDF-1.4 teste"
+    
+    def test_zip_inexistente(self, client, lote_dir):
+        """Testa 404 para lote desconhecido e caminhos fora do diretório."""
+        assert client.get('/download/zip/outro_lote.zip').status_code == 404
+        assert client.get('/download/zip/../segredo.zip').status_code == 404
+
+
+class TestAPIListarQuestoes:
+    """Testes para GET /api/questoes (banco de questões paginado por cursor)."""
+    
+    @pytest.fixture
+    def client(self):
+        from app import app
+        app.config['TESTING'] = True
+        with app.test_client() as client:
+            yield client
+    
+    def test_pagina_com_cursor(self, client, monkeypatch):
+        """Testa repasse de filtros/cursor e o proximo_cursor na resposta."""
+        import app as app_module
+        chamadas = []
+        
+        def buscar_pagina(**kwargs):
+            chamadas.append(kwargs)
+            return {"questoes": [{"id": "q1"}, {"id": "q2"}], "proximo_cursor": "abc"}
+        
+        monkeypatch.setattr(
+            app_module.prova_service.questao_service, "buscar_questoes_pagina", buscar_pagina
+        )
+        
+        response = client.get('/api/questoes?materia=fisica&limite=2&cursor=xyz')
+        
+        assert response.status_code == 200
+        data = json.loads(response.data)
+        assert data["total"] == 2
+        assert data["proximo_cursor"] == "abc"
+        assert chamadas[0]["materia"] == "fisica"
+        assert chamadas[0]["limite"] == 2
+        assert chamadas[0]["cursor"] == "xyz"
+    
+    def test_cursor_invalido(self, client):
+        """Testa 400 para cursor malformado."""
+        response = client.get('/api/questoes?cursor=@@@')
+        
+        assert response.status_code == 400
+        assert "erro" in json.loads(response.data)
+    
+    def test_limite_invalido(self, client):
+        """Testa 400 (e não 500) para limite não numérico."""
+        response = client.get('/api/questoes?limite=abc')
+        
+        assert response.status_code == 400
+        assert "limite" in json.loads(response.data)["erro"]
+
+
+class TestPaginacaoBancoQuestoes:
+    """Testes para a paginação por cursor de /banco-questoes e /api/questoes/pendentes|aprovadas."""
+    
+    @pytest.fixture
+    def client(self):
+        from app import app
+        app.config['TESTING'] = True
+        with app.test_client() as client:
+            yield client
+    
+    @pytest.fixture
+    def paginas(self, monkeypatch):
+        """Substitui a listagem paginada do serviço, registrando as chamadas."""
+        import app as app_module
+        chamadas = []
+        
+        def listar(**kwargs):
+            chamadas.append(kwargs)
+            return {"questoes": [{"id": "q1", "enunciado": "E", "materia": "fisica"}], "proximo_cursor": "abc"}
+        
+        monkeypatch.setattr(app_module.revisao_service, "listar_questoes_pagina", listar)
+        return chamadas
+    
+    def test_api_pendentes_com_cursor(self, client, paginas):
+        """Testa repasse de filtros/cursor e o proximo_cursor na resposta."""
+        response = client.get('/api/questoes/pendentes?materia=fisica&dificuldade=facil&q=mru&limite=5&cursor=xyz')
+        
+        data = json.loads(response.data)
+        assert response.status_code == 200
+        assert data["proximo_cursor"] == "abc"
+        assert paginas[0] == {
+            "aba": "pendentes", "materia": "fisica", "dificuldade": "facil",
+            "texto": "mru", "limite": 5, "cursor": "xyz"
+        }
+    
+    def test_api_aprovadas_limite_maximo(self, client, paginas):
+        """Testa o limite máximo por página."""
+        client.get('/api/questoes/aprovadas?limite=5000')
+        
+        assert paginas[0]["aba"] == "aprovadas"
+        assert paginas[0]["limite"] == 200
+    
+    def test_api_cursor_invalido(self, client):
+        """Testa 400 para cursor malformado."""
+        response = client.get('/api/questoes/pendentes?cursor=@@@')
+        
+        assert response.status_code == 400
+    
+    def test_api_limite_invalido(self, client):
+        """Testa 400 (e não 500) para limite não numérico."""
+        response = client.get('/api/questoes/aprovadas?limite=abc')
+        
+        assert response.status_code == 400
+        assert "limite" in json.loads(response.data)["erro"]
+    
+    def test_pagina_html_com_proxima(self, client, paginas):
+        """Testa filtros no servidor e o link para a próxima página."""
+        response = client.get('/banco-questoes?tab=aprovadas&materia=fisica&q=mru&status=xyz')
+        
+        assert response.status_code == 200
+        assert paginas[0]["aba"] == "aprovadas"
+        assert paginas[0]["texto"] == "mru"
+        assert paginas[0]["status"] is None
+        assert b'cursor=abc' in response.data
+    
+    def test_pagina_html_cursor_invalido(self, client):
+        """Testa que um cursor inválido volta para a primeira página."""
+        response = client.get('/banco-questoes?tab=pendentes&cursor=@@@')
+        
+        assert response.status_code == 302
+        assert 'cursor' not in response.headers["Location"]
+
+
+class TestAPIBuscaQuestoes:
+    """Testes para GET /api/questoes/busca (busca textual)."""
+    
+    @pytest.fixture
+    def client(self):
+        from app import app
+        app.config['TESTING'] = True
+        with app.test_client() as client:
+            yield client
+    
+    def test_busca_com_filtros(self, client, monkeypatch):
+        """Testa repasse do texto, palavras-chave e filtros ao serviço."""
+        import app as app_module
+        chamadas = []
+        
+        def buscar_texto(**kwargs):
+            chamadas.append(kwargs)
+            return [{"id": "q1", "relevancia": 0.6}]
+        
+        monkeypatch.setattr(app_module.prova_service.questao_service, "buscar_texto", buscar_texto)
+        
+        response = client.get('/api/questoes/busca?q=queda+livre&palavras_chave=mru,cinematica&materia=fisica')
+        
+        assert response.status_code == 200
+        data = json.loads(response.data)
+        assert data["total"] == 1
+        assert data["consulta"] == "queda livre"
+        assert chamadas[0]["texto"] == "queda livre"
+        assert chamadas[0]["palavras_chave"] == ["mru", "cinematica"]
+        assert chamadas[0]["materia"] == "fisica"
+    
+    def test_busca_sem_termos(self, client):
+        """Testa 400 quando não há texto nem palavras-chave."""
+        response = client.get('/api/questoes/busca')
+        
+        assert response.status_code == 400
+    
+    def test_busca_paginacao_invalida(self, client):
+        """Testa 400 (e não 500) para limite/offset não numéricos."""
+        for query in ("limite=abc", "offset=1.5"):
+            response = client.get(f'/api/questoes/busca?q=energia&{query}')
+            
+            assert response.status_code == 400
+            assert "erro" in json.loads(response.data)
+    
+    def test_busca_sem_banco(self, client, monkeypatch):
+        """Testa 503 quando o banco está indisponível."""
+        import app as app_module
+        
+        def buscar_texto(**kwargs):
+            raise RuntimeError("sem conexão")
+        
+        monkeypatch.setattr(app_module.prova_service.questao_service, "buscar_texto", buscar_texto)
+        
+        response = client.get('/api/questoes/busca?q=energia')
+        
+        assert response.status_code == 503
 
 
 class TestIntegracaoRotas:
@@ -435,11 +733,9 @@ class TestIntegracaoRotas:
     def setup(self):
         """Setup e teardown."""
         from app import revisao_service
-        revisao_service._questoes_cache = {}
-        revisao_service._revisoes_cache = {}
+        revisao_service.limpar_cache()
         yield
-        revisao_service._questoes_cache = {}
-        revisao_service._revisoes_cache = {}
+        revisao_service.limpar_cache()
     
     def test_fluxo_completo_web(self, client, setup):
         """Testa fluxo completo via interface web."""
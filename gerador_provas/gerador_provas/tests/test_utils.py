@@ -127,6 +127,464 @@ class TestLatexGenerator:
         assert "4" in latex
 
 
+class TestFormatoLatex:
+    """Testes para o preâmbulo LaTeX pré-compilado."""
+    
+    def test_hash_preambulo(self):
+        """Testa que o hash identifica o texto do preâmbulo."""
+        from backend.utils.formato_latex import calcular_hash_preambulo
+        
+        assert calcular_hash_preambulo("a") == calcular_hash_preambulo("a")
+        assert calcular_hash_preambulo("a") != calcular_hash_preambulo("b")
+    
+    def test_falha_nao_repete_geracao(self, tmp_path, monkeypatch):
+        """Testa que um formato que falhou não é gerado de novo no processo."""
+        from backend.utils import formato_latex
+        
+        chamadas = []
+        monkeypatch.setattr(formato_latex, "_formatos", {})
+        monkeypatch.setattr(
+            formato_latex, "_gerar_formato",
+            lambda preambulo, destino: chamadas.append(destino) or False
+        )
+        
+        assert formato_latex.obter_formato("preambulo", str(tmp_path)) is None
+        assert formato_latex.obter_formato("preambulo", str(tmp_path)) is None
+        assert len(chamadas) == 1
+    
+    def test_formato_existente_reaproveitado(self, tmp_path, monkeypatch):
+        """Testa reuso de um .fmt já gerado por outro processo."""
+        from backend.utils import formato_latex
+        
+        monkeypatch.setattr(formato_latex, "_formatos", {})
+        monkeypatch.setattr(formato_latex, "_gerar_formato", lambda p, d: False)
+        
+        chave = formato_latex.calcular_hash_preambulo("preambulo")
+        (tmp_path / f"prova_abnt_{chave}.fmt").write_bytes(b"fmt")
+        
+        formato = formato_latex.obter_formato("preambulo", str(tmp_path))
+        assert formato == str(tmp_path / f"prova_abnt_{chave}")
+    
+    def test_compilacao_com_formato(self, tmp_path, monkeypatch):
+        """Testa que só o preâmbulo fixo vai para o formato."""
+        from pylatex import Document
+        from backend.utils import prova_pdf_generator as modulo
+        
+        preambulos = []
+        compilacoes = []
+        monkeypatch.setattr(modulo.shutil, "which", lambda nome: "/usr/bin/pdflatex")
+        monkeypatch.setattr(
+            modulo, "obter_formato",
+            lambda preambulo: preambulos.append(preambulo) or "/fmt/prova_abnt"
+        )
+        monkeypatch.setattr(
+            Document, "generate_pdf",
+            lambda self, caminho, **kwargs: compilacoes.append((self.dumps(), kwargs))
+        )
+        
+        gerador = modulo.ProvaPDFGenerator(usar_formato_precompilado=True)
+        prova = {"titulo": "Prova Formato", "questoes": [{"enunciado": "Quanto é 1 + 1?", "resposta": "2"}]}
+        caminho = gerador.gerar_prova_pdf(prova, nome_arquivo="prova_fmt", output_dir=str(tmp_path))
+        
+        assert caminho.endswith(".pdf")
+        assert "tcolorbox" in preambulos[0]
+        assert "Prova Formato" not in preambulos[0]
+        
+        tex, kwargs = compilacoes[0]
+        assert kwargs["compiler_args"] == ["-fmt=/fmt/prova_abnt"]
+        assert tex.index("\\endofdump") < tex.index("Prova Formato")
+
+
+class TestTotalPaginas:
+    """Testes para o total de páginas reaproveitado entre variantes."""
+    
+    def _prova(self, ordem):
+        questoes = [
+            {"enunciado": "Primeira questão", "resposta": "A",
+             "alternativas": [{"letra": "A", "texto": "Um", "correta": True},
+                              {"letra": "B", "texto": "Dois", "correta": False}]},
+            {"enunciado": "Segunda questão", "resposta": "Livre"},
+        ]
+        return {"titulo": "Prova Layout", "questoes": [questoes[i] for i in ordem]}
+    
+    def test_chave_layout_ignora_ordem(self):
+        """Testa que variantes embaralhadas têm a mesma chave de layout."""
+        from backend.utils.prova_pdf_generator import ProvaPDFGenerator
+        
+        gerador = ProvaPDFGenerator()
+        chave_a = gerador._chave_layout(self._prova([0, 1]), "prova")
+        chave_b = gerador._chave_layout(self._prova([1, 0]), "prova")
+        
+        assert chave_a == chave_b
+        assert chave_a != gerador._chave_layout(self._prova([0, 1]), "gabarito")
+    
+    def test_uma_passada_apos_primeira_variante(self, tmp_path, monkeypatch):
+        """Testa que só a primeira variante do layout compila duas vezes."""
+        from pylatex import Document
+        from backend.utils import prova_pdf_generator as modulo
+        
+        compilacoes = []
+        
+        def gerar_pdf_falso(doc, caminho, **kwargs):
+            compilacoes.append(doc.dumps())
+            with open(caminho + ".aux", "w") as f:
+                f.write("\\newlabel{LastPage}{{}{3}{}{page.3}{}}\n")
+        
+        monkeypatch.setattr(modulo, "_totais_paginas", modulo.OrderedDict())
+        monkeypatch.setattr(Document, "generate_pdf", gerar_pdf_falso)
+        
+        gerador = modulo.ProvaPDFGenerator(usar_formato_precompilado=False)
+        gerador.gerar_prova_pdf(self._prova([0, 1]), nome_arquivo="aluno1", output_dir=str(tmp_path))
+        assert len(compilacoes) == 2
+        assert "\\newcommand{\\totalpaginas}{\\pageref{LastPage}}" in compilacoes[0]
+        assert "\\newcommand{\\totalpaginas}{3}" in compilacoes[1]
+        
+        gerador.gerar_prova_pdf(self._prova([1, 0]), nome_arquivo="aluno2", output_dir=str(tmp_path))
+        assert len(compilacoes) == 3
+        assert "\\newcommand{\\totalpaginas}{3}" in compilacoes[2]
+        
+        assert not list(tmp_path.glob("*.aux"))
+    
+    def test_limite_dos_totais_de_paginas(self, tmp_path, monkeypatch):
+        """Testa que os totais de páginas guardados descartam os layouts menos usados."""
+        from pylatex import Document
+        from backend.utils import prova_pdf_generator as modulo
+        
+        def gerar_pdf_falso(doc, caminho, **kwargs):
+            with open(caminho + ".aux", "w") as f:
+                f.write("\\newlabel{LastPage}{{}{2}{}{page.2}{}}\n")
+        
+        monkeypatch.setattr(modulo, "_totais_paginas", modulo.OrderedDict())
+        monkeypatch.setattr(modulo, "MAX_TOTAIS_PAGINAS", 2)
+        monkeypatch.setattr(Document, "generate_pdf", gerar_pdf_falso)
+        
+        gerador = modulo.ProvaPDFGenerator(usar_formato_precompilado=False)
+        for titulo in ("A", "B", "C"):
+            prova = self._prova([0, 1])
+            prova["titulo"] = f"Prova {titulo}"
+            gerador.gerar_prova_pdf(prova, nome_arquivo=titulo, output_dir=str(tmp_path))
+        
+        assert len(modulo._totais_paginas) == 2
+
+
+class TestBackendReportLab:
+    """Testes para o backend ReportLab do gerador de provas."""
+    
+    @pytest.fixture
+    def prova(self):
+        return {
+            "titulo": "Prova ReportLab",
+            "materia": "fisica",
+            "tempo_limite_min": 60,
+            "questoes": [
+                {
+                    "enunciado": "Qual a unidade de força? <SI> & cia",
+                    "resposta": "A",
+                    "explicacao": "Newton é a unidade do SI.",
+                    "alternativas": [
+                        {"letra": "A", "texto": "Newton", "correta": True},
+                        {"letra": "B", "texto": "Joule", "correta": False}
+                    ]
+                },
+                {"enunciado": "Explique a 1ª lei de Newton.", "resposta": "Inércia"}
+            ]
+        }
+    
+    def _paginas(self, caminho):
+        pdfplumber = pytest.importorskip("pdfplumber")
+        with pdfplumber.open(caminho) as pdf:
+            return [pagina.extract_text() or "" for pagina in pdf.pages]
+    
+    def test_backend_invalido(self):
+        """Testa erro para backend desconhecido."""
+        from backend.utils.prova_pdf_generator import ProvaPDFGenerator
+        
+        with pytest.raises(ValueError):
+            ProvaPDFGenerator(backend="word")
+    
+    def test_backend_auto_sem_pdflatex(self, monkeypatch):
+        """Testa que o modo auto usa ReportLab quando não há pdflatex."""
+        from backend.utils import prova_pdf_generator as modulo
+        
+        monkeypatch.setattr(modulo.shutil, "which", lambda nome: None)
+        assert modulo.ProvaPDFGenerator(backend="auto").backend == "reportlab"
+    
+    def test_prova_e_gabarito(self, prova, tmp_path):
+        """Testa prova e gabarito em PDF, com cabeçalho e total de páginas."""
+        from backend.utils.prova_pdf_generator import ProvaPDFGenerator
+        
+        gerador = ProvaPDFGenerator(backend="reportlab")
+        caminho_prova = gerador.gerar_prova_pdf(
+            prova, nome_arquivo="prova_rl", instituicao="Escola Teste", output_dir=str(tmp_path)
+        )
+        caminho_gabarito = gerador.gerar_gabarito_pdf(
+            prova, nome_arquivo="gabarito_rl", output_dir=str(tmp_path)
+        )
+        
+        assert caminho_prova == str(tmp_path / "prova_rl.pdf")
+        paginas = self._paginas(caminho_prova)
+        assert "Escola Teste" in paginas[0]
+        assert f"Página 1 de {len(paginas)}" in paginas[0]
+        assert "<SI> & cia" in "".join(paginas)
+        assert "Newton é a unidade" not in "".join(paginas)
+        
+        texto_gabarito = "".join(self._paginas(caminho_gabarito))
+        assert "GABARITO" in texto_gabarito
+        assert "Newton é a unidade" in texto_gabarito
+    
+    def test_prova_professor(self, prova, tmp_path):
+        """Testa a prova do professor com alternativas comentadas."""
+        from backend.utils.prova_pdf_generator import ProvaPDFGenerator
+        
+        prova_professor = dict(prova)
+        prova_professor["questoes"] = [dict(q, numero=i) for i, q in enumerate(prova["questoes"], 1)]
+        prova_professor["questoes"][0]["alternativas"][1]["explicacao"] = "Joule mede energia."
+        prova_professor["gabarito_completo"] = {"1": "A", "2": "Inércia"}
+        
+        gerador = ProvaPDFGenerator(backend="reportlab")
+        caminho = gerador.gerar_prova_professor_pdf(
+            prova_professor, nome_arquivo="professor_rl", output_dir=str(tmp_path)
+        )
+        
+        texto = "".join(self._paginas(caminho))
+        assert "PROVA DO PROFESSOR" in texto
+        assert "(A) CORRETA" in texto
+        assert "Por que está errada: Joule mede energia." in texto
+
+
+class TestFragmentosLatex:
+    """Testes para o cache de fragmentos LaTeX das questões."""
+    
+    def _questoes(self):
+        return [
+            {"enunciado": "Quanto é 50% de 10?", "resposta": "A",
+             "alternativas": [{"letra": "A", "texto": "5", "correta": True},
+                              {"letra": "B", "texto": "2 & 3", "correta": False}]},
+            {"enunciado": "Explique o_conceito.", "resposta": "Livre"},
+        ]
+    
+    def _renderizar(self, gerador, questoes):
+        from pylatex import Document
+        
+        doc = Document()
+        for i, q in enumerate(questoes, 1):
+            if q.get("alternativas"):
+                gerador._adicionar_questao_multipla_escolha(doc, i, q)
+            else:
+                gerador._adicionar_questao_dissertativa(doc, i, q)
+        return doc.dumps()
+    
+    def test_variante_reaproveita_fragmentos(self, monkeypatch):
+        """Testa que a segunda variante não escapa os textos de novo."""
+        from backend.utils import prova_pdf_generator as modulo
+        
+        monkeypatch.setattr(modulo, "_fragmentos", modulo.OrderedDict())
+        gerador = modulo.ProvaPDFGenerator(backend="latex")
+        
+        escapados = []
+        escapar_original = gerador._escapar_latex
+        gerador._escapar_latex = lambda texto: escapados.append(texto) or escapar_original(texto)
+        
+        questoes = self._questoes()
+        self._renderizar(gerador, questoes)
+        assert len(escapados) == 4
+        
+        # Variante embaralhada: outra ordem de questões e alternativas
+        variante = [dict(questoes[1]), dict(questoes[0], alternativas=questoes[0]["alternativas"][::-1])]
+        tex = self._renderizar(gerador, variante)
+        
+        assert len(escapados) == 4
+        assert tex.index("2 \\& 3") < tex.index("\\item 5")
+        assert "Questão 1" in tex and "o\\_conceito" in tex
+    
+    def test_limite_do_cache(self, monkeypatch):
+        """Testa que o cache descarta os fragmentos menos usados."""
+        from backend.utils import prova_pdf_generator as modulo
+        
+        monkeypatch.setattr(modulo, "_fragmentos", modulo.OrderedDict())
+        monkeypatch.setattr(modulo, "MAX_FRAGMENTOS", 2)
+        gerador = modulo.ProvaPDFGenerator(backend="latex")
+        
+        for texto in ["a", "b", "c"]:
+            gerador._fragmento("alternativa", texto, lambda: texto.upper())
+        
+        assert list(modulo._fragmentos) == [("alternativa", "b"), ("alternativa", "c")]
+
+
+class TestEmpacotadorZip:
+    """Testes para o empacotamento dos lotes em ZIP."""
+    
+    @pytest.fixture
+    def lote_dir(self, tmp_path):
+        lote = tmp_path / "lote"
+        (lote / "provas").mkdir(parents=True)
+        (lote / "provas" / "prova_A1.pdf").write_bytes(b"%PDF-1.4 " + b"x" * 2000)
+        (lote / "gabarito.json").write_text('{"1": "A"}' * 200)
+        return lote
+    
+    def test_metodo_por_extensao(self):
+        """Testa STORED para PDFs e DEFLATE para texto."""
+        import zipfile
+        from backend.utils.empacotador_zip import metodo_compressao
+        
+        assert metodo_compressao("prova.PDF") == zipfile.ZIP_STORED
+        assert metodo_compressao("gabarito.json") == zipfile.ZIP_DEFLATED
+        assert metodo_compressao("prova.tex") == zipfile.ZIP_DEFLATED
+    
+    def test_zip_incremental(self, lote_dir, tmp_path):
+        """Testa ZIP montado aos poucos, sem arquivos repetidos."""
+        import zipfile
+        from backend.utils.empacotador_zip import EmpacotadorZip
+        
+        caminho_zip = str(tmp_path / "lote.zip")
+        with EmpacotadorZip(caminho_zip) as empacotador:
+            assert empacotador.adicionar_arquivo(str(lote_dir / "provas" / "prova_A1.pdf"), "provas/prova_A1.pdf")
+            assert not os.path.exists(caminho_zip)
+            empacotador.adicionar_diretorio(str(lote_dir), str(lote_dir))
+        
+        with zipfile.ZipFile(caminho_zip) as zip_lote:
+            infos = {info.filename: info for info in zip_lote.infolist()}
+        
+        assert sorted(infos) == ["gabarito.json", "provas/prova_A1.pdf"]
+        assert infos["provas/prova_A1.pdf"].compress_type == zipfile.ZIP_STORED
+        assert infos["gabarito.json"].compress_type == zipfile.ZIP_DEFLATED
+        assert not os.path.exists(caminho_zip + ".parcial")
+    
+    def test_zip_descartado_em_erro(self, lote_dir, tmp_path):
+        """Testa que erro no lote não deixa ZIP parcial."""
+        from backend.utils.empacotador_zip import EmpacotadorZip
+        
+        caminho_zip = str(tmp_path / "lote.zip")
+        with pytest.raises(RuntimeError):
+            with EmpacotadorZip(caminho_zip) as empacotador:
+                empacotador.adicionar_diretorio(str(lote_dir), str(lote_dir))
+                raise RuntimeError("falha")
+        
+        assert os.listdir(tmp_path) == ["lote"]
+    
+    def test_zip_stream(self, lote_dir):
+        """Testa que o stream forma um ZIP válido, em vários pedaços."""
+        import io
+        import zipfile
+        from backend.utils.empacotador_zip import gerar_zip_stream, listar_arquivos
+        
+        pedacos = list(gerar_zip_stream(listar_arquivos(str(lote_dir)), tamanho_bloco=512))
+        assert len(pedacos) > 2
+        
+        with zipfile.ZipFile(io.BytesIO(b"".join(pedacos))) as zip_lote:
+            assert zip_lote.testzip() is None
+            assert zip_lote.read("gabarito.json") == b'{"1": "A"}' * 200
+
+
+class TestCompiladorPDF:
+    """Testes para a compilação paralela de provas individuais."""
+    
+    def _tarefa(self, tmp_path, codigo):
+        return {
+            "prova": {
+                "titulo": "Prova Paralela",
+                "codigo_prova": codigo,
+                "questoes": [{
+                    "numero": 1,
+                    "enunciado": f"Questão da prova {codigo}",
+                    "resposta": "A",
+                    "alternativas": [
+                        {"letra": "A", "texto": "Certa", "correta": True},
+                        {"letra": "B", "texto": "Errada", "correta": False}
+                    ]
+                }]
+            },
+            "nome_prova": f"prova_{codigo}",
+            "nome_gabarito": f"gabarito_{codigo}",
+            "provas_dir": str(tmp_path / "provas"),
+            "gabaritos_dir": str(tmp_path / "gabaritos")
+        }
+    
+    def test_num_workers_padrao(self):
+        """Testa que 0 ou None usa o número de CPUs."""
+        from backend.utils.compilador_pdf import get_num_workers
+        
+        assert get_num_workers(0) == (os.cpu_count() or 1)
+        assert get_num_workers(3) == 3
+    
+    def test_ordem_e_diretorios(self, tmp_path):
+        """Testa ordem dos resultados e arquivos nos diretórios finais."""
+        from backend.utils.compilador_pdf import compilar_provas_alunos
+        
+        codigos = ["A001", "A002", "A003"]
+        tarefas = [self._tarefa(tmp_path, c) for c in codigos]
+        
+        resultados = list(compilar_provas_alunos(tarefas, max_workers=2))
+        
+        assert len(resultados) == 3
+        for codigo, resultado in zip(codigos, resultados):
+            assert resultado["erro"] is None
+            assert os.path.basename(resultado["caminho_pdf"]).startswith(f"prova_{codigo}")
+            assert os.path.dirname(resultado["caminho_pdf"]) == str(tmp_path / "provas")
+            assert os.path.dirname(resultado["caminho_gabarito"]) == str(tmp_path / "gabaritos")
+            assert os.path.exists(resultado["caminho_pdf"])
+            assert os.path.exists(resultado["caminho_gabarito"])
+    
+    def test_pool_compartilhado_entre_lotes(self, tmp_path):
+        """Testa que todos os lotes usam o mesmo pool, iniciado com spawn."""
+        from backend.utils import compilador_pdf
+        
+        list(compilador_pdf.compilar_provas_alunos(
+            [self._tarefa(tmp_path, c) for c in ("C001", "C002")], max_workers=2
+        ))
+        pool = compilador_pdf._pool
+        list(compilador_pdf.compilar_provas_alunos(
+            [self._tarefa(tmp_path, c) for c in ("C003", "C004")], max_workers=2
+        ))
+        
+        assert pool is not None
+        assert compilador_pdf._pool is pool
+        assert pool._mp_context.get_start_method() == "spawn"
+    
+    def _importar_em_processo_novo(self, codigo: str) -> str:
+        """Executa o código em um interpretador novo e devolve a saída."""
+        import subprocess
+        
+        raiz = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+        saida = subprocess.run(
+            [sys.executable, "-c", codigo], cwd=raiz, capture_output=True, text=True,
+            timeout=120, env={**os.environ, "OTEL_SDK_DISABLED": "true"}
+        )
+        assert saida.returncode == 0, saida.stderr
+        return saida.stdout.strip().splitlines()[-1]
+    
+    def test_processo_do_pool_nao_carrega_crewai(self):
+        """Testa que o módulo executado nos processos do pool não importa o CrewAI (backend/__init__ sob demanda)."""
+        carregados = self._importar_em_processo_novo(
+            "import sys; import backend.utils.compilador_pdf; "
+            "from backend.utils.prova_pdf_generator import ProvaPDFGenerator; "
+            "print(sorted(m for m in ('crewai', 'litellm', 'pandas') if m in sys.modules))"
+        )
+        
+        assert carregados == "[]"
+    
+    def test_app_reimportado_no_pool_sem_servicos(self):
+        """Testa que app.py reimportado como __mp_main__ (spawn) não monta serviços nem consulta o banco."""
+        resultado = self._importar_em_processo_novo(
+            "import runpy, sys; g = runpy.run_path('app.py', run_name='__mp_main__'); "
+            "print(g['PROCESSO_SERVIDOR'], 'fila_lotes_service' in g, "
+            "'crewai' in sys.modules, 'sqlalchemy' in sys.modules)"
+        )
+        
+        assert resultado == "False False False False"
+    
+    def test_sequencial_sem_sobras(self, tmp_path):
+        """Testa que só os arquivos finais chegam aos diretórios do lote."""
+        from backend.utils.compilador_pdf import compilar_provas_alunos
+        
+        tarefas = [self._tarefa(tmp_path, "B001")]
+        resultado = next(compilar_provas_alunos(tarefas, max_workers=1))
+        
+        assert resultado["erro"] is None
+        arquivos = os.listdir(tmp_path / "provas")
+        assert arquivos == [os.path.basename(resultado["caminho_pdf"])]
+
+
 class TestDashboard:
     """Testes para o dashboard."""
     